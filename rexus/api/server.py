@@ -8,7 +8,6 @@ import time
 from datetime import datetime, timedelta
 from typing import Optional, List, Tuple
 from dataclasses import asdict
-import threading
 
 try:
     from fastapi import FastAPI, HTTPException, Depends, status, Request, Body
@@ -58,6 +57,8 @@ from ..core.config import get_env_var, SECURITY_CONFIG
 from ..core.logger import get_logger
 from ..core.database_pool import database_transaction
 from ..utils.cache_manager import get_cache_manager
+# Rate limiting por cliente (ventana deslizante, O(1) por request)
+from ..core.rate_limiter import SlidingWindowRateLimiter as RateLimiter
 
 # Obtener instancia del cache manager
 cache_manager = get_cache_manager()
@@ -114,36 +115,6 @@ class APIStats(BaseModel):
     active_connections: int
     cache_hit_rate: float
 
-# Rate limiting simple
-class RateLimiter:
-    def __init__(self, max_requests: int = 100, window_seconds: int = 60):
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
-        self.requests = {}
-        self.lock = threading.RLock()
-
-    def is_allowed(self, client_id: str) -> bool:
-        with self.lock:
-            now = time.time()
-            window_start = now - self.window_seconds
-
-            # Limpiar requests antiguos
-            if client_id in self.requests:
-                self.requests[client_id] = [
-                    req_time for req_time in self.requests[client_id]
-                    if req_time > window_start
-                ]
-            else:
-                self.requests[client_id] = []
-
-            # Verificar límite
-            if len(self.requests[client_id]) >= self.max_requests:
-                return False
-
-            # Agregar nueva request
-            self.requests[client_id].append(now)
-            return True
-
 class RexusAPI:
     """
     API REST para Rexus con autenticación, rate limiting y documentación automática
@@ -13,6 +13,8 @@ Características:
 - Detección de manipulación o corrupción
 - Sellado temporal opcional
 - Exportación segura de registros
+- Checkpoints firmados (raíz Merkle por tramo) para verificación incremental
+- Verificación en paralelo (pool de procesos) y en streaming desde la BD
 
 Author: Rexus Development Team
 Date: 2025-08-11
@@ -21,22 +23,36 @@ Version: 1.0.0
 
 import json
 import hashlib
+import logging
+import os
 import time
 import secrets
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict, field
 from enum import Enum
 import base64
 
 try:
+    from cryptography.exceptions import InvalidSignature
     from cryptography.hazmat.primitives import hashes, serialization
     from cryptography.hazmat.primitives.asymmetric import rsa, padding
-    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+    from cryptography.hazmat.primitives.serialization import (
+        load_pem_private_key,
+        load_pem_public_key,
+    )
     from cryptography.hazmat.backends import default_backend
     CRYPTOGRAPHY_AVAILABLE = True
 except ImportError:
     CRYPTOGRAPHY_AVAILABLE = False
+    InvalidSignature = ValueError
+
+logger = logging.getLogger("audit_integrity")
+
+# Campos de integridad excluidos del hash de contenido
+_INTEGRITY_FIELDS = ('content_hash', 'previous_hash', 'chain_hash', 'signature', 'integrity_sealed')
 
 try:
     from rexus.utils.secure_logger import log_security_event
@@ -95,6 +111,39 @@ class IntegrityReport:
     last_record_timestamp: Optional[str]
     verification_timestamp: str
     issues: List[Dict[str, Any]] = field(default_factory=list)
+    resumed_from: Optional[int] = None
+    checkpoints: List["IntegrityCheckpoint"] = field(default_factory=list)
+
+
+@dataclass
+class IntegrityCheckpoint:
+    """
+    Punto de control firmado de la cadena de integridad.
+
+    Atestigua que los primeros record_count registros fueron verificados y
+    que la cadena terminaba en last_chain_hash. merkle_root resume los
+    chain_hash de los segment_count registros del tramo desde el checkpoint
+    anterior.
+    """
+    record_count: int
+    last_record_id: str
+    last_record_timestamp: str
+    last_chain_hash: str
+    merkle_root: str
+    previous_checkpoint_hash: Optional[str]
+    created_at: str
+    key_fingerprint: str
+    segment_count: int = 0
+    signature: Optional[str] = None
+
+    def signed_payload(self) -> bytes:
+        data = asdict(self)
+        data.pop('signature', None)
+        return json.dumps(data, sort_keys=True).encode()
+
+    @property
+    def checkpoint_hash(self) -> str:
+        return hashlib.sha256(self.signed_payload()).hexdigest()
 
 
 @dataclass
@@ -108,6 +157,147 @@ class IntegrityChainInfo:
     key_fingerprint: str
 
 
+def _content_hash(record: AuditRecord) -> str:
+    """Hash SHA256 determinístico del contenido (sin campos de integridad)."""
+    record_dict = asdict(record)
+    for name in _INTEGRITY_FIELDS:
+        record_dict.pop(name, None)
+    content = json.dumps(record_dict, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def _chain_hash(content_hash: str, previous_hash: Optional[str]) -> str:
+    """Hash de cadena: combina el hash de contenido con el hash previo."""
+    chain_content = f"{content_hash}:{previous_hash or 'genesis'}"
+    return hashlib.sha256(chain_content.encode()).hexdigest()
+
+
+def _record_signature_payload(record: AuditRecord) -> bytes:
+    sign_data = {
+        "id": record.id,
+        "timestamp": record.timestamp,
+        "content_hash": record.content_hash,
+        "chain_hash": record.chain_hash
+    }
+    return json.dumps(sign_data, sort_keys=True).encode()
+
+
+def _verify_with_public_key(public_key, data: bytes, signature: str) -> bool:
+    try:
+        public_key.verify(
+            base64.b64decode(signature),
+            data,
+            padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),
+                salt_length=padding.PSS.MAX_LENGTH
+            ),
+            hashes.SHA256()
+        )
+        return True
+    except (InvalidSignature, ValueError, TypeError) as e:
+        logger.error(f"Error verificando firma de datos: {e}")
+        return False
+
+
+def _check_record(record: AuditRecord, public_key) -> Tuple[IntegrityStatus, List[str]]:
+    """Verificación individual de un registro (sin enlace con el anterior)."""
+    if not record.integrity_sealed:
+        return IntegrityStatus.TAMPERED, ["Registro no está sellado para integridad"]
+
+    expected_content_hash = _content_hash(record)
+    if record.content_hash != expected_content_hash:
+        return IntegrityStatus.CORRUPTED, [
+            f"Hash de contenido inválido: esperado {expected_content_hash[:16]}..., obtenido {record.content_hash[:16] if record.content_hash else 'None'}..."
+        ]
+
+    if record.signature and public_key is not None:
+        if not _verify_with_public_key(public_key, _record_signature_payload(record), record.signature):
+            return IntegrityStatus.SIGNATURE_INVALID, ["Firma digital inválida"]
+
+    expected_chain_hash = _chain_hash(expected_content_hash, record.previous_hash)
+    if record.chain_hash != expected_chain_hash:
+        return IntegrityStatus.CHAIN_BROKEN, [
+            f"Hash de cadena inválido: esperado {expected_chain_hash[:16]}..., obtenido {record.chain_hash[:16] if record.chain_hash else 'None'}..."
+        ]
+
+    return IntegrityStatus.VALID, []
+
+
+def merkle_root(hashes_hex: List[str]) -> str:
+    """Raíz Merkle (SHA256) de una lista de hashes hexadecimales."""
+    if not hashes_hex:
+        return hashlib.sha256(b"").hexdigest()
+    level = list(hashes_hex)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [
+            hashlib.sha256((level[i] + level[i + 1]).encode()).hexdigest()
+            for i in range(0, len(level), 2)
+        ]
+    return level[0]
+
+
+# Estado de los procesos del pool de verificación
+_worker_public_key = None
+
+
+def _init_verification_worker(public_pem: Optional[bytes]):
+    global _worker_public_key
+    _worker_public_key = load_pem_public_key(public_pem, backend=default_backend()) if public_pem else None
+
+
+def _verify_chunk_worker(records: List[AuditRecord]) -> List[Tuple[str, List[str]]]:
+    return [
+        (status.value, issues)
+        for status, issues in (_check_record(r, _worker_public_key) for r in records)
+    ]
+
+
+def iter_audit_records(cursor, batch_size: int = 1000) -> Iterator[AuditRecord]:
+    """
+    Recorre en streaming los registros de un cursor DB-API ya ejecutado
+    (ordenado cronológicamente) usando fetchmany, sin cargarlos en memoria.
+
+    Las columnas se mapean por nombre a los campos de AuditRecord; la
+    columna 'details' puede venir como JSON.
+    """
+    columns = [desc[0] for desc in cursor.description]
+    known = set(AuditRecord.__dataclass_fields__)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            data = {k: v for k, v in zip(columns, row) if k in known}
+            if isinstance(data.get('details'), str):
+                data['details'] = json.loads(data['details'])
+            data['integrity_sealed'] = bool(data.get('integrity_sealed'))
+            yield AuditRecord(**data)
+
+
+def save_checkpoint(checkpoint: IntegrityCheckpoint, path: str):
+    """Guarda un checkpoint en disco (JSON)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(asdict(checkpoint), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> Optional[IntegrityCheckpoint]:
+    """
+    Carga un checkpoint guardado con save_checkpoint (None si no existe).
+
+    No valida nada: la firma se comprueba al reanudar con
+    verify_chain_integrity, y la raíz Merkle solo si se le pasa el tramo
+    del checkpoint (checkpoint_segment).
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return IntegrityCheckpoint(**json.load(f))
+
+
 class AuditIntegrityManager:
     """
     Gestor de integridad para registros de auditoría.
@@ -287,110 +477,157 @@ class AuditIntegrityManager:
         Returns:
             Tupla con estado de integridad y lista de problemas encontrados
         """
-        issues = []
-
         try:
-            # Verificar si el registro está sellado
-            if not record.integrity_sealed:
-                issues.append("Registro no está sellado para integridad")
-                return IntegrityStatus.TAMPERED, issues
-
-            # Verificar hash del contenido
-            expected_content_hash = self._calculate_content_hash(record, exclude_integrity=True)
-            if record.content_hash != expected_content_hash:
-                issues.append(f"Hash de contenido inválido: esperado {expected_content_hash[:16]}..., obtenido {record.content_hash[:16] if record.content_hash else 'None'}...")
-                return IntegrityStatus.CORRUPTED, issues
-
-            # Verificar firma si está presente
-            if record.signature and self.signature_enabled:
-                if not self._verify_signature(record):
-                    issues.append("Firma digital inválida")
-                    return IntegrityStatus.SIGNATURE_INVALID, issues
-
-            # Verificar hash de cadena
-            expected_chain_hash = self._calculate_chain_hash(record, exclude_integrity=True)
-            if record.chain_hash != expected_chain_hash:
-                issues.append(f"Hash de cadena inválido: esperado {expected_chain_hash[:16]}..., obtenido {record.chain_hash[:16] if record.chain_hash else 'None'}...")
-                return IntegrityStatus.CHAIN_BROKEN, issues
-
-            return IntegrityStatus.VALID, []
+            public_key = self.public_key if self.signature_enabled else None
+            return _check_record(record, public_key)
 
         except Exception as e:
-            issues.append(f"Error durante verificación: {str(e)}")
             log_security_event(
                 "AUDIT_RECORD_VERIFICATION_ERROR",
                 {"record_id": record.id, "error": str(e)},
                 "ERROR"
             )
-            return IntegrityStatus.CORRUPTED, issues
-
-    def verify_chain_integrity(self, records: List[AuditRecord]) -> IntegrityReport:
+            return IntegrityStatus.CORRUPTED, [f"Error durante verificación: {str(e)}"]
+
+    def verify_chain_integrity(self,
+                               records: Iterable[AuditRecord],
+                               checkpoint: Optional[IntegrityCheckpoint] = None,
+                               checkpoint_every: int = 0,
+                               workers: int = 0,
+                               chunk_size: int = 500,
+                               checkpoint_segment: Optional[Iterable[AuditRecord]] = None) -> IntegrityReport:
         """
         Verifica la integridad de una cadena completa de registros.
 
+        Los registros se consumen en streaming (lista, generador o
+        iter_audit_records sobre un cursor) por tramos de chunk_size. El
+        enlace entre registros se comprueba en orden en este proceso; los
+        hashes y firmas individuales pueden repartirse en un pool de procesos.
+
         Args:
-            records: Lista de registros ordenados cronológicamente
+            records: Registros ordenados cronológicamente. Si se indica
+                checkpoint, solo los posteriores a él
+            checkpoint: Último checkpoint verificado; la verificación se
+                reanuda desde allí en lugar de recorrer toda la historia.
+                La firma solo prueba que el tramo era válido cuando se emitió
+                el checkpoint; una fila alterada después, antes del punto de
+                reanudación, pasa inadvertida salvo que se indique
+                checkpoint_segment
+            checkpoint_every: Emite un checkpoint firmado cada N registros
+                válidos (0 = no emitir)
+            workers: Procesos para verificar hashes y firmas (0/1 = en proceso)
+            chunk_size: Registros por tramo enviado a cada proceso
+            checkpoint_segment: Registros del tramo que cierra el checkpoint
+                (los últimos checkpoint.segment_count); se vuelven a verificar
+                y se recalcula su raíz Merkle antes de reanudar
 
         Returns:
             Reporte completo de integridad de la cadena
         """
         report = IntegrityReport(
-            total_records=len(records),
+            total_records=0,
             valid_records=0,
             corrupted_records=0,
             missing_records=0,
             tampered_records=0,
             chain_integrity=True,
             signature_validity=True,
-            first_record_timestamp=records[0].timestamp if records else None,
-            last_record_timestamp=records[-1].timestamp if records else None,
+            first_record_timestamp=None,
+            last_record_timestamp=None,
             verification_timestamp=datetime.now().isoformat()
         )
 
-        if not records:
-            return report
+        previous_hash = None
+        base_count = 0
+        if checkpoint is not None:
+            if not self.verify_checkpoint(checkpoint):
+                report.chain_integrity = False
+                report.signature_validity = False
+                report.issues.append({
+                    "record_id": "CHECKPOINT",
+                    "record_index": -1,
+                    "timestamp": checkpoint.last_record_timestamp,
+                    "issue": "Firma de checkpoint inválida"
+                })
+                return report
+            if checkpoint_segment is not None:
+                segment_issues = self.verify_checkpoint_segment(checkpoint, checkpoint_segment)
+                if segment_issues:
+                    report.chain_integrity = False
+                    report.issues.extend({
+                        "record_id": "CHECKPOINT",
+                        "record_index": -1,
+                        "timestamp": checkpoint.last_record_timestamp,
+                        "issue": issue
+                    } for issue in segment_issues)
+                    return report
+            previous_hash = checkpoint.last_chain_hash
+            base_count = checkpoint.record_count
+            report.resumed_from = checkpoint.record_count
+
+        last_checkpoint = checkpoint
+        segment_hashes: List[str] = []
+        last_record: Optional[AuditRecord] = None
 
         try:
-            previous_hash = None
-
-            for i, record in enumerate(records):
-                # Verificar integridad individual
-                status, issues = self.verify_record_integrity(record)
-
-                if status == IntegrityStatus.VALID:
-                    report.valid_records += 1
-                elif status == IntegrityStatus.CORRUPTED:
-                    report.corrupted_records += 1
-                    report.chain_integrity = False
-                elif status == IntegrityStatus.TAMPERED:
-                    report.tampered_records += 1
-                    report.chain_integrity = False
-                elif status == IntegrityStatus.SIGNATURE_INVALID:
-                    report.signature_validity = False
-
-                if issues:
-                    report.issues.extend([
-                        {
-                            "record_id": record.id,
-                            "record_index": i,
-                            "timestamp": record.timestamp,
-                            "issue": issue
-                        } for issue in issues
-                    ])
-
-                # Verificar enlace con registro anterior
-                if i > 0:  # No el primer registro
-                    if record.previous_hash != previous_hash:
+            for chunk, results in self._iter_verified_chunks(records, workers, chunk_size):
+                for record, (status, issues) in zip(chunk, results):
+                    i = base_count + report.total_records
+                    if report.total_records == 0:
+                        report.first_record_timestamp = record.timestamp
+                    report.total_records += 1
+
+                    if status == IntegrityStatus.VALID:
+                        report.valid_records += 1
+                    elif status == IntegrityStatus.CORRUPTED:
+                        report.corrupted_records += 1
+                        report.chain_integrity = False
+                    elif status == IntegrityStatus.TAMPERED:
+                        report.tampered_records += 1
+                        report.chain_integrity = False
+                    elif status == IntegrityStatus.SIGNATURE_INVALID:
+                        report.signature_validity = False
+                    elif status == IntegrityStatus.CHAIN_BROKEN:
                         report.chain_integrity = False
-                        report.issues.append({
-                            "record_id": record.id,
-                            "record_index": i,
-                            "timestamp": record.timestamp,
-                            "issue": f"Hash previo no coincide: esperado {previous_hash[:16] if previous_hash else 'None'}..., obtenido {record.previous_hash[:16] if record.previous_hash else 'None'}..."
-                        })
 
-                # Actualizar hash previo para siguiente iteración
-                previous_hash = record.chain_hash
+                    if issues:
+                        report.issues.extend([
+                            {
+                                "record_id": record.id,
+                                "record_index": i,
+                                "timestamp": record.timestamp,
+                                "issue": issue
+                            } for issue in issues
+                        ])
+
+                    # Verificar enlace con registro anterior (o con el checkpoint)
+                    if i > 0 or checkpoint is not None:
+                        if record.previous_hash != previous_hash:
+                            report.chain_integrity = False
+                            report.issues.append({
+                                "record_id": record.id,
+                                "record_index": i,
+                                "timestamp": record.timestamp,
+                                "issue": f"Hash previo no coincide: esperado {previous_hash[:16] if previous_hash else 'None'}..., obtenido {record.previous_hash[:16] if record.previous_hash else 'None'}..."
+                            })
+
+                    # Actualizar hash previo para siguiente iteración
+                    previous_hash = record.chain_hash
+                    last_record = record
+                    segment_hashes.append(record.chain_hash)
+
+                    # Solo se certifica un tramo si todo lo anterior es válido
+                    if (checkpoint_every and len(segment_hashes) >= checkpoint_every
+                            and report.chain_integrity and report.signature_validity):
+                        last_checkpoint = self.create_checkpoint(
+                            record, base_count + report.total_records,
+                            segment_hashes, last_checkpoint
+                        )
+                        report.checkpoints.append(last_checkpoint)
+                        segment_hashes = []
+
+            if last_record is not None:
+                report.last_record_timestamp = last_record.timestamp
 
             log_security_event(
                 "AUDIT_CHAIN_VERIFICATION_COMPLETED",
@@ -398,7 +635,8 @@ class AuditIntegrityManager:
                     "total_records": report.total_records,
                     "valid_records": report.valid_records,
                     "chain_integrity": report.chain_integrity,
-                    "issues_found": len(report.issues)
+                    "issues_found": len(report.issues),
+                    "resumed_from": report.resumed_from
                 },
                 "INFO"
             )
@@ -419,6 +657,113 @@ class AuditIntegrityManager:
 
         return report
 
+    def _iter_verified_chunks(self, records: Iterable[AuditRecord], workers: int,
+                              chunk_size: int):
+        """Genera (tramo, resultados) en orden, verificando en paralelo si workers > 1."""
+        iterator = iter(records)
+
+        def next_chunk():
+            return list(islice(iterator, chunk_size))
+
+        public_key = self.public_key if self.signature_enabled else None
+
+        if workers <= 1:
+            while True:
+                chunk = next_chunk()
+                if not chunk:
+                    return
+                yield chunk, [_check_record(r, public_key) for r in chunk]
+
+        public_pem = None
+        if public_key is not None:
+            public_pem = public_key.public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_verification_worker,
+                                 initargs=(public_pem,)) as pool:
+            # Ventana acotada de tramos en vuelo para mantener la memoria plana
+            pending = []
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = next_chunk()
+                    if not chunk:
+                        break
+                    pending.append((chunk, pool.submit(_verify_chunk_worker, chunk)))
+                if not pending:
+                    return
+                chunk, future = pending.pop(0)
+                yield chunk, [(IntegrityStatus(status), issues) for status, issues in future.result()]
+
+    def create_checkpoint(self, last_record: AuditRecord, record_count: int,
+                          segment_hashes: List[str],
+                          previous: Optional[IntegrityCheckpoint] = None) -> IntegrityCheckpoint:
+        """
+        Crea un checkpoint firmado tras verificar record_count registros.
+
+        Args:
+            last_record: Último registro verificado
+            record_count: Registros verificados desde el inicio de la cadena
+            segment_hashes: chain_hash de los registros desde el checkpoint previo
+            previous: Checkpoint anterior (se enlaza por su hash)
+        """
+        checkpoint = IntegrityCheckpoint(
+            record_count=record_count,
+            last_record_id=last_record.id,
+            last_record_timestamp=last_record.timestamp,
+            last_chain_hash=last_record.chain_hash,
+            merkle_root=merkle_root(segment_hashes),
+            previous_checkpoint_hash=previous.checkpoint_hash if previous else None,
+            created_at=datetime.now().isoformat(),
+            key_fingerprint=self._get_key_fingerprint(),
+            segment_count=len(segment_hashes)
+        )
+        if self.signature_enabled:
+            checkpoint.signature = self._sign_data(checkpoint.signed_payload())
+        return checkpoint
+
+    def verify_checkpoint(self, checkpoint: IntegrityCheckpoint) -> bool:
+        """Verifica que el checkpoint fue firmado con la clave de este gestor."""
+        if not self.signature_enabled:
+            return True
+        if not checkpoint.signature or checkpoint.key_fingerprint != self._get_key_fingerprint():
+            return False
+        return self._verify_data_signature(checkpoint.signed_payload(), checkpoint.signature)
+
+    def verify_checkpoint_segment(self, checkpoint: IntegrityCheckpoint,
+                                  records: Iterable[AuditRecord]) -> List[str]:
+        """
+        Vuelve a verificar el tramo que cierra un checkpoint.
+
+        Comprueba cada registro, su enlace dentro del tramo, que el tramo
+        termine en last_chain_hash y que su raíz Merkle coincida con la
+        firmada. Devuelve la lista de problemas (vacía si el tramo es íntegro).
+        """
+        public_key = self.public_key if self.signature_enabled else None
+        issues: List[str] = []
+        hashes_tramo: List[str] = []
+        previous_hash = None
+        for record in records:
+            status, record_issues = _check_record(record, public_key)
+            if status != IntegrityStatus.VALID:
+                issues.extend(f"Registro {record.id} del tramo: {issue}" for issue in record_issues)
+            if hashes_tramo and record.previous_hash != previous_hash:
+                issues.append(f"Registro {record.id} del tramo: hash previo no coincide")
+            previous_hash = record.chain_hash
+            hashes_tramo.append(record.chain_hash)
+
+        if len(hashes_tramo) != checkpoint.segment_count:
+            issues.append(
+                f"El tramo tiene {len(hashes_tramo)} registros, el checkpoint certifica {checkpoint.segment_count}"
+            )
+        if previous_hash != checkpoint.last_chain_hash:
+            issues.append("El tramo no termina en el hash de cadena del checkpoint")
+        if merkle_root(hashes_tramo) != checkpoint.merkle_root:
+            issues.append("Raíz Merkle del tramo no coincide con la del checkpoint")
+        return issues
+
     def export_chain_proof(self, records: List[AuditRecord]) -> Dict[str, Any]:
         """
         Exporta prueba criptográfica de integridad de la cadena.
@@ -597,49 +942,24 @@ export_data: Dict[str,
         return f"audit_{timestamp}_{random_part}"
 
     def _calculate_content_hash(self, record: AuditRecord, exclude_integrity: bool = False) -> str:
-        """Calcula el hash del contenido del registro."""
-        # Crear copia para modificación
-        record_dict = asdict(record)
-
-        # Excluir campos de integridad del cálculo
-        if exclude_integrity:
-            record_dict.pop('content_hash', None)
-            record_dict.pop('previous_hash', None)
-            record_dict.pop('chain_hash', None)
-            record_dict.pop('signature', None)
-            record_dict.pop('integrity_sealed', None)
-
-        # Serializar de forma determinística
-        content = json.dumps(record_dict, sort_keys=True).encode('utf-8')
-
-        # Calcular hash
-        return hashlib.sha256(content).hexdigest()
+        """Calcula el hash del contenido del registro (sin campos de integridad)."""
+        return _content_hash(record)
 
     def _calculate_chain_hash(self, record: AuditRecord, exclude_integrity: bool = False) -> str:
         """Calcula el hash de cadena del registro."""
         content_hash = record.content_hash
         if exclude_integrity:
-            content_hash = self._calculate_content_hash(record, exclude_integrity=True)
+            content_hash = _content_hash(record)
 
         # Combinar hash de contenido con hash previo
-        chain_content = f"{content_hash}:{record.previous_hash or 'genesis'}"
-        return hashlib.sha256(chain_content.encode()).hexdigest()
+        return _chain_hash(content_hash, record.previous_hash)
 
     def _sign_record(self, record: AuditRecord) -> str:
         """Firma digitalmente un registro."""
         if not self.private_key:
             return ""
 
-        # Preparar datos para firma
-        sign_data = {
-            "id": record.id,
-            "timestamp": record.timestamp,
-            "content_hash": record.content_hash,
-            "chain_hash": record.chain_hash
-        }
-
-        signature_content = json.dumps(sign_data, sort_keys=True).encode()
-        return self._sign_data(signature_content)
+        return self._sign_data(_record_signature_payload(record))
 
     def _sign_data(self, data: bytes) -> str:
         """Firma datos arbitrarios."""
@@ -661,45 +981,13 @@ export_data: Dict[str,
         """Verifica la firma digital de un registro."""
         if not self.public_key or not record.signature:
             return False
-
-        try:
-            # Preparar datos para verificación
-            sign_data = {
-                "id": record.id,
-                "timestamp": record.timestamp,
-                "content_hash": record.content_hash,
-                "chain_hash": record.chain_hash
-            }
-
-            signature_content = json.dumps(sign_data, sort_keys=True).encode()
-            return self._verify_data_signature(signature_content, record.signature)
-
-        except (json.JSONEncodeError, ValueError, TypeError, AttributeError) as e:
-            logger.error(f"Error verificando integridad de registro: {e}")
-            return False
+        return self._verify_data_signature(_record_signature_payload(record), record.signature)
 
     def _verify_data_signature(self, data: bytes, signature: str) -> bool:
         """Verifica la firma de datos arbitrarios."""
         if not self.public_key:
             return False
-
-        try:
-            signature_bytes = base64.b64decode(signature)
-
-            self.public_key.verify(
-                signature_bytes,
-                data,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            return True
-
-        except (cryptography.exceptions.InvalidSignature, ValueError, TypeError) as e:
-            logger.error(f"Error verificando firma de datos: {e}")
-            return False
+        return _verify_with_public_key(self.public_key, data, signature)
 
     def _update_chain_state(self, record: AuditRecord):
         """Actualiza el estado de la cadena de integridad."""
@@ -17,6 +17,8 @@ from enum import Enum
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 
+from rexus.core.audit_writer import AUDITORIA_SISTEMA, AsyncAuditWriter, audit_writer_for
+
 # Configure audit logger
 audit_logger = logging.getLogger("audit_system")
 
@@ -90,8 +92,15 @@ class AuditEntry:
 class AuditSystem:
     """Sistema centralizado de auditoría y logging de seguridad."""
 
-    def __init__(self, db_connection=None):
+    def __init__(self, db_connection=None, writer: Optional[AsyncAuditWriter] = None):
+        """
+        Args:
+            db_connection: Conexión a la base de datos
+            writer: Escritor asíncrono por lotes. Si se indica, los eventos se
+                encolan en lugar de insertarse con commit en la conexión del llamador.
+        """
         self.db_connection = db_connection
+        self.writer = writer
         self._crear_tabla_auditoria()
 
     def _crear_tabla_auditoria(self):
@@ -187,6 +196,25 @@ class AuditSystem:
             if level in [AuditLevel.CRITICAL, AuditLevel.SECURITY]:
                 audit_logger.warning(f"[WARN] [AUDIT CRÍTICO] Detalles: {detalles_json}")
 
+            valores = (
+                timestamp,
+                event_type.value,
+                level.value,
+                usuario_id,
+                usuario_nombre,
+                ip_address,
+                user_agent,
+                modulo,
+                accion,
+                detalles_json,
+                resultado,
+                session_id
+            )
+
+            # Encolar para escritura por lotes si hay escritor asíncrono
+            if self.writer:
+                return self.writer.submit(AUDITORIA_SISTEMA, valores)
+
             # Guardar en base de datos si está disponible
             if self.db_connection:
                 cursor = self.db_connection.connection.cursor()
@@ -196,20 +224,7 @@ class AuditSystem:
                     (timestamp, event_type, level, usuario_id, usuario_nombre,
                      ip_address, user_agent, modulo, accion, detalles, resultado, session_id)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    timestamp,
-                    event_type.value,
-                    level.value,
-                    usuario_id,
-                    usuario_nombre,
-                    ip_address,
-                    user_agent,
-                    modulo,
-                    accion,
-                    detalles_json,
-                    resultado,
-                    session_id
-                ))
+                """, valores)
 
                 self.db_connection.connection.commit()
 
@@ -499,8 +514,18 @@ def get_audit_system() -> AuditSystem:
     return _audit_system
 
 
-def init_audit_system(db_connection) -> AuditSystem:
-    """Inicializa el sistema de auditoría."""
+def init_audit_system(db_connection, async_writes: bool = True) -> AuditSystem:
+    """
+    Inicializa el sistema de auditoría.
+
+    Args:
+        db_connection: Conexión a la base de datos
+        async_writes: Si es True, los eventos se escriben por lotes en segundo
+            plano usando una conexión dedicada
+    """
     global _audit_system
-    _audit_system = AuditSystem(db_connection)
+    writer = None
+    if async_writes and db_connection:
+        writer = audit_writer_for(db_connection)
+    _audit_system = AuditSystem(db_connection, writer=writer)
     return _audit_system
@@ -14,15 +14,19 @@ ROOT_DIR = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
 from rexus.core.database import DatabaseConnection
+from rexus.core.audit_writer import AUDIT_TRAIL, AsyncAuditWriter, audit_writer_for
 
 
 class AuditTrail:
     """Sistema de auditoría para tracking de cambios"""
 
-    def __init__(self, db_connection=None):
+    def __init__(self, db_connection=None, writer: Optional[AsyncAuditWriter] = None):
         self.db_connection = db_connection or DatabaseConnection('audit')
+        self.writer = writer
         self.current_user_id = None
         self.current_username = None
+        self._audit_table_checked = False
+        self._client_ip = None
 
     def set_current_user(self, user_id: int, username: str):
         """Establece el usuario actual para auditoría"""
@@ -45,19 +49,11 @@ class AuditTrail:
             detalles: Detalles adicionales
         """
         try:
-            cursor = self.db_connection.cursor()
-
-            # Crear tabla de auditoría si no existe
-            self._create_audit_table_if_not_exists()
+            # Crear tabla de auditoría si no existe (una sola vez por instancia)
+            if not self._audit_table_checked:
+                self._create_audit_table_if_not_exists()
 
-            # Insertar registro de auditoría
-            cursor.execute("""
-                INSERT INTO audit_trail (
-                    tabla, accion, registro_id, usuario_id, usuario_nombre,
-                    datos_anteriores, datos_nuevos, modulo, detalles,
-                    fecha_cambio, ip_address
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE(), ?)
-            """, (
+            valores = (
                 tabla,
                 accion,
                 registro_id,
@@ -67,8 +63,24 @@ class AuditTrail:
                 str(datos_nuevos) if datos_nuevos else None,
                 modulo,
                 detalles,
+                datetime.now(),
                 self._get_client_ip()
-            ))
+            )
+
+            # Encolar para escritura por lotes si hay escritor asíncrono
+            if self.writer:
+                return self.writer.submit(AUDIT_TRAIL, valores)
+
+            cursor = self.db_connection.cursor()
+
+            # Insertar registro de auditoría
+            cursor.execute("""
+                INSERT INTO audit_trail (
+                    tabla, accion, registro_id, usuario_id, usuario_nombre,
+                    datos_anteriores, datos_nuevos, modulo, detalles,
+                    fecha_cambio, ip_address
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, valores)
 
             self.db_connection.commit()
             return True
@@ -104,20 +116,22 @@ class AuditTrail:
             """)
 
             self.db_connection.commit()
+            self._audit_table_checked = True
 
         except Exception as e:
             print(f"Error creando tabla de auditoría: {e}")
 
     def _get_client_ip(self):
-        """Obtiene la IP del cliente"""
+        """Obtiene la IP del cliente (resuelta una sola vez)"""
+        if self._client_ip:
+            return self._client_ip
+        import socket
         try:
-            import socket
-            hostname = socket.gethostname()
-            ip_address = socket.gethostbyname(hostname)
-            return ip_address
+            self._client_ip = socket.gethostbyname(socket.gethostname())
         except (socket.error, OSError) as e:
             print(f"[WARNING AUDIT_TRAIL] Could not get IP address: {e}")
-            return "127.0.0.1"
+            self._client_ip = "127.0.0.1"
+        return self._client_ip
 
     def get_audit_log(self, tabla: str = None, usuario_id: int = None,
                       fecha_inicio: datetime = None, fecha_fin: datetime = None,
@@ -477,7 +491,8 @@ def get_audit_trail():
     """Obtiene la instancia global del sistema de auditoría"""
     global _audit_trail
     if _audit_trail is None:
-        _audit_trail = AuditTrail()
+        db_connection = DatabaseConnection('audit')
+        _audit_trail = AuditTrail(db_connection, writer=audit_writer_for(db_connection))
     return _audit_trail
 
 def set_audit_user(user_id: int, username: str):
@@ -0,0 +1,426 @@
+"""
+Escritor Asíncrono de Auditoría - Rexus.app
+
+Desacopla el registro de auditoría de las acciones del usuario. Los eventos se
+encolan en memoria y un hilo en segundo plano los inserta por lotes
+(INSERT multi-fila) usando su propia conexión, de modo que login, RBAC y CRUD
+no pagan un commit por cada evento.
+
+Características:
+- Cola acotada (si se llena, el evento se guarda en el archivo de respaldo)
+- Vaciado por tamaño de lote o por intervalo de tiempo
+- Drenado garantizado al cerrar la aplicación (atexit)
+- Archivo de respaldo local (JSON lines) si la BD no está disponible,
+  reprocesado después de la primera escritura exitosa
+- Si el archivo de respaldo tampoco se puede escribir, los eventos se
+  retienen en memoria (acotado) y se reintentan en cada vaciado
+"""
+
+import atexit
+import collections
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from rexus.utils.app_logger import get_logger
+
+logger = get_logger("core.audit_writer")
+
+# SQL Server admite como máximo 2100 parámetros por sentencia y 1000 filas
+# por cláusula VALUES.
+MAX_SQL_PARAMS = 2000
+MAX_ROWS_PER_INSERT = 1000
+
+
+@dataclass(frozen=True)
+class AuditTarget:
+    """Tabla destino de eventos de auditoría y sus columnas."""
+    table: str
+    columns: Tuple[str, ...]
+
+    def build_insert(self, row_count: int) -> str:
+        """Construye un INSERT multi-fila para row_count filas."""
+        placeholders = "(" + ", ".join("?" for _ in self.columns) + ")"
+        return (
+            f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES "
+            + ", ".join(placeholders for _ in range(row_count))
+        )
+
+    @property
+    def rows_per_statement(self) -> int:
+        return max(1, min(MAX_ROWS_PER_INSERT, MAX_SQL_PARAMS // len(self.columns)))
+
+
+# Destinos conocidos (tablas de auditoría existentes)
+AUDITORIA_SISTEMA = AuditTarget(
+    "auditoria_sistema",
+    ("timestamp", "event_type", "level", "usuario_id", "usuario_nombre",
+     "ip_address", "user_agent", "modulo", "accion", "detalles", "resultado",
+     "session_id"),
+)
+
+AUDIT_TRAIL = AuditTarget(
+    "audit_trail",
+    ("tabla", "accion", "registro_id", "usuario_id", "usuario_nombre",
+     "datos_anteriores", "datos_nuevos", "modulo", "detalles",
+     "fecha_cambio", "ip_address"),
+)
+
+AUDITORIA_LOG = AuditTarget(
+    "auditoria_log",
+    ("usuario", "modulo", "accion", "descripcion", "tabla_afectada",
+     "registro_id", "valores_anteriores", "valores_nuevos",
+     "nivel_criticidad", "resultado", "error_mensaje", "fecha_hora"),
+)
+
+RBAC_ACCESS_LOG = AuditTarget(
+    "rbac_access_log",
+    ("user_id", "resource", "action", "result", "details", "timestamp"),
+)
+
+_TARGETS = {t.table: t for t in (AUDITORIA_SISTEMA, AUDIT_TRAIL, AUDITORIA_LOG, RBAC_ACCESS_LOG)}
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.datetime.fromisoformat(value["$dt"])
+    return value
+
+
+class AsyncAuditWriter:
+    """Escritor de auditoría por lotes en un hilo en segundo plano."""
+
+    def __init__(self,
+                 connection_factory: Callable[[], Any],
+                 batch_size: int = 200,
+                 flush_interval: float = 2.0,
+                 max_queue_size: int = 10000,
+                 spill_path: Optional[str] = None):
+        """
+        Args:
+            connection_factory: Callable que devuelve una conexión nueva y
+                dedicada (DatabaseConnection o conexión DB-API)
+            batch_size: Eventos que disparan un vaciado inmediato
+            flush_interval: Segundos máximos que un evento espera en la cola
+            max_queue_size: Tamaño máximo de la cola en memoria
+            spill_path: Archivo de respaldo local (JSON lines)
+        """
+        self.connection_factory = connection_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = Path(spill_path or os.path.join("logs", "audit_spill.jsonl"))
+
+        self._queue: "queue.Queue[Tuple[AuditTarget, Tuple]]" = queue.Queue(maxsize=max_queue_size)
+        self._stop_event = threading.Event()
+        self._flush_requested = threading.Event()
+        self._spill_lock = threading.Lock()
+        self._connection = None
+        self._retry_after = 0.0
+        # Eventos que no se pudieron escribir ni enviar al respaldo
+        self._retained: "collections.deque[Tuple[AuditTarget, Tuple]]" = collections.deque()
+        self._max_retained = max_queue_size or 10000
+
+        self._stats_lock = threading.Lock()
+        self.stats = {"enqueued": 0, "written": 0, "spilled": 0, "batches": 0,
+                      "retained": 0, "dropped": 0}
+
+        self._thread = threading.Thread(target=self._run, name="AuditWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------ API
+
+    def submit(self, target: AuditTarget, values: Sequence[Any]) -> bool:
+        """
+        Encola un evento. Nunca bloquea al llamador: si la cola está llena o
+        el escritor está cerrado, el evento va al archivo de respaldo.
+        """
+        row = tuple(values)
+        if len(row) != len(target.columns):
+            raise ValueError(
+                f"Se esperaban {len(target.columns)} valores para {target.table}, recibidos {len(row)}"
+            )
+
+        if self._stop_event.is_set():
+            return self._spill([(target, row)])
+
+        try:
+            self._queue.put_nowait((target, row))
+        except queue.Full:
+            logger.warning("[AUDIT WRITER] Cola llena - evento enviado a respaldo local")
+            return self._spill([(target, row)])
+
+        self._count("enqueued")
+        if self._queue.qsize() >= self.batch_size:
+            self._flush_requested.set()
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Solicita un vaciado y espera a que la cola quede vacía."""
+        self._flush_requested.set()
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self._queue.unfinished_tasks == 0
+
+    def close(self, timeout: float = 10.0):
+        """Detiene el hilo drenando todos los eventos pendientes."""
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+        self._flush_requested.set()
+        self._thread.join(timeout)
+        # Lo que no alcanzó a escribirse no se pierde
+        remaining = self._take_retained() + self._drain(block=False, limit=None)
+        if remaining:
+            self._spill(remaining)
+        if self._retained:
+            logger.error(f"[AUDIT WRITER] {len(self._retained)} eventos sin escribir al cerrar")
+        if not self._thread.is_alive():
+            self._close_connection()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() + len(self._retained)
+
+    # ------------------------------------------------------------- internos
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self._flush_once()
+        # Drenado final
+        while not self._queue.empty():
+            if not self._flush_once():
+                break
+
+    def _drain(self, block: bool, limit: Optional[int]) -> List[Tuple[AuditTarget, Tuple]]:
+        items = []
+        while limit is None or len(items) < limit:
+            try:
+                items.append(self._queue.get(block=block and not items, timeout=0.05))
+            except queue.Empty:
+                break
+        return items
+
+    def _flush_once(self) -> bool:
+        """Escribe todo lo pendiente en lotes. Devuelve False si se envió a respaldo."""
+        ok = True
+        written = False
+        retained = self._take_retained()
+        if retained:
+            written = self._write(retained)
+            if not written:
+                self._spill(retained)
+                ok = False
+        while True:
+            batch = self._drain(block=False, limit=max(self.batch_size, 1) * 5)
+            if not batch:
+                break
+            try:
+                if self._write(batch):
+                    written = True
+                else:
+                    self._spill(batch)
+                    ok = False
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        # El respaldo se reprocesa solo si la BD acaba de aceptar una escritura:
+        # mientras está caída no se relee ni se reescribe en cada vaciado
+        if ok and written and self.spill_path.exists():
+            self._replay_spill()
+        return ok
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _take_retained(self) -> List[Tuple[AuditTarget, Tuple]]:
+        items = []
+        while True:
+            try:
+                items.append(self._retained.popleft())
+            except IndexError:
+                return items
+
+    def _retain(self, items: List[Tuple[AuditTarget, Tuple]]):
+        """Retiene en memoria lo que no se pudo enviar al respaldo local."""
+        overflow = len(self._retained) + len(items) - self._max_retained
+        if overflow > 0:
+            for _ in range(min(overflow, len(self._retained))):
+                self._retained.popleft()
+            items = items[max(0, len(items) - self._max_retained):]
+            self._count("dropped", overflow)
+            logger.error(f"[AUDIT WRITER] Retención en memoria llena - {overflow} eventos descartados")
+        self._retained.extend(items)
+        self._count("retained", len(items))
+
+    def _get_connection(self):
+        if self._connection is not None:
+            return self._connection
+        if time.monotonic() < self._retry_after:
+            return None
+        try:
+            self._connection = self.connection_factory()
+        except Exception as e:
+            logger.error(f"[AUDIT WRITER] No se pudo abrir conexión de auditoría: {e}")
+            self._connection = None
+        if self._connection is None:
+            self._retry_after = time.monotonic() + 30
+        return self._connection
+
+    def _close_connection(self):
+        conn, self._connection = self._connection, None
+        if conn is None:
+            return
+        try:
+            conn.close()
+        except Exception:
+            pass  # La conexión pudo haberse cortado
+
+    def _write(self, batch: List[Tuple[AuditTarget, Tuple]]) -> bool:
+        conn = self._get_connection()
+        if conn is None:
+            return False
+
+        grouped: Dict[AuditTarget, List[Tuple]] = {}
+        for target, row in batch:
+            grouped.setdefault(target, []).append(row)
+
+        try:
+            cursor = conn.cursor()
+            for target, rows in grouped.items():
+                step = target.rows_per_statement
+                for start in range(0, len(rows), step):
+                    chunk = rows[start:start + step]
+                    params = [value for row in chunk for value in row]
+                    cursor.execute(target.build_insert(len(chunk)), params)
+            conn.commit()
+        except Exception as e:
+            logger.error(f"[AUDIT WRITER] Error escribiendo lote de {len(batch)} eventos: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass  # Rollback puede fallar si la conexión está rota
+            self._close_connection()
+            self._retry_after = time.monotonic() + 30
+            return False
+
+        with self._stats_lock:
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+        return True
+
+    def _spill(self, items: List[Tuple[AuditTarget, Tuple]]) -> bool:
+        try:
+            with self._spill_lock:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    for target, row in items:
+                        f.write(json.dumps(
+                            {"table": target.table, "values": [_encode_value(v) for v in row]},
+                            default=str, ensure_ascii=False) + "\n")
+            self._count("spilled", len(items))
+            return True
+        except OSError as e:
+            logger.error(f"[AUDIT WRITER] Error escribiendo respaldo local - {len(items)} eventos "
+                         f"retenidos en memoria: {e}")
+            self._retain(items)
+            return True
+
+    def _replay_spill(self):
+        """Reinserta los eventos del archivo de respaldo una vez que la BD responde."""
+        replay_path = self.spill_path.with_suffix(".replay")
+        with self._spill_lock:
+            if not self.spill_path.exists():
+                return
+            try:
+                os.replace(self.spill_path, replay_path)
+            except OSError as e:
+                logger.error(f"[AUDIT WRITER] No se pudo preparar respaldo para reproceso: {e}")
+                return
+
+        items = []
+        try:
+            f = open(replay_path, "r", encoding="utf-8")
+        except OSError as e:
+            logger.error(f"[AUDIT WRITER] No se pudo leer el respaldo local: {e}")
+            return
+        with f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                    target = _TARGETS[data["table"]]
+                    items.append((target, tuple(_decode_value(v) for v in data["values"])))
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"[AUDIT WRITER] Línea de respaldo inválida descartada: {e}")
+
+        for start in range(0, len(items), self.batch_size * 5):
+            chunk = items[start:start + self.batch_size * 5]
+            if not self._write(chunk):
+                self._spill(items[start:])
+                break
+        else:
+            logger.info(f"[AUDIT WRITER] {len(items)} eventos recuperados del respaldo local")
+        os.remove(replay_path)
+
+
+# Escritores globales, uno por base de datos destino
+_audit_writers: Dict[str, AsyncAuditWriter] = {}
+_audit_writers_lock = threading.Lock()
+
+
+def get_audit_writer(name: str = "default") -> Optional[AsyncAuditWriter]:
+    """Obtiene un escritor global (None si no fue inicializado)."""
+    return _audit_writers.get(name)
+
+
+def init_audit_writer(connection_factory: Callable[[], Any],
+                      name: str = "default", **kwargs) -> AsyncAuditWriter:
+    """Inicializa (o devuelve) el escritor global registrado como name."""
+    with _audit_writers_lock:
+        writer = _audit_writers.get(name)
+        if writer is None:
+            writer = AsyncAuditWriter(connection_factory, **kwargs)
+            _audit_writers[name] = writer
+        return writer
+
+
+def audit_writer_for(db_connection, **kwargs) -> AsyncAuditWriter:
+    """
+    Devuelve el escritor compartido para la base de datos de db_connection.
+    El escritor usa una conexión dedicada a esa misma base de datos, para no
+    compartir la conexión (ni sus transacciones) del hilo de la interfaz.
+    """
+    database = getattr(db_connection, "database", None) or "default"
+
+    def factory():
+        from rexus.core.database import DatabaseConnection
+
+        conn = DatabaseConnection(database=getattr(db_connection, "database", None))
+        return conn if conn.connect() else None
+
+    return init_audit_writer(factory, name=database, **kwargs)
+
+
+def shutdown_audit_writers(timeout: float = 10.0):
+    """Drena y detiene todos los escritores globales."""
+    with _audit_writers_lock:
+        writers = list(_audit_writers.values())
+        _audit_writers.clear()
+    for writer in writers:
+        writer.close(timeout)
@@ -0,0 +1,341 @@
+"""
+Almacén de Configuración - Rexus.app
+
+Mantiene la configuración del sistema en una instantánea inmutable con los
+valores ya decodificados ("true" -> True, "30" -> 30, "1.5" -> 1.5). Las
+lecturas no toman locks ni vuelven a convertir strings: obtener() es una
+búsqueda en un diccionario, apta para rutas calientes.
+
+Cada cambio construye una instantánea nueva y la reemplaza de forma atómica.
+Los suscriptores reciben solo las claves que cambiaron y el cambio se publica
+en el bus de eventos como EVENTO_CONFIGURACION_CAMBIADA, solo con los nombres
+de las claves. Con el relay local activo, los demás clientes de la máquina lo
+toman como una invalidación: releen esas claves de la fuente de verdad (el
+lector registrado con establecer_lector) y nunca aplican valores recibidos
+por el relay.
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from rexus.core.event_bus import (
+    EVENTO_CONFIGURACION_CAMBIADA, Despachador, Evento, EventBus, get_event_bus
+)
+from rexus.utils.app_logger import get_logger
+
+logger = get_logger("core.config_store")
+
+_VACIO: Mapping[str, Any] = MappingProxyType({})
+
+# Claves aceptadas por invalidación remota
+MAX_CLAVES_INVALIDACION = 500
+MAX_LONGITUD_CLAVE = 100
+
+# lector(claves) -> {clave: valor crudo}; las claves ausentes se eliminan
+Lector = Callable[[Sequence[str]], Mapping[str, Any]]
+
+
+def decodificar_valor(valor: Any) -> Any:
+    """Convierte el texto almacenado al tipo que representa (bool, int o float)."""
+    if isinstance(valor, str):
+        if valor.lower() == "true":
+            return True
+        elif valor.lower() == "false":
+            return False
+        elif valor.isdigit():
+            return int(valor)
+        elif valor.replace(".", "", 1).isdigit():
+            return float(valor)
+    return valor
+
+
+class SuscripcionConfiguracion:
+    """Suscripción a cambios de configuración; cancelar() la da de baja."""
+
+    def __init__(self, store: "ConfigStore", callback: Callable[[Dict[str, Any]], None],
+                 claves: Optional[Tuple[str, ...]], prefijos: Optional[Tuple[str, ...]],
+                 despachador: Optional[Despachador]):
+        self.store = store
+        self.callback = callback
+        self.claves = claves
+        self.prefijos = prefijos
+        self.despachador = despachador
+
+    def filtrar(self, cambios: Dict[str, Any]) -> Dict[str, Any]:
+        if self.claves is None and self.prefijos is None:
+            return cambios
+        return {
+            clave: valor for clave, valor in cambios.items()
+            if (self.claves and clave in self.claves)
+            or (self.prefijos and clave.startswith(self.prefijos))
+        }
+
+    def cancelar(self):
+        self.store.cancelar(self)
+
+
+class ConfigStore:
+    """Configuración decodificada en instantáneas inmutables, con notificación de cambios."""
+
+    def __init__(self, bus: Optional[EventBus] = None,
+                 defaults: Optional[Mapping[str, Any]] = None):
+        """
+        Args:
+            bus: Bus de eventos para difundir y recibir cambios (None = sin difusión)
+            defaults: Valores por defecto para las claves ausentes
+        """
+        self._lock = threading.Lock()
+        self._crudos: Mapping[str, Any] = _VACIO
+        self._valores: Mapping[str, Any] = _VACIO
+        self._defaults: Mapping[str, Any] = _VACIO
+        self._suscripciones: List[SuscripcionConfiguracion] = []
+        self.version = 0
+        self._lector: Optional[Lector] = None
+        self._despachador_lector: Optional[Despachador] = None
+        self._bus = bus
+        self._suscripcion_bus = None
+        if defaults:
+            self.establecer_defaults(defaults)
+        if bus is not None:
+            self._suscripcion_bus = bus.suscribir(
+                EVENTO_CONFIGURACION_CAMBIADA, self._al_cambiar_remoto
+            )
+
+    # Lectura (sin locks: las instantáneas no se modifican nunca)
+
+    def obtener(self, clave: str, valor_por_defecto: Any = None) -> Any:
+        """Valor decodificado de la clave, su default o valor_por_defecto decodificado."""
+        valores = self._valores
+        if clave in valores:
+            return valores[clave]
+        defaults = self._defaults
+        if clave in defaults:
+            return defaults[clave]
+        return decodificar_valor(valor_por_defecto)
+
+    def instantanea(self) -> Mapping[str, Any]:
+        """Valores decodificados vigentes (de solo lectura)."""
+        return self._valores
+
+    def crudos(self) -> Mapping[str, Any]:
+        """Valores tal como se almacenan (de solo lectura)."""
+        return self._crudos
+
+    def __contains__(self, clave: str) -> bool:
+        return clave in self._valores
+
+    # Escritura
+
+    def establecer_lector(self, lector: Optional[Lector],
+                          despachador: Optional[Despachador] = None):
+        """
+        Registra cómo releer claves de la fuente de verdad (BD o archivo).
+
+        Args:
+            lector: Función que recibe las claves y devuelve sus valores
+                crudos actuales; None desactiva la recarga remota
+            despachador: Contexto donde ejecutar la lectura (por ejemplo el
+                hilo de la UI, dueño de la conexión); por defecto, el hilo
+                que recibe el evento
+        """
+        self._lector = lector
+        self._despachador_lector = despachador
+
+    def establecer_defaults(self, defaults: Mapping[str, Any]):
+        self._defaults = MappingProxyType(
+            {clave: decodificar_valor(valor) for clave, valor in defaults.items()}
+        )
+
+    def cargar(self, crudos: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Reemplaza toda la configuración (carga desde BD o archivo).
+
+        Notifica a los suscriptores locales las claves que cambiaron, pero no
+        difunde: cada proceso carga su configuración al iniciar.
+
+        Returns:
+            Dict con los valores decodificados que cambiaron (None = eliminada)
+        """
+        with self._lock:
+            anteriores = self._crudos
+            nuevos = dict(crudos)
+            cambios = {
+                clave: decodificar_valor(valor) for clave, valor in nuevos.items()
+                if clave not in anteriores or anteriores[clave] != valor
+            }
+            cambios.update({clave: None for clave in anteriores if clave not in nuevos})
+            self._publicar_instantanea(nuevos)
+        self._notificar(cambios)
+        return cambios
+
+    def aplicar(self, cambios: Mapping[str, Any], difundir: bool = True) -> Dict[str, Any]:
+        """
+        Aplica cambios puntuales; un valor None elimina la clave.
+
+        Args:
+            cambios: Clave -> valor crudo
+            difundir: Publicar el cambio en el bus para los demás clientes
+
+        Returns:
+            Dict con los valores decodificados que cambiaron
+        """
+        with self._lock:
+            nuevos = dict(self._crudos)
+            efectivos: Dict[str, Any] = {}
+            for clave, valor in cambios.items():
+                if valor is None:
+                    if nuevos.pop(clave, None) is not None:
+                        efectivos[clave] = None
+                elif nuevos.get(clave) != valor:
+                    nuevos[clave] = valor
+                    efectivos[clave] = valor
+            if efectivos:
+                self._publicar_instantanea(nuevos)
+        if not efectivos:
+            return {}
+        if difundir and self._bus is not None:
+            # Solo los nombres: los demás clientes releen los valores
+            self._bus.publicar(EVENTO_CONFIGURACION_CAMBIADA, {"claves": sorted(efectivos)})
+        decodificados = {clave: decodificar_valor(valor) for clave, valor in efectivos.items()}
+        self._notificar(decodificados)
+        return decodificados
+
+    def _publicar_instantanea(self, crudos: Dict[str, Any]):
+        # Se construye completa antes de reemplazarla: los lectores ven la
+        # instantánea anterior o la nueva, nunca una mezcla
+        valores = {clave: decodificar_valor(valor) for clave, valor in crudos.items()}
+        self._crudos = MappingProxyType(crudos)
+        self._valores = MappingProxyType(valores)
+        self.version += 1
+
+    def recargar(self, claves: Sequence[str]) -> Dict[str, Any]:
+        """
+        Relee las claves con el lector registrado y aplica lo que cambió.
+
+        Returns:
+            Dict con los valores decodificados que cambiaron
+        """
+        lector = self._lector
+        if lector is None or not claves:
+            return {}
+        try:
+            valores = lector(list(claves))
+        except Exception as e:
+            logger.error(f"[ERROR CONFIGURACION] Releyendo {len(claves)} claves: {e}")
+            return {}
+        return self.aplicar({clave: valores.get(clave) for clave in claves}, difundir=False)
+
+    def _al_cambiar_remoto(self, evento: Evento):
+        if not evento.remoto:
+            return
+        claves = evento.datos.get("claves")
+        if not isinstance(claves, list) or len(claves) > MAX_CLAVES_INVALIDACION:
+            logger.warning("[CONFIGURACION] Invalidación remota con formato inválido, se ignora")
+            return
+        claves = [
+            c for c in claves if isinstance(c, str) and 0 < len(c) <= MAX_LONGITUD_CLAVE
+        ]
+        if not claves or self._lector is None:
+            return
+        logger.info(f"[CONFIGURACION] {len(claves)} claves modificadas por otro cliente, releyendo")
+        despachador = self._despachador_lector
+        if despachador is not None:
+            try:
+                despachador(lambda: self.recargar(claves))
+            except Exception as e:
+                logger.error(f"[ERROR CONFIGURACION] Despachador de recarga: {e}")
+        else:
+            self.recargar(claves)
+
+    # Suscripciones
+
+    def suscribir(self, callback: Callable[[Dict[str, Any]], None],
+                  claves: Optional[Iterable[str]] = None,
+                  despachador: Optional[Despachador] = None) -> SuscripcionConfiguracion:
+        """
+        Registra un callback para cambios de configuración.
+
+        Args:
+            callback: Función que recibe {clave: valor decodificado} con las
+                claves que cambiaron (None si se eliminó)
+            claves: Claves exactas o prefijos terminados en "*"
+                ("integraciones_*"); None = todas
+            despachador: Función que ejecuta el callback en otro contexto
+
+        Returns:
+            SuscripcionConfiguracion
+        """
+        exactas = prefijos = None
+        if claves is not None:
+            claves = list(claves)
+            exactas = tuple(c for c in claves if not c.endswith("*"))
+            prefijos = tuple(c[:-1] for c in claves if c.endswith("*"))
+        suscripcion = SuscripcionConfiguracion(self, callback, exactas, prefijos, despachador)
+        with self._lock:
+            self._suscripciones = self._suscripciones + [suscripcion]
+        return suscripcion
+
+    def cancelar(self, suscripcion: SuscripcionConfiguracion):
+        with self._lock:
+            self._suscripciones = [s for s in self._suscripciones if s is not suscripcion]
+
+    def _notificar(self, cambios: Dict[str, Any]):
+        if not cambios:
+            return
+        for suscripcion in self._suscripciones:
+            relevantes = suscripcion.filtrar(cambios)
+            if not relevantes:
+                continue
+            if suscripcion.despachador is not None:
+                try:
+                    suscripcion.despachador(
+                        lambda s=suscripcion, r=relevantes: self._invocar(s, r)
+                    )
+                except Exception as e:
+                    logger.error(f"[ERROR CONFIGURACION] Despachador de suscriptor: {e}")
+            else:
+                self._invocar(suscripcion, relevantes)
+
+    @staticmethod
+    def _invocar(suscripcion: SuscripcionConfiguracion, cambios: Dict[str, Any]):
+        try:
+            suscripcion.callback(cambios)
+        except Exception as e:
+            logger.error(f"[ERROR CONFIGURACION] Suscriptor de cambios: {e}")
+
+    def cerrar(self):
+        if self._suscripcion_bus is not None:
+            self._suscripcion_bus.cancelar()
+            self._suscripcion_bus = None
+
+
+_config_store: Optional[ConfigStore] = None
+_config_store_lock = threading.Lock()
+
+
+def get_config_store() -> ConfigStore:
+    """Obtiene el almacén de configuración global (conectado al bus global)."""
+    global _config_store
+    if _config_store is None:
+        with _config_store_lock:
+            if _config_store is None:
+                _config_store = ConfigStore(get_event_bus())
+    return _config_store
+
+
+def init_config_store(crudos: Optional[Mapping[str, Any]] = None,
+                      defaults: Optional[Mapping[str, Any]] = None) -> ConfigStore:
+    """
+    Inicializa el almacén global.
+
+    Args:
+        crudos: Configuración inicial (clave -> valor almacenado)
+        defaults: Valores por defecto para las claves ausentes
+    """
+    store = get_config_store()
+    if defaults is not None:
+        store.establecer_defaults(defaults)
+    if crudos is not None:
+        store.cargar(crudos)
+    return store
@@ -234,7 +234,7 @@ class DatabaseConnection:
             cursor.close()
             return result
         except Exception as e:
-            logger.error(f"Consulta fallida: {e}\nQuery: {query}\nParams: {params}")
+            logger.error("Consulta fallida: %s\nQuery: %s\nParams: %s", e, query, params)
             return []
 
     def execute_non_query(self, query: str, params: tuple = ()) -> bool:
@@ -249,7 +249,7 @@ class DatabaseConnection:
             cursor.close()
             return True
         except Exception as e:
-            logger.error(f"Comando fallido: {e}\nQuery: {query}\nParams: {params}")
+            logger.error("Comando fallido: %s\nQuery: %s\nParams: %s", e, query, params)
             return False
 
 
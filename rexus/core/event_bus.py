@@ -0,0 +1,573 @@
+"""
+Bus de Eventos - Rexus.app
+
+Publicación/suscripción en proceso para eventos de dominio (stock bajo el
+mínimo, pedido aprobado, reserva vencida, notificación creada...). Los
+suscriptores reciben el evento en el momento en que se publica, en lugar de
+consultar periódicamente la base de datos.
+
+Características:
+- Suscripción por tipo exacto, por módulo ("inventario.*") o a todos ("*")
+- Despachador opcional por suscripción para reencolar el callback en otro
+  hilo (crear_despachador_qt() lo entrega en el hilo de la UI)
+- Relay local opcional sobre TCP 127.0.0.1: el primer proceso que abre el
+  puerto actúa de concentrador y reenvía los eventos al resto de los
+  clientes abiertos en la misma máquina. Si el concentrador se cierra, otro
+  proceso toma su lugar. Cada conexión se autentica en ambos sentidos con un
+  secreto por usuario guardado en su perfil (~/.rexus/event_relay.token);
+  sin ese secreto el relay no se activa.
+
+Los eventos recibidos por el relay llegan con remoto=True; los suscriptores
+que persisten datos deben ignorarlos para no duplicar el trabajo que ya hizo
+el proceso de origen.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import select
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from rexus.utils.app_logger import get_logger
+
+logger = get_logger("core.event_bus")
+
+# Eventos de dominio conocidos
+EVENTO_STOCK_BAJO_MINIMO = "inventario.stock_bajo_minimo"
+EVENTO_RESERVA_VENCIDA = "inventario.reserva_vencida"
+EVENTO_LOTE_POR_VENCER = "inventario.lote_por_vencer"
+EVENTO_LOTES_ACTUALIZADOS = "inventario.lotes_actualizados"
+EVENTO_PEDIDO_APROBADO = "pedidos.aprobado"
+EVENTO_ORDEN_COMPRA_APROBADA = "compras.orden_aprobada"
+EVENTO_NOTIFICACION_CREADA = "notificaciones.creada"
+EVENTO_NOTIFICACION_LEIDA = "notificaciones.leida"
+EVENTO_NOTIFICACIONES_INVALIDADAS = "notificaciones.invalidadas"
+EVENTO_SESION_REVOCADA = "usuarios.sesion_revocada"
+EVENTO_CONFIGURACION_CAMBIADA = "configuracion.cambiada"
+EVENTO_ESTADISTICAS_INVALIDADAS = "estadisticas.invalidadas"
+
+# Relay local
+PUERTO_RELAY = 47615
+RANGO_PUERTOS_RELAY = 2000          # el puerto de cada usuario se deriva de su secreto
+REINTENTO_RELAY_SEGUNDOS = 2.0
+MAX_LINEA_RELAY = 64 * 1024
+TIEMPO_HANDSHAKE_SEGUNDOS = 1.0
+TIEMPO_ENVIO_RELAY_SEGUNDOS = 2.0   # un par que no lee en este plazo se desconecta
+MAX_LINEA_HANDSHAKE = 1024
+RUTA_SECRETO_RELAY = os.path.join(os.path.expanduser("~"), ".rexus", "event_relay.token")
+
+Despachador = Callable[[Callable[[], None]], None]
+
+
+@dataclass(frozen=True)
+class Evento:
+    """Evento publicado en el bus."""
+    tipo: str
+    datos: Dict[str, Any]
+    origen: str
+    timestamp: float = field(default_factory=time.time)
+    remoto: bool = False
+
+
+class Suscripcion:
+    """Suscripción activa; cancelar() la da de baja."""
+
+    def __init__(self, bus: "EventBus", tipo: str, callback: Callable[[Evento], None],
+                 despachador: Optional[Despachador] = None):
+        self.bus = bus
+        self.tipo = tipo
+        self.callback = callback
+        self.despachador = despachador
+
+    def cancelar(self):
+        self.bus.cancelar(self)
+
+
+class EventBus:
+    """Bus de eventos en proceso, seguro para hilos."""
+
+    def __init__(self):
+        self.origen = uuid.uuid4().hex
+        self._suscripciones: Dict[str, List[Suscripcion]] = {}
+        self._lock = threading.RLock()
+        self._relay: Optional["RelayLocal"] = None
+
+    def suscribir(self, tipo: str, callback: Callable[[Evento], None],
+                  despachador: Optional[Despachador] = None) -> Suscripcion:
+        """
+        Registra un callback para un tipo de evento.
+
+        Args:
+            tipo: Tipo exacto, "modulo.*" o "*"
+            callback: Función que recibe el Evento
+            despachador: Función que ejecuta el callback en otro contexto
+                (por defecto se ejecuta en el hilo que publica)
+
+        Returns:
+            Suscripcion
+        """
+        suscripcion = Suscripcion(self, tipo, callback, despachador)
+        with self._lock:
+            # Copia al escribir: _entregar itera listas sin tomar el lock
+            actuales = self._suscripciones.get(tipo, [])
+            self._suscripciones[tipo] = actuales + [suscripcion]
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion):
+        with self._lock:
+            actuales = self._suscripciones.get(suscripcion.tipo, [])
+            restantes = [s for s in actuales if s is not suscripcion]
+            if restantes:
+                self._suscripciones[suscripcion.tipo] = restantes
+            else:
+                self._suscripciones.pop(suscripcion.tipo, None)
+
+    def publicar(self, tipo: str, datos: Optional[Dict[str, Any]] = None) -> Evento:
+        """Publica un evento a los suscriptores locales y al relay, si está activo."""
+        evento = Evento(tipo, dict(datos or {}), self.origen)
+        self._entregar(evento)
+        relay = self._relay
+        if relay is not None:
+            relay.enviar(evento)
+        return evento
+
+    def _entregar(self, evento: Evento):
+        modulo = evento.tipo.split(".", 1)[0]
+        suscripciones = self._suscripciones
+        for clave in (evento.tipo, f"{modulo}.*", "*"):
+            for suscripcion in suscripciones.get(clave, ()):
+                if suscripcion.despachador is not None:
+                    try:
+                        suscripcion.despachador(
+                            lambda s=suscripcion: self._invocar(s, evento)
+                        )
+                    except Exception as e:
+                        logger.error(f"[ERROR EVENT BUS] Despachador de {clave}: {e}")
+                else:
+                    self._invocar(suscripcion, evento)
+
+    @staticmethod
+    def _invocar(suscripcion: Suscripcion, evento: Evento):
+        try:
+            suscripcion.callback(evento)
+        except Exception as e:
+            # Un suscriptor con errores no debe afectar al que publica
+            logger.error(f"[ERROR EVENT BUS] Suscriptor de {evento.tipo}: {e}")
+
+    def recibir_remoto(self, tipo: str, datos: Dict[str, Any], origen: str, timestamp: float):
+        """Entrega localmente un evento llegado por el relay."""
+        if origen == self.origen:
+            return
+        self._entregar(Evento(tipo, datos, origen, timestamp, remoto=True))
+
+    def conectar_relay(self, puerto: Optional[int] = None,
+                       secreto: Optional[bytes] = None) -> Optional["RelayLocal"]:
+        """
+        Activa el relay local para compartir eventos con otros procesos.
+
+        Args:
+            puerto: Puerto TCP en 127.0.0.1 (por defecto, derivado del secreto)
+            secreto: Secreto compartido por los procesos del usuario (por
+                defecto, el del archivo del perfil)
+
+        Returns:
+            RelayLocal, o None si no hay secreto disponible
+        """
+        with self._lock:
+            if self._relay is None:
+                secreto = secreto or obtener_secreto_relay()
+                if not secreto:
+                    logger.warning("[EVENT BUS] Relay local desactivado: no hay secreto de usuario")
+                    return None
+                self._relay = RelayLocal(self, secreto, puerto or puerto_relay(secreto))
+                self._relay.iniciar()
+            return self._relay
+
+    def cerrar(self):
+        with self._lock:
+            relay, self._relay = self._relay, None
+        if relay is not None:
+            relay.detener()
+
+
+def obtener_secreto_relay(ruta: str = RUTA_SECRETO_RELAY) -> Optional[bytes]:
+    """
+    Lee (o crea) el secreto del relay en el perfil del usuario.
+
+    El archivo se crea con permisos 0600; en POSIX se rechaza si otros
+    usuarios pueden leerlo o escribirlo.
+
+    Returns:
+        Secreto, o None si no puede leerse o crearse de forma segura
+    """
+    try:
+        os.makedirs(os.path.dirname(ruta) or ".", mode=0o700, exist_ok=True)
+        try:
+            fd = os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as archivo:
+                archivo.write(secrets.token_hex(32))
+
+        if os.name == "posix":
+            estado = os.stat(ruta)
+            if estado.st_uid != os.getuid() or estado.st_mode & 0o077:
+                logger.warning(f"[EVENT BUS] Permisos inseguros en {ruta}, relay desactivado")
+                return None
+        with open(ruta, encoding="utf-8") as archivo:
+            secreto = archivo.read().strip()
+    except OSError as e:
+        logger.warning(f"[EVENT BUS] No se pudo leer el secreto del relay: {e}")
+        return None
+    return secreto.encode("utf-8") if len(secreto) >= 32 else None
+
+
+def puerto_relay(secreto: bytes) -> int:
+    """Puerto del relay del usuario: variable de entorno o derivado del secreto."""
+    configurado = os.getenv("REXUS_EVENT_RELAY_PORT")
+    if configurado:
+        return int(configurado)
+    # Usuarios distintos en el mismo equipo no comparten concentrador
+    desplazamiento = int.from_bytes(hashlib.sha256(secreto).digest()[:4], "big")
+    return PUERTO_RELAY + desplazamiento % RANGO_PUERTOS_RELAY
+
+
+class RelayLocal:
+    """
+    Reenvío de eventos entre procesos de la misma máquina.
+
+    Al conectar, concentrador y cliente se autentican mutuamente con un
+    reto HMAC-SHA256 sobre el secreto del usuario; un par que no lo supera se
+    desconecta sin recibir ni entregar eventos. Después, cada línea del
+    socket es un evento JSON. El concentrador reenvía lo que recibe de un
+    cliente al resto; los clientes solo hablan con el concentrador.
+    """
+
+    def __init__(self, bus: EventBus, secreto: bytes, puerto: int = PUERTO_RELAY,
+                 host: str = "127.0.0.1"):
+        if not secreto:
+            raise ValueError("El relay local requiere un secreto")
+        self.bus = bus
+        self.secreto = secreto
+        self.puerto = puerto
+        self.host = host
+        self.es_concentrador = False
+        self._aviso_rechazo = False
+        self._pares: List[socket.socket] = []
+        self._buffers: Dict[socket.socket, bytes] = {}
+        self._lock_envio = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._bucle, name="RexusEventRelay", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 2.0):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        self._cerrar_pares()
+
+    @property
+    def conectado(self) -> bool:
+        return self.es_concentrador or bool(self._pares)
+
+    def enviar(self, evento: Evento):
+        """Envía un evento local a los pares conectados."""
+        if not self._pares:
+            return
+        try:
+            linea = self._serializar(evento.tipo, evento.datos, evento.origen, evento.timestamp)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"[EVENT BUS] Evento {evento.tipo} no serializable: {e}")
+            return
+        self._difundir(linea)
+
+    @staticmethod
+    def _serializar(tipo: str, datos: Dict[str, Any], origen: str, timestamp: float) -> bytes:
+        return (json.dumps({
+            "tipo": tipo, "datos": datos, "origen": origen, "ts": timestamp,
+        }, default=str) + "\n").encode("utf-8")
+
+    def _difundir(self, linea: bytes, excepto: Optional[socket.socket] = None):
+        # Los pares tienen TIEMPO_ENVIO_RELAY_SEGUNDOS de timeout: uno que no
+        # lee no bloquea indefinidamente al que publica
+        caidos = []
+        with self._lock_envio:
+            for par in list(self._pares):
+                if par is excepto:
+                    continue
+                try:
+                    par.sendall(linea)
+                except socket.timeout:
+                    logger.warning("[EVENT BUS] Par del relay sin leer eventos, se desconecta")
+                    caidos.append(par)
+                except OSError:
+                    caidos.append(par)
+        for par in caidos:
+            self._quitar_par(par)
+
+    def _quitar_par(self, par: socket.socket):
+        with self._lock_envio:
+            if par in self._pares:
+                self._pares.remove(par)
+        self._buffers.pop(par, None)
+        try:
+            par.close()
+        except OSError:
+            pass
+
+    def _cerrar_pares(self):
+        for par in list(self._pares):
+            self._quitar_par(par)
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            servidor = self._abrir_concentrador()
+            if servidor is not None:
+                self._atender(servidor)
+                continue
+            cliente = self._conectar_cliente()
+            if cliente is not None:
+                self._atender(None)
+                continue
+            self._detener.wait(REINTENTO_RELAY_SEGUNDOS)
+
+    def _abrir_concentrador(self) -> Optional[socket.socket]:
+        servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+                # Windows: SO_REUSEADDR permitiría a dos procesos abrir el mismo puerto
+                servidor.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+            else:
+                servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            servidor.bind((self.host, self.puerto))
+            servidor.listen(16)
+            servidor.setblocking(False)
+        except OSError:
+            servidor.close()
+            return None
+        self.es_concentrador = True
+        logger.info(f"[EVENT BUS] Relay local como concentrador en {self.host}:{self.puerto}")
+        return servidor
+
+    def _firma(self, reto: str, rol: str) -> str:
+        return hmac.new(self.secreto, f"{rol}:{reto}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _leer_linea(sock: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+        """Lee un mensaje JSON del handshake; devuelve (mensaje, bytes sobrantes)."""
+        buffer = b""
+        while b"\n" not in buffer:
+            if len(buffer) > MAX_LINEA_HANDSHAKE:
+                raise ValueError("Handshake demasiado largo")
+            datos = sock.recv(4096)
+            if not datos:
+                raise ConnectionError("Conexión cerrada durante el handshake")
+            buffer += datos
+        linea, resto = buffer.split(b"\n", 1)
+        mensaje = json.loads(linea)
+        if not isinstance(mensaje, dict):
+            raise ValueError("Handshake inválido")
+        return mensaje, resto
+
+    @staticmethod
+    def _enviar_linea(sock: socket.socket, mensaje: Dict[str, Any]):
+        sock.sendall((json.dumps(mensaje) + "\n").encode("utf-8"))
+
+    def _autenticar_como_concentrador(self, par: socket.socket) -> Optional[bytes]:
+        """Handshake del lado concentrador; devuelve los bytes sobrantes o None si falla."""
+        reto = secrets.token_hex(16)
+        try:
+            par.settimeout(TIEMPO_HANDSHAKE_SEGUNDOS)
+            self._enviar_linea(par, {"reto": reto})
+            mensaje, resto = self._leer_linea(par)
+            if not hmac.compare_digest(str(mensaje.get("respuesta", "")),
+                                       self._firma(reto, "cliente")):
+                return None
+            self._enviar_linea(par, {"respuesta": self._firma(str(mensaje["reto"]), "concentrador")})
+            par.settimeout(TIEMPO_ENVIO_RELAY_SEGUNDOS)
+            return resto
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _autenticar_como_cliente(self, cliente: socket.socket) -> Optional[bytes]:
+        """Handshake del lado cliente; también verifica al concentrador."""
+        reto = secrets.token_hex(16)
+        try:
+            mensaje, _ = self._leer_linea(cliente)
+            self._enviar_linea(cliente, {
+                "respuesta": self._firma(str(mensaje["reto"]), "cliente"),
+                "reto": reto,
+            })
+            mensaje, resto = self._leer_linea(cliente)
+            if not hmac.compare_digest(str(mensaje.get("respuesta", "")),
+                                       self._firma(reto, "concentrador")):
+                return None
+            cliente.settimeout(TIEMPO_ENVIO_RELAY_SEGUNDOS)
+            return resto
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _conectar_cliente(self) -> Optional[socket.socket]:
+        try:
+            cliente = socket.create_connection((self.host, self.puerto),
+                                               timeout=TIEMPO_HANDSHAKE_SEGUNDOS)
+        except OSError:
+            return None
+        resto = self._autenticar_como_cliente(cliente)
+        if resto is None:
+            cliente.close()
+            if not self._aviso_rechazo:
+                self._aviso_rechazo = True
+                logger.warning(
+                    f"[EVENT BUS] El proceso en {self.host}:{self.puerto} no superó la "
+                    "autenticación del relay"
+                )
+            return None
+        with self._lock_envio:
+            self._pares.append(cliente)
+        self._buffers[cliente] = resto
+        logger.info(f"[EVENT BUS] Relay local conectado a {self.host}:{self.puerto}")
+        return cliente
+
+    def _atender(self, servidor: Optional[socket.socket]):
+        """Atiende el socket del concentrador (si lo hay) y los pares hasta perder la conexión."""
+        try:
+            while not self._detener.is_set():
+                if servidor is None and not self._pares:
+                    return  # Cliente sin concentrador: reintentar
+                lectura = list(self._pares) + ([servidor] if servidor is not None else [])
+                try:
+                    listos, _, _ = select.select(lectura, [], [], 0.5)
+                except (OSError, ValueError):
+                    listos = []
+                    for par in list(self._pares):
+                        if par.fileno() < 0:
+                            self._quitar_par(par)
+                for sock in listos:
+                    if sock is servidor:
+                        self._aceptar(servidor)
+                    else:
+                        self._leer(sock, reenviar=servidor is not None)
+        finally:
+            if servidor is not None:
+                servidor.close()
+                self.es_concentrador = False
+            self._cerrar_pares()
+
+    def _aceptar(self, servidor: socket.socket):
+        try:
+            par, _ = servidor.accept()
+        except OSError:
+            return
+        par.setblocking(True)
+        resto = self._autenticar_como_concentrador(par)
+        if resto is None:
+            logger.warning("[EVENT BUS] Conexión al relay rechazada: autenticación fallida")
+            try:
+                par.close()
+            except OSError:
+                pass
+            return
+        with self._lock_envio:
+            self._pares.append(par)
+        self._buffers[par] = resto
+
+    def _leer(self, par: socket.socket, reenviar: bool):
+        try:
+            datos = par.recv(65536)
+        except OSError:
+            datos = b""
+        if not datos:
+            self._quitar_par(par)
+            return
+        buffer = self._buffers.get(par, b"") + datos
+        *lineas, resto = buffer.split(b"\n")
+        if len(resto) > MAX_LINEA_RELAY:
+            logger.warning("[EVENT BUS] Línea del relay demasiado larga, se descarta el par")
+            self._quitar_par(par)
+            return
+        self._buffers[par] = resto
+        for linea in lineas:
+            if not linea:
+                continue
+            try:
+                mensaje = json.loads(linea)
+                self.bus.recibir_remoto(
+                    mensaje["tipo"], mensaje.get("datos") or {},
+                    mensaje["origen"], float(mensaje.get("ts") or time.time()),
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"[EVENT BUS] Mensaje de relay inválido: {e}")
+                continue
+            if reenviar:
+                self._difundir(linea + b"\n", excepto=par)
+
+
+def crear_despachador_qt() -> Optional[Despachador]:
+    """
+    Devuelve un despachador que ejecuta los callbacks en el hilo de la UI.
+
+    Debe llamarse desde el hilo principal de Qt. Devuelve None si PyQt6 no
+    está disponible (los callbacks se ejecutan entonces en el hilo que publica).
+    """
+    try:
+        from PyQt6.QtCore import QObject, pyqtSignal
+    except ImportError:
+        return None
+
+    class _DespachadorQt(QObject):
+        invocar = pyqtSignal(object)
+
+        def __init__(self):
+            super().__init__()
+            self.invocar.connect(self._ejecutar)
+
+        def _ejecutar(self, funcion):
+            funcion()
+
+        def despachar(self, funcion):
+            # Emitida desde otro hilo, la señal se encola en el hilo del objeto
+            self.invocar.emit(funcion)
+
+    return _DespachadorQt().despachar
+
+
+_event_bus: Optional[EventBus] = None
+_event_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Obtiene el bus de eventos global."""
+    global _event_bus
+    if _event_bus is None:
+        with _event_bus_lock:
+            if _event_bus is None:
+                _event_bus = EventBus()
+    return _event_bus
+
+
+def init_event_bus(relay_local: bool = False, puerto: Optional[int] = None) -> EventBus:
+    """
+    Inicializa el bus global.
+
+    Args:
+        relay_local: Compartir eventos con otros procesos del mismo usuario
+            en esta máquina (requiere el secreto del perfil)
+        puerto: Puerto TCP del relay en 127.0.0.1 (por defecto, derivado
+            del secreto)
+    """
+    bus = get_event_bus()
+    if relay_local:
+        bus.conectar_relay(puerto)
+    return bus
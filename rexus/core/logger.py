@@ -23,6 +23,7 @@ except ImportError:
     LOGURU_AVAILABLE = False
 
 from .config import LOGGING_CONFIG, LOGS_DIR
+from rexus.utils.log_pipeline import get_log_pipeline
 
 class RexusLogger:
     """
@@ -66,7 +67,6 @@ class RexusLogger:
         console_handler.setLevel(level)
         console_formatter = self._get_console_formatter()
         console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
 
         # Handler para archivo con rotación
         file_handler = logging.handlers.RotatingFileHandler(
@@ -78,7 +78,6 @@ class RexusLogger:
         file_handler.setLevel(level)
         file_formatter = self._get_file_formatter()
         file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
 
         # Handler para errores críticos (archivo separado)
         error_handler = logging.handlers.RotatingFileHandler(
@@ -89,7 +88,11 @@ class RexusLogger:
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(file_formatter)
-        self.logger.addHandler(error_handler)
+
+        # Formateo, enmascarado, JSON y rotación corren en el hilo del
+        # pipeline; el logger solo encola
+        pipeline = get_log_pipeline()
+        pipeline.attach(self.logger, [console_handler, file_handler, error_handler], replace=True)
 
         # Handler para audit logs (archivo separado)
         audit_handler = logging.handlers.RotatingFileHandler(
@@ -104,7 +107,7 @@ class RexusLogger:
 
         # Crear logger separado para auditoría
         audit_logger = logging.getLogger(f"{self.name}.audit")
-        audit_logger.addHandler(audit_handler)
+        pipeline.attach(audit_logger, [audit_handler], replace=True)
         audit_logger.setLevel(logging.INFO)
 
         # Configurar structured logging si está disponible
@@ -114,7 +117,7 @@ class RexusLogger:
         self._configured = True
         self.info("Sistema de logging inicializado", extra={
             "version": "2.0.0",
-            "handlers": len(self.logger.handlers),
+            "handlers": len(pipeline.handlers_for(self.name)),
             "level": level
         })
 
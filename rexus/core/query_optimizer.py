@@ -28,7 +28,8 @@ Sistema para prevenir problemas N+1 y mejorar el rendimiento de queries.
 import time
 import functools
 import hashlib
-from typing import Dict, List, Any, Optional, Callable
+from concurrent.futures import Future
+from typing import Dict, Hashable, Iterable, List, Any, Optional, Callable
 from datetime import datetime
 from dataclasses import dataclass
 import threading
@@ -56,92 +57,201 @@ class QueryStats:
         self.last_executed = datetime.now()
 
 
-class BatchQueryExecutor:
+# Máximo de parámetros por consulta IN (SQL Server admite 2100)
+MAX_IN_PARAMS = 2000
+
+
+class LoaderFuture(Future):
     """
-    Ejecutor de consultas por lotes para evitar problemas N+1.
+    Future de un DataLoader.
+
+    Pedir el resultado despacha el lote pendiente: todas las claves pedidas
+    antes del primer result() viajan en la misma consulta.
     """
 
-    def __init__(self):
-        self._batch_queries = {}
-        self._batch_timeout = 0.1  # 100ms timeout para batching
-        self._batch_threads = {}
-        self._lock = threading.RLock()
+    def __init__(self, loader: "DataLoader"):
+        super().__init__()
+        self._loader = loader
 
-    def batch_query(self,
-query_key: str,
-        query_func: Callable,
-        *args,
-        **kwargs):
-        """
-        Agrupa consultas similares para ejecutarlas en lotes.
+    def result(self, timeout: Optional[float] = None):
+        if not self.done():
+            self._loader.dispatch()
+        return super().result(timeout)
+
+    def exception(self, timeout: Optional[float] = None):
+        if not self.done():
+            self._loader.dispatch()
+        return super().exception(timeout)
+
+
+class DataLoader:
+    """
+    Agrupa cargas por clave individual en consultas por lotes.
+
+    Los llamadores piden una clave (load) y reciben un future; las claves
+    pedidas antes de consumir cualquier resultado se deduplican y se resuelven
+    con una sola llamada a batch_load_fn. Los resultados quedan en caché
+    mientras viva el loader (normalmente, una acción o vista de detalle).
+
+    Ejemplo:
+        loader = DataLoader(self._obtener_stock_por_codigos, default=0)
+        futuros = [loader.load(item["codigo_producto"]) for item in items]
+        stocks = [f.result() for f in futuros]   # una única consulta IN
+    """
 
+    def __init__(self,
+                 batch_load_fn: Callable[[List[Hashable]], Dict[Hashable, Any]],
+                 max_batch_size: int = MAX_IN_PARAMS,
+                 cache: bool = True,
+                 default: Any = None):
+        """
         Args:
-            query_key: Identificador único del tipo de consulta
-            query_func: Función que ejecuta la consulta
-            *args, **kwargs: Parámetros de la consulta
+            batch_load_fn: Recibe una lista de claves únicas y devuelve
+                {clave: valor}; las claves ausentes se resuelven con default
+            max_batch_size: Claves máximas por llamada a batch_load_fn
+            cache: Si es True, cada clave se carga una sola vez
+            default: Valor para claves no encontradas
         """
-        with self._lock:
-            if query_key not in self._batch_queries:
-                self._batch_queries[query_key] = {
-                    'queries': [],
-                    'func': query_func,
-                    'timer': None
-                }
+        self._batch_load_fn = batch_load_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.cache_enabled = cache
+        self.default = default
+        self._cache: Dict[Hashable, LoaderFuture] = {}
+        self._queue: Dict[Hashable, LoaderFuture] = {}
+        self._lock = threading.RLock()
+        self.batches_dispatched = 0
 
-            # Agregar consulta al lote
-            batch = self._batch_queries[query_key]
-            batch['queries'].append((args, kwargs))
+    def load(self, key: Hashable) -> LoaderFuture:
+        """Pide una clave; devuelve un future que se resuelve por lotes."""
+        with self._lock:
+            if self.cache_enabled and key in self._cache:
+                return self._cache[key]
+            future = self._queue.get(key)
+            if future is None:
+                future = LoaderFuture(self)
+                self._queue[key] = future
+                if self.cache_enabled:
+                    self._cache[key] = future
+            return future
+
+    def load_many(self, keys: Iterable[Hashable]) -> List[LoaderFuture]:
+        """Pide varias claves (se resuelven en el mismo lote)."""
+        return [self.load(key) for key in keys]
+
+    def get_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """Carga varias claves y devuelve sus valores en el mismo orden."""
+        futures = self.load_many(keys)
+        self.dispatch()
+        return [future.result() for future in futures]
+
+    def dispatch(self):
+        """Ejecuta las cargas pendientes en lotes de max_batch_size."""
+        with self._lock:
+            pending, self._queue = self._queue, {}
+        if not pending:
+            return
+
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_batch_size):
+            chunk = keys[start:start + self.max_batch_size]
+            self.batches_dispatched += 1
+            try:
+                results = self._batch_load_fn(chunk) or {}
+            except Exception as e:
+                for key in chunk:
+                    pending[key].set_exception(e)
+                    # Un error no debe quedar cacheado
+                    with self._lock:
+                        self._cache.pop(key, None)
+                continue
+            for key in chunk:
+                pending[key].set_result(results.get(key, self.default))
+
+    def prime(self, key: Hashable, value: Any):
+        """Guarda en caché un valor ya conocido (p. ej. de una lista previa)."""
+        with self._lock:
+            if key not in self._cache:
+                future = LoaderFuture(self)
+                future.set_result(value)
+                self._cache[key] = future
 
-            # Si es la primera consulta del lote, iniciar timer
-            if batch['timer'] is None:
-                batch['timer'] = threading.Timer(
-                    self._batch_timeout,
-                    self._execute_batch,
-                    args=[query_key]
-                )
-                batch['timer'].start()
+    def clear(self, key: Hashable):
+        """Invalida una clave (tras modificar el registro)."""
+        with self._lock:
+            self._cache.pop(key, None)
 
-    def _execute_batch(self, query_key: str):
-        """Ejecuta un lote de consultas."""
+    def clear_all(self):
         with self._lock:
-            if query_key not in self._batch_queries:
-                return
-
-            batch = self._batch_queries[query_key]
-            queries = batch['queries']
-            func = batch['func']
-
-            # Limpiar el lote
-            del self._batch_queries[query_key]
-
-        # Ejecutar el lote fuera del lock
-        try:
-            if len(queries) == 1:
-                # Consulta individual
-                args, kwargs = queries[0]
-                return func(*args, **kwargs)
+            self._cache.clear()
+
+
+def sql_in_loader(cursor_factory: Callable[[], Any],
+                  sql_template: str,
+                  key_column: str,
+                  many: bool = False,
+                  max_batch_size: int = MAX_IN_PARAMS) -> DataLoader:
+    """
+    Crea un DataLoader que resuelve claves con una consulta IN parametrizada.
+
+    Args:
+        cursor_factory: Devuelve un cursor de la conexión del modelo
+        sql_template: Consulta con el marcador {placeholders}, p. ej.
+            "SELECT * FROM proveedores WHERE id IN ({placeholders})"
+        key_column: Columna del resultado que contiene la clave
+        many: Si es True, cada clave se resuelve a una lista de filas
+            (relaciones uno a muchos, p. ej. detalles por pedido)
+        max_batch_size: Claves máximas por consulta
+
+    Returns:
+        DataLoader cuyos valores son dicts (o listas de dicts si many)
+    """
+
+    def batch_load(keys: List[Hashable]) -> Dict[Hashable, Any]:
+        return fetch_rows_by_keys(cursor_factory(), sql_template, keys, key_column, many)
+
+    return DataLoader(batch_load, max_batch_size=max_batch_size,
+                      default=[] if many else None)
+
+
+def fetch_rows_by_keys(cursor,
+                       sql_template: str,
+                       keys: List[Hashable],
+                       key_column: str,
+                       many: bool = False) -> Dict[Hashable, Any]:
+    """
+    Ejecuta sql_template con un IN (?, ?, ...) por cada tramo de claves y
+    agrupa las filas por key_column.
+    """
+    results: Dict[Hashable, Any] = {}
+    keys = list(dict.fromkeys(keys))
+    for start in range(0, len(keys), MAX_IN_PARAMS):
+        chunk = keys[start:start + MAX_IN_PARAMS]
+        placeholders = ", ".join("?" for _ in chunk)
+        cursor.execute(sql_template.format(placeholders=placeholders), chunk)
+        columns = [desc[0] for desc in cursor.description]
+        key_index = columns.index(key_column)
+        for row in cursor.fetchall():
+            record = dict(zip(columns, row))
+            key = row[key_index]
+            if many:
+                results.setdefault(key, []).append(record)
             else:
-                # Consulta en lote - la función debe saber manejar múltiples queries
-                return func(queries)
-        except Exception as e:
-            print(f"[QUERY_OPTIMIZER] Error ejecutando lote {query_key}: {e}")
-            return None
+                results[key] = record
+    return results
 
 
 class QueryOptimizer:
     """
-    Optimizador principal de consultas con cache y prevención N+1.
+    Optimizador principal de consultas con cache y estadísticas de rendimiento.
     """
 
     def __init__(self):
         self._query_stats: Dict[str, QueryStats] = {}
-        self._batch_executor = BatchQueryExecutor()
         self._lock = threading.RLock()
 
         # Configuración
         self.slow_query_threshold = 1.0  # 1 segundo
         self.cache_slow_queries = True
-        self.enable_batching = True
 
     def _generate_query_hash(self,
 func: Callable,
@@ -226,27 +336,6 @@ func: Callable,
             return wrapper
         return decorator
 
-    def prevent_n_plus_one(self, batch_key: str):
-        """
-        Decorador para prevenir problemas N+1 mediante batching.
-
-        Args:
-            batch_key: Identificador único para el tipo de consulta
-        """
-        def decorator(func: Callable):
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                if self.enable_batching:
-                    return self._batch_executor.batch_query(batch_key,
-func,
-                        *args,
-                        **kwargs)
-                else:
-                    return func(*args, **kwargs)
-
-            return wrapper
-        return decorator
-
     def paginated_query(self, page_size: int = 50, max_page_size: int = 500):
         """
         Decorador para agregar paginación automática a consultas.
@@ -409,26 +498,22 @@ def cached_query(cache_key: str = None, ttl: int = 300):
     return query_optimizer.cached_query(cache_key, ttl)
 
 
-def prevent_n_plus_one(batch_key: str):
-    """Decorador de conveniencia para prevenir N+1."""
-    return query_optimizer.prevent_n_plus_one(batch_key)
-
-
 def paginated(page_size: int = 50):
     """Decorador de conveniencia para paginación."""
     return query_optimizer.paginated_query(page_size)
 
 
 # Función para aplicar múltiples optimizaciones
-def optimized_query(cache_key: str = None, ttl: int = 300,
-                   batch_key: str = None, page_size: int = 50):
+def optimized_query(cache_key: str = None, ttl: int = 300, page_size: int = 50):
     """
     Decorador que combina múltiples optimizaciones.
 
+    Para evitar consultas N+1 las cargas por clave se agrupan con
+    DataLoader o fetch_rows_by_keys.
+
     Args:
         cache_key: Clave de cache personalizada
         ttl: Time to live para cache
-        batch_key: Clave para batching (previene N+1)
         page_size: Tamaño de página por defecto
     """
     def decorator(func):
@@ -438,9 +523,6 @@ def optimized_query(cache_key: str = None, ttl: int = 300,
         if cache_key or ttl != 300:
             optimized_func = cached_query(cache_key, ttl)(optimized_func)
 
-        if batch_key:
-            optimized_func = prevent_n_plus_one(batch_key)(optimized_func)
-
         if page_size != 50:
             optimized_func = paginated(page_size)(optimized_func)
 
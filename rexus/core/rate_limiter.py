@@ -31,14 +31,35 @@ Sistema de rate limiting que protege contra ataques de fuerza bruta:
 - Implementa bloqueo temporal progresivo
 - Registra actividad sospechosa
 - Permite configuración flexible
+
+Motor común (SlidingWindowRateLimiter):
+- Contador de ventana deslizante: dos contadores por clave (ventana actual y
+  anterior ponderada) en lugar de una lista de timestamps, O(1) por consulta
+- Las claves inactivas se descartan en orden de uso sin recorrer el resto
+- Lo usan LoginRateLimiter (intentos recientes) y la API REST
+
+LoginRateLimiter guarda el estado por usuario en SQLite
+(data/rate_limiter.db): cada intento actualiza solo la fila de ese usuario y
+los registros vencidos se compactan periódicamente. El archivo JSON anterior
+se migra automáticamente la primera vez.
 """
 
 import datetime
 import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
 
+# Usuarios con estado en memoria (el resto se lee de SQLite al necesitarlo)
+MAX_CACHED_USERS = 10000
+
+# Estado de una ventana: (inicio, contador_actual, contador_anterior)
+WindowState = Tuple[float, float, float]
+
 
 @dataclass
 class RateLimitConfig:
@@ -48,6 +69,212 @@ class RateLimitConfig:
     max_lockout_minutes: int = 120  # Máximo minutos de bloqueo
     progressive_multiplier: int = 2  # Multiplicador progresivo
     cleanup_hours: int = 24  # Horas para limpiar registros antiguos
+    recent_window_seconds: int = 3600  # Ventana de "intentos recientes"
+    compaction_interval_minutes: int = 60  # Frecuencia de la compactación
+
+
+class SlidingWindowRateLimiter:
+    """
+    Limitador por clave con contador de ventana deslizante.
+
+    Los eventos de los últimos window_seconds se estiman como
+    actual + anterior * (fracción de la ventana anterior todavía cubierta).
+    Memoria y trabajo por consulta constantes, sin importar cuántos clientes
+    ni cuántos eventos haya.
+    """
+
+    def __init__(self, max_requests: int = 100, window_seconds: float = 60,
+                 max_keys: int = 100000, clock: Callable[[], float] = time.time):
+        self.max_requests = max_requests
+        self.window_seconds = float(window_seconds)
+        self.max_keys = max_keys
+        self.clock = clock
+        # clave -> [inicio, contador_actual, contador_anterior], en orden de uso
+        self._windows: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.lock = threading.RLock()
+
+    def _window(self, key: str, now: float, create: bool) -> Optional[List[float]]:
+        window = self._windows.get(key)
+        if window is None:
+            if not create:
+                return None
+            window = [now - now % self.window_seconds, 0.0, 0.0]
+            self._windows[key] = window
+        elif now >= window[0] + self.window_seconds:
+            elapsed = int((now - window[0]) // self.window_seconds)
+            window[2] = window[1] if elapsed == 1 else 0.0
+            window[1] = 0.0
+            window[0] += elapsed * self.window_seconds
+        # Al tocar una clave su ventana queda al día: el orden de uso coincide
+        # con el orden de inicio de ventana y el descarte solo mira el frente
+        self._windows.move_to_end(key)
+        return window
+
+    @staticmethod
+    def estimate(state: WindowState, now: float, window_seconds: float) -> float:
+        """Eventos estimados en la ventana que termina en now."""
+        start, current, previous = state
+        if now >= start + 2 * window_seconds:
+            return 0.0
+        if now >= start + window_seconds:
+            previous, current = current, 0.0
+            start += window_seconds
+        weight = 1.0 - (now - start) / window_seconds
+        return current + previous * weight
+
+    def _evict(self, now: float):
+        expired_before = now - 2 * self.window_seconds
+        windows = self._windows
+        while windows:
+            key = next(iter(windows))
+            if windows[key][0] > expired_before and len(windows) <= self.max_keys:
+                break
+            windows.popitem(last=False)
+
+    def is_allowed(self, client_id: str, cost: float = 1) -> bool:
+        """Registra un evento si entra en el límite; devuelve si se permitió."""
+        with self.lock:
+            now = self.clock()
+            window = self._window(client_id, now, True)
+            if self.estimate(window, now, self.window_seconds) + cost > self.max_requests:
+                return False
+            window[1] += cost
+            self._evict(now)
+            return True
+
+    def hit(self, key: str, cost: float = 1) -> float:
+        """Registra un evento sin aplicar el límite; devuelve el conteo estimado."""
+        with self.lock:
+            now = self.clock()
+            window = self._window(key, now, True)
+            window[1] += cost
+            self._evict(now)
+            return self.estimate(window, now, self.window_seconds)
+
+    def count(self, key: str) -> float:
+        with self.lock:
+            window = self._windows.get(key)
+            if window is None:
+                return 0.0
+            return self.estimate(window, self.clock(), self.window_seconds)
+
+    def reset(self, key: str):
+        with self.lock:
+            self._windows.pop(key, None)
+
+    def get_state(self, key: str) -> Optional[WindowState]:
+        with self.lock:
+            window = self._windows.get(key)
+            return tuple(window) if window is not None else None
+
+    def set_state(self, key: str, state: WindowState):
+        with self.lock:
+            self._windows[key] = list(state)
+            # Un estado restaurado puede ser más viejo que el frente
+            self._window(key, self.clock(), False)
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+
+@dataclass
+class _LoginState:
+    consecutive_failures: int = 0
+    locked_until: Optional[datetime.datetime] = None
+    last_attempt: Optional[datetime.datetime] = None
+
+
+def _to_ts(value: Optional[datetime.datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
+
+
+def _from_ts(value: Optional[float]) -> Optional[datetime.datetime]:
+    return datetime.datetime.fromtimestamp(value) if value is not None else None
+
+
+class _LoginAttemptStore:
+    """Estado de login por usuario en SQLite (una fila por usuario)."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS login_attempts (
+                username TEXT PRIMARY KEY,
+                consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                locked_until REAL,
+                last_attempt REAL,
+                window_start REAL,
+                window_current REAL,
+                window_previous REAL
+            )
+        """)
+        self._lock = threading.Lock()
+
+    def load(self, username: str) -> Optional[Tuple[_LoginState, Optional[WindowState]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT consecutive_failures, locked_until, last_attempt, window_start, "
+                "window_current, window_previous FROM login_attempts WHERE username = ?",
+                (username,),
+            ).fetchone()
+        if row is None:
+            return None
+        state = _LoginState(row[0], _from_ts(row[1]), _from_ts(row[2]))
+        window = (row[3], row[4], row[5]) if row[3] is not None else None
+        return state, window
+
+    def save_many(self, rows: Iterable[Tuple[str, _LoginState, Optional[WindowState]]]):
+        params = [
+            (username, state.consecutive_failures, _to_ts(state.locked_until),
+             _to_ts(state.last_attempt), *(window or (None, None, None)))
+            for username, state, window in rows
+        ]
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO login_attempts (username, consecutive_failures, locked_until,
+                    last_attempt, window_start, window_current, window_previous)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(username) DO UPDATE SET
+                    consecutive_failures = excluded.consecutive_failures,
+                    locked_until = excluded.locked_until,
+                    last_attempt = excluded.last_attempt,
+                    window_start = excluded.window_start,
+                    window_current = excluded.window_current,
+                    window_previous = excluded.window_previous
+            """, params)
+
+    def save(self, username: str, state: _LoginState, window: Optional[WindowState]):
+        self.save_many([(username, state, window)])
+
+    def delete(self, username: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM login_attempts WHERE username = ?", (username,))
+
+    def purge(self, cutoff: float, now: float) -> List[str]:
+        """Borra usuarios sin intentos desde cutoff y sin bloqueo vigente."""
+        with self._lock:
+            condition = ("last_attempt < ? AND (locked_until IS NULL OR locked_until < ?)")
+            removed = [row[0] for row in self._conn.execute(
+                f"SELECT username FROM login_attempts WHERE {condition}", (cutoff, now))]
+            if removed:
+                self._conn.execute(f"DELETE FROM login_attempts WHERE {condition}", (cutoff, now))
+            return removed
+
+    def statistics(self, now: float) -> Tuple[int, int, List[WindowState]]:
+        """(usuarios, bloqueados, ventanas) para get_statistics."""
+        with self._lock:
+            total, blocked = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(CASE WHEN locked_until > ? THEN 1 ELSE 0 END), 0) "
+                "FROM login_attempts", (now,),
+            ).fetchone()
+            windows = self._conn.execute(
+                "SELECT window_start, window_current, window_previous FROM login_attempts "
+                "WHERE window_start IS NOT NULL",
+            ).fetchall()
+        return total, blocked, windows
 
 
 class LoginRateLimiter:
@@ -56,114 +283,122 @@ class LoginRateLimiter:
 
     Características:
     - Bloqueo temporal progresivo por usuario
-    - Persistencia de datos entre sesiones
-    - Limpieza automática de registros antiguos
+    - Persistencia de datos entre sesiones (SQLite, escritura por usuario)
+    - Compactación periódica de registros antiguos
     - Logging de actividad sospechosa
     - Configuración flexible
     """
 
-    def __init__(self, config: Optional[RateLimitConfig] = None):
+    def __init__(self, config: Optional[RateLimitConfig] = None,
+                 db_file: Optional[Path] = None):
         """Inicializa el rate limiter"""
         self.config = config or RateLimitConfig()
-        self.data_file = Path("data/rate_limiter.json")
-        self.attempts = {}  # {username: attempt_data}
-
-        # Crear directorio data si no existe
-        self.data_file.parent.mkdir(exist_ok=True)
-
-        # Cargar datos persistidos
+        self.data_file = Path("data/rate_limiter.json")  # Formato anterior
+        self.db_file = Path(db_file) if db_file else Path("data/rate_limiter.db")
+        self.attempts: "OrderedDict[str, _LoginState]" = OrderedDict()  # Cache acotado
+        self._recent = SlidingWindowRateLimiter(
+            max_requests=self.config.max_attempts,
+            window_seconds=self.config.recent_window_seconds,
+            max_keys=MAX_CACHED_USERS,
+        )
+        self._lock = threading.RLock()
+        self._last_compaction = 0.0
+
+        self._store = _LoginAttemptStore(self.db_file)
+
+        # Migrar datos del JSON anterior
         self._load_data()
 
         # Limpiar registros antiguos
         self._cleanup_old_records()
 
     def _load_data(self):
-        """Carga datos de intentos desde archivo JSON"""
+        """Migra el archivo JSON del formato anterior a SQLite (una sola vez)"""
+        if not self.data_file.exists():
+            return
         try:
-            if self.data_file.exists():
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                # Convertir timestamps string de vuelta a datetime
-                for username, attempt_data in data.items():
-                    if 'locked_until' in attempt_data and \
-                        attempt_data['locked_until']:
-                        attempt_data['locked_until'] = datetime.datetime.fromisoformat(
-                            attempt_data['locked_until']
-                        )
-                    if 'last_attempt' in attempt_data:
-                        attempt_data['last_attempt'] = datetime.datetime.fromisoformat(
-                            attempt_data['last_attempt']
-                        )
-                    if 'attempts' in attempt_data:
-                        # Convertir lista de timestamps
-                        attempt_data['attempts'] = [
-                            datetime.datetime.fromisoformat(ts)
-                            for ts in attempt_data['attempts']
-                        ]
-
-                self.attempts = data
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            now = time.time()
+            window_seconds = self._recent.window_seconds
+            rows = []
+            for username, attempt_data in data.items():
+                state = _LoginState(
+                    consecutive_failures=attempt_data.get('consecutive_failures', 0),
+                    locked_until=(datetime.datetime.fromisoformat(attempt_data['locked_until'])
+                                  if attempt_data.get('locked_until') else None),
+                    last_attempt=(datetime.datetime.fromisoformat(attempt_data['last_attempt'])
+                                  if attempt_data.get('last_attempt') else None),
+                )
+                recent = sum(
+                    1 for ts in attempt_data.get('attempts', [])
+                    if datetime.datetime.fromisoformat(ts).timestamp() > now - window_seconds
+                )
+                window = (now - now % window_seconds, float(recent), 0.0) if recent else None
+                rows.append((username, state, window))
+
+            self._store.save_many(rows)
+            self.data_file.rename(self.data_file.with_suffix('.json.migrated'))
+            print(f"[INFO] Rate limiter: {len(rows)} registros migrados a {self.db_file}")
 
         except Exception as e:
-            print(f"[WARNING] Error cargando rate limiter data: {e}")
-            self.attempts = {}
-
-    def _save_data(self):
-        """Guarda datos de intentos en archivo JSON"""
-        try:
-            # Convertir datetime objects a strings para JSON
-            data_to_save = {}
-            for username, attempt_data in self.attempts.items():
-                serialized_data = attempt_data.copy()
-
-                if 'locked_until' in serialized_data and \
-                    serialized_data['locked_until']:
-                    serialized_data['locked_until'] = serialized_data['locked_until'].isoformat()
-
-                if 'last_attempt' in serialized_data:
-                    serialized_data['last_attempt'] = serialized_data['last_attempt'].isoformat()
-
-                if 'attempts' in serialized_data:
-                    serialized_data['attempts'] = [
-                        ts.isoformat() for ts in serialized_data['attempts']
-                    ]
-
-                data_to_save[username] = serialized_data
+            print(f"[WARNING] Error migrando rate limiter data: {e}")
+
+    def _get_state(self, username: str, create: bool = False) -> Optional[_LoginState]:
+        """Estado del usuario desde el cache o, si no está, desde SQLite"""
+        state = self.attempts.get(username)
+        if state is not None:
+            self.attempts.move_to_end(username)
+            return state
+
+        stored = self._store.load(username)
+        if stored is not None:
+            state, window = stored
+            if window is not None:
+                self._recent.set_state(username, window)
+        elif create:
+            state = _LoginState()
+        else:
+            return None
 
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, indent=2, ensure_ascii=False)
+        self.attempts[username] = state
+        while len(self.attempts) > MAX_CACHED_USERS:
+            # Ya persistido: se puede descartar de memoria
+            self.attempts.popitem(last=False)
+        return state
 
+    def _save_data(self, username: str):
+        """Persiste el estado de un usuario (solo su fila)"""
+        try:
+            state = self.attempts.get(username)
+            if state is not None:
+                self._store.save(username, state, self._recent.get_state(username))
         except Exception as e:
             print(f"[ERROR] Error guardando rate limiter data: {e}")
 
     def _cleanup_old_records(self):
-        """Limpia registros antiguos basado en configuración"""
+        """Compacta el almacenamiento borrando registros antiguos"""
         try:
-            cutoff_time = datetime.datetime.now() - datetime.timedelta(
-                hours=self.config.cleanup_hours
-            )
-
-            users_to_remove = []
-            for username, data in self.attempts.items():
-                # Si el último intento es muy antiguo y no está bloqueado
-                last_attempt = data.get('last_attempt')
-                locked_until = data.get('locked_until')
-
-                if last_attempt and last_attempt < cutoff_time:
-                    if not locked_until or locked_until < datetime.datetime.now():
-                        users_to_remove.append(username)
-
-            # Remover registros antiguos
-            for username in users_to_remove:
-                del self.attempts[username]
-
-            if users_to_remove:
-                print(f"[INFO] Rate limiter: limpiados {len(users_to_remove)} registros antiguos")
-                self._save_data()
+            now = time.time()
+            cutoff = now - self.config.cleanup_hours * 3600
+            with self._lock:
+                self._last_compaction = now
+                removed = self._store.purge(cutoff, now)
+                for username in removed:
+                    self.attempts.pop(username, None)
+                    self._recent.reset(username)
+
+            if removed:
+                print(f"[INFO] Rate limiter: limpiados {len(removed)} registros antiguos")
 
         except Exception as e:
             print(f"[ERROR] Error limpiando registros antiguos: {e}")
 
+    def _maybe_compact(self):
+        if time.time() - self._last_compaction >= self.config.compaction_interval_minutes * 60:
+            self._cleanup_old_records()
+
     def is_blocked(self, username: str) -> Tuple[bool, Optional[datetime.datetime]]:
         """
         Verifica si un usuario está bloqueado
@@ -171,25 +406,20 @@ class LoginRateLimiter:
         Returns:
             Tuple[bool, Optional[datetime]]: (está_bloqueado, hasta_cuando)
         """
-        if username not in self.attempts:
-            return False, None
-
-        attempt_data = self.attempts[username]
-        locked_until = attempt_data.get('locked_until')
+        with self._lock:
+            state = self._get_state(username)
+            if state is None or not state.locked_until:
+                return False, None
 
-        if not locked_until:
-            return False, None
+            # Verificar si el bloqueo ya expiró
+            if state.locked_until <= datetime.datetime.now():
+                # Bloqueo expirado, limpiar
+                state.locked_until = None
+                state.consecutive_failures = 0
+                self._save_data(username)
+                return False, None
 
-        # Verificar si el bloqueo ya expiró
-        now = datetime.datetime.now()
-        if locked_until <= now:
-            # Bloqueo expirado, limpiar
-            attempt_data['locked_until'] = None
-            attempt_data['consecutive_failures'] = 0
-            self._save_data()
-            return False, None
-
-        return True, locked_until
+            return True, state.locked_until
 
     def record_failed_attempt(self, username: str):
         """
@@ -198,38 +428,26 @@ class LoginRateLimiter:
         Args:
             username: Usuario que falló el login
         """
-        now = datetime.datetime.now()
-
-        if username not in self.attempts:
-            self.attempts[username] = {
-                'consecutive_failures': 0,
-                'attempts': [],
-                'last_attempt': now,
-                'locked_until': None
-            }
+        with self._lock:
+            state = self._get_state(username, create=True)
 
-        attempt_data = self.attempts[username]
+            # Registrar el intento
+            state.consecutive_failures += 1
+            state.last_attempt = datetime.datetime.now()
+            self._recent.hit(username)
 
-        # Registrar el intento
-        attempt_data['consecutive_failures'] += 1
-        attempt_data['last_attempt'] = now
-        attempt_data['attempts'].append(now)
-
-        # Limpiar intentos antiguos (más de 1 hora)
-        cutoff = now - datetime.timedelta(hours=1)
-        attempt_data['attempts'] = [
-            ts for ts in attempt_data['attempts'] if ts > cutoff
-        ]
+            # Verificar si necesita bloqueo
+            if state.consecutive_failures >= self.config.max_attempts:
+                self._apply_lockout(username, state)
 
-        # Verificar si necesita bloqueo
-        if attempt_data['consecutive_failures'] >= self.config.max_attempts:
-            self._apply_lockout(username, attempt_data)
+            # Guardar cambios
+            self._save_data(username)
+            failures = state.consecutive_failures
 
-        # Guardar cambios
-        self._save_data()
+        self._maybe_compact()
 
         # Log de seguridad
-        self._log_security_event(username, "failed_attempt", attempt_data['consecutive_failures'])
+        self._log_security_event(username, "failed_attempt", failures)
 
     def record_successful_attempt(self, username: str):
         """
@@ -238,23 +456,21 @@ class LoginRateLimiter:
         Args:
             username: Usuario que logró autenticarse
         """
-        if username in self.attempts:
-            # Limpiar registros de fallos
-            self.attempts[username] = {
-                'consecutive_failures': 0,
-                'attempts': [],
-                'last_attempt': datetime.datetime.now(),
-                'locked_until': None
-            }
+        with self._lock:
+            if self._get_state(username) is None:
+                return
 
-            self._save_data()
+            # Limpiar registros de fallos
+            self.attempts[username] = _LoginState(last_attempt=datetime.datetime.now())
+            self._recent.reset(username)
+            self._save_data(username)
 
-            # Log de seguridad si había fallos previos
-            self._log_security_event(username, "successful_login_after_failures", 0)
+        # Log de seguridad si había fallos previos
+        self._log_security_event(username, "successful_login_after_failures", 0)
 
-    def _apply_lockout(self, username: str, attempt_data: Dict):
+    def _apply_lockout(self, username: str, state: _LoginState):
         """Aplica bloqueo temporal con escalación progresiva"""
-        failures = attempt_data['consecutive_failures']
+        failures = state.consecutive_failures
 
         # Calcular tiempo de bloqueo con escalación
         if failures <= self.config.max_attempts:
@@ -268,8 +484,7 @@ class LoginRateLimiter:
             )
 
         # Aplicar bloqueo
-        locked_until = datetime.datetime.now() + datetime.timedelta(minutes=lockout_minutes)
-        attempt_data['locked_until'] = locked_until
+        state.locked_until = datetime.datetime.now() + datetime.timedelta(minutes=lockout_minutes)
 
         # Log crítico de bloqueo
         self._log_security_event(username, "user_locked", lockout_minutes)
@@ -284,26 +499,27 @@ class LoginRateLimiter:
         Returns:
             Dict con información de bloqueo y intentos
         """
-        if username not in self.attempts:
+        with self._lock:
+            state = self._get_state(username)
+            if state is None:
+                return {
+                    'is_blocked': False,
+                    'consecutive_failures': 0,
+                    'locked_until': None,
+                    'remaining_attempts': self.config.max_attempts,
+                    'recent_attempts': 0
+                }
+
+            is_blocked, locked_until = self.is_blocked(username)
+
             return {
-                'is_blocked': False,
-                'consecutive_failures': 0,
-                'locked_until': None,
-                'remaining_attempts': self.config.max_attempts,
-                'recent_attempts': 0
+                'is_blocked': is_blocked,
+                'consecutive_failures': state.consecutive_failures,
+                'locked_until': locked_until,
+                'remaining_attempts': max(0, self.config.max_attempts - state.consecutive_failures),
+                'recent_attempts': round(self._recent.count(username))
             }
 
-        attempt_data = self.attempts[username]
-        is_blocked, locked_until = self.is_blocked(username)
-
-        return {
-            'is_blocked': is_blocked,
-            'consecutive_failures': attempt_data.get('consecutive_failures', 0),
-            'locked_until': locked_until,
-            'remaining_attempts': max(0, self.config.max_attempts - attempt_data.get('consecutive_failures', 0)),
-            'recent_attempts': len(attempt_data.get('attempts', []))
-        }
-
     def _log_security_event(self, username: str, event_type: str, details):
         """Registra eventos de seguridad en auditoria"""
         try:
@@ -339,35 +555,32 @@ class LoginRateLimiter:
             username: Usuario a resetear
             admin_user: Usuario admin que realiza la acción
         """
-        if username in self.attempts:
+        with self._lock:
+            if self._get_state(username) is None:
+                return
             del self.attempts[username]
-            self._save_data()
+            self._recent.reset(username)
+            self._store.delete(username)
 
-            # Log de la acción administrativa
-            self._log_security_event(admin_user, "admin_reset_attempts", f"Reset for user: {username}")
+        # Log de la acción administrativa
+        self._log_security_event(admin_user, "admin_reset_attempts", f"Reset for user: {username}")
 
-            print(f"[ADMIN] Intentos resetados para usuario '{username}' por '{admin_user}'")
+        print(f"[ADMIN] Intentos resetados para usuario '{username}' por '{admin_user}'")
 
     def get_statistics(self) -> Dict:
         """Obtiene estadísticas del rate limiter"""
-        now = datetime.datetime.now()
-
-        total_users = len(self.attempts)
-        blocked_users = sum(1 for data in self.attempts.values()
-                          if data.get('locked_until') and \
-                              data['locked_until'] > now)
+        now = time.time()
+        total_users, blocked_users, windows = self._store.statistics(now)
 
-        recent_attempts = 0
-        for data in self.attempts.values():
-            recent_attempts += len([
-                ts for ts in data.get('attempts', [])
-                if ts > now - datetime.timedelta(hours=1)
-            ])
+        window_seconds = self._recent.window_seconds
+        recent_attempts = sum(
+            SlidingWindowRateLimiter.estimate(window, now, window_seconds) for window in windows
+        )
 
         return {
             'total_tracked_users': total_users,
             'currently_blocked': blocked_users,
-            'recent_attempts_1h': recent_attempts,
+            'recent_attempts_1h': round(recent_attempts),
             'config': {
                 'max_attempts': self.config.max_attempts,
                 'base_lockout_minutes': self.config.base_lockout_minutes,
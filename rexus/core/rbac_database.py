@@ -11,19 +11,36 @@ Este sistema permite:
 - Auditoría completa de accesos
 - Herencia de permisos entre roles
 
+Rendimiento de check_access:
+- Roles, herencia, asignaciones y políticas se compilan una vez en memoria
+  (permisos efectivos por rol, patrones de políticas precompilados); una
+  verificación es una búsqueda en conjuntos, sin consultas
+- La compilación se invalida al modificar roles, permisos o políticas desde
+  esta instancia, y cada VERIFICACION_VERSION_SEGUNDOS se comprueba un
+  contador que los triggers incrementan ante cambios hechos por otros procesos
+- Los intentos de acceso se encolan y un hilo los inserta por lotes sobre una
+  conexión WAL de larga duración (AsyncAuditWriter)
+
 Author: Rexus Development Team
 Date: 2025-08-11
 Version: 1.0.0
 """
 
-import sqlite3
+import calendar
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Tuple, Any
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
+from rexus.core.audit_writer import RBAC_ACCESS_LOG, AsyncAuditWriter, init_audit_writer
+
 try:
     from rexus.utils.secure_logger import log_security_event
 except ImportError:
@@ -97,6 +114,86 @@ class AccessAttempt:
     details: Optional[Dict[str, Any]] = None
 
 
+# Segundos entre comprobaciones de cambios hechos por otros procesos
+VERIFICACION_VERSION_SEGUNDOS = 2.0
+# Combinaciones recurso/acción con políticas precalculadas antes de vaciar la tabla
+MAX_DECISIONES_POLITICAS = 10000
+TABLAS_VERSIONADAS = ("rbac_roles", "rbac_permissions", "rbac_user_roles",
+                      "rbac_role_permissions", "rbac_policies")
+
+
+def _epoch_utc(valor: Any) -> Optional[float]:
+    """Convierte una fecha de SQLite (UTC, como datetime('now')) a epoch."""
+    try:
+        fecha = datetime.fromisoformat(str(valor).replace("Z", ""))
+    except ValueError:
+        return None
+    if fecha.tzinfo is not None:
+        return fecha.timestamp()
+    return calendar.timegm(fecha.timetuple()) + fecha.microsecond / 1e6
+
+
+@dataclass(frozen=True)
+class _CompiledPolicy:
+    """Política con patrón y condiciones ya interpretados."""
+    effect: str
+    pattern: "re.Pattern"
+    actions: Optional[FrozenSet[str]]
+    context: Optional[Tuple[Tuple[str, Any], ...]]
+
+    def matches_context(self, context: Optional[Dict[str, Any]]) -> bool:
+        # Igual que antes: sin contexto del llamador, las condiciones de
+        # contexto no se evalúan
+        if not context or not self.context:
+            return True
+        return all(key in context and context[key] == value for key, value in self.context)
+
+
+@dataclass
+class _CompiledModel:
+    """Instantánea de roles, asignaciones y políticas lista para decidir."""
+    version: int
+    # Permisos efectivos (propios + heredados) de cada rol activo
+    role_grants: Dict[int, FrozenSet[Tuple[str, str]]]
+    # user_id -> [(role_id, vencimiento epoch o None)]
+    user_roles: Dict[int, List[Tuple[int, Optional[float]]]]
+    policies: List[_CompiledPolicy]
+    # user_id -> (permisos efectivos, válido hasta epoch)
+    user_grants: Dict[int, Tuple[FrozenSet[Tuple[str, str]], float]] = field(default_factory=dict)
+    # (recurso, acción) -> políticas aplicables en orden de prioridad
+    policy_candidates: Dict[Tuple[str, str], Tuple[_CompiledPolicy, ...]] = field(default_factory=dict)
+
+    def grants_for(self, user_id: int, now: float) -> FrozenSet[Tuple[str, str]]:
+        cached = self.user_grants.get(user_id)
+        if cached is not None and now < cached[1]:
+            return cached[0]
+
+        grants = set()
+        valid_until = float("inf")
+        for role_id, expires in self.user_roles.get(user_id, ()):
+            if expires is not None:
+                if expires <= now:
+                    continue
+                valid_until = min(valid_until, expires)
+            grants.update(self.role_grants.get(role_id, ()))
+        result = frozenset(grants)
+        self.user_grants[user_id] = (result, valid_until)
+        return result
+
+    def candidates_for(self, resource: str, action: str) -> Tuple[_CompiledPolicy, ...]:
+        key = (resource, action)
+        candidates = self.policy_candidates.get(key)
+        if candidates is None:
+            candidates = tuple(
+                p for p in self.policies
+                if p.pattern.match(resource) and (p.actions is None or action in p.actions)
+            )
+            if len(self.policy_candidates) >= MAX_DECISIONES_POLITICAS:
+                self.policy_candidates.clear()
+            self.policy_candidates[key] = candidates
+        return candidates
+
+
 class RBACDatabase:
     """
     Sistema de control de acceso basado en roles con respaldo en base de datos.
@@ -113,13 +210,17 @@ class RBACDatabase:
             db_path: Ruta al archivo de base de datos SQLite
         """
         self.db_path = db_path
-        self.permission_cache = {}
-        self.cache_timeout = timedelta(minutes=15)
-        self.last_cache_update = datetime.min
+        self._compiled: Optional[_CompiledModel] = None
+        self._compile_lock = threading.Lock()
+        self._next_version_check = 0.0
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._timestamp_second = 0
+        self._timestamp_text = ""
 
         # Inicializar base de datos
         self._initialize_database()
         self._create_default_roles()
+        self._access_log = self._create_access_log_writer()
 
         log_security_event(
             "RBAC_SYSTEM_INITIALIZED",
@@ -237,8 +338,51 @@ class RBACDatabase:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_access_log_user ON rbac_access_log (user_id, timestamp)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_access_log_resource ON rbac_access_log (resource, timestamp)")
 
+            # Versión del modelo de acceso: cualquier cambio en roles, permisos,
+            # asignaciones o políticas (de este u otro proceso) la incrementa
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rbac_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("INSERT OR IGNORE INTO rbac_meta (key, value) VALUES ('policy_version', 0)")
+            for table in TABLAS_VERSIONADAS:
+                for event in ("INSERT", "UPDATE", "DELETE"):
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                        AFTER {event} ON {table}
+                        BEGIN
+                            UPDATE rbac_meta SET value = value + 1 WHERE key = 'policy_version';
+                        END
+                    """)
+
             conn.commit()
 
+        # WAL: las verificaciones leen mientras el escritor de accesos inserta
+        with self._get_db_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+
+    def _create_access_log_writer(self) -> AsyncAuditWriter:
+        """Escritor por lotes compartido para el log de accesos de esta base."""
+        db_path = self.db_path
+
+        def factory():
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            return conn
+
+        return init_audit_writer(
+            factory,
+            name=f"rbac:{os.path.abspath(db_path)}",
+            batch_size=500,
+            flush_interval=1.0,
+            max_queue_size=50000,
+            spill_path=os.path.join("logs", "rbac_access_spill.jsonl"),
+        )
+
     def _create_default_roles(self):
         """Crea roles por defecto del sistema."""
         default_roles = [
@@ -403,8 +547,7 @@ resource: str,
                     "INFO"
                 )
 
-                # Limpiar caché para este usuario
-                self._clear_user_cache(user_id)
+                self.invalidate_access_model()
 
                 return True
 
@@ -450,8 +593,7 @@ role_id: int,
                     "INFO"
                 )
 
-                # Limpiar caché relacionado
-                self._clear_role_cache(role_id)
+                self.invalidate_access_model()
 
                 return True
 
@@ -463,6 +605,180 @@ role_id: int,
             )
             return False
 
+    def create_policy(self, name: str, resource_pattern: str, effect: str,
+                      conditions: Optional[Dict[str, Any]] = None,
+                      priority: int = 0, created_by: Optional[int] = None) -> int:
+        """
+        Crea una política de acceso.
+
+        Args:
+            name: Nombre único de la política
+            resource_pattern: Patrón de recurso ('*' como comodín)
+            effect: 'ALLOW' o 'DENY'
+            conditions: {"actions": [...], "context": {...}} opcional
+            priority: Mayor prioridad se evalúa primero
+            created_by: ID del usuario que crea la política
+
+        Returns:
+            ID de la política creada
+        """
+        with self._get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """INSERT INTO rbac_policies
+                   (name, resource_pattern, conditions, effect, priority, created_by)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (name, resource_pattern, json.dumps(conditions) if conditions else None,
+                 effect, priority, created_by)
+            )
+
+            policy_id = cursor.lastrowid
+            conn.commit()
+
+        log_security_event(
+            "POLICY_CREATED",
+            {"policy_id": policy_id, "name": name, "effect": effect},
+            "INFO"
+        )
+        self.invalidate_access_model()
+        return policy_id
+
+    def set_policy_active(self, policy_id: int, is_active: bool) -> bool:
+        """Activa o desactiva una política de acceso."""
+        with self._get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE rbac_policies SET is_active = ? WHERE id = ?",
+                           (1 if is_active else 0, policy_id))
+            updated = cursor.rowcount > 0
+            conn.commit()
+
+        if updated:
+            log_security_event(
+                "POLICY_UPDATED",
+                {"policy_id": policy_id, "is_active": is_active},
+                "INFO"
+            )
+            self.invalidate_access_model()
+        return updated
+
+    # ------------------------------------------------------------------
+    # Modelo de acceso compilado
+    # ------------------------------------------------------------------
+
+    def invalidate_access_model(self):
+        """Descarta el modelo compilado; la próxima verificación lo reconstruye."""
+        with self._compile_lock:
+            self._compiled = None
+
+    def _get_read_connection(self) -> sqlite3.Connection:
+        """Conexión de lectura de larga duración para compilar y leer la versión."""
+        if self._read_conn is None:
+            self._read_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._read_conn.execute("PRAGMA busy_timeout=5000")
+        return self._read_conn
+
+    def _read_version(self) -> int:
+        row = self._get_read_connection().execute(
+            "SELECT value FROM rbac_meta WHERE key = 'policy_version'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _access_model(self) -> _CompiledModel:
+        """Devuelve el modelo compilado vigente, recompilando si hubo cambios."""
+        compiled = self._compiled
+        now = time.monotonic()
+        if compiled is not None and now < self._next_version_check:
+            return compiled
+
+        with self._compile_lock:
+            compiled = self._compiled
+            if compiled is not None and time.monotonic() < self._next_version_check:
+                return compiled
+            version = self._read_version()
+            if compiled is None or compiled.version != version:
+                compiled = self._compile(version)
+                self._compiled = compiled
+            self._next_version_check = time.monotonic() + VERIFICACION_VERSION_SEGUNDOS
+            return compiled
+
+    def _compile(self, version: int) -> _CompiledModel:
+        """Lee roles, asignaciones y políticas y construye las estructuras de decisión."""
+        conn = self._get_read_connection()
+
+        parents = dict(conn.execute(
+            "SELECT id, parent_id FROM rbac_roles WHERE is_active = 1"
+        ).fetchall())
+
+        own_grants: Dict[int, set] = {}
+        for role_id, resource, action in conn.execute("""
+            SELECT rp.role_id, p.resource, p.action
+            FROM rbac_role_permissions rp
+            JOIN rbac_permissions p ON p.id = rp.permission_id
+            WHERE rp.is_active = 1 AND p.is_active = 1
+        """):
+            own_grants.setdefault(role_id, set()).add((resource, action))
+
+        # Herencia: un rol acumula los permisos de su cadena de padres activos
+        role_grants: Dict[int, FrozenSet[Tuple[str, str]]] = {}
+        for role_id in parents:
+            grants = set()
+            visited = set()
+            current = role_id
+            while current in parents and current not in visited:
+                visited.add(current)
+                grants.update(own_grants.get(current, ()))
+                current = parents[current]
+            role_grants[role_id] = frozenset(grants)
+
+        user_roles: Dict[int, List[Tuple[int, Optional[float]]]] = {}
+        wall_now = time.time()
+        for user_id, role_id, expires_at in conn.execute(
+            "SELECT user_id, role_id, expires_at FROM rbac_user_roles WHERE is_active = 1"
+        ):
+            if role_id not in parents:
+                continue
+            expires = None
+            if expires_at is not None:
+                expires = _epoch_utc(expires_at)
+                if expires is None:
+                    # Formato no reconocido: misma comparación de texto que SQLite
+                    vigente = str(expires_at) > datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+                    expires = float("inf") if vigente else 0.0
+                if expires <= wall_now:
+                    continue
+            user_roles.setdefault(user_id, []).append((role_id, expires))
+
+        policies: List[_CompiledPolicy] = []
+        for name, resource_pattern, conditions, effect in conn.execute("""
+            SELECT name, resource_pattern, conditions, effect
+            FROM rbac_policies
+            WHERE is_active = 1
+            ORDER BY priority DESC, id ASC
+        """):
+            try:
+                pattern = re.compile(resource_pattern.replace('*', '.*'))
+                parsed = json.loads(conditions) if conditions else {}
+            except (re.error, json.JSONDecodeError) as e:
+                log_security_event(
+                    "POLICY_INVALID",
+                    {"policy": name, "error": str(e)},
+                    "WARNING"
+                )
+                continue
+            if not isinstance(parsed, dict):
+                continue
+            actions = parsed.get('actions')
+            context = parsed.get('context')
+            policies.append(_CompiledPolicy(
+                effect=effect,
+                pattern=pattern,
+                actions=frozenset(actions) if actions is not None else None,
+                context=tuple(context.items()) if isinstance(context, dict) else None,
+            ))
+
+        return _CompiledModel(version, role_grants, user_roles, policies)
+
     def check_access(self, user_id: int, resource: str, action: str,
                     context: Optional[Dict[str, Any]] = None) -> Tuple[AccessResult, str]:
         """
@@ -524,127 +840,36 @@ user_id: int,
         resource: str,
         action: str) -> bool:
         """Verifica si el usuario tiene permisos directos o heredados."""
-        # Verificar caché
-        cache_key = f"{user_id}:{resource}:{action}"
-        if self._is_cache_valid() and cache_key in self.permission_cache:
-            return self.permission_cache[cache_key]
-
-        with self._get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # Query compleja que incluye herencia de roles
-            cursor.execute("""
-                WITH RECURSIVE role_hierarchy AS (
-                    -- Roles directos del usuario
-                    SELECT r.id, r.name, r.parent_id, 0 as level
-                    FROM rbac_roles r
-                    JOIN rbac_user_roles ur ON r.id = ur.role_id
-                    WHERE ur.user_id = ?
-                      AND ur.is_active = 1
-                      AND (ur.expires_at IS NULL OR ur.expires_at > datetime('now'))
-                      AND r.is_active = 1
-
-                    UNION ALL
-
-                    -- Roles heredados
-                    SELECT r.id, r.name, r.parent_id, rh.level + 1
-                    FROM rbac_roles r
-                    JOIN role_hierarchy rh ON r.id = rh.parent_id
-                    WHERE r.is_active = 1
-                )
-                SELECT DISTINCT p.resource, p.action
-                FROM rbac_permissions p
-                JOIN rbac_role_permissions rp ON p.id = rp.permission_id
-                JOIN role_hierarchy rh ON rp.role_id = rh.id
-                WHERE p.resource = ? AND p.action = ?
-                  AND p.is_active = 1 AND rp.is_active = 1
-            """, (user_id, resource, action))
-
-            result = cursor.fetchone() is not None
-
-            # Actualizar caché
-            self.permission_cache[cache_key] = result
-
-            return result
+        grants = self._access_model().grants_for(user_id, time.time())
+        return (resource, action) in grants
 
     def _check_access_policies(self, user_id: int, resource: str, action: str,
                               context: Optional[Dict[str, Any]] = None) -> AccessResult:
         """Verifica políticas de acceso específicas."""
-        with self._get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT name, resource_pattern, conditions, effect, priority
-                FROM rbac_policies
-                WHERE is_active = 1
-                ORDER BY priority DESC, id ASC
-            """)
-
-            policies = cursor.fetchall()
+        for policy in self._access_model().candidates_for(resource, action):
+            if policy.matches_context(context):
+                if policy.effect == 'DENY':
+                    return AccessResult.DENIED
+                elif policy.effect == 'ALLOW':
+                    return AccessResult.GRANTED
 
-            for policy in policies:
-                if self._policy_matches(policy, resource, action, context):
-                    if policy['effect'] == 'DENY':
-                        return AccessResult.DENIED
-                    elif policy['effect'] == 'ALLOW':
-                        return AccessResult.GRANTED
-
-            return AccessResult.CONDITIONAL
-
-    def _policy_matches(self, policy, resource: str, action: str,
-                       context: Optional[Dict[str, Any]] = None) -> bool:
-        """Verifica si una política aplica al recurso y contexto."""
-        import re
-
-        # Verificar patrón de recurso
-        pattern = policy['resource_pattern'].replace('*', '.*')
-        if not re.match(pattern, resource):
-            return False
-
-        # Verificar condiciones adicionales
-        if policy['conditions']:
-            try:
-                conditions = json.loads(policy['conditions'])
-
-                # Verificar condiciones de acción
-                if 'actions' in conditions:
-                    if action not in conditions['actions']:
-                        return False
-
-                # Verificar condiciones de contexto
-                if context and 'context' in conditions:
-                    for key, value in conditions['context'].items():
-                        if key not in context or context[key] != value:
-                            return False
-
-            except json.JSONDecodeError:
-                return False
-
-        return True
+        return AccessResult.CONDITIONAL
 
     def _log_access_attempt(self, user_id: int, resource: str, action: str,
                            result: AccessResult, context: Optional[Dict[str, Any]] = None):
-        """Registra intento de acceso en el log de auditoría."""
+        """Encola el intento de acceso para el log de auditoría (escritura por lotes)."""
         try:
-            details = {}
-            if context:
-                details.update(context)
-
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-
-                cursor.execute("""
-                    INSERT INTO rbac_access_log
-                    (user_id, resource, action, result, details)
-                    VALUES (?, ?, ?, ?, ?)
-                """,
-(user_id,
-                    resource,
-                    action,
-                    result.value,
-                    json.dumps(details)))
+            details = json.dumps(context, default=str) if context else "{}"
 
-                conn.commit()
+            # La columna result solo admite GRANTED/DENIED/CONDITIONAL
+            self._access_log.submit(RBAC_ACCESS_LOG, (
+                user_id,
+                resource,
+                action,
+                result.name,
+                details,
+                self._log_timestamp(),
+            ))
 
         except Exception as e:
             log_security_event(
@@ -653,6 +878,18 @@ user_id: int,
                 "ERROR"
             )
 
+    def _log_timestamp(self) -> str:
+        """Marca UTC con formato de CURRENT_TIMESTAMP, formateada una vez por segundo."""
+        second = int(time.time())
+        if second != self._timestamp_second:
+            self._timestamp_second = second
+            self._timestamp_text = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(second))
+        return self._timestamp_text
+
+    def flush_access_log(self, timeout: float = 5.0) -> bool:
+        """Espera a que los intentos de acceso encolados estén escritos."""
+        return self._access_log.flush(timeout)
+
     def get_user_roles(self, user_id: int) -> List[Role]:
         """Obtiene todos los roles asignados a un usuario."""
         with self._get_db_connection() as conn:
@@ -690,6 +927,9 @@ user_id: int,
     def get_access_statistics(self, user_id: Optional[int] = None,
                             days: int = 30) -> Dict[str, Any]:
         """Obtiene estadísticas de acceso del sistema."""
+        # Incluir los intentos que todavía están en la cola del escritor
+        self.flush_access_log()
+
         with self._get_db_connection() as conn:
             cursor = conn.cursor()
 
@@ -736,7 +976,9 @@ user_id: int,
             # Recursos más accedidos
             cursor.execute(f"""
                 SELECT resource, COUNT(*) as count
-                {base_query} {user_filter}
+                FROM rbac_access_log
+                WHERE timestamp > datetime('now', '-{int(days)} days')
+                {"AND user_id = ?" if user_id else ""}
                 GROUP BY resource
                 ORDER BY count DESC
                 LIMIT 10
@@ -751,23 +993,6 @@ user_id: int,
                 "period_days": days
             }
 
-    def _is_cache_valid(self) -> bool:
-        """Verifica si el caché de permisos sigue siendo válido."""
-        return datetime.now() - self.last_cache_update < self.cache_timeout
-
-    def _clear_user_cache(self, user_id: int):
-        """Limpia el caché de permisos para un usuario específico."""
-        keys_to_remove = [key for key in self.permission_cache.keys()
-                         if key.startswith(f"{user_id}:")]
-        for key in keys_to_remove:
-            del self.permission_cache[key]
-
-    def _clear_role_cache(self, role_id: int):
-        """Limpia el caché relacionado con un rol."""
-        # En una implementación más sofisticada, esto requeriría mapeo de roles a usuarios
-        self.permission_cache.clear()
-        self.last_cache_update = datetime.min
-
     def cleanup_expired_assignments(self) -> int:
         """Limpia asignaciones de roles expiradas."""
         with self._get_db_connection() as conn:
@@ -790,6 +1015,7 @@ user_id: int,
                     {"expired_count": expired_count},
                     "INFO"
                 )
+                self.invalidate_access_model()
 
             return expired_count
 
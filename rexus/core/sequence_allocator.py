@@ -0,0 +1,138 @@
+"""
+Numerador de Documentos - Rexus.app
+
+Asigna números correlativos a pedidos, órdenes de compra, reservas y demás
+documentos numerados (PED-2025-00042) a partir de un contador por prefijo y
+año en la tabla secuencias_documentos. Reemplaza el MAX(CAST(SUBSTRING(...)))
+sobre la tabla del documento, que recorre todo el historial y entrega el
+mismo número a dos usuarios que crean a la vez.
+
+siguiente(cursor, ...) se llama dentro de la transacción que inserta el
+documento. El UPDATE bloquea solo la fila del contador hasta el commit; si
+el documento se descarta (rollback), el número vuelve al contador y la
+numeración queda sin huecos.
+
+La primera vez que se numera un prefijo y año, el contador se inicializa con
+el último número ya usado en la tabla del documento (función semilla).
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from rexus.utils.app_logger import get_logger
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+logger = get_logger("core.sequence_allocator")
+
+ANCHO_NUMERO = 5
+MAX_REINTENTOS_ALTA = 3
+
+# semilla(cursor, "PED-2025-") -> último número usado con ese prefijo (o None)
+Semilla = Callable[[Any, str], Optional[int]]
+
+
+def prefijo_completo(prefijo: str, anio: Optional[int]) -> str:
+    """PED, 2025 -> "PED-2025-"; sin año -> "PED-"."""
+    return f"{prefijo}-{anio}-" if anio else f"{prefijo}-"
+
+
+def formatear_numero(prefijo: str, anio: Optional[int], numero: int,
+                     ancho: int = ANCHO_NUMERO) -> str:
+    """PED, 2025, 42 -> "PED-2025-00042"; sin año -> "PED-00042"."""
+    return f"{prefijo_completo(prefijo, anio)}{numero:0{ancho}d}"
+
+
+def semilla_sql(modulo: str, consulta: str) -> Semilla:
+    """
+    Semilla que ejecuta sql/<modulo>/<consulta>.sql con los parámetros
+    (prefijo_completo, prefijo_completo + "%").
+    """
+    def semilla(cursor, prefijo: str) -> Optional[int]:
+        cursor.execute(SQLQueryManager().get_query(modulo, consulta), (prefijo, f"{prefijo}%"))
+        fila = cursor.fetchone()
+        return fila[0] if fila and fila[0] else 0
+
+    return semilla
+
+
+class SequenceAllocator:
+    """Contadores por prefijo y año con asignación atómica."""
+
+    def __init__(self):
+        self.sql_manager = SQLQueryManager()
+
+    def crear_tabla(self, cursor):
+        """Crea secuencias_documentos si no existe (el llamador hace commit)."""
+        cursor.execute(self.sql_manager.get_query('secuencias', 'create_secuencias_table'))
+
+    def reservar(self, cursor, prefijo: str, anio: Optional[int] = None,
+                 cantidad: int = 1, semilla: Optional[Semilla] = None) -> int:
+        """
+        Reserva `cantidad` números consecutivos en la transacción de cursor.
+
+        Args:
+            cursor: Cursor de la transacción del llamador (el llamador hace
+                commit o rollback)
+            prefijo: Prefijo del documento ("PED", "OC"...)
+            anio: Año del contador (None = año actual, 0 = sin año)
+            cantidad: Números a reservar
+            semilla: Último número usado, si el contador aún no existe
+
+        Returns:
+            int: Último número reservado; el rango es
+                [resultado - cantidad + 1, resultado]
+        """
+        if cantidad < 1:
+            raise ValueError("La cantidad a reservar debe ser mayor que cero")
+        anio = datetime.now().year if anio is None else anio
+        incrementar = self.sql_manager.get_query('secuencias', 'incrementar_secuencia')
+
+        for _ in range(MAX_REINTENTOS_ALTA):
+            cursor.execute(incrementar, (cantidad, prefijo, anio))
+            if cursor.rowcount:
+                cursor.execute(
+                    self.sql_manager.get_query('secuencias', 'obtener_secuencia'),
+                    (prefijo, anio),
+                )
+                return cursor.fetchone()[0]
+            ultimo = self._dar_de_alta(cursor, prefijo, anio, cantidad, semilla)
+            if ultimo is not None:
+                return ultimo
+        raise RuntimeError(f"No se pudo inicializar la secuencia {prefijo}-{anio}")
+
+    def _dar_de_alta(self, cursor, prefijo: str, anio: int, cantidad: int,
+                     semilla: Optional[Semilla]) -> Optional[int]:
+        inicial = (semilla(cursor, prefijo_completo(prefijo, anio)) or 0) if semilla else 0
+        try:
+            cursor.execute(
+                self.sql_manager.get_query('secuencias', 'insertar_secuencia'),
+                (prefijo, anio, inicial + cantidad),
+            )
+        except Exception as e:
+            # Otro cliente la creó al mismo tiempo: se reintenta el UPDATE
+            logger.debug(f"[SECUENCIAS] Alta concurrente de {prefijo}-{anio}: {e}")
+            return None
+        logger.info(f"[SECUENCIAS] Secuencia {prefijo}-{anio} inicializada en {inicial}")
+        return inicial + cantidad
+
+    def siguiente(self, cursor, prefijo: str, anio: Optional[int] = None,
+                  semilla: Optional[Semilla] = None, ancho: int = ANCHO_NUMERO) -> str:
+        """Número formateado dentro de la transacción del llamador (sin huecos)."""
+        anio = datetime.now().year if anio is None else anio
+        numero = self.reservar(cursor, prefijo, anio, 1, semilla)
+        return formatear_numero(prefijo, anio, numero, ancho)
+
+
+_sequence_allocator: Optional[SequenceAllocator] = None
+_sequence_allocator_lock = threading.Lock()
+
+
+def get_sequence_allocator() -> SequenceAllocator:
+    """Obtiene el numerador global."""
+    global _sequence_allocator
+    if _sequence_allocator is None:
+        with _sequence_allocator_lock:
+            if _sequence_allocator is None:
+                _sequence_allocator = SequenceAllocator()
+    return _sequence_allocator
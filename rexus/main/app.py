@@ -2102,6 +2102,37 @@ def main():
     except Exception as e:
         logger.warning(f"Error inicializando sistema de backup: {e}")
 
+    # Los handlers que basicConfig dejó en el logger raíz durante los imports
+    # pasan por el pipeline de logging (enmascarado en segundo plano)
+    try:
+        from rexus.utils.log_pipeline import get_log_pipeline
+
+        get_log_pipeline().adopt(logging.getLogger())
+    except Exception as e:
+        logger.warning(f"Error enrutando handlers de logging: {e}")
+
+    # Bus de eventos con relay local (otras instancias del mismo usuario en este
+    # equipo, autenticadas con el secreto de su perfil)
+    try:
+        from rexus.core.event_bus import init_event_bus
+
+        init_event_bus(relay_local=os.getenv("REXUS_EVENT_RELAY", "1") != "0")
+    except Exception as e:
+        logger.warning(f"Error inicializando bus de eventos: {e}")
+
+    # Los eventos de dominio (stock bajo, pedidos aprobados, ...) se persisten
+    # como notificaciones una sola vez por proceso, abra o no el módulo
+    try:
+        from rexus.core.database import get_inventario_connection
+        from rexus.modules.notificaciones.model import (
+            NotificacionesModel,
+            conectar_eventos_dominio,
+        )
+
+        conectar_eventos_dominio(NotificacionesModel(get_inventario_connection()))
+    except Exception as e:
+        logger.warning(f"Error conectando eventos de dominio a notificaciones: {e}")
+
     # Crear dialog de login moderno
     login_dialog = LoginDialog()
 
@@ -22,6 +22,10 @@ except ImportError as e:
     logger.warning(f"SQL System not available in contabilidad: {e}")
     SQL_SYSTEM_AVAILABLE = False
 
+from rexus.modules.administracion.contabilidad.saldos_periodo import (
+    ORIGEN_LIBRO, ORIGEN_PAGOS_OBRA, ORIGEN_RECIBOS, SaldosPeriodo
+)
+
 
 class ContabilidadModel:
     """Modelo para gestionar contabilidad."""
@@ -48,6 +52,11 @@ class ContabilidadModel:
             self.sql_manager = None
             logger.warning("SQL System no disponible - usando queries embebidas")
 
+        # Saldos mensuales de los períodos cerrados (balance y flujo de caja)
+        self.saldos = None
+        if self.sql_manager and self.db_connection:
+            self.saldos = SaldosPeriodo(self.db_connection, self.sql_manager)
+
         self._verificar_tablas()
 
     def _validate_table_name(self, table_name: str) -> str:
@@ -107,6 +116,25 @@ class ContabilidadModel:
         except Exception as e:
             logger.error(f"Error verificando tablas: {e}")
 
+        if self.saldos:
+            try:
+                cursor = self.db_connection.cursor()
+                self.saldos.crear_tablas(cursor)
+                self.db_connection.commit()
+            except Exception as e:
+                logger.error(f"Error creando tablas de saldos por período: {e}")
+                self.saldos = None
+
+    def _actualizar_saldos(self, cursor, origen, *fechas):
+        """Recalcula los saldos consolidados de los meses cerrados afectados (antes del commit)."""
+        if not self.saldos:
+            return
+        meses = set()
+        for fecha in fechas:
+            if fecha and str(fecha)[:7] not in meses:
+                meses.add(str(fecha)[:7])
+                self.saldos.actualizar_mes(cursor, origen, fecha)
+
     # MÉTODOS PARA LIBRO CONTABLE
 
     def obtener_asientos_contables(self,
@@ -336,6 +364,7 @@ fecha_desde=None,
             cursor.execute("SELECT @@IDENTITY")
             asiento_id = cursor.fetchone()[0]
 
+            self._actualizar_saldos(cursor, ORIGEN_LIBRO, datos_asiento.get('fecha_asiento'))
             self.db_connection.commit()
             logger.info(f"Asiento contable creado con ID: {asiento_id}")
             return asiento_id
@@ -368,10 +397,15 @@ fecha_desde=None,
             haber = float(datos_asiento.get('haber', 0))
             saldo = debe - haber
 
+            # Fecha anterior: si el asiento cambia de mes, se recalculan ambos
+            cursor.execute("SELECT fecha_asiento FROM libro_contable WHERE id = ?", (asiento_id,))
+            anterior = cursor.fetchone()
+            fecha_anterior = anterior[0] if anterior else None
+
             # Actualizar asiento usando script SQL seguro
-            if self.sql_loader:
+            if self.sql_manager:
                 try:
-                    script_content = self.sql_loader.load_script('contabilidad/update_asiento_contable')
+                    script_content = self.sql_manager.get_query('contabilidad', 'update_asiento_contable')
                     if script_content:
                         cursor.execute(script_content, (
                             datos_asiento.get('fecha_asiento'),
@@ -434,6 +468,9 @@ haber = ?,
                     asiento_id
                 ))
 
+            self._actualizar_saldos(
+                cursor, ORIGEN_LIBRO, fecha_anterior, datos_asiento.get('fecha_asiento')
+            )
             self.db_connection.commit()
             logger.info(f"Asiento {asiento_id} actualizado exitosamente")
             return True
@@ -551,6 +588,7 @@ haber = ?,
             cursor.execute("SELECT @@IDENTITY")
             recibo_id = cursor.fetchone()[0]
 
+            self._actualizar_saldos(cursor, ORIGEN_RECIBOS, datos_recibo.get('fecha_emision'))
             self.db_connection.commit()
             logger.info(f"Recibo creado con ID: {recibo_id}")
             return recibo_id
@@ -689,6 +727,7 @@ haber = ?,
             cursor.execute("SELECT @@IDENTITY")
             pago_id = cursor.fetchone()[0]
 
+            self._actualizar_saldos(cursor, ORIGEN_PAGOS_OBRA, datos_pago.get('fecha_pago'))
             self.db_connection.commit()
             logger.info(f"Pago por obra creado con ID: {pago_id}")
             return pago_id
@@ -890,6 +929,9 @@ haber = ?,
         """
         Obtiene el balance general para un período.
 
+        Los meses cerrados se leen de los saldos consolidados; del libro
+        contable solo se leen los bordes del rango y el período abierto.
+
         Args:
             fecha_desde (date): Fecha desde
             fecha_hasta (date): Fecha hasta
@@ -901,6 +943,13 @@ haber = ?,
             return {}
 
         try:
+            if self.saldos:
+                totales = self.saldos.totales(ORIGEN_LIBRO, fecha_desde, fecha_hasta)
+                return {
+                    tipo: {'debe': debe, 'haber': haber, 'saldo': saldo}
+                    for tipo, (debe, haber, saldo) in totales.items()
+                }
+
             cursor = self.db_connection.cursor()
 
             conditions = ["estado = 'ACTIVO'"]
@@ -957,6 +1006,14 @@ haber = ?,
             return {}
 
         try:
+            if self.saldos:
+                ingresos = self.saldos.totales(ORIGEN_RECIBOS, fecha_desde, fecha_hasta)
+                egresos = self.saldos.totales(ORIGEN_PAGOS_OBRA, fecha_desde, fecha_hasta)
+                return {
+                    'ingresos': {tipo: debe for tipo, (debe, _, _) in ingresos.items()},
+                    'egresos': {categoria: haber for categoria, (_, haber, _) in egresos.items()},
+                }
+
             cursor = self.db_connection.cursor()
             flujo = {}
 
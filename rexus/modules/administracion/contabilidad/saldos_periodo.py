@@ -0,0 +1,193 @@
+"""
+Saldos por Período - Contabilidad
+
+Mantiene los totales mensuales por cuenta de los períodos cerrados en la tabla
+saldos_periodo, para que el balance general y el flujo de caja no recorran
+todo el libro contable cada vez que se abren.
+
+- Al empezar un mes, el mes anterior se consolida (una consulta agrupada por
+  origen) y avanza la marca cerrado_hasta de saldos_periodo_cierre
+- Un asiento, recibo o pago registrado o modificado en un mes ya cerrado
+  recalcula solo ese mes, en la transacción del llamador
+- Los reportes suman los saldos de los meses cerrados completos del rango y
+  leen del detalle solo los bordes del rango y el período abierto
+
+Orígenes: LIBRO (libro_contable por tipo_asiento), RECIBOS (ingresos por
+tipo_recibo) y PAGOS_OBRA (egresos por categoria).
+"""
+
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from rexus.utils.app_logger import get_logger
+from rexus.utils.format_utils import a_fecha
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+logger = get_logger(__name__)
+
+ORIGEN_LIBRO = "LIBRO"
+ORIGEN_RECIBOS = "RECIBOS"
+ORIGEN_PAGOS_OBRA = "PAGOS_OBRA"
+
+# origen -> (consulta de consolidación, consulta del detalle por rango)
+ORIGENES = {
+    ORIGEN_LIBRO: ("consolidar_saldos_libro", "select_balance_general_rango"),
+    ORIGEN_RECIBOS: ("consolidar_saldos_recibos", "select_flujo_caja_ingresos_rango"),
+    ORIGEN_PAGOS_OBRA: ("consolidar_saldos_pagos_obra", "select_flujo_caja_egresos_rango"),
+}
+
+# cuenta -> (debe, haber, saldo)
+Totales = Dict[str, Tuple[float, float, float]]
+
+
+def primer_dia_mes(fecha: date) -> date:
+    return fecha.replace(day=1)
+
+
+def mes_siguiente(fecha: date) -> date:
+    """Primer día del mes siguiente al de fecha."""
+    if fecha.month == 12:
+        return date(fecha.year + 1, 1, 1)
+    return date(fecha.year, fecha.month + 1, 1)
+
+
+class SaldosPeriodo:
+    """Saldos mensuales consolidados de los períodos cerrados."""
+
+    def __init__(self, db_connection, sql_manager: Optional[SQLQueryManager] = None):
+        self.db_connection = db_connection
+        self.sql_manager = sql_manager or SQLQueryManager()
+
+    def crear_tablas(self, cursor):
+        """Crea saldos_periodo y saldos_periodo_cierre si no existen (el llamador hace commit)."""
+        cursor.execute(self._query("create_saldos_periodo_tables"))
+
+    def cierres(self, cursor) -> Dict[str, date]:
+        """origen -> primer día del primer mes abierto."""
+        cursor.execute(self._query("select_cierre_saldos"))
+        return {origen: a_fecha(cerrado) for origen, cerrado in cursor.fetchall()}
+
+    # Consolidación
+
+    def consolidar(self, hasta: Optional[date] = None) -> Dict[str, date]:
+        """
+        Consolida los meses anteriores a hasta (por defecto, el mes actual)
+        que todavía no lo estén, en una transacción.
+
+        Returns:
+            Dict origen -> cerrado_hasta vigente
+        """
+        hasta = primer_dia_mes(a_fecha(hasta) or date.today())
+        cursor = self.db_connection.cursor()
+        try:
+            cierres = self.cierres(cursor)
+            for origen in ORIGENES:
+                desde = cierres.get(origen)
+                if desde is not None and desde >= hasta:
+                    continue
+                self._recalcular(cursor, origen, desde, hasta)
+                cursor.execute(self._query("update_cierre_saldos"), (hasta, origen))
+                if not cursor.rowcount:
+                    cursor.execute(self._query("insert_cierre_saldos"), (origen, hasta))
+                cierres[origen] = hasta
+                logger.info(f"[SALDOS] {origen} consolidado desde {desde or 'el inicio'} hasta {hasta}")
+            self.db_connection.commit()
+            return cierres
+        except Exception:
+            self.db_connection.rollback()
+            raise
+
+    def _recalcular(self, cursor, origen: str, desde: Optional[date], hasta: date):
+        cursor.execute(self._query("delete_saldos_periodo"), (origen, desde, desde, hasta))
+        cursor.execute(self._query(ORIGENES[origen][0]), (desde, desde, hasta))
+
+    def actualizar_mes(self, cursor, origen: str, fecha) -> bool:
+        """
+        Recalcula el mes de fecha si ya está consolidado. Llamar después de
+        registrar o modificar un movimiento, antes del commit del llamador.
+
+        Returns:
+            bool: True si el mes estaba cerrado y se recalculó
+        """
+        fecha = a_fecha(fecha)
+        if fecha is None:
+            return False
+        cerrado = self.cierres(cursor).get(origen)
+        if cerrado is None or fecha >= cerrado:
+            return False
+        mes = primer_dia_mes(fecha)
+        self._recalcular(cursor, origen, mes, mes_siguiente(mes))
+        logger.info(f"[SALDOS] {origen} {mes:%Y-%m} recalculado por un movimiento en período cerrado")
+        return True
+
+    # Consulta
+
+    def totales(self, origen: str, fecha_desde=None, fecha_hasta=None) -> Totales:
+        """
+        Totales por cuenta entre fecha_desde y fecha_hasta (inclusive; None =
+        sin límite): saldos de los meses cerrados completos más el detalle de
+        los bordes del rango y del período abierto.
+        """
+        desde = a_fecha(fecha_desde)
+        hasta = a_fecha(fecha_hasta)
+        hasta_exclusivo = date.fromordinal(hasta.toordinal() + 1) if hasta else None
+        cursor = self.db_connection.cursor()
+
+        cerrado = self._cierre_vigente(cursor, origen)
+        if cerrado is None:
+            return self._detalle(cursor, origen, desde, hasta_exclusivo)
+
+        # Meses cerrados completos dentro del rango: [inicio_saldos, fin_saldos)
+        inicio_saldos = None
+        if desde is not None:
+            inicio_saldos = desde if desde.day == 1 else mes_siguiente(desde)
+        fin_saldos = cerrado
+        if hasta_exclusivo is not None:
+            fin_saldos = min(cerrado, primer_dia_mes(hasta_exclusivo))
+        if inicio_saldos is not None and inicio_saldos >= fin_saldos:
+            return self._detalle(cursor, origen, desde, hasta_exclusivo)
+
+        totales: Totales = {}
+        cursor.execute(self._query("select_saldos_periodo"),
+                       (origen, inicio_saldos, inicio_saldos, fin_saldos))
+        self._acumular(totales, cursor.fetchall())
+        if desde is not None and desde < inicio_saldos:
+            self._acumular(totales, self._filas_detalle(cursor, origen, desde, inicio_saldos))
+        if hasta_exclusivo is None or fin_saldos < hasta_exclusivo:
+            self._acumular(totales, self._filas_detalle(cursor, origen, fin_saldos, hasta_exclusivo))
+        return totales
+
+    def _cierre_vigente(self, cursor, origen: str) -> Optional[date]:
+        cerrado = self.cierres(cursor).get(origen)
+        if cerrado is None or cerrado < primer_dia_mes(date.today()):
+            # Primer reporte del mes: se consolida lo que falte
+            try:
+                cerrado = self.consolidar().get(origen)
+            except Exception as e:
+                logger.warning(f"[SALDOS] No se pudo consolidar {origen}: {e}")
+        return cerrado
+
+    def _detalle(self, cursor, origen: str, desde: Optional[date],
+                 hasta_exclusivo: Optional[date]) -> Totales:
+        totales: Totales = {}
+        self._acumular(totales, self._filas_detalle(cursor, origen, desde, hasta_exclusivo))
+        return totales
+
+    def _filas_detalle(self, cursor, origen: str, desde: Optional[date],
+                       hasta_exclusivo: Optional[date]):
+        cursor.execute(self._query(ORIGENES[origen][1]),
+                       (desde, desde, hasta_exclusivo, hasta_exclusivo))
+        return cursor.fetchall()
+
+    @staticmethod
+    def _acumular(totales: Totales, filas):
+        for cuenta, debe, haber, saldo in filas:
+            anterior = totales.get(cuenta, (0.0, 0.0, 0.0))
+            totales[cuenta] = (
+                anterior[0] + float(debe or 0),
+                anterior[1] + float(haber or 0),
+                anterior[2] + float(saldo or 0),
+            )
+
+    def _query(self, nombre: str) -> str:
+        return self.sql_manager.get_query("contabilidad", nombre)
@@ -40,6 +40,7 @@ class AuditoriaController(QObject):
         self.view = view
         self.db_connection = db_connection
         self.usuario_actual = "SISTEMA"
+        self.filtros_actuales = {}
 
         if self.view:
             self._conectar_senales()
@@ -91,6 +92,7 @@ class AuditoriaController(QObject):
             usuario = filtros.get("usuario", "")
             modulo = filtros.get("modulo", "")
             criticidad = filtros.get("criticidad", "")
+            self.filtros_actuales = dict(filtros)
 
             # Obtener registros filtrados
             registros = self.model.obtener_registros(
@@ -115,6 +117,19 @@ class AuditoriaController(QObject):
             logger.error(f"[ERROR AUDITORÍA] Error filtrando registros: {e}")
             self.view.mostrar_error(f"Error aplicando filtros: {e}")
 
+    def obtener_fuente_exportacion(self):
+        """Origen de exportación con todos los registros de los filtros actuales."""
+        if not self.model or not hasattr(self.model, "crear_fuente_exportacion"):
+            return None
+        filtros = self.filtros_actuales
+        return self.model.crear_fuente_exportacion(
+            fecha_inicio=filtros.get("fecha_inicio"),
+            fecha_fin=filtros.get("fecha_fin"),
+            usuario=filtros.get("usuario", ""),
+            modulo=filtros.get("modulo", ""),
+            nivel_criticidad=filtros.get("criticidad", ""),
+        )
+
     def exportar_datos(self, formato="csv"):
         """
         Exporta los datos de auditoría a un archivo.
@@ -12,7 +12,8 @@ import datetime
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from collections import Counter
+from typing import Any, Dict, List, Optional
 
 # Importar sistema de logging centralizado
 from rexus.utils.app_logger import get_logger
@@ -36,6 +37,16 @@ except ImportError as e:
 from rexus.utils.unified_sanitizer import unified_sanitizer, sanitize_string
 from rexus.utils.sql_query_manager import SQLQueryManager
 from rexus.utils.unified_sanitizer import sanitize_string
+from rexus.core.audit_writer import AUDITORIA_LOG, audit_writer_for
+from rexus.core.audit_integrity import (
+    IntegrityReport,
+    get_audit_integrity_manager,
+    iter_audit_records,
+    load_checkpoint,
+    save_checkpoint,
+)
+from rexus.utils.statistics_service import fabrica_conexion, get_statistics_service
+from rexus.utils.streaming_export import ExportSource, cursor_source
 
 try:
     from rexus.utils.sql_security import SQLSecurityError, validate_table_name
@@ -46,19 +57,29 @@ except ImportError:
     validate_table_name = None
     SQLSecurityError = Exception
 
+# Vigencia de las estadísticas (segundos); ver AuditoriaModel.__init__
+ESTADISTICAS_MAX_EDAD = 60
+
+# Checkpoint de la cadena de integridad entre verificaciones
+RUTA_CHECKPOINT_INTEGRIDAD = os.path.join("data", "auditoria_integridad_checkpoint.json")
+CHECKPOINT_INTEGRIDAD_CADA = 1000
+
 
 class AuditoriaModel:
     """Modelo para gestionar los registros de auditoría del sistema con seguridad."""
 
-    def __init__(self, db_connection=None):
+    def __init__(self, db_connection=None, async_writes: bool = True):
         """
         Inicializa el modelo de auditoría.
 
         Args:
             db_connection: Conexión a la base de datos
+            async_writes: Si es True, registrar_accion encola los registros y
+                un escritor en segundo plano los inserta por lotes
         """
         self.db_connection = db_connection
         self.tabla_auditoria = "auditoria_log"
+        self.writer = None
 
         # Inicializar SQLQueryManager para consultas seguras
         self.sql_manager = SQLQueryManager()
@@ -85,6 +106,15 @@ class AuditoriaModel:
             logger.error("[ERROR AUDITORÍA] Conexión a base de datos no disponible")
         else:
             self._crear_tabla_si_no_existe()
+            if async_writes and getattr(self.db_connection, 'database', None):
+                self.writer = audit_writer_for(self.db_connection)
+            # El log recibe una fila por cada acción de la aplicación: en vez de
+            # invalidar en cada inserción, las estadísticas se refrescan en
+            # segundo plano cada minuto (y al limpiar registros)
+            get_statistics_service().registrar(
+                "auditoria", self._calcular_estadisticas,
+                fabrica_conexion(self.db_connection), max_edad=ESTADISTICAS_MAX_EDAD,
+            )
 
     def _validate_table_name(self, table_name: str) -> str:
         """
@@ -279,8 +309,6 @@ modulo,
             # Validar tabla
             tabla_validada = self._validate_table_name(self.tabla_auditoria)
 
-            cursor = self.db_connection.connection.cursor()
-
             # Convertir diccionarios a string JSON si existen (sanitizados)
             valores_ant_str = None
             valores_new_str = None
@@ -303,25 +331,33 @@ modulo,
                 else:
                     valores_new_str = str(valores_nuevos)
 
+            valores = (
+                usuario_limpio,
+                modulo_limpio,
+                accion_limpia,
+                descripcion_limpia,
+                tabla_afectada_limpia,
+                registro_id_limpio,
+                valores_ant_str,
+                valores_new_str,
+                nivel_criticidad_limpio,
+                resultado_limpio,
+                error_mensaje_limpio,
+            )
+
+            # Encolar para escritura por lotes si hay escritor asíncrono
+            if self.writer:
+                encolado = self.writer.submit(
+                    AUDITORIA_LOG, valores + (datetime.datetime.now(),)
+                )
+                logger.debug(f"[AUDITORÍA] Encolado: {usuario} - {modulo} - {accion}")
+                return encolado
+
             # Usar SQL query manager para inserción segura
             sql_insert = self.sql_manager.get_query('auditoria', 'insert_audit_log')
 
-            cursor.execute(
-                sql_insert,
-                (
-                    usuario_limpio,
-                    modulo_limpio,
-                    accion_limpia,
-                    descripcion_limpia,
-                    tabla_afectada_limpia,
-                    registro_id_limpio,
-                    valores_ant_str,
-                    valores_new_str,
-                    nivel_criticidad_limpio,
-                    resultado_limpio,
-                    error_mensaje_limpio,
-                ),
-            )
+            cursor = self.db_connection.connection.cursor()
+            cursor.execute(sql_insert, valores)
 
             self.db_connection.connection.commit()
             logger.info(f"[AUDITORÍA] Registrado: {usuario} - {modulo} - {accion}")
@@ -386,26 +422,6 @@ modulo,
             return []
 
         try:
-            # [LOCK] SANITIZACIÓN Y VALIDACIÓN DE PARÁMETROS
-            if self.data_sanitizer:
-                usuario_limpio = (
-                    sanitize_string(usuario) if usuario else ""
-                )
-                modulo_limpio = (
-                    sanitize_string(modulo) if modulo else ""
-                )
-                nivel_criticidad_limpio = (
-                    sanitize_string(nivel_criticidad)
-                    if nivel_criticidad
-                    else ""
-                )
-            else:
-                usuario_limpio = usuario.strip() if usuario else ""
-                modulo_limpio = modulo.strip() if modulo else ""
-                nivel_criticidad_limpio = (
-                    nivel_criticidad.strip() if nivel_criticidad else ""
-                )
-
             # Validar límite para evitar DoS
             limite_seguro = min(max(1, int(limite)), 10000)  # Entre 1 y 10000
 
@@ -414,33 +430,9 @@ modulo,
 
             cursor = self.db_connection.connection.cursor()
 
-            # Construir query con filtros
-            conditions = []
-            params = []
-
-            if fecha_inicio:
-                conditions.append("fecha_hora >= ?")
-                params.append(fecha_inicio)
-
-            if fecha_fin:
-                conditions.append("fecha_hora <= ?")
-                params.append(fecha_fin + datetime.timedelta(days=1))
-
-            if usuario_limpio:
-                conditions.append("usuario LIKE ?")
-                params.append(f"%{usuario_limpio}%")
-
-            if modulo_limpio:
-                conditions.append("modulo = ?")
-                params.append(modulo_limpio)
-
-            if nivel_criticidad_limpio:
-                conditions.append("nivel_criticidad = ?")
-                params.append(nivel_criticidad_limpio)
-
-            where_clause = ""
-            if conditions:
-                where_clause = "WHERE " + " AND ".join(conditions)
+            where_clause, params = self._construir_filtros_registros(
+                fecha_inicio, fecha_fin, usuario, modulo, nivel_criticidad
+            )
 
             # Usar SQL query manager (sin where_clause aún para simplicidad)
             if not where_clause:
@@ -474,6 +466,121 @@ modulo,
             logger.error(f"[ERROR AUDITORÍA] Error obteniendo registros: {e}")
             return []
 
+    def _construir_filtros_registros(
+        self,
+        fecha_inicio: datetime.date | None = None,
+        fecha_fin: datetime.date | None = None,
+        usuario: str = "",
+        modulo: str = "",
+        nivel_criticidad: str = "",
+    ) -> tuple:
+        """
+        Sanitiza los filtros y construye la cláusula WHERE parametrizada.
+
+        Returns:
+            tuple: (where_clause, params)
+        """
+        # [LOCK] SANITIZACIÓN Y VALIDACIÓN DE PARÁMETROS
+        if self.data_sanitizer:
+            usuario_limpio = (
+                sanitize_string(usuario) if usuario else ""
+            )
+            modulo_limpio = (
+                sanitize_string(modulo) if modulo else ""
+            )
+            nivel_criticidad_limpio = (
+                sanitize_string(nivel_criticidad)
+                if nivel_criticidad
+                else ""
+            )
+        else:
+            usuario_limpio = usuario.strip() if usuario else ""
+            modulo_limpio = modulo.strip() if modulo else ""
+            nivel_criticidad_limpio = (
+                nivel_criticidad.strip() if nivel_criticidad else ""
+            )
+
+        conditions = []
+        params = []
+
+        if fecha_inicio:
+            conditions.append("fecha_hora >= ?")
+            params.append(fecha_inicio)
+
+        if fecha_fin:
+            conditions.append("fecha_hora <= ?")
+            params.append(fecha_fin + datetime.timedelta(days=1))
+
+        if usuario_limpio:
+            conditions.append("usuario LIKE ?")
+            params.append(f"%{usuario_limpio}%")
+
+        if modulo_limpio:
+            conditions.append("modulo = ?")
+            params.append(modulo_limpio)
+
+        if nivel_criticidad_limpio:
+            conditions.append("nivel_criticidad = ?")
+            params.append(nivel_criticidad_limpio)
+
+        where_clause = ""
+        if conditions:
+            where_clause = "WHERE " + " AND ".join(conditions)
+        return where_clause, params
+
+    def crear_fuente_exportacion(
+        self,
+        fecha_inicio: datetime.date | None = None,
+        fecha_fin: datetime.date | None = None,
+        usuario: str = "",
+        modulo: str = "",
+        nivel_criticidad: str = "",
+    ) -> ExportSource | None:
+        """
+        Origen de exportación con todos los registros que cumplen los filtros.
+
+        A diferencia de obtener_registros no aplica TOP: las filas se leen del
+        cursor por lotes en el hilo de exportación, con una conexión propia.
+
+        Returns:
+            ExportSource o None si no hay conexión
+        """
+        database = getattr(self.db_connection, "database", None)
+        if not database:
+            logger.error("[ERROR AUDITORÍA] Sin conexión a BD para exportar registros")
+            return None
+
+        tabla_validada = self._validate_table_name(self.tabla_auditoria)
+        where_clause, params = self._construir_filtros_registros(
+            fecha_inicio, fecha_fin, usuario, modulo, nivel_criticidad
+        )
+        sql_select = f"""
+            SELECT id, fecha_hora, usuario, modulo, accion, descripcion,
+                   tabla_afectada, registro_id, nivel_criticidad, resultado
+            FROM [{tabla_validada}]
+            {where_clause}
+            ORDER BY fecha_hora DESC
+        """
+
+        total = None
+        try:
+            cursor = self.db_connection.connection.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM [{tabla_validada}] {where_clause}", params)
+            total = cursor.fetchone()[0]
+        except Exception as e:
+            logger.warning(f"[AUDITORÍA] No se pudo contar registros a exportar: {e}")
+
+        from rexus.core.database import DatabaseConnection
+        return cursor_source(
+            lambda: DatabaseConnection(database=database, auto_connect=True),
+            sql_select,
+            params,
+            headers=["ID", "Fecha/Hora", "Usuario", "Módulo", "Acción", "Descripción",
+                     "Tabla", "Registro", "Criticidad", "Resultado"],
+            total=total,
+            title="Auditoría",
+        )
+
     def obtener_estadisticas(self, dias: int = 30) -> Dict[str, Any]:
         """
         Obtiene estadísticas de auditoría de los últimos días.
@@ -489,38 +596,49 @@ modulo,
             return {}
 
         try:
-            cursor = self.db_connection.connection.cursor()
-            fecha_limite = datetime.datetime.now() - datetime.timedelta(days=dias)
-
-            # Usar SQL query manager para estadísticas
-            queries = {
-                "total_acciones": self.sql_manager.get_query('auditoria', 'count_total_acciones'),
-                "acciones_por_modulo": self.sql_manager.get_query('auditoria', 'count_acciones_por_modulo'),
-                "acciones_por_usuario": self.sql_manager.get_query('auditoria', 'count_acciones_por_usuario'),
-                "acciones_criticas": self.sql_manager.get_query('auditoria', 'count_acciones_criticas'),
-                "acciones_fallidas": self.sql_manager.get_query('auditoria', 'count_acciones_fallidas'),
-            }
-
-            estadisticas = {}
-
-            for key, query in queries.items():
-                cursor.execute(query, (fecha_limite,))
-
-                if key in ["total_acciones", "acciones_criticas", "acciones_fallidas"]:
-                    result = cursor.fetchone()
-                    estadisticas[key] = result[0] if result else 0
-                else:
-                    results = cursor.fetchall()
-                    estadisticas[key] = [
-                        {"nombre": row[0], "cantidad": row[1]} for row in results
-                    ]
-
-            return estadisticas
-
+            return get_statistics_service().obtener(
+                "auditoria", dias, conexion=self.db_connection.connection
+            ) or {}
         except Exception as e:
             logger.error(f"[ERROR AUDITORÍA] Error obteniendo estadísticas: {e}")
             return {}
 
+    def _calcular_estadisticas(self, conexion, dias: int) -> Dict[str, Any]:
+        """Calcula las estadísticas de los últimos días en una sola consulta agrupada."""
+        fecha_limite = datetime.datetime.now() - datetime.timedelta(days=dias)
+        cursor = conexion.cursor()
+        try:
+            cursor.execute(
+                self.sql_manager.get_query('auditoria', 'estadisticas_auditoria'),
+                (fecha_limite,),
+            )
+            filas = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        por_modulo = Counter()
+        por_usuario = Counter()
+        criticas = fallidas = 0
+        for modulo, usuario, cantidad, criticas_grupo, fallidas_grupo in filas:
+            por_modulo[modulo] += cantidad
+            por_usuario[usuario] += cantidad
+            criticas += criticas_grupo or 0
+            fallidas += fallidas_grupo or 0
+
+        return {
+            "total_acciones": sum(por_modulo.values()),
+            "acciones_por_modulo": [
+                {"nombre": nombre, "cantidad": cantidad}
+                for nombre, cantidad in por_modulo.most_common()
+            ],
+            "acciones_por_usuario": [
+                {"nombre": nombre, "cantidad": cantidad}
+                for nombre, cantidad in por_usuario.most_common()
+            ],
+            "acciones_criticas": criticas,
+            "acciones_fallidas": fallidas,
+        }
+
     def limpiar_registros_antiguos(self, dias_conservar: int = 365) -> bool:
         """
         Limpia registros de auditoría antiguos.
@@ -547,6 +665,7 @@ modulo,
             cursor.execute(sql_delete, (fecha_limite,))
             registros_eliminados = cursor.rowcount
             self.db_connection.connection.commit()
+            get_statistics_service().invalidar("auditoria")
 
             logger.info(f"[AUDITORÍA] Eliminados {registros_eliminados} registros antiguos")
 
@@ -565,6 +684,76 @@ modulo,
             logger.error(f"[ERROR AUDITORÍA] Error limpiando registros: {e}")
             return False
 
+    def verificar_integridad(
+        self, ruta_checkpoint: str = RUTA_CHECKPOINT_INTEGRIDAD, workers: int = 0
+    ) -> Optional[IntegrityReport]:
+        """
+        Verifica la cadena de registros sellados (tabla auditoria_integridad).
+
+        Reanuda desde el último checkpoint guardado: antes vuelve a verificar
+        el tramo que lo cierra y su raíz Merkle, así una fila alterada antes
+        del punto de reanudación no pasa inadvertida. El último checkpoint
+        emitido se guarda para la próxima ejecución.
+
+        Args:
+            ruta_checkpoint: Archivo JSON del checkpoint
+            workers: Procesos para verificar hashes y firmas (0 = en proceso)
+
+        Returns:
+            IntegrityReport, o None si no hay conexión o gestor de integridad
+        """
+        if not self.db_connection or not hasattr(self.db_connection, 'connection') or not self.db_connection.connection:
+            logger.error("[ERROR AUDITORÍA] Sin conexión a BD para verificar integridad")
+            return None
+
+        try:
+            gestor = get_audit_integrity_manager()
+        except RuntimeError as e:
+            logger.warning(f"[AUDITORÍA] Verificación de integridad no disponible: {e}")
+            return None
+
+        try:
+            checkpoint = load_checkpoint(ruta_checkpoint)
+            cursor = self.db_connection.connection.cursor()
+            try:
+                desde = 0
+                tramo = None
+                if checkpoint is not None:
+                    desde = checkpoint.record_count
+                    cursor.execute(
+                        self.sql_manager.get_query('auditoria', 'select_tramo_integridad'),
+                        (desde - checkpoint.segment_count, checkpoint.segment_count),
+                    )
+                    tramo = list(iter_audit_records(cursor))
+
+                cursor.execute(
+                    self.sql_manager.get_query('auditoria', 'select_registros_integridad'),
+                    (desde,),
+                )
+                reporte = gestor.verify_chain_integrity(
+                    iter_audit_records(cursor),
+                    checkpoint=checkpoint,
+                    checkpoint_every=CHECKPOINT_INTEGRIDAD_CADA,
+                    workers=workers,
+                    checkpoint_segment=tramo,
+                )
+            finally:
+                cursor.close()
+
+            if reporte.checkpoints:
+                os.makedirs(os.path.dirname(ruta_checkpoint) or ".", exist_ok=True)
+                save_checkpoint(reporte.checkpoints[-1], ruta_checkpoint)
+
+            if not reporte.chain_integrity or not reporte.signature_validity:
+                logger.error(
+                    f"[ERROR AUDITORÍA] Cadena de integridad comprometida: {len(reporte.issues)} problemas"
+                )
+            return reporte
+
+        except Exception as e:
+            logger.error(f"[ERROR AUDITORÍA] Error verificando integridad: {e}")
+            return None
+
     def obtener_logs_auditoria(self, limite=50, filtros=None):
         """
         Obtiene logs de auditoría con límite y filtros opcionales
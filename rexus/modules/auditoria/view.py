@@ -387,6 +387,12 @@ class AuditoriaView(BaseModuleView, ModuleExportMixin):
         """Establece el controlador para la vista."""
         self.controller = controller
 
+    def _get_export_source(self):
+        """Exporta desde la BD todos los registros filtrados, no solo la página."""
+        if self.controller and hasattr(self.controller, "obtener_fuente_exportacion"):
+            return self.controller.obtener_fuente_exportacion()
+        return None
+
     def actualizar_registros(self):
         """
         Actualiza los registros mostrados en la vista.
@@ -439,33 +439,35 @@ pedido_id,
         """Actualiza el stock de inventario desde una compra recibida"""
         try:
             if self.model:
-                # Obtener detalles de la orden
-                detalles = self.model.obtener_detalles_orden(orden_id)
-
-                # Actualizar inventario
-                for detalle in detalles:
-                    # Integración con el módulo de inventario
-                    try:
-                        from rexus.modules.inventario.model import InventarioModel
-                        from rexus.core.database import get_inventario_connection
-                        
-                        db_connection = get_inventario_connection()
-                        if db_connection:
-                            inventario_model = InventarioModel(db_connection)
-                            # Actualizar stock de producto recibido
-                            inventario_model.actualizar_stock_por_compra(
-                                producto_id=detalle.get('producto_id'),
-                                cantidad_recibida=detalle.get('cantidad', 0),
-                                precio_unitario=detalle.get('precio_unitario', 0),
-                                numero_compra=compra_id
-                            )
-                    except Exception as e:
-                        self.logger.warning(f"No se pudo actualizar inventario para detalle {detalle}: {e}")
-                        # Continuar con el resto de la operación
-
-                self.mostrar_exito("Stock actualizado desde compra")
-        except Exception as e:
-            self.mostrar_error(f"Error actualizando stock: {e}")
+                detalles = self.detalle_model.obtener_items_compra(orden_id)
+                productos, sin_producto = self.model.resolver_lineas_recepcion(detalles)
+                if sin_producto:
+                    # Ninguna línea se ingresa hasta que todas tengan producto
+                    items = "\n".join(
+                        f"- {detalle.get('descripcion') or 'ítem ' + str(detalle.get('id'))}"
+                        for detalle in sin_producto
+                    )
+                    self.mostrar_error(
+                        "Recepción no aplicada",
+                        f"{len(sin_producto)} de {len(detalles)} ítems no corresponden a un "
+                        f"único producto del inventario:\n{items}"
+                    )
+                    return
+
+                # Todas las líneas en una transacción del inventario
+                resultado = self.model.recibir_compra(orden_id, productos)
+                if resultado is None:
+                    self.mostrar_error("Error", "Sin conexión a la base de datos")
+                elif resultado.exito:
+                    self.mostrar_mensaje("Éxito", "Stock actualizado desde compra")
+                else:
+                    self.mostrar_error(
+                        "Recepción parcial",
+                        f"Stock actualizado en {resultado.aplicadas} de "
+                        f"{len(resultado.lineas)} líneas"
+                    )
+        except Exception as e:
+            self.mostrar_error("Error", f"Error actualizando stock: {e}")
 
     @auth_required
     def verificar_stock_minimos(self):
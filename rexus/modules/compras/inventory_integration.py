@@ -13,6 +13,7 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 
 from rexus.core.auth_decorators import auth_required
+from rexus.core.query_optimizer import DataLoader, fetch_rows_by_keys
 from rexus.utils.security import SecurityUtils
 
 logger = logging.getLogger(__name__)
@@ -276,6 +277,15 @@ orden_id: int,
                 'advertencias': []
             }
 
+            # Un único IN para todos los códigos en lugar de una consulta por item
+            stock_loader = DataLoader(self._obtener_stock_por_codigos, default=0)
+            futuros = [
+                stock_loader.load(item.get('codigo_producto'))
+                for item in items_solicitud if item.get('codigo_producto')
+            ]
+            stock_loader.dispatch()
+            futuros = iter(futuros)
+
             for item in items_solicitud:
                 codigo = item.get('codigo_producto')
                 cantidad_solicitada = item.get('cantidad', 0)
@@ -284,7 +294,7 @@ orden_id: int,
                     continue
 
                 # Obtener stock actual
-                stock_actual = self._obtener_stock_actual(codigo)
+                stock_actual = next(futuros).result()
 
                 item_verificado = {
                     'codigo_producto': codigo,
@@ -307,6 +317,22 @@ orden_id: int,
             logger.error(f"Error verificando disponibilidad de stock: {e}")
             return {'disponible_completo': False, 'error': str(e)}
 
+    def _obtener_stock_por_codigos(self, codigos: List[str]) -> Dict[str, int]:
+        """Obtiene el stock actual de varios productos en una consulta."""
+        try:
+            filas = fetch_rows_by_keys(
+                self.inventario_db.cursor(),
+                "SELECT codigo, cantidad FROM inventario "
+                "WHERE codigo IN ({placeholders}) AND estado = 'ACTIVO'",
+                codigos,
+                "codigo",
+            )
+            return {codigo: fila["cantidad"] for codigo, fila in filas.items()}
+
+        except Exception as e:
+            logger.error(f"Error obteniendo stock para {len(codigos)} productos: {e}")
+            return {}
+
     def _obtener_stock_actual(self, codigo_producto: str) -> int:
         """Obtiene el stock actual de un producto."""
         try:
@@ -11,9 +11,13 @@ Maneja la lógica de negocio y acceso a datos para el sistema de compras.
 import datetime
 import logging
 import os
-from typing import Any, Dict, List
-from rexus.core.query_optimizer import cached_query, track_performance
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+from rexus.core.event_bus import EVENTO_ORDEN_COMPRA_APROBADA, get_event_bus
+from rexus.core.query_optimizer import cached_query, fetch_rows_by_keys, track_performance
+from rexus.core.sequence_allocator import get_sequence_allocator, semilla_sql
 from rexus.utils.sql_query_manager import SQLQueryManager
+from rexus.utils.statistics_service import fabrica_conexion, get_statistics_service
 
 # Sistema de logging centralizado
 from rexus.utils.app_logger import get_logger
@@ -35,6 +39,10 @@ class ComprasModel:
         self.tabla_detalle_compras = "detalle_compras"
         self.sql_manager = SQLQueryManager()
         self._crear_tablas_si_no_existen()
+        if self.db_connection:
+            get_statistics_service().registrar(
+                "compras", self._calcular_estadisticas, fabrica_conexion(self.db_connection)
+            )
 
     def obtener_compras(self, filtros=None):
         """
@@ -108,6 +116,10 @@ class ComprasModel:
             else:
                 logger.warning(f"[ADVERTENCIA] La tabla '{self.tabla_detalle_compras}' no existe en la base de datos.")
 
+            # Contadores de numeración de órdenes
+            get_sequence_allocator().crear_tabla(cursor)
+            self.db_connection.commit()
+
         except Exception as e:
             logger.error(f"[ERROR COMPRAS] Error verificando tablas: {e}", exc_info=True)
 
@@ -133,7 +145,8 @@ class ComprasModel:
 
         Args:
             proveedor: Nombre del proveedor
-            numero_orden: Número de orden de compra
+            numero_orden: Número de orden de compra (vacío = se asigna el
+                siguiente OC-<año>-00001 en la misma transacción)
             fecha_pedido: Fecha del pedido
             fecha_entrega_estimada: Fecha estimada de entrega
             estado: Estado de la compra (PENDIENTE,
@@ -154,6 +167,8 @@ APROBADA,
 
         try:
             cursor = self.db_connection.cursor()
+            if not str(numero_orden or "").strip():
+                numero_orden = self.generar_numero_orden(cursor)
 
             # Usar consulta SQL externa
             sql_insert = self.sql_manager.get_query('compras', 'crear_compra')
@@ -173,13 +188,27 @@ APROBADA,
             )
 
             self.db_connection.commit()
+            get_statistics_service().invalidar("compras")
             logger.info(f"[COMPRAS] Orden creada: {numero_orden}")
             return True
 
         except Exception as e:
             logger.error(f"[ERROR COMPRAS] Error creando orden: {e}", exc_info=True)
+            try:
+                self.db_connection.rollback()
+            except Exception:
+                pass
             return False
 
+    def generar_numero_orden(self, cursor) -> str:
+        """
+        Reserva el siguiente número de orden (OC-<año>-00001) en la
+        transacción de cursor; vuelve al contador si se hace rollback.
+        """
+        return get_sequence_allocator().siguiente(
+            cursor, "OC", semilla=semilla_sql('compras', 'ultimo_numero_orden')
+        )
+
     def obtener_todas_compras(self) -> List[Dict]:
         """
         Obtiene todas las órdenes de compra.
@@ -242,6 +271,7 @@ APROBADA,
             sql_update = self.sql_manager.get_query('compras', 'actualizar_estado_compra')
             cursor.execute(sql_update, (nuevo_estado, compra_id))
             self.db_connection.commit()
+            get_statistics_service().invalidar("compras")
 
             logger.info(f"[COMPRAS] Estado actualizado para compra {compra_id}: {nuevo_estado}")
             return True
@@ -303,6 +333,7 @@ APROBADA,
             
             cursor.execute(query, valores)
             self.db_connection.commit()
+            get_statistics_service().invalidar("compras")
             
             logger.info(f"[COMPRAS] Orden de compra {compra_id} actualizada exitosamente")
             return True
@@ -366,46 +397,94 @@ APROBADA,
             productos: Lista de productos con cantidades recibidas
 
         Returns:
-            bool: True si se actualizó exitosamente
+            bool: True si se actualizaron todas las líneas
         """
-        try:
-            from rexus.modules.inventario.model import InventarioModel
+        resultado = self.recibir_compra(compra_id, productos)
+        return resultado is not None and resultado.exito
 
-            if not self.db_connection:
-                return False
+    def resolver_lineas_recepcion(self, detalles: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Convierte los ítems de detalle_compras en líneas de recepción.
 
-            inventario_model = InventarioModel(self.db_connection)
+        detalle_compras no guarda el producto: cada ítem se resuelve contra
+        inventario_perfiles por id o código si los trae, y si no, por su
+        descripción tomada como código o como descripción exacta de un único
+        producto activo.
 
-            for producto in productos:
-                producto_id = producto.get('id_producto')
-                cantidad_recibida = producto.get('cantidad_recibida', 0)
-                precio_unitario = producto.get('precio_unitario', 0.0)
+        Args:
+            detalles: Ítems de la compra (ver DetalleComprasModel.obtener_items_compra)
 
-                if cantidad_recibida <= 0:
-                    continue
+        Returns:
+            (líneas con id_producto y cantidad_recibida, ítems sin producto)
+        """
+        if not self.db_connection:
+            return [], list(detalles)
 
-                # Registrar movimiento de entrada en inventario
-                movimiento_data = {
-                    'producto_id': producto_id,
-                    'tipo_movimiento': 'ENTRADA',
-                    'cantidad': cantidad_recibida,
-                    'precio_unitario': precio_unitario,
-                    'referencia': f"Compra #{compra_id}",
-                    'usuario': producto.get('usuario', 'sistema'),
-                    'fecha': datetime.datetime.now()
-                }
+        descripciones = [
+            str(d['descripcion']).strip() for d in detalles
+            if d.get('producto_id') is None and not d.get('codigo_producto') and d.get('descripcion')
+        ]
+        por_codigo, por_descripcion = {}, {}
+        if descripciones:
+            cursor = self.db_connection.cursor()
+            por_codigo = fetch_rows_by_keys(
+                cursor, self.sql_manager.get_query('compras', 'recepcion_productos_por_codigo'),
+                descripciones, 'codigo',
+            )
+            pendientes = [d for d in descripciones if d not in por_codigo]
+            if pendientes:
+                por_descripcion = fetch_rows_by_keys(
+                    cursor, self.sql_manager.get_query('compras', 'recepcion_productos_por_descripcion'),
+                    pendientes, 'descripcion', many=True,
+                )
+
+        lineas, sin_resolver = [], []
+        for detalle in detalles:
+            producto_id = detalle.get('producto_id')
+            codigo = detalle.get('codigo_producto')
+            if producto_id is None and not codigo:
+                clave = str(detalle.get('descripcion') or '').strip()
+                candidatos = ([por_codigo[clave]] if clave in por_codigo
+                              else por_descripcion.get(clave, []))
+                if len(candidatos) != 1:
+                    # Sin producto o con varios productos de igual descripción
+                    sin_resolver.append(detalle)
+                    continue
+                producto_id = candidatos[0]['id']
+            lineas.append({
+                'id_producto': producto_id,
+                'codigo_producto': codigo,
+                'cantidad_recibida': detalle.get('cantidad', 0),
+                'precio_unitario': detalle.get('precio_unitario', 0),
+            })
+        return lineas, sin_resolver
 
-                # Usar el método del inventario para registrar movimiento
-                if hasattr(inventario_model, 'registrar_movimiento_inventario'):
-                    inventario_model.registrar_movimiento_inventario(movimiento_data)
+    @track_performance
+    def recibir_compra(self, compra_id: int, productos: List[Dict],
+                       usuario: str = None, atomica: bool = False):
+        """
+        Ingresa al inventario las líneas recibidas de una compra en una sola
+        transacción (ver RecepcionMasiva).
 
-                logger.info(f"Stock actualizado para producto {producto_id}: +{cantidad_recibida}")
+        Args:
+            compra_id: ID de la compra
+            productos: Líneas con id_producto o codigo_producto y cantidad_recibida
+            usuario: Usuario que recibe (por defecto, el de la primera línea)
+            atomica: Si alguna línea se rechaza, no aplicar ninguna
 
-            return True
+        Returns:
+            ResultadoRecepcion con el resultado de cada línea, o None sin conexión
+        """
+        from rexus.modules.compras.recepcion_masiva import RecepcionMasiva
 
-        except Exception as e:
-            logger.error(f"Error actualizando stock por compra: {e}")
-            return False
+        if not self.db_connection:
+            return None
+        if usuario is None:
+            usuario = productos[0].get('usuario', 'sistema') if productos else 'sistema'
+        resultado = RecepcionMasiva(self.db_connection).recibir(compra_id, productos, usuario, atomica)
+        for linea in resultado.rechazadas:
+            logger.warning(f"Compra {compra_id}, línea {linea.linea} no ingresada: {linea.motivo}")
+        return resultado
 
     @cached_query(ttl=600)
     @track_performance
@@ -461,210 +540,119 @@ APROBADA,
             return self._get_estadisticas_demo()
 
         try:
-            cursor = self.db_connection.cursor()
-            fecha_limite = datetime.datetime.now() - datetime.timedelta(days=dias)
-
-            # === ESTADÍSTICAS GENERALES ===
-            # Total de órdenes
-            sql_count = self.sql_manager.get_query('compras', 'count_total_compras')
-            cursor.execute(sql_count)
-            total_ordenes = cursor.fetchone()[0]
-
-            # Órdenes por estado
-            sql_estados = self.sql_manager.get_query('compras', 'count_compras_por_estado')
-            cursor.execute(sql_estados)
-            ordenes_por_estado = [
-                {"estado": row[0], "cantidad": row[1]} for row in cursor.fetchall()
-            ]
-
-            # Monto total
-            sql_monto = self.sql_manager.get_query('compras', 'sum_monto_total_compras')
-            cursor.execute(sql_monto)
-            monto_total = cursor.fetchone()[0] or 0
-
-            # Promedio por orden
-            promedio_orden = monto_total / total_ordenes if total_ordenes > 0 else 0
-
-            # Órdenes este mes
-            sql_mes = self.sql_manager.get_query('compras', 'count_compras_mes_actual')
-            cursor.execute(sql_mes)
-            ordenes_mes = cursor.fetchone()[0]
-
-            # === ANÁLISIS POR PROVEEDORES ===
-            # Análisis completo de proveedores
-            cursor.execute(
-                """
-                SELECT
-                    c.proveedor,
-                    COUNT(*) as ordenes,
-                    ISNULL(SUM(
-                        ISNULL((SELECT SUM(dc.cantidad * dc.precio_unitario)
-                                FROM detalle_compras dc
-                                WHERE dc.compra_id = c.id), 0) - c.descuento + c.impuestos
-                    ), 0) as monto_total,
-                    CASE
-                        WHEN COUNT(*) > 0 THEN
-                            ISNULL(SUM(
-                                ISNULL((SELECT SUM(dc.cantidad * dc.precio_unitario)
-                                        FROM detalle_compras dc
-                                        WHERE dc.compra_id = c.id), 0) - c.descuento + c.impuestos
-                            ), 0) / COUNT(*)
-                        ELSE 0
-                    END as promedio
-                FROM compras c
-                GROUP BY c.proveedor
-                ORDER BY monto_total DESC
-            """
-            )
-            proveedores_data = cursor.fetchall()
-
-            # Calcular porcentajes
-            proveedores_analisis = []
-            for proveedor, ordenes, monto, promedio in proveedores_data:
-                porcentaje = (monto / monto_total * 100) if monto_total > 0 else 0
-                proveedores_analisis.append({
-                    "proveedor": proveedor,
-                    "ordenes": ordenes,
-                    "monto_total": monto,
-                    "promedio": promedio,
-                    "porcentaje": porcentaje
-                })
-
-            # Proveedor principal
-            proveedor_principal = proveedores_analisis[0] if proveedores_analisis else None
-
-            # === ANÁLISIS TEMPORAL ===
-            # Compras hoy
-            cursor.execute(
-                """
-                SELECT COUNT(*) FROM compras
-                WHERE CAST(fecha_creacion AS DATE) = CAST(GETDATE() AS DATE)
-            """
-            )
-            compras_hoy = cursor.fetchone()[0]
+            estadisticas = get_statistics_service().obtener("compras", conexion=self.db_connection)
+            return estadisticas or self._get_estadisticas_demo()
+        except Exception as e:
+            logger.error(f"Error obteniendo estadísticas: {e}")
+            return self._get_estadisticas_demo()
 
-            # Compras esta semana
-            cursor.execute(
-                """
-                SELECT COUNT(*) FROM compras
-                WHERE DATEPART(WEEK, fecha_creacion) = DATEPART(WEEK, GETDATE())
-                AND YEAR(fecha_creacion) = YEAR(GETDATE())
-            """
-            )
-            compras_semana = cursor.fetchone()[0]
+    def _calcular_estadisticas(self, conexion) -> Dict[str, Any]:
+        """
+        Calcula las estadísticas de compras con dos consultas agrupadas: una
+        por proveedor y estado (totales y análisis temporal) y otra por
+        producto y categoría (análisis de productos).
+        """
+        hoy = datetime.date.today()
+        # Semana que empieza el domingo, como DATEPART(WEEK) en SQL Server
+        inicio_semana = hoy - datetime.timedelta(days=(hoy.weekday() + 1) % 7)
+        inicio_mes = hoy.replace(day=1)
+        inicio_mes_anterior = (inicio_mes - datetime.timedelta(days=1)).replace(day=1)
 
-            # Compras mes actual
+        cursor = conexion.cursor()
+        try:
             cursor.execute(
-                """
-                SELECT COUNT(*) FROM compras
-                WHERE MONTH(fecha_creacion) = MONTH(GETDATE())
-                AND YEAR(fecha_creacion) = YEAR(GETDATE())
-            """
+                self.sql_manager.get_query('compras', 'estadisticas_compras'),
+                (hoy, inicio_semana, inicio_mes, inicio_mes_anterior, inicio_mes),
             )
-            compras_mes = cursor.fetchone()[0]
+            grupos = cursor.fetchall()
+            cursor.execute(self.sql_manager.get_query('compras', 'estadisticas_productos_compras'))
+            productos = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        por_estado = Counter()
+        ordenes_proveedor = Counter()
+        monto_proveedor = Counter()
+        temporal = Counter()
+        for proveedor, estado, ordenes, monto, hoy_n, semana_n, mes_n, anterior_n in grupos:
+            por_estado[estado] += ordenes
+            ordenes_proveedor[proveedor] += ordenes
+            monto_proveedor[proveedor] += monto or 0
+            temporal.update(hoy=hoy_n or 0, semana=semana_n or 0,
+                            mes=mes_n or 0, mes_anterior=anterior_n or 0)
+
+        total_ordenes = sum(por_estado.values())
+        monto_total = sum(monto_proveedor.values())
+        promedio_orden = monto_total / total_ordenes if total_ordenes > 0 else 0
+
+        proveedores_analisis = [
+            {
+                "proveedor": proveedor,
+                "ordenes": ordenes_proveedor[proveedor],
+                "monto_total": monto,
+                "promedio": monto / ordenes_proveedor[proveedor],
+                "porcentaje": (monto / monto_total * 100) if monto_total > 0 else 0,
+            }
+            for proveedor, monto in monto_proveedor.most_common()
+        ]
 
-            # Tendencia (comparar con mes anterior)
-            cursor.execute(
-                """
-                SELECT COUNT(*) FROM compras
-                WHERE MONTH(fecha_creacion) = MONTH(DATEADD(MONTH, -1, GETDATE()))
-                AND YEAR(fecha_creacion) = YEAR(DATEADD(MONTH, -1, GETDATE()))
-            """
-            )
-            compras_mes_anterior = cursor.fetchone()[0]
-
-            if compras_mes_anterior > 0:
-                if compras_mes > compras_mes_anterior:
-                    tendencia = "Al alza"
-                elif compras_mes < compras_mes_anterior:
-                    tendencia = "A la baja"
-                else:
-                    tendencia = "Estable"
+        compras_mes = temporal["mes"]
+        compras_mes_anterior = temporal["mes_anterior"]
+        if compras_mes_anterior > 0:
+            if compras_mes > compras_mes_anterior:
+                tendencia = "Al alza"
+            elif compras_mes < compras_mes_anterior:
+                tendencia = "A la baja"
             else:
-                tendencia = "Nuevo período"
+                tendencia = "Estable"
+        else:
+            tendencia = "Nuevo período"
+
+        lineas_categoria = Counter()
+        cantidad_producto = Counter()
+        suma_precios = cantidad_precios = 0
+        for descripcion, categoria, lineas, cantidad, precios, n_precios in productos:
+            if categoria:
+                lineas_categoria[categoria] += lineas
+            cantidad_producto[descripcion] += cantidad or 0
+            suma_precios += precios or 0
+            cantidad_precios += n_precios or 0
+        producto_principal = cantidad_producto.most_common(1)
+        categoria_principal = lineas_categoria.most_common(1)
 
-            # === ANÁLISIS DE PRODUCTOS ===
-            # Productos únicos (basado en detalle_compras)
-            cursor.execute(
-                """
-                SELECT COUNT(DISTINCT dc.descripcion)
-                FROM detalle_compras dc
-                INNER JOIN compras c ON dc.compra_id = c.id
-            """
-            )
-            productos_unicos = cursor.fetchone()[0] or 0
+        return {
+            # Estadísticas generales
+            "total_ordenes": total_ordenes,
+            "ordenes_por_estado": [
+                {"estado": estado, "cantidad": cantidad}
+                for estado, cantidad in por_estado.most_common()
+            ],
+            "monto_total": monto_total,
+            "promedio_orden": promedio_orden,
+            "ordenes_mes": compras_mes,
 
-            # Categoría principal
-            cursor.execute(
-                """
-                SELECT TOP 1 dc.categoria, COUNT(*) as cantidad
-                FROM detalle_compras dc
-                INNER JOIN compras c ON dc.compra_id = c.id
-                WHERE dc.categoria IS NOT NULL AND dc.categoria != ''
-                GROUP BY dc.categoria
-                ORDER BY cantidad DESC
-            """
-            )
-            categoria_result = cursor.fetchone()
-            categoria_principal = categoria_result[0] if categoria_result else "No hay datos"
+            # Análisis por proveedores
+            "proveedores_analisis": proveedores_analisis,
+            "proveedor_principal": proveedores_analisis[0] if proveedores_analisis else None,
 
-            # Producto más comprado
-            cursor.execute(
-                """
-                SELECT TOP 1 dc.descripcion, SUM(dc.cantidad) as total_cantidad
-                FROM detalle_compras dc
-                INNER JOIN compras c ON dc.compra_id = c.id
-                GROUP BY dc.descripcion
-                ORDER BY total_cantidad DESC
-            """
-            )
-            producto_result = cursor.fetchone()
-            producto_mas_comprado = producto_result[0] if producto_result else "No hay datos"
+            # Análisis temporal
+            "compras_hoy": temporal["hoy"],
+            "compras_semana": temporal["semana"],
+            "compras_mes": compras_mes,
+            "tendencia": tendencia,
 
-            # Ticket promedio
-            cursor.execute(
-                """
-                SELECT AVG(dc.precio_unitario)
-                FROM detalle_compras dc
-                INNER JOIN compras c ON dc.compra_id = c.id
-            """
-            )
-            ticket_promedio = cursor.fetchone()[0] or 0
-
-            return {
-                # Estadísticas generales
-                "total_ordenes": total_ordenes,
-                "ordenes_por_estado": ordenes_por_estado,
-                "monto_total": monto_total,
-                "promedio_orden": promedio_orden,
-                "ordenes_mes": ordenes_mes,
-
-                # Análisis por proveedores
-                "proveedores_analisis": proveedores_analisis,
-                "proveedor_principal": proveedor_principal,
-
-                # Análisis temporal
-                "compras_hoy": compras_hoy,
-                "compras_semana": compras_semana,
-                "compras_mes": compras_mes,
-                "tendencia": tendencia,
-
-                # Análisis de productos
-                "productos_unicos": productos_unicos,
-                "categoria_principal": categoria_principal,
-                "producto_mas_comprado": producto_mas_comprado,
-                "ticket_promedio": ticket_promedio,
-
-                # Compatibilidad con código existente
-                "proveedores_activos": [
-                    {"proveedor": p["proveedor"], "cantidad": p["ordenes"]}
-                    for p in proveedores_analisis
-                ]
-            }
+            # Análisis de productos
+            "productos_unicos": sum(1 for d in cantidad_producto if d is not None),
+            "categoria_principal": categoria_principal[0][0] if categoria_principal else "No hay datos",
+            "producto_mas_comprado": producto_principal[0][0] if producto_principal else "No hay datos",
+            "ticket_promedio": suma_precios / cantidad_precios if cantidad_precios else 0,
 
-        except Exception as e:
-            logger.error(f"Error obteniendo estadísticas: {e}")
-            return self._get_estadisticas_demo()
+            # Compatibilidad con código existente
+            "proveedores_activos": [
+                {"proveedor": p["proveedor"], "cantidad": p["ordenes"]}
+                for p in proveedores_analisis
+            ]
+        }
 
     def _get_estadisticas_demo(self) -> Dict[str, Any]:
         """Estadísticas demo cuando no hay conexión a BD."""
@@ -819,6 +807,7 @@ APROBADA,
             cursor.execute(sql_cancelar, (motivo, orden_id))
 
             self.db_connection.commit()
+            get_statistics_service().invalidar("compras")
             return cursor.rowcount > 0
 
         except Exception as e:
@@ -836,7 +825,14 @@ APROBADA,
             cursor.execute(sql_aprobar, (usuario_aprobacion, orden_id))
 
             self.db_connection.commit()
-            return cursor.rowcount > 0
+            get_statistics_service().invalidar("compras")
+            aprobada = cursor.rowcount > 0
+            if aprobada:
+                get_event_bus().publicar(EVENTO_ORDEN_COMPRA_APROBADA, {
+                    'orden_id': orden_id,
+                    'usuario_aprobacion': usuario_aprobacion,
+                })
+            return aprobada
 
         except Exception as e:
             logger.error(f"Error aprobando orden: {e}")
@@ -1003,6 +999,7 @@ APROBADA,
             
             # Confirmar transacción
             self.db_connection.commit()
+            get_statistics_service().invalidar("compras")
             
             # Verificar que se eliminó
             rows_affected = result.rowcount
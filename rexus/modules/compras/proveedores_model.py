@@ -5,6 +5,7 @@ Maneja la gestión de proveedores para el módulo de compras.
 """
 
 from typing import Any, Dict, List, Optional
+from rexus.utils.search_index import crear_cargador_sql, get_search_index, ordenar_por_ranking
 from rexus.utils.security import SecurityUtils
 
 
@@ -21,6 +22,28 @@ class ProveedoresModel:
         self.db_connection = db_connection
         self.tabla_proveedores = "proveedores"
         self._crear_tabla_si_no_existe()
+        self._registrar_indice_busqueda()
+
+    def _registrar_indice_busqueda(self):
+        """Registra proveedores en el índice de búsqueda local."""
+        if not self.db_connection:
+            return
+
+        sql_indice = """
+        SELECT id, nombre, razon_social, ruc, contacto_principal, categoria, email
+        FROM proveedores
+        WHERE {filtro}
+        """
+        try:
+            get_search_index().registrar(
+                "proveedores",
+                ("nombre", "razon_social", "ruc", "contacto_principal", "categoria", "email"),
+                (10.0, 6.0, 8.0, 3.0, 2.0, 2.0),
+                crear_cargador_sql(lambda: self.db_connection, sql_indice,
+                                   "COALESCE(fecha_actualizacion, fecha_creacion)"),
+            )
+        except Exception as e:
+            print(f"[WARN PROVEEDORES] Índice de búsqueda no registrado: {e}")
 
     def _crear_tabla_si_no_existe(self):
         """Verifica que la tabla de proveedores exista."""
@@ -133,6 +156,7 @@ class ProveedoresModel:
             )
 
             self.db_connection.commit()
+            get_search_index().invalidar("proveedores")
             print(f"[PROVEEDORES] Proveedor creado: {nombre}")
             return True
 
@@ -323,6 +347,7 @@ class ProveedoresModel:
 
             cursor.execute(sql_update, params)
             self.db_connection.commit()
+            get_search_index().refrescar("proveedores", [proveedor_id])
 
             print(f"[PROVEEDORES] Proveedor {proveedor_id} actualizado")
             return True
@@ -336,7 +361,8 @@ class ProveedoresModel:
         nombre: str = "",
         categoria: str = "",
         estado: str = "",
-        ruc: str = ""
+        ruc: str = "",
+        texto: str = ""
     ) -> List[Dict]:
         """
         Busca proveedores con filtros.
@@ -346,6 +372,8 @@ class ProveedoresModel:
             categoria: Filtrar por categoría
             estado: Filtrar por estado
             ruc: Filtrar por RUC
+            texto: Texto libre (nombre, razón social, RUC, contacto...);
+                los resultados se ordenan por relevancia
 
         Returns:
             List[Dict]: Lista de proveedores filtrados
@@ -359,6 +387,19 @@ class ProveedoresModel:
             # Construir query con filtros
             conditions = []
             params = []
+            ids_busqueda = None
+
+            if texto:
+                ids_busqueda = get_search_index().buscar("proveedores", texto)
+                if ids_busqueda is None:
+                    patron = f"%{SecurityUtils.sanitize_sql_input(texto)}%"
+                    conditions.append("(nombre LIKE ? OR razon_social LIKE ? OR ruc LIKE ?)")
+                    params.extend([patron, patron, patron])
+                elif not ids_busqueda:
+                    return []
+                else:
+                    conditions.append(f"id IN ({', '.join('?' for _ in ids_busqueda)})")
+                    params.extend(ids_busqueda)
 
             if nombre:
                 conditions.append("nombre LIKE ?")
@@ -401,6 +442,9 @@ class ProveedoresModel:
                 proveedor = dict(zip(columns, row))
                 proveedores.append(proveedor)
 
+            if ids_busqueda:
+                proveedores = ordenar_por_ranking(proveedores, ids_busqueda)
+
             print(f"[PROVEEDORES] Búsqueda retornó {len(proveedores)} proveedores")
             return proveedores
 
@@ -0,0 +1,232 @@
+"""
+Recepción Masiva de Compras - Rexus.app
+
+Ingresa al inventario todas las líneas recibidas de una orden de compra en
+una sola transacción y con operaciones por conjunto, en lugar de crear un
+InventarioModel y hacer lectura + UPDATE + INSERT por cada producto.
+
+Pasos (una transacción, un commit):
+1. Las líneas se cargan en la tabla temporal #recepcion_lineas con
+   executemany (fast_executemany en pyodbc): es la entrada tabular de la
+   recepción
+2. Las líneas identificadas por código se resuelven a id de producto y se
+   descartan las de productos inexistentes o inactivos
+3. Un UPDATE suma al stock lo recibido de cada producto (todas sus líneas)
+4. Un INSERT ... SELECT escribe el movimiento de entrada de cada línea
+
+Se informa el resultado de cada línea (aplicada o rechazada con su motivo) y
+el stock resultante. Con atomica=True, una sola línea rechazada deja la
+recepción completa sin aplicar.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from rexus.utils.app_logger import get_logger
+from rexus.utils.sql_query_manager import SQLQueryManager
+from rexus.utils.statistics_service import get_statistics_service
+
+logger = get_logger("compras.recepcion_masiva")
+
+TAMANO_LOTE = 1000
+
+MOTIVO_CANTIDAD_INVALIDA = "Cantidad recibida inválida"
+MOTIVO_SIN_PRODUCTO = "Línea sin producto ni código"
+MOTIVO_PRODUCTO_INEXISTENTE = "Producto inexistente o inactivo"
+MOTIVO_RECEPCION_RECHAZADA = "Recepción no aplicada: hay líneas rechazadas"
+
+
+@dataclass
+class ResultadoLinea:
+    """Resultado de una línea de la recepción."""
+    linea: int
+    producto_id: Optional[int]
+    codigo: Optional[str]
+    cantidad: float
+    aplicada: bool = False
+    motivo: str = ""
+    stock_anterior: Optional[float] = None   # stock del producto antes de la recepción
+    stock_nuevo: Optional[float] = None      # stock del producto después de la recepción
+
+
+@dataclass
+class ResultadoRecepcion:
+    """Resultado de una recepción masiva."""
+    compra_id: Any
+    lineas: List[ResultadoLinea] = field(default_factory=list)
+    segundos: float = 0.0
+    error: str = ""
+
+    @property
+    def aplicadas(self) -> int:
+        return sum(1 for linea in self.lineas if linea.aplicada)
+
+    @property
+    def rechazadas(self) -> List[ResultadoLinea]:
+        return [linea for linea in self.lineas if not linea.aplicada]
+
+    @property
+    def exito(self) -> bool:
+        """Todas las líneas se aplicaron."""
+        return not self.error and self.aplicadas == len(self.lineas)
+
+    @property
+    def lineas_por_segundo(self) -> float:
+        return len(self.lineas) / self.segundos if self.segundos > 0 else 0.0
+
+
+class RecepcionMasiva:
+    """Aplica al inventario las líneas recibidas de una compra en una transacción."""
+
+    def __init__(self, db_connection, tamano_lote: int = TAMANO_LOTE):
+        """
+        Args:
+            db_connection: Conexión con cursor(), commit() y rollback()
+            tamano_lote: Filas por executemany al cargar la tabla temporal
+        """
+        self.db_connection = db_connection
+        self.tamano_lote = tamano_lote
+        self.sql_manager = SQLQueryManager()
+
+    def recibir(self, compra_id, productos: Iterable[Dict], usuario: str = "sistema",
+                atomica: bool = False) -> ResultadoRecepcion:
+        """
+        Ingresa al inventario las líneas recibidas.
+
+        Args:
+            compra_id: ID de la compra (referencia de los movimientos)
+            productos: Líneas con id_producto (o producto_id) o codigo_producto,
+                y cantidad_recibida
+            usuario: Usuario que registra la recepción
+            atomica: Si hay líneas rechazadas, no aplicar ninguna
+
+        Returns:
+            ResultadoRecepcion con el resultado de cada línea
+        """
+        inicio = time.perf_counter()
+        resultado = ResultadoRecepcion(compra_id)
+        validas = self._validar(productos, resultado)
+        invalidas = len(resultado.lineas) - len(validas)
+
+        if validas and not (atomica and invalidas):
+            try:
+                self._aplicar(compra_id, validas, usuario, atomica)
+            except Exception as e:
+                resultado.error = str(e)
+                for linea in validas:
+                    linea.aplicada = False
+                    linea.motivo = linea.motivo or str(e)
+                logger.error(f"[ERROR RECEPCION] Compra {compra_id}: {e}")
+        elif atomica:
+            for linea in validas:
+                linea.motivo = MOTIVO_RECEPCION_RECHAZADA
+
+        resultado.segundos = time.perf_counter() - inicio
+        logger.info(
+            f"[RECEPCION] Compra {compra_id}: {resultado.aplicadas}/{len(resultado.lineas)} "
+            f"líneas en {resultado.segundos:.3f}s ({resultado.lineas_por_segundo:.0f} líneas/s)"
+        )
+        return resultado
+
+    @staticmethod
+    def _validar(productos: Iterable[Dict], resultado: ResultadoRecepcion) -> List[ResultadoLinea]:
+        validas = []
+        for numero, producto in enumerate(productos, start=1):
+            producto_id = producto.get("id_producto", producto.get("producto_id"))
+            codigo = producto.get("codigo_producto", producto.get("codigo"))
+            linea = ResultadoLinea(numero, producto_id, codigo, producto.get("cantidad_recibida", 0))
+            resultado.lineas.append(linea)
+            try:
+                linea.cantidad = float(linea.cantidad)
+            except (TypeError, ValueError):
+                linea.motivo = MOTIVO_CANTIDAD_INVALIDA
+                continue
+            try:
+                linea.producto_id = int(producto_id) if producto_id is not None else None
+            except (TypeError, ValueError):
+                linea.motivo = MOTIVO_PRODUCTO_INEXISTENTE
+                continue
+            if linea.cantidad <= 0:
+                linea.motivo = MOTIVO_CANTIDAD_INVALIDA
+            elif linea.producto_id is None and not codigo:
+                linea.motivo = MOTIVO_SIN_PRODUCTO
+            else:
+                validas.append(linea)
+        return validas
+
+    def _aplicar(self, compra_id, lineas: List[ResultadoLinea], usuario: str, atomica: bool):
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(self._query("recepcion_crear_staging"))
+            self._cargar_lineas(cursor, lineas)
+            cursor.execute(self._query("recepcion_resolver_codigos"))
+
+            cursor.execute(self._query("recepcion_lineas_rechazadas"))
+            rechazadas = {fila[0] for fila in cursor.fetchall()}
+            if rechazadas:
+                por_numero = {linea.linea: linea for linea in lineas}
+                for numero in rechazadas:
+                    por_numero[numero].motivo = MOTIVO_PRODUCTO_INEXISTENTE
+                if atomica or len(rechazadas) == len(lineas):
+                    for linea in lineas:
+                        linea.motivo = linea.motivo or MOTIVO_RECEPCION_RECHAZADA
+                    self._deshacer(cursor)
+                    return
+                cursor.execute(self._query("recepcion_descartar_rechazadas"))
+
+            cursor.execute(self._query("recepcion_actualizar_stock"))
+            cursor.execute(self._query("recepcion_insertar_movimientos"),
+                           (f"Recepción compra #{compra_id}", usuario))
+            cursor.execute(self._query("recepcion_stock_resultante"))
+            aplicadas = cursor.fetchall()
+            cursor.execute(self._query("recepcion_eliminar_staging"))
+            self.db_connection.commit()
+        except Exception:
+            self._deshacer(cursor)
+            raise
+
+        self._completar_resultados(lineas, aplicadas)
+        get_statistics_service().invalidar("inventario")
+
+    def _cargar_lineas(self, cursor, lineas: List[ResultadoLinea]):
+        if hasattr(cursor, "fast_executemany"):
+            # pyodbc: envía cada lote como un arreglo de parámetros
+            cursor.fast_executemany = True
+        sql = self._query("recepcion_insertar_linea")
+        for desde in range(0, len(lineas), self.tamano_lote):
+            cursor.executemany(sql, [
+                (linea.linea, linea.producto_id, linea.codigo, linea.cantidad)
+                for linea in lineas[desde:desde + self.tamano_lote]
+            ])
+
+    @staticmethod
+    def _completar_resultados(lineas: List[ResultadoLinea], aplicadas: List[Any]):
+        """aplicadas: filas (linea, producto_id, stock_actual) de las líneas aplicadas."""
+        por_numero = {linea.linea: linea for linea in lineas}
+        recibido: Dict[int, float] = {}
+        for numero, producto_id, _ in aplicadas:
+            linea = por_numero[numero]
+            linea.producto_id = producto_id
+            linea.aplicada = True
+            recibido[producto_id] = recibido.get(producto_id, 0.0) + linea.cantidad
+        # El stock anterior descuenta todas las líneas del mismo producto
+        for numero, producto_id, stock_actual in aplicadas:
+            linea = por_numero[numero]
+            linea.stock_nuevo = float(stock_actual)
+            linea.stock_anterior = linea.stock_nuevo - recibido[producto_id]
+
+    def _deshacer(self, cursor):
+        try:
+            self.db_connection.rollback()
+        except Exception as e:
+            logger.error(f"[ERROR RECEPCION] Rollback: {e}")
+        # Si la tabla temporal se creó fuera de la transacción, sigue existiendo
+        try:
+            cursor.execute(self._query("recepcion_eliminar_staging"))
+            self.db_connection.commit()
+        except Exception:
+            pass
+
+    def _query(self, nombre: str) -> str:
+        return self.sql_manager.get_query("compras", nombre)
@@ -17,6 +17,7 @@ from PyQt6.QtWidgets import (
 from rexus.ui.templates.base_module_view import BaseModuleView
 from rexus.ui.style_manager import style_manager
 from rexus.utils.dialogs import show_success, show_error, show_warning
+from rexus.utils.table_search import SearchDebouncer, TableSearchIndex, normalizar_texto
 from rexus.core.auth_manager import auth_required
 
 
@@ -589,7 +590,8 @@ class ComprasViewComplete(BaseModuleView):
         filtros_layout.addWidget(QLabel("Buscar:"))
         self.le_busqueda = QLineEdit()
         self.le_busqueda.setPlaceholderText("Número de orden, proveedor...")
-        self.le_busqueda.textChanged.connect(self.aplicar_filtros)
+        self._debouncer_busqueda = SearchDebouncer(self.aplicar_filtros, parent=self)
+        self.le_busqueda.textChanged.connect(self._debouncer_busqueda.programar)
         filtros_layout.addWidget(self.le_busqueda)
 
         layout.addWidget(filtros_group, 2)
@@ -893,37 +895,19 @@ class ComprasViewComplete(BaseModuleView):
 
     def aplicar_filtros(self):
         """Aplica los filtros seleccionados."""
-        estado = self.cb_filtro_estado.currentText()
-        proveedor = self.cb_filtro_proveedor.currentText()
-        busqueda = self.le_busqueda.text().lower()
-
-        for row in range(self.tabla_compras.rowCount()):
-            mostrar_fila = True
-
-            # Filtro por estado
-            if estado != "TODOS":
-                estado_item = self.tabla_compras.item(row, 3)
-                if estado_item and estado_item.text() != estado:
-                    mostrar_fila = False
-
-            # Filtro por proveedor
-            if proveedor != "TODOS" and mostrar_fila:
-                proveedor_item = self.tabla_compras.item(row, 2)
-                if proveedor_item and proveedor not in proveedor_item.text():
-                    mostrar_fila = False
-
-            # Filtro por búsqueda
-            if busqueda and mostrar_fila:
-                fila_texto = ""
-                for col in [0, 2, 9]:  # Orden, Proveedor, Observaciones
-                    item = self.tabla_compras.item(row, col)
-                    if item:
-                        fila_texto += item.text().lower() + " "
-
-                if busqueda not in fila_texto:
-                    mostrar_fila = False
-
-            self.tabla_compras.setRowHidden(row, not mostrar_fila)
+        estado = normalizar_texto(self.cb_filtro_estado.currentText())
+        proveedor = normalizar_texto(self.cb_filtro_proveedor.currentText())
+        busqueda = self.le_busqueda.text()
+
+        filtros = {}
+        if estado != "todos":
+            filtros[3] = lambda valor: not valor or valor == estado
+        if proveedor != "todos":
+            filtros[2] = lambda valor: not valor or proveedor in valor
+
+        # Orden, Proveedor, Observaciones
+        indice = TableSearchIndex.para_tabla(self.tabla_compras, (0, 2, 9))
+        indice.filtrar(busqueda, filtros)
 
     def cargar_compras(self):
         """Carga la lista de compras."""
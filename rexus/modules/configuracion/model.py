@@ -26,6 +26,10 @@ try:
 except ImportError:
     logger = logging.getLogger("configuracion.model")
 
+from rexus.core.config_store import get_config_store
+from rexus.core.event_bus import crear_despachador_qt
+from rexus.core.query_optimizer import fetch_rows_by_keys
+
 # Importar SQL loader para queries externas
 from rexus.utils.sql_script_loader import sql_script_loader
 
@@ -129,7 +133,10 @@ class ConfiguracionModel:
         self.sanitizer = unified_sanitizer
         self.tabla_configuracion = "configuracion_sistema"
         self.config_file = Path("config/rexus_config.json")
-        self.config_cache = {}
+        # Almacén compartido del proceso: valores decodificados una sola vez
+        # y cambios notificados a suscriptores y a otros clientes locales
+        self.store = get_config_store()
+        self.store.establecer_defaults(self.CONFIG_DEFAULTS)
         # Configurar cargador de scripts SQL
         self.sql_loader = sql_script_loader
 
@@ -139,6 +146,10 @@ class ConfiguracionModel:
         # Inicializar configuración
         self._cargar_configuracion_inicial()
 
+        # Cambios hechos por otros clientes: se releen de la BD (o del
+        # archivo) en el hilo de la UI, dueño de la conexión
+        self.store.establecer_lector(self._leer_claves, crear_despachador_qt())
+
     def actualizar_configuracion(self, clave, valor, descripcion=None, categoria=None):
         """
         Actualiza una configuración específica.
@@ -173,6 +184,11 @@ class ConfiguracionModel:
             logger.error(f"Error actualizando configuración: {e}")
             return False
 
+    @property
+    def config_cache(self):
+        """Valores crudos vigentes (vista de solo lectura del almacén)."""
+        return self.store.crudos()
+
     def _actualizar_configuracion_demo(self, clave, valor):
         """Actualización demo para testing."""
         logger.info(f"[DEMO CONFIG] Configuración actualizada: {clave} = {valor}")
@@ -349,22 +365,46 @@ class ConfiguracionModel:
         try:
             if self.config_file.exists():
                 with open(self.config_file, "r", encoding="utf-8") as f:
-                    self.config_cache = json.load(f)
+                    self.store.cargar(json.load(f))
             else:
-                self.config_cache = self.CONFIG_DEFAULTS.copy()
+                self.store.cargar(self.CONFIG_DEFAULTS)
                 self._guardar_en_archivo()
         except Exception as e:
             logger.error(f"Error cargando desde archivo: {e}")
-            self.config_cache = self.CONFIG_DEFAULTS.copy()
+            self.store.cargar(self.CONFIG_DEFAULTS)
 
-    def _guardar_en_archivo(self):
-        """Guarda configuración en archivo JSON."""
+    def _guardar_en_archivo(self, cambios: Optional[Dict[str, Any]] = None):
+        """Guarda configuración en archivo JSON (con cambios aún no aplicados al almacén)."""
         try:
+            datos = dict(self.config_cache)
+            datos.update(cambios or {})
             with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(self.config_cache, f, indent=2, ensure_ascii=False)
+                json.dump(datos, f, indent=2, ensure_ascii=False)
         except Exception as e:
             print(f"[ERROR CONFIGURACION] Error guardando en archivo: {e}")
 
+    def _leer_claves(self, claves: List[str]) -> Dict[str, Any]:
+        """Valores crudos actuales de las claves, desde la BD o el archivo."""
+        if self.db_connection:
+            from rexus.utils.sql_query_manager import SQLQueryManager
+
+            sql_manager = getattr(self, "sql_manager", SQLQueryManager())
+            cursor = self.db_connection.cursor()
+            try:
+                filas = fetch_rows_by_keys(
+                    cursor, sql_manager.get_query("configuracion", "select_configs_por_claves"),
+                    claves, "clave"
+                )
+            finally:
+                cursor.close()
+            return {clave: fila["valor"] for clave, fila in filas.items()}
+
+        if not self.config_file.exists():
+            return {}
+        with open(self.config_file, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+        return {clave: datos[clave] for clave in claves if clave in datos}
+
     def _cargar_cache(self):
         """Carga toda la configuración en cache."""
         if not self.db_connection:
@@ -393,10 +433,8 @@ class ConfiguracionModel:
                     ORDER BY categoria, clave
                 """)
 
-            self.config_cache = {}
             rows = cursor.fetchall()
-            for row in rows:
-                self.config_cache[row[0]] = row[1]
+            self.store.cargar({row[0]: row[1] for row in rows})
 
             cursor.close()
             print(
@@ -407,7 +445,7 @@ class ConfiguracionModel:
             print(
                 f"[CONFIGURACION] Error cargando cache: {e} - usando configuración por defecto"
             )
-            self.config_cache = self.CONFIG_DEFAULTS.copy()
+            self.store.cargar(self.CONFIG_DEFAULTS)
 
     def obtener_valor(self, clave: str, valor_por_defecto: Any = None) -> Any:
         """
@@ -418,25 +456,9 @@ class ConfiguracionModel:
             valor_por_defecto: Valor por defecto si no existe
 
         Returns:
-            El valor de configuración
+            El valor de configuración, ya convertido a bool/int/float
         """
-        if clave in self.config_cache:
-            valor = self.config_cache[clave]
-        else:
-            valor = self.CONFIG_DEFAULTS.get(clave, valor_por_defecto)
-
-        # Convertir strings a tipos apropiados
-        if isinstance(valor, str):
-            if valor.lower() == "true":
-                return True
-            elif valor.lower() == "false":
-                return False
-            elif valor.isdigit():
-                return int(valor)
-            elif valor.replace(".", "", 1).isdigit():
-                return float(valor)
-
-        return valor
+        return self.store.obtener(clave, valor_por_defecto)
 
     def establecer_valor(
         self, clave: str, valor: Any, usuario: str = "SISTEMA"
@@ -527,12 +549,13 @@ class ConfiguracionModel:
                 finally:
                     cursor.close()
 
-            # Actualizar cache con datos sanitizados
-            self.config_cache[clave_sanitizada] = valor_str
-
-            # Guardar en archivo si no hay BD
+            # Guardar en archivo si no hay BD, antes de avisar a los otros
+            # clientes que lo van a releer
             if not self.db_connection:
-                self._guardar_en_archivo()
+                self._guardar_en_archivo({clave_sanitizada: valor_str})
+
+            # Actualizar el almacén y notificar a suscriptores y otros clientes
+            self.store.aplicar({clave_sanitizada: valor_str})
 
             return True, f"Configuración '{clave_sanitizada}' actualizada exitosamente"
 
@@ -31,6 +31,7 @@ from rexus.ui.components.base_components import RexusColors
 from rexus.utils.loading_manager import LoadingManager
 from rexus.utils.message_system import ask_question, show_error, show_warning
 from rexus.utils.xss_protection import FormProtector
+from rexus.utils.table_search import SearchDebouncer, TableSearchIndex
 from rexus.utils.export_manager import ModuleExportMixin
 from rexus.modules.herrajes.constants import HerrajesConstants
 
@@ -894,7 +895,13 @@ icon: str,
 
     def on_buscar(self, texto: str):
         """Maneja la búsqueda de herrajes con debounce."""
-        texto_limpio = texto.strip()
+        if getattr(self, '_debouncer_busqueda', None) is None:
+            self._debouncer_busqueda = SearchDebouncer(self._procesar_busqueda, parent=self)
+        self._debouncer_busqueda.programar()
+
+    def _procesar_busqueda(self):
+        """Ejecuta la búsqueda cuando el usuario deja de escribir."""
+        texto_limpio = self.input_busqueda.text().strip() if self.input_busqueda else ""
         
         if not texto_limpio:
             self._cargar_todos_herrajes()
@@ -958,18 +965,9 @@ icon: str,
         if not self.tabla_herrajes:
             return
 
-        termino_lower = termino.lower()
-        for row in range(self.tabla_herrajes.rowCount()):
-            mostrar_fila = False
-
-            # Buscar en todas las columnas relevantes
-            for col in range(min(6, self.tabla_herrajes.columnCount())):  # Hasta la columna de proveedor
-                item = self.tabla_herrajes.item(row, col)
-                if item and termino_lower in item.text().lower():
-                    mostrar_fila = True
-                    break
-
-            self.tabla_herrajes.setRowHidden(row, not mostrar_fila)
+        # Hasta la columna de proveedor
+        indice = TableSearchIndex.para_tabla(self.tabla_herrajes, tuple(range(6)))
+        indice.filtrar(termino)
 
     def _filtrar_tabla_local_por_categoria(self, categoria: str):
         """Filtra la tabla localmente por categoría."""
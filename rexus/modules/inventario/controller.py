@@ -729,6 +729,21 @@ class InventarioController(QObject):
             if not self.model:
                 show_error(self.view, "Error", "Modelo no disponible para exportación")
                 return
+
+            # Con conexión a BD se exporta el resultado filtrado completo en
+            # streaming (cursor -> archivo) en segundo plano
+            if max_records is None and hasattr(self.model, "crear_fuente_exportacion"):
+                filtros = getattr(self.view, "filtros_activos", None) or None
+                fuente = self.model.crear_fuente_exportacion(filtros)
+                if fuente is not None:
+                    from rexus.utils.export_manager import export_manager
+                    export_manager.export_source_async(
+                        fuente,
+                        module_name=f"inventario_{self.usuario_actual}",
+                        export_format=formato.lower(),
+                        parent_widget=self.view,
+                    )
+                    return
             
             # Obtener datos del inventario con límite de seguridad
             productos = SafeQueryManager.obtener_registros_seguros(
@@ -767,6 +782,38 @@ class InventarioController(QObject):
             logger.error(f"Error en exportar inventario: {e}", exc_info=True)
             self._mostrar_error("exportar inventario", e)
 
+    @auth_required
+    def generar_codigo_qr(self, producto_id=None):
+        """Hoja de etiquetas QR del producto seleccionado (o de todo el catálogo)."""
+        from rexus.utils.label_engine import SIMBOLOGIA_QR
+        self.imprimir_etiquetas([producto_id] if producto_id else None, SIMBOLOGIA_QR)
+
+    @auth_required
+    def imprimir_etiquetas(self, producto_ids=None, simbologia="barras", copias=1):
+        """
+        Genera en segundo plano un PDF con hojas de etiquetas de productos.
+
+        Args:
+            producto_ids: Productos a etiquetar (None = todo el catálogo activo)
+            simbologia: "barras" o "qr"
+            copias: Etiquetas por producto
+        """
+        try:
+            if not self.model or not hasattr(self.model, "crear_etiquetas_productos"):
+                show_error(self.view, "Error", "Modelo no disponible para generar etiquetas")
+                return
+
+            etiquetas = self.model.crear_etiquetas_productos(producto_ids, simbologia, copias)
+            from rexus.utils.export_manager import export_manager
+            export_manager.generar_etiquetas_async(
+                etiquetas,
+                module_name="inventario",
+                parent_widget=self.view,
+            )
+        except (AttributeError, RuntimeError, IOError, OSError, ConnectionError) as e:
+            logger.error(f"Error generando etiquetas: {e}", exc_info=True)
+            self._mostrar_error("generar etiquetas", e)
+
     def obtener_estadisticas(self):
         """Obtiene estadísticas del inventario."""
         try:
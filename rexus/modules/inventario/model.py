@@ -1,6 +1,8 @@
 from rexus.utils.unified_sanitizer import unified_sanitizer
 from rexus.utils.sql_query_manager import SQLQueryManager
-from rexus.core.query_optimizer import cached_query, track_performance
+from rexus.core.query_optimizer import cached_query, fetch_rows_by_keys, track_performance
+from rexus.core.config_store import get_config_store
+from rexus.core.event_bus import EVENTO_STOCK_BAJO_MINIMO, get_event_bus
 
 # [LOCK] DB Authorization Check - Verify user permissions before DB operations
 # Ensure all database operations are properly authorized
@@ -16,13 +18,10 @@ para prevenir inyección SQL y mejorar mantenibilidad.
 
 import datetime
 import sys
-from io import BytesIO
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 from sqlite3 import IntegrityError
 
-import qrcode
-
 # Importar logging centralizado
 try:
     from rexus.utils.app_logger import get_logger
@@ -33,6 +32,14 @@ except ImportError:
 
 # Importar sistema de paginación
 from rexus.utils.pagination import PaginatedTableMixin
+from rexus.utils.search_index import crear_cargador_sql, get_search_index, ordenar_por_ranking
+from rexus.utils.statistics_service import fabrica_conexion, get_statistics_service
+from rexus.utils.label_engine import SIMBOLOGIA_BARRAS, SIMBOLOGIA_QR, Etiqueta, get_motor_etiquetas
+from rexus.utils.streaming_export import cursor_source
+from rexus.utils.format_utils import a_fecha
+from rexus.modules.inventario.submodules.indice_vencimientos import (
+    DIAS_AVISO, LoteVencimiento, get_indice_vencimientos, orden_fefo, tomar_fefo
+)
 
 # Importar utilidades de seguridad
 try:
@@ -91,6 +98,18 @@ except ImportError as e:
     CONSULTAS_MANAGER_AVAILABLE = False
     ConsultasManager = None
 
+# Tope de coincidencias del índice de búsqueda usadas como filtro IN (...)
+MAX_IDS_BUSQUEDA = 1000
+
+# Filtro de stock de la vista (combo) -> condición SQL fija.
+# Los umbrales de stock son los de _determinar_estado_stock.
+CONDICIONES_STOCK = {
+    "Con stock": "AND stock > 0",
+    "Sin stock": "AND stock <= 0",
+    "Stock crítico": "AND stock > 0 AND stock <= stock_minimo",
+    "Stock bajo": "AND stock > stock_minimo AND stock <= stock_minimo * 1.5",
+}
+
 
 class InventarioModel(PaginatedTableMixin):
     """
@@ -129,6 +148,7 @@ class InventarioModel(PaginatedTableMixin):
         self.tabla_inventario = "inventario_perfiles"  # Usar tabla real de la BD
         self.tabla_movimientos = "historial"  # Usar tabla historial existente
         self.tabla_reservas = "reserva_materiales"  # Tabla para reservas por obra
+        self._tabla_lotes = None  # lotes_inventario existe (se verifica al primer uso)
 
         # Inicializar utilidades de seguridad
         self.security_available = SECURITY_AVAILABLE
@@ -157,7 +177,9 @@ class InventarioModel(PaginatedTableMixin):
             try:
                 self.base_utils = BaseUtilities(db_connection=self.db_connection)
                 self.productos_manager = ProductosManager(db_connection=self.db_connection)
-                self.movimientos_manager = MovimientosManager(db_connection=self.db_connection)
+                self.movimientos_manager = MovimientosManager(
+                    db_connection=self.db_connection, descontar_lotes=self._descontar_lotes_fefo
+                )
                 self.reservas_manager = ReservasManager(db_connection=self.db_connection)
                 self.reportes_manager = ReportesManager(db_connection=self.db_connection)
                 self.categorias_manager = CategoriasManager(db_connection=self.db_connection)
@@ -185,6 +207,95 @@ class InventarioModel(PaginatedTableMixin):
                 "[ERROR INVENTARIO] No hay conexión a la base de datos. El módulo no funcionará correctamente."
             )
         self._verificar_tablas()
+        self._registrar_indice_busqueda()
+        self._registrar_estadisticas()
+        self._registrar_indice_vencimientos()
+
+    # Campos del índice de búsqueda y su peso en el ranking
+    CAMPOS_BUSQUEDA = ("codigo", "descripcion", "tipo", "acabado", "proveedor")
+    PESOS_BUSQUEDA = (10.0, 4.0, 2.0, 1.0, 1.0)
+
+    def _registrar_indice_busqueda(self):
+        """Registra productos en el índice de búsqueda local."""
+        if not self.db_connection:
+            return
+        try:
+            get_search_index().registrar(
+                "productos",
+                self.CAMPOS_BUSQUEDA,
+                self.PESOS_BUSQUEDA,
+                crear_cargador_sql(
+                    lambda: self.db_connection,
+                    self.sql_manager.get_query('inventario', 'indice_busqueda_productos'),
+                    "COALESCE(fecha_modificacion, fecha_creacion)",
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"[INVENTARIO] Índice de búsqueda no registrado: {e}")
+
+    def _registrar_estadisticas(self):
+        """Registra las estadísticas del inventario en el servicio compartido."""
+        if not self.db_connection:
+            return
+        get_statistics_service().registrar(
+            "inventario", self._calcular_estadisticas, fabrica_conexion(self.db_connection)
+        )
+
+    def _registrar_indice_vencimientos(self):
+        """Inicia la revisión periódica de vencimientos de lotes (con conexión propia)."""
+        if not self.db_connection:
+            return
+        connection_factory = fabrica_conexion(self.db_connection)
+        if connection_factory is not None:
+            get_indice_vencimientos().iniciar_revision_periodica(
+                connection_factory, self._dias_aviso_vencimiento
+            )
+
+    @staticmethod
+    def _dias_aviso_vencimiento() -> int:
+        return int(get_config_store().obtener("inventario_dias_aviso_vencimiento", DIAS_AVISO))
+
+    def _indice_vencimientos(self):
+        """Índice de vencimientos cargado (None si no hay lotes que consultar)."""
+        indice = get_indice_vencimientos()
+        return indice if indice.asegurar(self.db_connection) else None
+
+    def _hay_tabla_lotes(self, cursor) -> bool:
+        if self._tabla_lotes is None:
+            cursor.execute(self.sql_manager.get_query('inventario', 'verificar_tabla_lotes'))
+            self._tabla_lotes = cursor.fetchone() is not None
+        return self._tabla_lotes
+
+    def _descontar_lotes_fefo(self, cursor, producto_id, cantidad) -> List[LoteVencimiento]:
+        """
+        Descuenta una salida de los lotes del producto en orden FEFO, dentro de
+        la transacción del llamador.
+
+        Returns:
+            Lotes modificados con su cantidad resultante (para el índice)
+        """
+        if cantidad <= 0 or not self._hay_tabla_lotes(cursor):
+            return []
+        cursor.execute(self.sql_manager.get_query('inventario', 'select_lotes_fefo_bloqueo'),
+                       (producto_id,))
+        lotes = [LoteVencimiento.desde_fila(fila) for fila in cursor.fetchall()]
+        if not lotes:
+            return []
+        sugerencias, faltante = tomar_fefo(orden_fefo(lotes), cantidad)
+        if faltante > 0:
+            logger.warning(
+                f"[INVENTARIO] Salida del producto {producto_id}: {faltante} unidades sin lote asignado"
+            )
+        sql_update = self.sql_manager.get_query('inventario', 'actualizar_cantidad_lote')
+        modificados = []
+        for sugerencia in sugerencias:
+            restante = sugerencia.lote.cantidad - sugerencia.cantidad
+            cursor.execute(sql_update, (restante, sugerencia.lote.lote_id))
+            modificados.append(LoteVencimiento(
+                sugerencia.lote.lote_id, sugerencia.lote.producto_id,
+                sugerencia.lote.numero_lote, sugerencia.lote.fecha_vencimiento, restante,
+            ))
+        return modificados
 
     def _init_fallback_managers(self):
         """Inicializa managers básicos como fallback cuando los submódulos no están disponibles."""
@@ -220,12 +331,56 @@ datos_producto: Dict[str,
 
     def actualizar_stock_producto(self, producto_id: int, nuevo_stock: Union[int, float],
                                 razon: str = "Ajuste manual") -> Dict[str, Any]:
-        """Proxy para actualizar stock de producto."""
-        if self.managers_available and self.productos_manager:
-            return self.productos_manager.actualizar_stock(producto_id, nuevo_stock, razon)
-        else:
+        """
+        Fija el stock de un producto con un movimiento AJUSTE, por el mismo
+        camino que registrar_movimiento_stock: queda registrado y una baja se
+        descuenta de los lotes en orden FEFO.
+        """
+        if not self.db_connection:
             return self._actualizar_stock_fallback(producto_id, nuevo_stock, razon)
 
+        producto = self.obtener_producto_por_id(producto_id)
+        if not producto:
+            return {
+                'success': False,
+                'error': f'Producto {producto_id} no encontrado',
+                'stock_anterior': 0,
+                'stock_nuevo': nuevo_stock,
+                'diferencia': 0
+            }
+
+        stock_anterior = producto["stock_actual"]
+        diferencia = nuevo_stock - stock_anterior
+        exito, error = True, ''
+        if diferencia:
+            try:
+                if self.managers_available and self.movimientos_manager:
+                    # MovimientosManager suma la cantidad del AJUSTE al stock
+                    exito = self.movimientos_manager.registrar_movimiento(
+                        producto_id, "AJUSTE", diferencia, razon
+                    )
+                else:
+                    # registrar_movimiento toma el stock final del AJUSTE
+                    exito = self.registrar_movimiento(producto_id, "AJUSTE", nuevo_stock, motivo=razon)
+            except Exception as e:
+                exito, error = False, str(e)
+        if not exito:
+            logger.error(f"Error ajustando stock del producto {producto_id}: {error}")
+            return {
+                'success': False,
+                'error': error or 'No se pudo registrar el ajuste de stock',
+                'stock_anterior': stock_anterior,
+                'stock_nuevo': stock_anterior,
+                'diferencia': 0
+            }
+        return {
+            'success': True,
+            'error': '',
+            'stock_anterior': stock_anterior,
+            'stock_nuevo': nuevo_stock,
+            'diferencia': diferencia
+        }
+
     def actualizar_stock(self, producto_id: int, nuevo_stock: Union[int, float],
                         razon: str = "Ajuste manual") -> Dict[str, Any]:
         """Alias conveniente para actualizar_stock_producto."""
@@ -277,6 +432,13 @@ datos_reserva: Dict[str,
             elif tipo_reporte == 'ANALISIS_ABC':
                 criterio = filtros.get('criterio', 'valor') if filtros else 'valor'
                 return self.reportes_manager.generar_analisis_abc(criterio, formato)
+            elif tipo_reporte == 'ROTACION':
+                filtros = filtros or {}
+                return self.reportes_manager.generar_analisis_rotacion(
+                    filtros.get('dias_periodo', 90),
+                    filtros.get('dias_inmovilizado', 180),
+                    formato
+                )
             elif tipo_reporte == 'VALORACION_INVENTARIO':
                 fecha_corte = filtros.get('fecha_corte') if filtros else None
                 return self.reportes_manager.generar_reporte_valoracion_inventario(fecha_corte, formato)
@@ -789,6 +951,7 @@ datos_reserva: Dict[str,
             producto_id = cursor.fetchone()[0]
 
             self.db_connection.commit()
+            get_statistics_service().invalidar("inventario")
 
             # Registrar movimiento inicial si hay stock
             stock_inicial = datos_producto.get("stock_actual", 0)
@@ -801,6 +964,7 @@ datos_reserva: Dict[str,
                     usuario=usuario,
                 )
 
+            get_search_index().refrescar("productos", [producto_id])
             logger.info(f"Producto creado: {datos_producto.get('codigo')}")
             return producto_id
 
@@ -863,6 +1027,8 @@ producto_id,
             )
 
             self.db_connection.commit()
+            get_search_index().refrescar("productos", [producto_id])
+            get_statistics_service().invalidar("inventario")
             logger.info(f"Producto actualizado: {producto_id}")
             return True
 
@@ -947,8 +1113,26 @@ producto_id,
                 usuario,
                 producto_id))
 
+            # Las salidas (y ajustes a la baja) descuentan de los lotes que vencen antes
+            lotes_modificados = self._descontar_lotes_fefo(
+                cursor, producto_id, stock_anterior - stock_nuevo
+            )
+
             self.db_connection.commit()
+            get_statistics_service().invalidar("inventario")
+            if lotes_modificados:
+                get_indice_vencimientos().actualizar(lotes_modificados)
             logger.info(f"Movimiento registrado: {tipo_movimiento} - {cantidad}")
+
+            stock_minimo = producto.get("stock_minimo")
+            if stock_minimo is not None and stock_nuevo <= stock_minimo < stock_anterior:
+                get_event_bus().publicar(EVENTO_STOCK_BAJO_MINIMO, {
+                    'producto_id': producto_id,
+                    'codigo': producto.get("codigo"),
+                    'stock_actual': stock_nuevo,
+                    'stock_minimo': stock_minimo,
+                    'tipo_movimiento': tipo_movimiento,
+                })
             return True
 
         except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
@@ -1033,23 +1217,16 @@ producto_id,
             qr_dir = "qr_codes"
             os.makedirs(qr_dir, exist_ok=True)
 
-            # Generar QR
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(codigo)
-            qr.make(fit=True)
-
-            # Crear imagen
-            img = qr.make_image(fill_color="black", back_color="white")
+            # Generar QR (desde la cache del motor de etiquetas si ya se dibujó)
+            imagen = get_motor_etiquetas().imagen(SIMBOLOGIA_QR, codigo)
+            if imagen is None:
+                return ""
 
             # Guardar archivo
             filename = f"qr_{codigo}.png"
             filepath = os.path.join(qr_dir, filename)
-            img.save(filepath)
+            with open(filepath, "wb") as archivo:
+                archivo.write(imagen)
 
             return filename
 
@@ -1109,44 +1286,44 @@ producto_id,
             logger.error(f"Error actualizando QRs: {e}")
 
     def obtener_estadisticas_inventario(self):
-        """Obtiene estadísticas generales del inventario."""
+        """Obtiene estadísticas generales del inventario (servicio de estadísticas)."""
         if not self.db_connection:
             return {}
 
         try:
-            cursor = self.db_connection.cursor()
-
-            # Total de productos
-            sql_count = self.sql_manager.get_query('inventario', 'contar_productos_totales')
-            cursor.execute(sql_count)
-            total_productos = cursor.fetchone()[0]
-
-            # Productos con stock bajo
-            sql_stock_bajo = self.sql_manager.get_query('inventario', 'contar_stock_bajo')
-            cursor.execute(sql_stock_bajo)
-            stock_bajo = cursor.fetchone()[0]
-
-            # Valor total del inventario
-            sql_valor_total = self.sql_manager.get_query('inventario', 'calcular_valor_total')
-            cursor.execute(sql_valor_total)
-            valor_total = cursor.fetchone()[0] or 0
-
-            # Movimientos del mes actual desde historial
-            sql_movimientos_mes = self.sql_manager.get_query('inventario', 'contar_movimientos_mes')
-            cursor.execute(sql_movimientos_mes)
-            movimientos_mes = cursor.fetchone()[0]
-
+            estadisticas = get_statistics_service().obtener("inventario", conexion=self.db_connection)
+            if not estadisticas:
+                return {}
             return {
-                "total_productos": total_productos,
-                "stock_bajo": stock_bajo,
-                "valor_total": float(valor_total),
-                "movimientos_mes": movimientos_mes,
+                "total_productos": estadisticas["total_productos"],
+                "stock_bajo": estadisticas["stock_bajo"],
+                "valor_total": estadisticas["valor_total"],
+                "movimientos_mes": estadisticas["movimientos_mes"],
             }
 
-        except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
+        except Exception as e:
             logger.error(f"Error obteniendo estadísticas: {e}")
             return {}
 
+    def _calcular_estadisticas(self, conexion) -> Dict[str, Any]:
+        """Calcula los contadores del inventario en una sola consulta."""
+        inicio_mes = datetime.date.today().replace(day=1)
+        cursor = conexion.cursor()
+        try:
+            cursor.execute(
+                self.sql_manager.get_query('inventario', 'estadisticas_inventario'),
+                (inicio_mes,),
+            )
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return {
+            "total_productos": row[0] or 0,
+            "stock_bajo": row[1] or 0,
+            "valor_total": float(row[2] or 0),
+            "movimientos_mes": row[3] or 0,
+        }
+
     def obtener_productos_por_obra(self, obra_id):
         """
         Obtiene todos los productos asignados a una obra específica.
@@ -1251,6 +1428,7 @@ producto_id,
             )
 
             self.db_connection.commit()
+            get_statistics_service().invalidar("inventario")
             return True, f"Producto asignado correctamente a la obra"
 
         except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
@@ -1290,7 +1468,7 @@ producto_id,
                 return False
 
             # MIGRADO: Usar consulta SQL externa para insertar lote
-            sql_insert = self.sql_manager.get_query('inventario', 'insert_lote_inventario')
+            sql_insert = self.sql_manager.get_query('inventario', 'insertar_lote_inventario')
 
             cursor.execute(
                 sql_insert,
@@ -1305,6 +1483,13 @@ producto_id,
                     datos_lote.get("observaciones", ""),
                 ),
             )
+            lote = LoteVencimiento(
+                int(cursor.fetchone()[0]),
+                producto_id,
+                datos_lote.get("numero_lote") or "",
+                a_fecha(datos_lote.get("fecha_vencimiento")),
+                float(datos_lote.get("cantidad", 0) or 0),
+            )
 
             # Si se requiere, actualizar stock del producto
             if datos_lote.get("actualizar_stock", False):
@@ -1317,6 +1502,9 @@ producto_id,
                 )
 
             self.db_connection.commit()
+            get_indice_vencimientos().actualizar([lote])
+            if datos_lote.get("actualizar_stock", False):
+                get_statistics_service().invalidar("inventario")
             return True
 
         except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
@@ -1342,9 +1530,7 @@ producto_id,
             cursor = self.db_connection.cursor()
 
             # Validar existencia de la tabla
-            sql_verificar = self.sql_manager.get_query('inventario', 'verificar_tabla_lotes')
-            cursor.execute(sql_verificar)
-            if not cursor.fetchone():
+            if not self._hay_tabla_lotes(cursor):
                 return []
 
             # MIGRADO: Usar consulta SQL externa para obtener lotes por producto
@@ -1363,7 +1549,7 @@ producto_id,
                 # Determinar si está vencido o próximo a vencer
                 if lote.get("fecha_vencimiento"):
                     hoy = datetime.datetime.now().date()
-                    dias_restantes = (lote["fecha_vencimiento"] - hoy).days
+                    dias_restantes = (a_fecha(lote["fecha_vencimiento"]) - hoy).days
 
                     if dias_restantes < 0:
                         lote["estado_vencimiento"] = "VENCIDO"
@@ -1478,51 +1664,88 @@ fecha_fin,
 
     def obtener_productos_proximos_vencer(self, dias_limite=30):
         """
-        Obtiene productos próximos a vencerse.
+        Obtiene los lotes con stock que vencen en los próximos días, desde el
+        índice de vencimientos (sin recorrer lotes_inventario).
 
         Args:
             dias_limite (int): Días límite para considerar próximos a vencer
 
         Returns:
-            List[Dict]: Lista de productos próximos a vencer
+            List[Dict]: Lotes por fecha de vencimiento, con código y
+                descripción del producto
         """
-        if not self.db_connection:
+        indice = self._indice_vencimientos()
+        if indice is None:
             return []
 
         try:
-            cursor = self.db_connection.cursor()
-
-            # Validar existencia de la tabla
-            sql_verificar = self.sql_manager.get_query('inventario', 'verificar_tabla_lotes')
-            cursor.execute(sql_verificar)
-            if not cursor.fetchone():
-                return []
+            hoy = datetime.date.today()
+            lotes = indice.proximos_a_vencer(dias_limite, hoy)
+            productos = {
+                producto["id"]: producto
+                for producto in self._obtener_productos_por_ids([lote.producto_id for lote in lotes])
+            }
+            resultado = []
+            for lote in lotes:
+                fila = lote.como_dict(hoy)
+                producto = productos.get(lote.producto_id, {})
+                fila["codigo"] = producto.get("codigo")
+                fila["descripcion"] = producto.get("descripcion")
+                resultado.append(fila)
+            return resultado
 
-            fecha_limite = datetime.datetime.now().date() + datetime.timedelta(
-                days=dias_limite
+        except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
+            logger.error(
+                f"[ERROR INVENTARIO] Error obteniendo productos próximos a vencer: {e}"
             )
+            return []
 
-            # MIGRADO: Usar consulta SQL externa para lotes próximos a vencer
-            sql_select = self.sql_manager.get_query('inventario', 'select_lotes_proximos_vencer')
+    def sugerir_picking_fefo(self, producto_id, cantidad, incluir_vencidos=False):
+        """
+        Sugiere de qué lotes tomar una cantidad del producto, primero los que
+        vencen antes (FEFO).
 
-            cursor.execute(sql_select, (fecha_limite,))
-            rows = cursor.fetchall()
+        Args:
+            producto_id (int): ID del producto
+            cantidad (float): Cantidad a preparar
+            incluir_vencidos (bool): Completar con lotes ya vencidos
 
-            # Convertir a lista de diccionarios
-            columns = [desc[0] for desc in cursor.description]
-            productos = []
+        Returns:
+            Dict: sugerencias (lote y cantidad a tomar) y faltante
+        """
+        indice = self._indice_vencimientos()
+        if indice is None:
+            return {"sugerencias": [], "faltante": float(cantidad)}
 
-            for row in rows:
-                producto = dict(zip(columns, row))
-                productos.append(producto)
+        hoy = datetime.date.today()
+        sugerencias, faltante = indice.sugerir_fefo(
+            producto_id, cantidad, hoy, incluir_vencidos=incluir_vencidos
+        )
+        return {
+            "sugerencias": [
+                {**sugerencia.lote.como_dict(hoy), "tomar": sugerencia.cantidad}
+                for sugerencia in sugerencias
+            ],
+            "faltante": faltante,
+        }
 
-            return productos
+    def revisar_vencimientos(self, dias_aviso=None):
+        """
+        Emite ahora los avisos de lotes próximos a vencer pendientes (la
+        revisión periódica lo hace cada hora).
 
-        except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
-            logger.error(
-                f"[ERROR INVENTARIO] Error obteniendo productos próximos a vencer: {e}"
-            )
+        Args:
+            dias_aviso (int): Días de anticipación (por defecto, la configuración
+                inventario_dias_aviso_vencimiento)
+
+        Returns:
+            List[Dict]: Lotes avisados
+        """
+        indice = self._indice_vencimientos()
+        if indice is None:
             return []
+        dias = self._dias_aviso_vencimiento() if dias_aviso is None else dias_aviso
+        return [lote.como_dict() for lote in indice.revisar_vencimientos(dias, conexion=self.db_connection)]
 
     def generar_reporte_valoracion_inventario(self, filtros=None):
         """
@@ -1785,34 +2008,53 @@ fecha_fin,
             if not producto:
                 return None
 
-            # Se requiere la librería barcode, instalarla si no está presente
-            try:
-                import barcode
-                from barcode.writer import ImageWriter
-            except ImportError:
-                logger.error("Se requiere la librería python-barcode")
-                return None
+            # EAN-13 si el código tiene 13 dígitos, si no CODE128
+            return get_motor_etiquetas().imagen(SIMBOLOGIA_BARRAS, producto["codigo"])
 
-            # Generar código EAN13 o CODE128 según el formato del código
-            codigo = producto["codigo"].replace("-", "").strip()
+        except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
+            logger.error(f"[ERROR INVENTARIO] Error generando código de barras: {e}")
+            return None
 
-            if len(codigo) == 13 and codigo.isdigit():
-                # EAN-13
-                ean = barcode.get("ean13", codigo, writer=ImageWriter())
-            else:
-                # CODE128 para cualquier otro formato
-                ean = barcode.get("code128", codigo, writer=ImageWriter())
+    def crear_etiquetas_productos(self, producto_ids=None, simbologia=SIMBOLOGIA_BARRAS, copias=1):
+        """
+        Etiquetas de productos para imprimir en hojas (motor de etiquetas).
 
-            # Generar imagen
-            fp = BytesIO()
-            ean.write(fp)
-            fp.seek(0)
+        Args:
+            producto_ids (list, optional): Productos a etiquetar (None = todo el
+                catálogo activo)
+            simbologia (str): "barras" (EAN-13 o CODE128) o "qr"
+            copias (int): Etiquetas por producto
 
-            return fp.getvalue()
+        Returns:
+            List[Etiqueta]: Una por producto, en el orden recibido o por código
+        """
+        if not self.db_connection:
+            return []
 
-        except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
-            logger.error(f"[ERROR INVENTARIO] Error generando código de barras: {e}")
-            return None
+        try:
+            if producto_ids is not None:
+                productos = self._obtener_productos_por_ids(producto_ids)
+            else:
+                cursor = self.db_connection.cursor()
+                cursor.execute(self.sql_manager.get_query('inventario', 'select_productos_etiquetas'))
+                columns = [desc[0] for desc in cursor.description]
+                productos = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+            return [
+                Etiqueta(
+                    contenido=str(producto["codigo"]),
+                    titulo=producto.get("descripcion") or "",
+                    subtitulo=str(producto["codigo"]),
+                    simbologia=simbologia,
+                    copias=copias,
+                )
+                for producto in productos
+                if producto.get("codigo")
+            ]
+
+        except Exception as e:
+            logger.error(f"[ERROR INVENTARIO] Error preparando etiquetas: {e}")
+            return []
 
     def actualizar_precios_masivo(self, actualizaciones, usuario="SISTEMA"):
         """
@@ -1898,6 +2140,7 @@ fecha_fin,
                     fallidos += 1
 
             self.db_connection.commit()
+            get_statistics_service().invalidar("inventario")
             return exitosos, fallidos
 
         except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
@@ -2561,53 +2804,46 @@ descripcion,
 
     def obtener_estadisticas_generales(self):
         """Obtiene estadísticas generales del inventario."""
+        vacias = {
+            "total_productos": 0,
+            "valor_total": 0.0,
+            "stock_bajo": 0,
+            "productos_activos": 0,
+        }
         try:
-            cursor = self.db_connection.cursor()
-
-            # Total de productos
-            sql_activos = self.sql_manager.get_query('inventario', 'contar_productos_activos')
-            cursor.execute(sql_activos)
-            total_productos = cursor.fetchone()[0]
-
-            # Valor total
-            cursor.execute("""
-                SELECT SUM(stock_actual * precio_unitario)
-                FROM inventario_perfiles
-                WHERE activo = 1
-            """)
-            valor_total = cursor.fetchone()[0] or 0.0
+            estadisticas = get_statistics_service().obtener("inventario", conexion=self.db_connection)
+        except Exception as e:
+            logger.error(f"Error al obtener estadísticas generales: {str(e)}")
+            return vacias
+        if not estadisticas:
+            return vacias
+        return {
+            "total_productos": estadisticas["total_productos"],
+            "valor_total": estadisticas["valor_total"],
+            "stock_bajo": estadisticas["stock_bajo"],
+            "productos_activos": estadisticas["total_productos"],
+        }
 
-            # Stock bajo
-            cursor.execute("""
-                SELECT COUNT(*)
-                FROM inventario_perfiles
-                WHERE stock_actual <= stock_minimo AND activo = 1
-            """)
-            stock_bajo = cursor.fetchone()[0]
+    def buscar_productos(self, filtros, limite=50):
+        """
+        Busca productos según los filtros especificados.
 
-            # Productos activos
-            sql_activos = self.sql_manager.get_query('inventario', 'contar_productos_activos')
-            cursor.execute(sql_activos)
-            productos_activos = cursor.fetchone()[0]
+        Args:
+            filtros: dict de filtros o texto libre
+            limite: Máximo de resultados para el texto libre
 
-            return {
-                "total_productos": total_productos,
-                "valor_total": valor_total,
-                "stock_bajo": stock_bajo,
-                "productos_activos": productos_activos,
-            }
+        Returns:
+            list: Productos (por relevancia si se usó el índice de búsqueda)
+        """
+        if isinstance(filtros, str):
+            filtros = {"busqueda": filtros}
+        filtros = filtros or {}
 
-        except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
-            logger.error(f"Error al obtener estadísticas generales: {str(e)}")
-            return {
-                "total_productos": 0,
-                "valor_total": 0.0,
-                "stock_bajo": 0,
-                "productos_activos": 0,
-            }
+        if filtros.get("busqueda") and not filtros.get("categoria"):
+            ids = get_search_index().buscar("productos", filtros["busqueda"], limite=limite)
+            if ids is not None:
+                return self._obtener_productos_por_ids(ids)
 
-    def buscar_productos(self, filtros):
-        """Busca productos según los filtros especificados."""
         try:
             cursor = self.db_connection.cursor()
 
@@ -2645,6 +2881,21 @@ descripcion,
             logger.error(f"Error al buscar productos: {str(e)}")
             return []
 
+    def _obtener_productos_por_ids(self, ids):
+        """Productos por lote de IDs, en el orden recibido."""
+        if not ids or not self.db_connection:
+            return []
+        try:
+            cursor = self.db_connection.cursor()
+            productos = fetch_rows_by_keys(
+                cursor, self.sql_manager.get_query('inventario', 'select_productos_por_ids'),
+                list(ids), "id"
+            )
+            return ordenar_por_ranking(productos.values(), ids)
+        except Exception as e:
+            logger.error(f"Error obteniendo productos por IDs: {e}")
+            return []
+
     def obtener_estadisticas_reservas(self, obra_id):
         """Obtiene estadísticas de reservas para una obra específica."""
         try:
@@ -3011,30 +3262,7 @@ descripcion,
             count_query = self._get_count_query()
 
             # Aplicar filtros seguros si existen
-            additional_conditions = []
-            params = []
-
-            if filtros:
-                # Validación estricta de campos permitidos para filtros
-                campos_permitidos = {
-                    "codigo",
-                    "descripcion",
-                    "tipo",
-                    "acabado",
-                    "proveedor",
-                }
-
-                for campo, valor in filtros.items():
-                    if valor and campo in campos_permitidos:
-                        # Mapear campos a nombres reales de la tabla
-                        campo_real = campo
-                        if campo == "categoria":
-                            campo_real = "tipo"
-                        elif campo == "subcategoria":
-                            campo_real = "acabado"
-
-                        additional_conditions.append(f"AND {campo_real} LIKE ?")
-                        params.append(f"%{valor}%")
+            additional_conditions, params = self._construir_condiciones_filtros(filtros)
 
             # Construir query completa para conteo
             if additional_conditions:
@@ -3072,6 +3300,124 @@ descripcion,
             logger.error(f"Error obteniendo datos paginados: {e}")
             return [], 0
 
+    def _construir_condiciones_filtros(self, filtros=None):
+        """
+        Construye condiciones "AND campo LIKE ?" para los filtros permitidos.
+
+        Acepta también los filtros de la vista (filtros_activos): search,
+        categoria y stock_filter. El estado se ignora: las consultas base
+        solo devuelven productos activos.
+
+        Returns:
+            tuple: (condiciones, params)
+        """
+        additional_conditions = []
+        params = []
+
+        if filtros:
+            # Validación estricta de campos permitidos para filtros
+            campos_permitidos = {
+                "codigo",
+                "descripcion",
+                "tipo",
+                "acabado",
+                "proveedor",
+                "categoria",
+                "subcategoria",
+            }
+
+            for campo, valor in filtros.items():
+                if valor and campo in campos_permitidos:
+                    # Mapear campos a nombres reales de la tabla
+                    campo_real = campo
+                    if campo == "categoria":
+                        campo_real = "tipo"
+                    elif campo == "subcategoria":
+                        campo_real = "acabado"
+
+                    additional_conditions.append(f"AND {campo_real} LIKE ?")
+                    params.append(f"%{valor}%")
+
+            busqueda = filtros.get("busqueda") or filtros.get("search")
+            if busqueda:
+                condicion, params_busqueda = self._condicion_busqueda(busqueda)
+                additional_conditions.append(condicion)
+                params.extend(params_busqueda)
+
+            # Valores fuera de las opciones del combo se ignoran
+            condicion = CONDICIONES_STOCK.get(filtros.get("stock_filter"))
+            if condicion:
+                additional_conditions.append(condicion)
+
+        return additional_conditions, params
+
+    def _condicion_busqueda(self, termino):
+        """
+        Condición para el texto libre de búsqueda: IDs del índice local o,
+        si no está disponible o las coincidencias llegan al tope
+        MAX_IDS_BUSQUEDA (la lista estaría truncada), LIKE sobre código y
+        descripción.
+        """
+        ids = get_search_index().buscar("productos", termino, limite=MAX_IDS_BUSQUEDA)
+        if ids is None or len(ids) >= MAX_IDS_BUSQUEDA:
+            patron = f"%{termino}%"
+            return "AND (codigo LIKE ? OR descripcion LIKE ?)", [patron, patron]
+        if not ids:
+            return "AND 1 = 0", []
+        return f"AND id IN ({', '.join('?' for _ in ids)})", list(ids)
+
+    def crear_fuente_exportacion(self, filtros=None):
+        """
+        Origen de exportación con todos los productos que cumplen los filtros.
+
+        Las filas se leen por lotes desde un cursor en el hilo de exportación
+        (con una conexión propia), sin paginación ni límite de registros.
+
+        Returns:
+            ExportSource o None si no hay conexión
+        """
+        database = getattr(self.db_connection, "database", None)
+        if not database:
+            logger.error("Sin conexión a BD para exportar inventario")
+            return None
+
+        try:
+            base_query = self.sql_manager.get_query('inventario', 'select_productos_exportacion')
+        except FileNotFoundError as e:
+            logger.error(f"Error cargando script de exportación: {e}")
+            return None
+        # Remover comentarios del script
+        lines = [
+            line.strip()
+            for line in base_query.split("\n")
+            if line.strip() and not line.strip().startswith("--")
+        ]
+        base_query = " ".join(lines).rstrip(";")
+
+        condiciones, params = self._construir_condiciones_filtros(filtros)
+        sql_export = f"{base_query} {' '.join(condiciones)} ORDER BY id DESC"
+
+        total = None
+        try:
+            cursor = self.db_connection.cursor()
+            count_query = self._get_count_query().strip().rstrip(";")
+            cursor.execute(f"{count_query} {' '.join(condiciones)}", params)
+            total = cursor.fetchone()[0]
+        except Exception as e:
+            logger.warning(f"No se pudo contar productos a exportar: {e}")
+
+        from rexus.core.database import DatabaseConnection
+        return cursor_source(
+            lambda: DatabaseConnection(database=database, auto_connect=True),
+            sql_export,
+            params,
+            headers=["ID", "Código", "Descripción", "Categoría", "Subcategoría",
+                     "Stock", "Stock Mínimo", "Precio Unitario", "Unidad",
+                     "Ubicación", "Proveedor", "Fecha Creación", "Fecha Modificación"],
+            total=total,
+            title="Inventario",
+        )
+
     def obtener_total_registros(self, filtros=None):
         """Obtiene el total de registros disponibles"""
         try:
@@ -3288,87 +3634,25 @@ datos_reserva: Dict[str,
             activos_solo (bool): Solo lotes activos
             
         Returns:
-            List[Dict]: Lista de lotes
+            List[Dict]: Lista de lotes, por fecha de vencimiento
         """
         try:
             if not self.db_connection:
                 logger.warning("No hay conexión BD para obtener lotes")
                 return []
-                
-            cursor = self.db_connection.cursor()
-            
+
             if producto_id:
                 # Usar método existente para producto específico
                 return self.obtener_lotes_producto(producto_id)
-            else:
-                # Obtener todos los lotes
-                if self.sql_manager:
-                    # Intentar usar SQL externo
-                    try:
-                        sql = self.sql_manager.get_query('inventario', 'obtener_todos_lotes')
-                        cursor.execute(sql, {
-                            'activos_solo': activos_solo
-                        })
-                    except:
-                        # Fallback con query manual
-                        sql = """
-                        SELECT 
-                            l.id,
-                            l.producto_id,
-                            l.numero_lote,
-                            l.cantidad,
-                            l.fecha_vencimiento,
-                            l.ubicacion,
-                            l.estado,
-                            l.fecha_ingreso,
-                            p.nombre as producto_nombre,
-                            p.codigo as producto_codigo
-                        FROM lotes_inventario l
-                        LEFT JOIN productos p ON l.producto_id = p.id
-                        WHERE l.activo = ?
-                        ORDER BY l.fecha_ingreso DESC
-                        """
-                        cursor.execute(sql, (1 if activos_solo else 0,))
-                else:
-                    # Query manual sin SQL Manager
-                    sql = """
-                    SELECT 
-                        l.id,
-                        l.producto_id,
-                        l.numero_lote,
-                        l.cantidad,
-                        l.fecha_vencimiento,
-                        l.ubicacion,
-                        l.estado,
-                        l.fecha_ingreso,
-                        p.nombre as producto_nombre,
-                        p.codigo as producto_codigo
-                    FROM lotes_inventario l
-                    LEFT JOIN productos p ON l.producto_id = p.id
-                    WHERE l.activo = ?
-                    ORDER BY l.fecha_ingreso DESC
-                    """
-                    cursor.execute(sql, (1 if activos_solo else 0,))
-                
-                # Procesar resultados
-                lotes = []
-                for row in cursor.fetchall():
-                    lote = {
-                        'id': row[0],
-                        'producto_id': row[1], 
-                        'numero_lote': row[2],
-                        'cantidad': row[3],
-                        'fecha_vencimiento': row[4],
-                        'ubicacion': row[5],
-                        'estado': row[6],
-                        'fecha_ingreso': row[7],
-                        'producto_nombre': row[8] if len(row) > 8 else None,
-                        'producto_codigo': row[9] if len(row) > 9 else None
-                    }
-                    lotes.append(lote)
-                    
-                return lotes
-                
+
+            cursor = self.db_connection.cursor()
+            if not self._hay_tabla_lotes(cursor):
+                return []
+            sql = self.sql_manager.get_query('inventario', 'obtener_todos_lotes')
+            cursor.execute(sql, (1 if activos_solo else 0,))
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
         except Exception as e:
             logger.error(f"Error obteniendo lotes: {e}")
             return []
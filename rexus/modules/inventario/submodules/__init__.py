@@ -20,7 +20,7 @@ except ImportError as e:
             pass
 
     class MovimientosManager:
-        def __init__(self, db_connection=None):
+        def __init__(self, db_connection=None, descontar_lotes=None):
             pass
 
     class ProductosManager:
@@ -0,0 +1,222 @@
+"""
+Analítica Manager - Cálculos analíticos del inventario en el servidor
+
+Reemplaza los bucles fila por fila de ReportesManager (clasificación ABC,
+sumatoria de valoración) por consultas con funciones de ventana: la base de
+datos ordena, acumula y clasifica en una sola pasada, y Python solo lee el
+resultado ya calculado.
+
+Responsabilidades:
+- Análisis ABC por valor, movimiento o cantidad (SUM() OVER acumulado)
+- Valoración por producto y por categoría con totales en la misma consulta
+- Rotación, días de cobertura y stock inmovilizado (movimientos agregados
+  una sola vez por producto)
+
+Requiere el índice idx_historial_producto_fecha
+(sql/performance/performance_indexes.sql) para volúmenes grandes de
+movimientos.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+logger = logging.getLogger(__name__)
+
+# Umbrales de porcentaje acumulado para la clasificación ABC
+LIMITE_CATEGORIA_A = 80.0
+LIMITE_CATEGORIA_B = 95.0
+
+CRITERIOS_ABC = {
+    'valor': 'valor_total',
+    'movimiento': 'total_movimientos',
+    'cantidad': 'stock_actual',
+}
+
+# Filas leídas por viaje al servidor
+TAMANO_LOTE = 5000
+
+
+class AnaliticaManager:
+    """Cálculos analíticos del inventario resueltos con SQL de ventana."""
+
+    def __init__(self, db_connection=None):
+        """
+        Args:
+            db_connection: Conexión a la base de datos
+        """
+        self.db_connection = db_connection
+        self.sql_manager = SQLQueryManager()
+
+    def _consultar(self, nombre_sql: str, params: Tuple = ()) -> Tuple[List[str], List[tuple]]:
+        """Ejecuta una consulta del módulo y devuelve (columnas, filas)."""
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(self.sql_manager.get_query('inventario', nombre_sql), params)
+            columnas = [desc[0] for desc in cursor.description]
+            filas: List[tuple] = []
+            while True:
+                lote = cursor.fetchmany(TAMANO_LOTE)
+                if not lote:
+                    break
+                filas.extend(lote)
+            return columnas, filas
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _a_dicts(columnas: List[str], filas: List[tuple],
+                 excluir: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
+        """Convierte filas a dicts omitiendo las columnas de agregados."""
+        if not excluir:
+            return [dict(zip(columnas, fila)) for fila in filas]
+        indices = [i for i, col in enumerate(columnas) if col not in excluir]
+        nombres = [columnas[i] for i in indices]
+        return [dict(zip(nombres, [fila[i] for i in indices])) for fila in filas]
+
+    @staticmethod
+    def _agregados(columnas: List[str], filas: List[tuple],
+                   nombres: Tuple[str, ...]) -> Dict[str, float]:
+        """Lee los agregados OVER () (iguales en todas las filas) de la primera fila."""
+        if not filas:
+            return {nombre: 0.0 for nombre in nombres}
+        primera = dict(zip(columnas, filas[0]))
+        return {nombre: float(primera[nombre] or 0) for nombre in nombres}
+
+    def analisis_abc(self, criterio: str = 'valor', dias_movimiento: int = 90) -> Dict[str, Any]:
+        """
+        Clasificación ABC calculada en el servidor.
+
+        Args:
+            criterio: 'valor', 'movimiento' o 'cantidad'
+            dias_movimiento: Ventana de movimientos para el criterio 'movimiento'
+
+        Returns:
+            Dict con productos clasificados (en orden de posición) y resumen
+            por categoría
+        """
+        if criterio not in CRITERIOS_ABC:
+            raise ValueError(f"Criterio ABC no soportado: {criterio}")
+
+        fecha_desde = (datetime.now() - timedelta(days=dias_movimiento)).strftime('%Y-%m-%d %H:%M:%S')
+        columnas, filas = self._consultar('analisis_abc', (
+            fecha_desde, criterio, criterio, LIMITE_CATEGORIA_A, LIMITE_CATEGORIA_B
+        ))
+        totales = self._agregados(columnas, filas, ('total_valor_analisis',))
+        productos = self._a_dicts(columnas, filas, ('total_valor_analisis', 'total_productos'))
+
+        total_valor = totales['total_valor_analisis']
+        resumen: Dict[str, Any] = {
+            'total_productos_analizados': len(productos),
+            'total_valor_analizado': total_valor,
+        }
+        por_categoria: Dict[str, List[Dict[str, Any]]] = {'A': [], 'B': [], 'C': []}
+        agregados_categoria: Dict[str, Tuple[int, float]] = {}
+        for producto in productos:
+            categoria = producto['categoria_abc']
+            por_categoria[categoria].append(producto)
+            # Los agregados por categoría ya vienen en cada fila (PARTITION BY)
+            agregados_categoria[categoria] = (
+                int(producto.pop('productos_categoria')),
+                float(producto.pop('valor_categoria') or 0),
+            )
+
+        for categoria in por_categoria:
+            cantidad, valor = agregados_categoria.get(categoria, (0, 0.0))
+            resumen[f'categoria_{categoria}'] = {
+                'cantidad_productos': cantidad,
+                'porcentaje_productos': (cantidad / len(productos)) * 100 if productos else 0,
+                'valor_total': valor,
+                'porcentaje_valor': (valor / total_valor) * 100 if total_valor > 0 else 0,
+            }
+
+        return {
+            'campo_analisis': CRITERIOS_ABC[criterio],
+            'productos': productos,
+            'productos_por_categoria': por_categoria,
+            'resumen': resumen,
+        }
+
+    def valoracion(self) -> Dict[str, Any]:
+        """
+        Valoración del inventario por producto y categoría.
+
+        Returns:
+            Dict con productos, totales generales y valoración por categoría
+        """
+        columnas, filas = self._consultar('valoracion_productos')
+        agregados = (
+            'total_productos', 'suma_valor_total', 'suma_valor_reservado',
+            'suma_valor_disponible', 'suma_stock_total', 'suma_stock_reservado',
+            'suma_stock_disponible',
+        )
+        sumas = self._agregados(columnas, filas, agregados)
+        productos = self._a_dicts(columnas, filas, agregados)
+        totales = {
+            'productos': len(productos),
+            'valor_total': sumas['suma_valor_total'],
+            'valor_reservado': sumas['suma_valor_reservado'],
+            'valor_disponible': sumas['suma_valor_disponible'],
+            'stock_total': sumas['suma_stock_total'],
+            'stock_reservado': sumas['suma_stock_reservado'],
+            'stock_disponible': sumas['suma_stock_disponible'],
+        }
+
+        columnas_cat, filas_cat = self._consultar('valoracion_categorias')
+        categorias = []
+        for fila in filas_cat:
+            categoria = dict(zip(columnas_cat, fila))
+            for campo in ('total_unidades', 'valor_total_categoria', 'precio_promedio',
+                          'precio_maximo', 'precio_minimo', 'porcentaje_valor'):
+                categoria[campo] = float(categoria[campo] or 0)
+            categorias.append(categoria)
+
+        return {'productos': productos, 'totales': totales, 'categorias': categorias}
+
+    def rotacion(self, dias_periodo: int = 90, dias_inmovilizado: int = 180) -> Dict[str, Any]:
+        """
+        Rotación, cobertura y stock inmovilizado por producto.
+
+        Args:
+            dias_periodo: Período de movimientos considerado para la rotación
+            dias_inmovilizado: Días sin movimientos para considerar un producto
+                con stock como inmovilizado
+
+        Returns:
+            Dict con productos (inmovilizados primero) y resumen
+        """
+        fecha_desde = (datetime.now() - timedelta(days=dias_periodo)).strftime('%Y-%m-%d %H:%M:%S')
+        columnas, filas = self._consultar('analisis_rotacion', (
+            fecha_desde, dias_periodo, dias_inmovilizado, dias_inmovilizado
+        ))
+        agregados = (
+            'total_productos', 'valor_stock_total', 'productos_inmovilizados',
+            'valor_inmovilizado', 'unidades_salida_total', 'stock_promedio_total',
+        )
+        sumas = self._agregados(columnas, filas, agregados)
+        productos = self._a_dicts(columnas, filas, agregados)
+
+        valor_total = sumas['valor_stock_total']
+        valor_inmovilizado = sumas['valor_inmovilizado']
+        stock_promedio_total = sumas['stock_promedio_total']
+        resumen = {
+            'total_productos': len(productos),
+            'productos_inmovilizados': int(sumas['productos_inmovilizados']),
+            'valor_stock_total': valor_total,
+            'valor_inmovilizado': valor_inmovilizado,
+            'porcentaje_valor_inmovilizado': (
+                (valor_inmovilizado / valor_total) * 100 if valor_total > 0 else 0
+            ),
+            'rotacion_global': (
+                sumas['unidades_salida_total'] / stock_promedio_total
+                if stock_promedio_total > 0 else 0
+            ),
+        }
+
+        return {
+            'productos': productos,
+            'inmovilizados': [p for p in productos if p['inmovilizado']],
+            'resumen': resumen,
+        }
@@ -0,0 +1,471 @@
+"""
+Índice de Vencimientos - Inventario
+
+Mantiene en memoria los lotes con stock ordenados por fecha de vencimiento,
+para responder "qué vence en los próximos N días" y sugerir el picking FEFO
+(primero en vencer, primero en salir) sin recorrer lotes_inventario.
+
+- Consultas por rango: búsqueda binaria sobre la lista ordenada por
+  (fecha_vencimiento, id), O(log n + k) para k lotes en el rango
+- FEFO: cada producto tiene su propia lista ordenada
+- Vigencia: el modelo aplica al índice, después de cada commit, los lotes que
+  cambió (alta de lote, salidas descontadas por FEFO). El cambio se difunde
+  por el bus (EVENTO_LOTES_ACTUALIZADOS) con las cantidades resultantes y los
+  demás clientes de la máquina lo aplican sin releer la base. Los cambios de
+  otros puestos entran al recargar el índice, a los MAX_EDAD segundos
+- Avisos: revisar_vencimientos() publica EVENTO_LOTE_POR_VENCER para los
+  lotes que entraron en la ventana de aviso desde la revisión anterior. La
+  tabla lotes_alertas_vencimiento asegura un solo aviso por lote aunque
+  revisen varios puestos. iniciar_revision_periodica() la ejecuta en un hilo
+  con conexión propia
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from rexus.core.event_bus import (
+    EVENTO_LOTE_POR_VENCER, EVENTO_LOTES_ACTUALIZADOS, Evento, EventBus, get_event_bus
+)
+from rexus.utils.app_logger import get_logger
+from rexus.utils.format_utils import a_fecha
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+logger = get_logger("inventario.indice_vencimientos")
+
+MAX_EDAD = 15 * 60              # segundos hasta recargar desde la base
+DIAS_AVISO = 30                 # ventana de aviso por defecto
+INTERVALO_REVISION = 60 * 60    # segundos entre revisiones periódicas
+MAX_LOTES_POR_EVENTO = 200      # el relay local acepta líneas de hasta 64 KB
+
+# (fecha_vencimiento, lote_id)
+Clave = Tuple[date, int]
+
+
+@dataclass(frozen=True)
+class LoteVencimiento:
+    """Lote con stock, tal como lo guarda el índice."""
+    lote_id: int
+    producto_id: int
+    numero_lote: str
+    fecha_vencimiento: Optional[date]
+    cantidad: float
+
+    @classmethod
+    def desde_fila(cls, fila) -> "LoteVencimiento":
+        """Fila (id, producto_id, numero_lote, fecha_vencimiento, cantidad)."""
+        lote_id, producto_id, numero_lote, fecha_vencimiento, cantidad = fila[:5]
+        return cls(int(lote_id), int(producto_id), numero_lote or "",
+                   a_fecha(fecha_vencimiento), float(cantidad or 0))
+
+    @property
+    def clave(self) -> Clave:
+        return (self.fecha_vencimiento, self.lote_id)
+
+    def dias_restantes(self, hoy: Optional[date] = None) -> Optional[int]:
+        if self.fecha_vencimiento is None:
+            return None
+        return (self.fecha_vencimiento - (hoy or date.today())).days
+
+    def como_dict(self, hoy: Optional[date] = None) -> Dict[str, Any]:
+        return {
+            "lote_id": self.lote_id,
+            "producto_id": self.producto_id,
+            "numero_lote": self.numero_lote,
+            "fecha_vencimiento": self.fecha_vencimiento.isoformat() if self.fecha_vencimiento else None,
+            "cantidad": self.cantidad,
+            "dias_restantes": self.dias_restantes(hoy),
+        }
+
+
+@dataclass(frozen=True)
+class SugerenciaPicking:
+    """Cantidad a tomar de un lote."""
+    lote: LoteVencimiento
+    cantidad: float
+
+
+def orden_fefo(lotes: Iterable[LoteVencimiento], hoy: Optional[date] = None) -> List[LoteVencimiento]:
+    """
+    Lotes ordenados por vencimiento (ya ordenados por fecha, sin fecha al
+    final) en el orden en que deben salir: vigentes, sin vencimiento y por
+    último los vencidos.
+    """
+    hoy = hoy or date.today()
+    vigentes, sin_fecha, vencidos = [], [], []
+    for lote in lotes:
+        if lote.fecha_vencimiento is None:
+            sin_fecha.append(lote)
+        elif lote.fecha_vencimiento < hoy:
+            vencidos.append(lote)
+        else:
+            vigentes.append(lote)
+    return vigentes + sin_fecha + vencidos
+
+
+def tomar_fefo(lotes: Iterable[LoteVencimiento],
+               cantidad: float) -> Tuple[List[SugerenciaPicking], float]:
+    """
+    Reparte cantidad entre los lotes en el orden recibido.
+
+    Returns:
+        (sugerencias, faltante): faltante > 0 si los lotes no alcanzan
+    """
+    sugerencias = []
+    pendiente = float(cantidad)
+    for lote in lotes:
+        if pendiente <= 0:
+            break
+        if lote.cantidad <= 0:
+            continue
+        tomar = min(lote.cantidad, pendiente)
+        sugerencias.append(SugerenciaPicking(lote, tomar))
+        pendiente -= tomar
+    return sugerencias, max(pendiente, 0.0)
+
+
+class IndiceVencimientos:
+    """Lotes con stock ordenados por vencimiento, con avisos y sugerencias FEFO."""
+
+    def __init__(self, bus: Optional[EventBus] = None, max_edad: float = MAX_EDAD):
+        self.max_edad = max_edad
+        self.sql_manager = SQLQueryManager()
+        self._lock = threading.RLock()
+        self._lotes: Dict[int, LoteVencimiento] = {}
+        self._orden: List[Clave] = []
+        self._por_producto: Dict[int, List[Clave]] = {}
+        self._cargado_en: Optional[float] = None
+        self._fallo_en: Optional[float] = None
+        # Avisos: horizonte ya revisado y lotes que entraron dentro de él después
+        self._avisado_hasta: Optional[date] = None
+        self._sin_revisar: Set[int] = set()
+        self._avisados: Set[Clave] = set()
+        self._tabla_alertas = False
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._bus = bus
+        self._suscripcion_bus = None
+        if bus is not None:
+            self._suscripcion_bus = bus.suscribir(
+                EVENTO_LOTES_ACTUALIZADOS, self._al_actualizar_remoto
+            )
+
+    def __len__(self) -> int:
+        return len(self._lotes)
+
+    # Carga
+
+    @property
+    def vigente(self) -> bool:
+        return (
+            self._cargado_en is not None
+            and time.monotonic() - self._cargado_en < self.max_edad
+        )
+
+    def cargar(self, filas: Iterable[Any]):
+        """Reemplaza el contenido del índice (filas de select_lotes_indice)."""
+        lotes = {}
+        for fila in filas:
+            lote = fila if isinstance(fila, LoteVencimiento) else LoteVencimiento.desde_fila(fila)
+            if lote.fecha_vencimiento is not None and lote.cantidad > 0:
+                lotes[lote.lote_id] = lote
+        orden = sorted(lote.clave for lote in lotes.values())
+        por_producto: Dict[int, List[Clave]] = {}
+        for clave in orden:
+            por_producto.setdefault(lotes[clave[1]].producto_id, []).append(clave)
+
+        with self._lock:
+            # Lotes dados de alta en otros puestos dentro del horizonte ya revisado
+            if self._cargado_en is not None and self._avisado_hasta is not None:
+                self._sin_revisar.update(
+                    lote_id for lote_id, lote in lotes.items()
+                    if lote_id not in self._lotes and lote.fecha_vencimiento <= self._avisado_hasta
+                )
+            self._lotes, self._orden, self._por_producto = lotes, orden, por_producto
+            self._cargado_en = time.monotonic()
+            self._fallo_en = None
+        logger.info(f"[VENCIMIENTOS] Índice cargado con {len(lotes)} lotes")
+
+    def cargar_desde(self, conexion):
+        cursor = conexion.cursor()
+        cursor.execute(self._query("select_lotes_indice"))
+        self.cargar(cursor.fetchall())
+
+    def asegurar(self, conexion) -> bool:
+        """
+        Recarga el índice con conexion si nunca se cargó o está vencido.
+
+        Returns:
+            bool: True si el índice tiene datos para consultar
+        """
+        if self.vigente or conexion is None:
+            return self._cargado_en is not None
+        # Sin tabla de lotes no se reintenta en cada consulta
+        if self._fallo_en is not None and time.monotonic() - self._fallo_en < self.max_edad:
+            return self._cargado_en is not None
+        try:
+            self.cargar_desde(conexion)
+        except Exception as e:
+            self._fallo_en = time.monotonic()
+            logger.warning(f"[VENCIMIENTOS] No se pudo cargar el índice: {e}")
+        return self._cargado_en is not None
+
+    # Cambios
+
+    def actualizar(self, lotes: Iterable[LoteVencimiento], difundir: bool = True):
+        """
+        Aplica el estado actual de lotes (llamar después del commit). Un lote
+        sin cantidad o sin fecha de vencimiento sale del índice.
+        """
+        lotes = list(lotes)
+        with self._lock:
+            for lote in lotes:
+                self._quitar(lote.lote_id)
+                if lote.fecha_vencimiento is not None and lote.cantidad > 0:
+                    self._insertar(lote)
+        if difundir and self._bus is not None and lotes:
+            for desde in range(0, len(lotes), MAX_LOTES_POR_EVENTO):
+                self._bus.publicar(EVENTO_LOTES_ACTUALIZADOS, {"lotes": [
+                    [lote.lote_id, lote.producto_id, lote.numero_lote,
+                     lote.fecha_vencimiento.isoformat() if lote.fecha_vencimiento else None,
+                     lote.cantidad]
+                    for lote in lotes[desde:desde + MAX_LOTES_POR_EVENTO]
+                ]})
+
+    def _insertar(self, lote: LoteVencimiento):
+        self._lotes[lote.lote_id] = lote
+        insort(self._orden, lote.clave)
+        insort(self._por_producto.setdefault(lote.producto_id, []), lote.clave)
+        if self._avisado_hasta is not None and lote.fecha_vencimiento <= self._avisado_hasta:
+            self._sin_revisar.add(lote.lote_id)
+
+    def _quitar(self, lote_id: int):
+        lote = self._lotes.pop(lote_id, None)
+        if lote is None:
+            return
+        self._eliminar_clave(self._orden, lote.clave)
+        claves = self._por_producto.get(lote.producto_id)
+        if claves is not None:
+            self._eliminar_clave(claves, lote.clave)
+            if not claves:
+                del self._por_producto[lote.producto_id]
+
+    @staticmethod
+    def _eliminar_clave(claves: List[Clave], clave: Clave):
+        posicion = bisect_left(claves, clave)
+        if posicion < len(claves) and claves[posicion] == clave:
+            del claves[posicion]
+
+    def _al_actualizar_remoto(self, evento: Evento):
+        if not evento.remoto:
+            return
+        try:
+            lotes = [LoteVencimiento.desde_fila(fila) for fila in evento.datos.get("lotes", [])]
+        except (TypeError, ValueError) as e:
+            logger.warning(f"[VENCIMIENTOS] Evento de lotes inválido: {e}")
+            return
+        self.actualizar(lotes, difundir=False)
+
+    # Consultas
+
+    def _rango(self, claves: List[Clave], desde: Optional[date],
+               hasta: Optional[date]) -> List[LoteVencimiento]:
+        """Lotes con vencimiento en [desde, hasta] (None = sin límite)."""
+        inicio = bisect_left(claves, (desde,)) if desde is not None else 0
+        fin = bisect_left(claves, (hasta + timedelta(days=1),)) if hasta is not None else len(claves)
+        return [self._lotes[lote_id] for _, lote_id in claves[inicio:fin]]
+
+    def entre(self, desde: Optional[date], hasta: Optional[date],
+              producto_id: Optional[int] = None) -> List[LoteVencimiento]:
+        """Lotes que vencen entre desde y hasta (inclusive), por fecha."""
+        with self._lock:
+            claves = self._orden if producto_id is None else self._por_producto.get(producto_id, [])
+            return self._rango(claves, a_fecha(desde), a_fecha(hasta))
+
+    def proximos_a_vencer(self, dias: int = DIAS_AVISO, hoy: Optional[date] = None,
+                          producto_id: Optional[int] = None) -> List[LoteVencimiento]:
+        """Lotes que vencen desde hoy hasta dentro de dias días."""
+        hoy = a_fecha(hoy) or date.today()
+        return self.entre(hoy, hoy + timedelta(days=dias), producto_id)
+
+    def vencidos(self, hoy: Optional[date] = None,
+                 producto_id: Optional[int] = None) -> List[LoteVencimiento]:
+        """Lotes con stock ya vencidos."""
+        hoy = a_fecha(hoy) or date.today()
+        return self.entre(None, hoy - timedelta(days=1), producto_id)
+
+    def sugerir_fefo(self, producto_id: int, cantidad: float, hoy: Optional[date] = None,
+                     incluir_vencidos: bool = False) -> Tuple[List[SugerenciaPicking], float]:
+        """
+        Lotes de los que tomar cantidad del producto, primero los que vencen antes.
+
+        Returns:
+            (sugerencias, faltante): faltante > 0 si los lotes no alcanzan
+        """
+        hoy = a_fecha(hoy) or date.today()
+        with self._lock:
+            claves = self._por_producto.get(producto_id, [])
+            corte = bisect_left(claves, (hoy,))
+            lotes = [self._lotes[lote_id] for _, lote_id in claves[corte:]]
+            if incluir_vencidos:
+                lotes += [self._lotes[lote_id] for _, lote_id in claves[:corte]]
+        return tomar_fefo(lotes, cantidad)
+
+    # Avisos
+
+    def revisar_vencimientos(self, dias_aviso: int = DIAS_AVISO, hoy: Optional[date] = None,
+                             conexion=None) -> List[LoteVencimiento]:
+        """
+        Publica EVENTO_LOTE_POR_VENCER para los lotes que entraron en la
+        ventana [hoy, hoy + dias_aviso] desde la revisión anterior: solo se
+        recorre el tramo nuevo del horizonte y los lotes que cambiaron.
+
+        Args:
+            dias_aviso: Días de anticipación del aviso
+            hoy: Fecha de la revisión (por defecto, hoy)
+            conexion: Conexión para registrar los avisos en
+                lotes_alertas_vencimiento (None = sin coordinación entre puestos)
+
+        Returns:
+            Lotes avisados en esta revisión
+        """
+        hoy = a_fecha(hoy) or date.today()
+        horizonte = hoy + timedelta(days=dias_aviso)
+        with self._lock:
+            desde = hoy
+            if self._avisado_hasta is not None:
+                desde = max(hoy, self._avisado_hasta + timedelta(days=1))
+            candidatos = {lote.lote_id: lote for lote in self._rango(self._orden, desde, horizonte)}
+            for lote_id in self._sin_revisar:
+                lote = self._lotes.get(lote_id)
+                if lote is not None and hoy <= lote.fecha_vencimiento <= horizonte:
+                    candidatos[lote_id] = lote
+            pendientes = [lote for lote in candidatos.values() if lote.clave not in self._avisados]
+            sin_revisar, self._sin_revisar = self._sin_revisar, set()
+            avisado_hasta = self._avisado_hasta
+            self._avisado_hasta = max(horizonte, avisado_hasta or horizonte)
+            # Los avisos de lotes ya vencidos no se vuelven a emitir
+            self._avisados = {clave for clave in self._avisados if clave[0] >= hoy}
+
+        try:
+            avisados = self._reclamar(pendientes, conexion) if conexion is not None else pendientes
+        except Exception as e:
+            logger.error(f"[ERROR VENCIMIENTOS] Registrando avisos: {e}")
+            with self._lock:
+                self._avisado_hasta = avisado_hasta
+                self._sin_revisar |= sin_revisar
+            return []
+
+        with self._lock:
+            self._avisados.update(lote.clave for lote in pendientes)
+        bus = self._bus or get_event_bus()
+        for lote in sorted(avisados, key=lambda l: l.clave):
+            bus.publicar(EVENTO_LOTE_POR_VENCER, lote.como_dict(hoy))
+        if avisados:
+            logger.info(f"[VENCIMIENTOS] {len(avisados)} lotes vencen en los próximos {dias_aviso} días")
+        return avisados
+
+    def _reclamar(self, lotes: List[LoteVencimiento], conexion) -> List[LoteVencimiento]:
+        """Registra los avisos; devuelve los lotes que no avisó otro puesto."""
+        if not lotes:
+            return []
+        cursor = conexion.cursor()
+        try:
+            if not self._tabla_alertas:
+                cursor.execute(self._query("create_alertas_vencimiento_table"))
+                self._tabla_alertas = True
+            reclamados = []
+            sql = self._query("insertar_alerta_vencimiento")
+            for lote in lotes:
+                cursor.execute(sql, (lote.lote_id, lote.fecha_vencimiento,
+                                     lote.lote_id, lote.fecha_vencimiento))
+                if cursor.rowcount:
+                    reclamados.append(lote)
+            conexion.commit()
+            return reclamados
+        except Exception:
+            try:
+                conexion.rollback()
+            except Exception:
+                pass
+            raise
+
+    # Revisión periódica
+
+    def iniciar_revision_periodica(self, connection_factory: Callable[[], Any],
+                                   dias_aviso: Callable[[], int] = lambda: DIAS_AVISO,
+                                   intervalo: float = INTERVALO_REVISION):
+        """
+        Revisa los vencimientos cada intervalo segundos en un hilo con
+        conexión propia, recargando el índice cuando vence. No hace nada si
+        la revisión ya está en marcha.
+
+        Args:
+            connection_factory: Abre la conexión del hilo de revisión
+            dias_aviso: Devuelve los días de anticipación vigentes
+            intervalo: Segundos entre revisiones
+        """
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(
+                target=self._bucle, args=(connection_factory, dias_aviso, intervalo),
+                name="rexus-vencimientos", daemon=True,
+            )
+            self._hilo.start()
+
+    def _bucle(self, connection_factory, dias_aviso, intervalo):
+        conexion = None
+        while not self._detener.is_set():
+            try:
+                if conexion is None:
+                    conexion = connection_factory()
+                if conexion is not None:
+                    if not self.vigente:
+                        self.cargar_desde(conexion)
+                    self.revisar_vencimientos(int(dias_aviso()), conexion=conexion)
+            except Exception as e:
+                logger.error(f"[ERROR VENCIMIENTOS] Revisión periódica: {e}")
+                self._cerrar(conexion)
+                conexion = None
+            self._detener.wait(intervalo)
+        self._cerrar(conexion)
+
+    @staticmethod
+    def _cerrar(conexion):
+        if conexion is not None:
+            try:
+                conexion.close()
+            except Exception:
+                pass
+
+    def cerrar(self, timeout: float = 5.0):
+        """Detiene la revisión periódica."""
+        self._detener.set()
+        hilo = self._hilo
+        if hilo is not None:
+            hilo.join(timeout)
+        if self._suscripcion_bus is not None:
+            self._suscripcion_bus.cancelar()
+            self._suscripcion_bus = None
+
+    def _query(self, nombre: str) -> str:
+        return self.sql_manager.get_query("inventario", nombre)
+
+
+_indice_vencimientos: Optional[IndiceVencimientos] = None
+_indice_vencimientos_lock = threading.Lock()
+
+
+def get_indice_vencimientos() -> IndiceVencimientos:
+    """Obtiene el índice de vencimientos global (conectado al bus global)."""
+    global _indice_vencimientos
+    if _indice_vencimientos is None:
+        with _indice_vencimientos_lock:
+            if _indice_vencimientos is None:
+                _indice_vencimientos = IndiceVencimientos(get_event_bus())
+    return _indice_vencimientos
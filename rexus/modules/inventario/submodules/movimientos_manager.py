@@ -9,11 +9,15 @@ Responsabilidades:
 - Auditoría de cambios
 """
 
+import sqlite3
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 # Imports de seguridad unificados
 from rexus.core.auth_decorators import auth_required, permission_required
+from rexus.core.event_bus import EVENTO_STOCK_BAJO_MINIMO, get_event_bus
+from rexus.modules.inventario.submodules.indice_vencimientos import get_indice_vencimientos
+from rexus.utils.statistics_service import get_statistics_service
 from rexus.utils.unified_sanitizer import unified_sanitizer, sanitize_string
 
 # SQLQueryManager unificado
@@ -53,9 +57,18 @@ class MovimientosManager:
         "MERMA": "Merma/Pérdida",
     }
 
-    def __init__(self, db_connection=None):
-        """Inicializa el gestor de movimientos."""
+    def __init__(self, db_connection=None, descontar_lotes=None):
+        """
+        Inicializa el gestor de movimientos.
+
+        Args:
+            db_connection: Conexión a la base de datos
+            descontar_lotes: Función (cursor, producto_id, cantidad) que
+                descuenta una baja de stock de los lotes en orden FEFO dentro
+                de la transacción y devuelve los lotes modificados
+        """
         self.db_connection = db_connection
+        self.descontar_lotes = descontar_lotes
         self.sql_manager = SQLQueryManager()
         self.sanitizer = unified_sanitizer
         self.sql_path = "scripts/sql/inventario/movimientos"
@@ -84,10 +97,11 @@ class MovimientosManager:
             if cantidad == 0:
                 raise ValueError("La cantidad no puede ser cero")
 
-            # Obtener stock actual
-            stock_actual = self._obtener_stock_actual(producto_id)
-            if stock_actual is None:
+            # Obtener stock actual y mínimo
+            niveles = self._obtener_niveles_stock(producto_id)
+            if niveles is None:
                 raise ValueError(f"Producto {producto_id} no encontrado")
+            stock_actual, stock_minimo, codigo = niveles
 
             # Validar stock para salidas
             if tipo_movimiento in ["SALIDA", "TRANSFERENCIA"] and \
@@ -175,7 +189,28 @@ class MovimientosManager:
                     (nuevo_stock, producto_id)
                 )
 
+            # Las bajas de stock descuentan de los lotes que vencen antes
+            lotes_modificados = []
+            if self.descontar_lotes and nuevo_stock < stock_actual:
+                lotes_modificados = self.descontar_lotes(
+                    cursor, producto_id, stock_actual - nuevo_stock
+                )
+
             self.db_connection.commit()
+            get_statistics_service().invalidar("inventario")
+            if lotes_modificados:
+                get_indice_vencimientos().actualizar(lotes_modificados)
+
+            # Solo se avisa al cruzar el mínimo, no en cada salida posterior
+            if stock_minimo is not None and nuevo_stock <= stock_minimo < stock_actual:
+                get_event_bus().publicar(EVENTO_STOCK_BAJO_MINIMO, {
+                    'producto_id': producto_id,
+                    'codigo': codigo,
+                    'stock_actual': nuevo_stock,
+                    'stock_minimo': stock_minimo,
+                    'tipo_movimiento': tipo_movimiento,
+                    'obra_id': obra_id,
+                })
             return True
 
         except Exception as e:
@@ -328,6 +363,27 @@ class MovimientosManager:
         except (sqlite3.Error, ValueError, TypeError, AttributeError):
             return None
 
+    def _obtener_niveles_stock(self, producto_id: int) -> Optional[Tuple[float, Optional[float], Any]]:
+        """Obtiene (stock_actual, stock_minimo, codigo) de un producto."""
+        if not self.db_connection:
+            return None
+
+        try:
+            cursor = self.db_connection.cursor()
+            cursor.execute(
+                "SELECT stock_actual, stock_minimo, codigo FROM inventario WHERE id = ?",
+                (producto_id,),
+            )
+
+            row = cursor.fetchone()
+            if not row:
+                return None
+            stock_minimo = float(row[1]) if row[1] is not None else None
+            return float(row[0]), stock_minimo, row[2]
+
+        except (sqlite3.Error, ValueError, TypeError, AttributeError):
+            return None
+
     @auth_required
     @permission_required("view_stock_bajo")
     def obtener_productos_stock_bajo(self) -> List[Dict[str, Any]]:
@@ -78,6 +78,8 @@ except ImportError:
                 """Sanitiza texto de forma segura."""
                 return str(text).strip() if text else ""
 
+from .analitica_manager import AnaliticaManager
+
 # Importar utilidades base si están disponibles
 try:
     from .base_utilities import BaseUtilities, TABLA_INVENTARIO, TABLA_MOVIMIENTOS, TABLA_RESERVAS
@@ -102,6 +104,7 @@ class ReportesManager:
         'PRODUCTOS_CRITICOS': 'Productos con Stock Crítico',
         'VALORACION_INVENTARIO': 'Valoración de Inventario',
         'ANALISIS_ABC': 'Análisis ABC de Productos',
+        'ROTACION': 'Rotación y Stock Inmovilizado',
         'TENDENCIAS': 'Análisis de Tendencias',
         'KPI_DASHBOARD': 'Dashboard de KPIs'
     }
@@ -125,6 +128,7 @@ class ReportesManager:
         self.sanitizer = data_sanitizer
         self.sql_path = "scripts/sql/inventario/reportes"
         self.logger = logging.getLogger(__name__)
+        self.analitica = AnaliticaManager(db_connection)
 
         # Inicializar utilidades base si están disponibles
         if BASE_AVAILABLE and db_connection:
@@ -665,146 +669,25 @@ criterio: str = 'valor',
             }
 
         try:
-            cursor = self.db_connection.cursor()
-
-            # Definir query según criterio
-            if criterio == 'valor':
-                # ABC por valor de inventario
-                query = """
-                    SELECT
-                        p.id, p.codigo, p.descripcion, p.categoria,
-                        p.stock_actual, p.precio_unitario,
-                        (p.stock_actual * p.precio_unitario) as valor_total
-                    FROM inventario_perfiles p
-                    WHERE p.activo = 1 AND p.stock_actual > 0
-                    ORDER BY (p.stock_actual * p.precio_unitario) DESC
-                """
-                params = []
-                campo_analisis = 'valor_total'
-
-            elif criterio == 'movimiento':
-                # ABC por frecuencia de movimientos (último trimestre)
-                fecha_trimestre = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d %H:%M:%S')
-                query = """
-                    SELECT
-                        p.id, p.codigo, p.descripcion, p.categoria,
-                        p.stock_actual, p.precio_unitario,
-                        COUNT(m.id) as total_movimientos,
-                        SUM(ABS(m.cantidad)) as cantidad_movida
-                    FROM inventario_perfiles p
-                    LEFT JOIN historial m ON p.id = m.producto_id
-                        AND m.fecha_movimiento >= ?
-                    WHERE p.activo = 1
-                    GROUP BY p.id, p.codigo, p.descripcion, p.categoria, p.stock_actual, p.precio_unitario
-                    ORDER BY COUNT(m.id) DESC, SUM(ABS(m.cantidad)) DESC
-                """
-                params = [fecha_trimestre]
-                campo_analisis = 'total_movimientos'
-
-            else:  # cantidad
-                # ABC por cantidad en stock
-                query = """
-                    SELECT
-                        p.id, p.codigo, p.descripcion, p.categoria,
-                        p.stock_actual, p.precio_unitario,
-                        p.stock_actual as cantidad_stock
-                    FROM inventario_perfiles p
-                    WHERE p.activo = 1 AND p.stock_actual > 0
-                    ORDER BY p.stock_actual DESC
-                """
-                params = []
-                campo_analisis = 'cantidad_stock'
-
-            cursor.execute(query, params if 'params' in locals() else [])
-            columnas = [desc[0] for desc in cursor.description]
-            filas = cursor.fetchall()
-            cursor.close()
+            # Orden, acumulado y clasificación se resuelven en el servidor
+            resultado = self.analitica.analisis_abc(criterio)
+            productos = resultado['productos']
 
-            if not filas:
+            if not productos:
                 return {
                     'success': False,
                     'error': 'No hay datos suficientes para análisis ABC',
                     'data': None
                 }
 
-            # Procesar datos para análisis ABC
-            productos = []
-            total_valor_analisis = 0
-
-            for fila in filas:
-                producto = dict(zip(columnas, fila))
-                valor_analisis = float(producto.get(campo_analisis, 0) or 0)
-                producto['valor_analisis'] = valor_analisis
-                total_valor_analisis += valor_analisis
-                productos.append(producto)
-
-            # Clasificar en categorías ABC
-            productos_clasificados = []
-            acumulado = 0
-
-            for i, producto in enumerate(productos):
-                valor_analisis = producto['valor_analisis']
-                acumulado += valor_analisis
-                porcentaje_acumulado = (acumulado / total_valor_analisis) * 100 if total_valor_analisis > 0 else 0
-
-                # Clasificación ABC estándar
-                if porcentaje_acumulado <= 80:
-                    categoria_abc = 'A'
-                elif porcentaje_acumulado <= 95:
-                    categoria_abc = 'B'
-                else:
-                    categoria_abc = 'C'
-
-                producto['categoria_abc'] = categoria_abc
-                producto['porcentaje_individual'] = (valor_analisis / total_valor_analisis) * 100 if total_valor_analisis > 0 else 0
-                producto['porcentaje_acumulado'] = porcentaje_acumulado
-                producto['posicion'] = i + 1
-
-                productos_clasificados.append(producto)
-
-            # Calcular resumen por categoría
-            resumen_abc = {'A': [], 'B': [], 'C': []}
-            contadores = {'A': 0, 'B': 0, 'C': 0}
-            valores = {'A': 0, 'B': 0, 'C': 0}
-
-            for producto in productos_clasificados:
-                cat = producto['categoria_abc']
-                resumen_abc[cat].append(producto)
-                contadores[cat] += 1
-                valores[cat] += producto['valor_analisis']
-
-            # Construir reporte final
             analisis = {
                 'tipo_reporte': 'ANALISIS_ABC',
                 'fecha_generacion': datetime.now().isoformat(),
                 'criterio_analisis': criterio,
-                'campo_analisis': campo_analisis,
-
-                'resumen': {
-                    'total_productos_analizados': len(productos_clasificados),
-                    'total_valor_analizado': total_valor_analisis,
-                    'categoria_A': {
-                        'cantidad_productos': contadores['A'],
-                        'porcentaje_productos': (contadores['A'] / len(productos)) * 100,
-                        'valor_total': valores['A'],
-                        'porcentaje_valor': (valores['A'] / total_valor_analisis) * 100 if total_valor_analisis > 0 else 0
-                    },
-                    'categoria_B': {
-                        'cantidad_productos': contadores['B'],
-                        'porcentaje_productos': (contadores['B'] / len(productos)) * 100,
-                        'valor_total': valores['B'],
-                        'porcentaje_valor': (valores['B'] / total_valor_analisis) * 100 if total_valor_analisis > 0 else 0
-                    },
-                    'categoria_C': {
-                        'cantidad_productos': contadores['C'],
-                        'porcentaje_productos': (contadores['C'] / len(productos)) * 100,
-                        'valor_total': valores['C'],
-                        'porcentaje_valor': (valores['C'] / total_valor_analisis) * 100 if total_valor_analisis > 0 else 0
-                    }
-                },
-
-                'productos_por_categoria': resumen_abc,
-                'todos_los_productos': productos_clasificados
+                'campo_analisis': resultado['campo_analisis'],
+                'resumen': resultado['resumen'],
+                'productos_por_categoria': resultado['productos_por_categoria'],
+                'todos_los_productos': productos
             }
 
             return {
@@ -812,6 +695,12 @@ criterio: str = 'valor',
                 'data': self._formatear_reporte(analisis, formato)
             }
 
+        except ValueError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'data': None
+            }
         except Exception as e:
             self.logger.error(f"Error generando análisis ABC: {e}")
             return {
@@ -846,102 +735,11 @@ criterio: str = 'valor',
             if not fecha_corte:
                 fecha_corte = datetime.now().strftime('%Y-%m-%d')
 
-            cursor = self.db_connection.cursor()
-
-            # Valoración detallada por producto - Optimizada para evitar consultas N+1
-            query = """
-                SELECT
-                    i.id, i.codigo, i.descripcion, i.categoria, i.proveedor,
-                    i.stock_actual, i.precio_unitario, i.unidad_medida,
-                    i.fecha_creacion, i.fecha_modificacion,
-                    (i.stock_actual * i.precio_unitario) as valor_total,
-                    -- Stock reservado optimizado
-                    ISNULL(r.stock_reservado, 0) as stock_reservado,
-                    -- Valor de stock reservado optimizado
-                    (ISNULL(r.stock_reservado, 0) * i.precio_unitario) as valor_reservado,
-                    -- Stock disponible optimizado
-                    (i.stock_actual - ISNULL(r.stock_reservado, 0)) as stock_disponible,
-                    -- Valor disponible optimizado
-                    ((i.stock_actual - ISNULL(r.stock_reservado, 0)) * i.precio_unitario) as valor_disponible
-                FROM inventario_perfiles i
-                LEFT JOIN (
-                    SELECT
-                        producto_id,
-                        SUM(cantidad_reservada) as stock_reservado
-                    FROM reserva_materiales
-                    WHERE estado = 'ACTIVA'
-                    GROUP BY producto_id
-                ) r ON i.id = r.producto_id
-                WHERE i.activo = 1
-                ORDER BY (i.stock_actual * i.precio_unitario) DESC
-            """
-
-            cursor.execute(query)
-            columnas = [desc[0] for desc in cursor.description]
-            filas = cursor.fetchall()
-
-            # Resumen por categoría
-            query_categoria = """
-                SELECT
-                    i.categoria,
-                    COUNT(*) as total_productos,
-                    SUM(i.stock_actual) as total_unidades,
-                    SUM(i.stock_actual * i.precio_unitario) as valor_total_categoria,
-                    AVG(i.precio_unitario) as precio_promedio,
-                    MAX(i.precio_unitario) as precio_maximo,
-                    MIN(i.precio_unitario) as precio_minimo
-                FROM inventario_perfiles i
-                WHERE i.activo = 1
-                GROUP BY i.categoria
-                ORDER BY SUM(i.stock_actual * i.precio_unitario) DESC
-            """
-
-            cursor.execute(query_categoria)
-            categorias = cursor.fetchall()
-            cursor.close()
-
-            # Procesar datos de productos
-            productos = []
-            totales = {
-                'productos': 0,
-                'valor_total': 0,
-                'valor_reservado': 0,
-                'valor_disponible': 0,
-                'stock_total': 0,
-                'stock_reservado': 0,
-                'stock_disponible': 0
-            }
-
-            for fila in filas:
-                producto = dict(zip(columnas, fila))
-                productos.append(producto)
-
-                # Actualizar totales
-                totales['productos'] += 1
-                totales['valor_total'] += float(producto.get('valor_total', 0) or 0)
-                totales['valor_reservado'] += float(producto.get('valor_reservado', 0) or 0)
-                totales['valor_disponible'] += float(producto.get('valor_disponible', 0) or 0)
-                totales['stock_total'] += float(producto.get('stock_actual', 0) or 0)
-                totales['stock_reservado'] += float(producto.get('stock_reservado', 0) or 0)
-                totales['stock_disponible'] += float(producto.get('stock_disponible', 0) or 0)
-
-            # Procesar datos por categoría
-            valoracion_por_categoria = []
-            for cat_fila in categorias:
-                categoria_info = {
-                    'categoria': cat_fila[0],
-                    'total_productos': cat_fila[1],
-                    'total_unidades': float(cat_fila[2] or 0),
-                    'valor_total_categoria': float(cat_fila[3] or 0),
-                    'precio_promedio': float(cat_fila[4] or 0),
-                    'precio_maximo': float(cat_fila[5] or 0),
-                    'precio_minimo': float(cat_fila[6] or 0),
-                    'porcentaje_valor': (
-                        (float(cat_fila[3] or 0) / totales['valor_total']) * 100
-                        if totales['valor_total'] > 0 else 0
-                    )
-                }
-                valoracion_por_categoria.append(categoria_info)
+            # Totales y participación por categoría calculados en el servidor
+            resultado = self.analitica.valoracion()
+            productos = resultado['productos']
+            totales = resultado['totales']
+            valoracion_por_categoria = resultado['categorias']
 
             # Construir reporte final
             valoracion = {
@@ -990,6 +788,57 @@ criterio: str = 'valor',
                 'data': None
             }
 
+    @cached_query(ttl=900)  # Cache por 15 minutos - Depende del historial de movimientos
+    @auth_required
+    @permission_required("view_reportes")
+    def generar_analisis_rotacion(self, dias_periodo: int = 90,
+                                  dias_inmovilizado: int = 180,
+                                  formato: str = 'DICT') -> Dict[str, Any]:
+        """
+        Genera análisis de rotación y stock inmovilizado.
+
+        Args:
+            dias_periodo: Días de movimientos considerados para la rotación
+            dias_inmovilizado: Días sin movimientos para marcar stock inmovilizado
+            formato: Formato de salida
+
+        Returns:
+            Dict con rotación por producto y resumen de stock inmovilizado
+        """
+        if not self._validar_conexion():
+            return {
+                'success': False,
+                'error': 'Sin conexión a base de datos',
+                'data': None
+            }
+
+        try:
+            resultado = self.analitica.rotacion(dias_periodo, dias_inmovilizado)
+
+            reporte = {
+                'tipo_reporte': 'ROTACION',
+                'fecha_generacion': datetime.now().isoformat(),
+                'periodo_dias': dias_periodo,
+                'umbral_inmovilizado_dias': dias_inmovilizado,
+                'resumen': resultado['resumen'],
+                'productos_inmovilizados': resultado['inmovilizados'],
+                'productos': resultado['productos'],
+                'total_registros': len(resultado['productos'])
+            }
+
+            return {
+                'success': True,
+                'data': self._formatear_reporte(reporte, formato)
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error generando análisis de rotación: {e}")
+            return {
+                'success': False,
+                'error': f'Error interno: {str(e)}',
+                'data': None
+            }
+
     # Métodos auxiliares
 
     def _formatear_reporte(self,
@@ -1071,7 +920,8 @@ indent=2,
                 'generar_reporte_stock_actual',
                 'generar_dashboard_kpis',
                 'generar_reporte_valoracion',
-                'generar_analisis_abc'
+                'generar_analisis_abc',
+                'generar_analisis_rotacion'
             ]
 
             for patron in patrones_invalidacion:
@@ -1092,6 +942,7 @@ indent=2,
         try:
             from rexus.utils.intelligent_cache import invalidate_cache
             invalidate_cache('generar_reporte_movimientos')
+            invalidate_cache('generar_analisis_rotacion')
             logger.info("Cache de movimientos invalidado")
         except Exception as e:
             logger.error(f"Error invalidando cache de movimientos: {e}")
@@ -21,6 +21,7 @@ logger = logging.getLogger(__name__)
 
 # Imports de seguridad unificados
 from rexus.core.auth_decorators import auth_required, permission_required
+from rexus.core.event_bus import EVENTO_RESERVA_VENCIDA, get_event_bus
 from rexus.utils.unified_sanitizer import unified_sanitizer, sanitize_string
 
 # SQLQueryManager unificado
@@ -653,6 +654,15 @@ reserva_id: int,
 
             self.logger.info(f"Procesadas {reservas_procesadas} reservas vencidas")
 
+            bus = get_event_bus()
+            for reserva_id, producto_id, cantidad, motivo in reservas_vencidas:
+                bus.publicar(EVENTO_RESERVA_VENCIDA, {
+                    'reserva_id': reserva_id,
+                    'producto_id': producto_id,
+                    'cantidad_reservada': cantidad,
+                    'motivo': motivo,
+                })
+
             return {
                 'success': True,
                 'message': f'Se procesaron {reservas_procesadas} reservas vencidas',
@@ -336,13 +336,15 @@ class InventarioView(BaseModuleView):
         self.btn_movimiento = RexusButton("[PACKAGE] Registrar Movimiento", "secondary")
         self.btn_asociar_obra = RexusButton("[CONSTRUCTION] Asociar a Obra", "secondary")
         self.btn_generar_qr = RexusButton("📱 Generar QR", "secondary")
+        self.btn_imprimir_etiquetas = RexusButton("🏷️ Imprimir Etiquetas", "secondary")
 
         # Establecer nombres de objeto para que el controlador los encuentre
         self.btn_movimiento.setObjectName("btn_movimiento")
         self.btn_limpiar = self.btn_limpiar_busqueda  # Alias para compatibilidad
 
         for btn in [self.btn_reporte_stock_bajo, self.btn_movimiento,
-                   self.btn_asociar_obra, self.btn_generar_qr]:
+                   self.btn_asociar_obra, self.btn_generar_qr,
+                   self.btn_imprimir_etiquetas]:
             btn.setMinimumHeight(35)
             acciones_layout.addWidget(btn)
 
@@ -907,7 +909,8 @@ class InventarioView(BaseModuleView):
             ('btn_movimiento', 'registrar_movimiento', lambda: controller.registrar_movimiento()),
             ('btn_reporte_stock_bajo', 'generar_reporte_stock_bajo', lambda: controller.generar_reporte_stock_bajo()),
             ('btn_asociar_obra', 'asociar_a_obra', lambda: controller.asociar_a_obra(self.obtener_producto_seleccionado_id())),
-            ('btn_generar_qr', 'generar_codigo_qr', lambda: controller.generar_codigo_qr(self.obtener_producto_seleccionado_id()))
+            ('btn_generar_qr', 'generar_codigo_qr', lambda: controller.generar_codigo_qr(self.obtener_producto_seleccionado_id())),
+            ('btn_imprimir_etiquetas', 'imprimir_etiquetas', lambda: controller.imprimir_etiquetas())
         ]
 
         for button_name, controller_method, callback in buttons_to_connect:
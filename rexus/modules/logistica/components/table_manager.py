@@ -11,6 +11,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
+from rexus.utils.table_search import SearchDebouncer, TableSearchIndex
+
 class LogisticaTableManager:
     """Gestor de tablas para el módulo de logística."""
 
@@ -23,6 +25,8 @@ class LogisticaTableManager:
         self.parent_view = parent_view
         self.tabla_entregas = None
         self.tabla_transportes = None
+        self._debouncer_busqueda = None
+        self._termino_pendiente = ""
 
     def cargar_entregas_en_tabla(self, entregas=None):
         """Carga entregas en la tabla principal."""
@@ -176,28 +180,26 @@ class LogisticaTableManager:
         self.tabla_transportes = tabla
 
     def buscar_en_tabla_transportes(self, termino_busqueda):
-        """Busca en la tabla de transportes por término."""
-        if not self.tabla_transportes:
-            return
+        """Busca en la tabla de transportes por término.
 
-        # Mostrar todas las filas primero
-        for row in range(self.tabla_transportes.rowCount()):
-            self.tabla_transportes.setRowHidden(row, False)
-
-        # Si no hay término de búsqueda, mostrar todo
-        if not termino_busqueda.strip():
+        Usa un índice normalizado de las filas cargadas: solo se recorre el
+        texto una vez por carga y solo se tocan las filas cuya visibilidad cambia.
+        """
+        if not self.tabla_transportes:
             return
 
-        # Ocultar filas que no coinciden
-        termino = termino_busqueda.lower()
-        for row in range(self.tabla_transportes.rowCount()):
-            fila_visible = False
-            for col in range(self.tabla_transportes.columnCount()):
-                item = self.tabla_transportes.item(row, col)
-                if item and termino in item.text().lower():
-                    fila_visible = True
-                    break
-            self.tabla_transportes.setRowHidden(row, not fila_visible)
+        indice = TableSearchIndex.para_tabla(self.tabla_transportes)
+        indice.filtrar(termino_busqueda or "")
+
+    def buscar_en_tabla_transportes_diferido(self, termino_busqueda):
+        """Programa la búsqueda para cuando el usuario deja de escribir."""
+        self._termino_pendiente = termino_busqueda
+        if self._debouncer_busqueda is None:
+            self._debouncer_busqueda = SearchDebouncer(
+                lambda: self.buscar_en_tabla_transportes(self._termino_pendiente),
+                parent=self.tabla_transportes,
+            )
+        self._debouncer_busqueda.programar()
 
     def get_transporte_seleccionado(self):
         """Obtiene los datos del transporte seleccionado."""
@@ -123,7 +123,7 @@ class LogisticaTransportManager:
     def buscar_transportes(self, termino_busqueda=""):
         """Busca transportes por término de búsqueda."""
         if hasattr(self.parent_view, 'table_manager'):
-            self.parent_view.table_manager.buscar_en_tabla_transportes(termino_busqueda)
+            self.parent_view.table_manager.buscar_en_tabla_transportes_diferido(termino_busqueda)
 
     def actualizar_estado_botones(self):
         """Actualiza el estado de los botones según la selección."""
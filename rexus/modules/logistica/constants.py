@@ -22,6 +22,48 @@ class LogisticaConstants:
     DIRECCION_DEPOSITO_SUR = "Calle 120 y 610, La Plata"
     DIRECCION_CENTRO = "Av. 1 y 60, La Plata"
 
+    # Coordenadas (lat, lng)
+    COORDENADAS_ALMACEN_CENTRAL = (-34.9214, -57.9544)
+
+    # Nomenclátor local: ubicaciones de cada zona de servicio -> (lat, lng).
+    # Permite geocodificar los servicios generados sin depender de un
+    # servicio externo; las ubicaciones fuera de la lista quedan sin ruteo.
+    COORDENADAS_UBICACIONES = {
+        'metropolitana': {
+            'Centro': (-34.9205, -57.9536),
+            'Zona Norte': (-34.8946, -57.9728),
+            'Zona Sur': (-34.9590, -57.9412),
+            'Zona Oeste': (-34.9335, -57.9960),
+            'Zona Este': (-34.9050, -57.9160),
+            'Puerto': (-34.8700, -57.8950),
+        },
+        'interior': {
+            'Planta Industrial': (-34.8890, -58.0410),
+            'Ciudad': (-34.9520, -58.0390),
+            'Campo': (-35.0180, -58.0830),
+            'Planta': (-34.9750, -58.0050),
+            'Depósito Regional': (-34.9880, -57.9830),
+            'Centro Logístico': (-34.8580, -58.0200),
+            'Sucursal': (-34.9090, -58.0700),
+        },
+        'costa': {
+            'Puerto': (-34.8700, -57.8950),
+            'Centro': (-34.8350, -57.8830),
+            'Terminal': (-34.8620, -57.8870),
+            'Zona Residencial': (-34.8430, -57.8700),
+            'Depósito Costero': (-34.8560, -57.9010),
+            'Ciudad': (-34.8300, -57.8950),
+            'Muelle': (-34.8660, -57.8820),
+            'Zona Comercial': (-34.8400, -57.8880),
+        },
+    }
+
+    # Ruteo: valores por defecto de la flota
+    CAPACIDAD_VEHICULO_KG = 1500
+    VELOCIDAD_PROMEDIO_KMH = 30
+    DURACION_TURNO_MINUTOS = 9 * 60
+    PRESUPUESTO_RUTEO_SEGUNDOS = 2.0
+
     # Ciudades
     CIUDAD_BUENOS_AIRES = "Buenos Aires"
     CIUDAD_LA_PLATA = "La Plata"
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 from PyQt6.QtCore import QObject, pyqtSignal
 from rexus.utils.error_handler import error_boundary as safe_method_decorator
 from rexus.core.auth_decorators import auth_required, admin_required
+from rexus.modules.logistica.constants import LogisticaConstants
+from rexus.modules.logistica.route_optimizer import ConfiguracionFlota, OptimizadorRutas, Parada
 
 # Importar sistema de mensajería centralizado y logging
 try:
@@ -483,8 +485,20 @@ model=None,
             'obra_id': criterios.get('obra_id'),
             'recursos_necesarios': self._determinar_recursos_necesarios(tipo_especifico, prioridad)
         }
-        
+
+        # Coordenadas del destino para el ruteo CVRPTW
+        coordenadas = self._geocodificar_ubicacion(destino, zona)
+        if coordenadas:
+            servicio['coordenadas'] = coordenadas
+
         return servicio
+
+    @staticmethod
+    def _geocodificar_ubicacion(ubicacion, zona):
+        """Devuelve (lat, lng) de una ubicación según el nomenclátor local, o None."""
+        nomenclator = LogisticaConstants.COORDENADAS_UBICACIONES
+        por_zona = nomenclator.get(zona, nomenclator['metropolitana'])
+        return por_zona.get(ubicacion)
     
     def _generar_ubicaciones_zona(self, zona):
         """Genera ubicaciones realistas para una zona específica."""
@@ -537,20 +551,67 @@ model=None,
         
         return recursos_base
     
-    def _optimizar_rutas_servicios(self, servicios, zona):
-        """Optimiza las rutas de los servicios generados."""
-        # Implementación básica: agrupar por proximidad geográfica
+    def _optimizar_rutas_servicios(self, servicios, zona, flota=None):
+        """
+        Optimiza las rutas de los servicios generados.
+
+        Los servicios con coordenadas se rutean con el solver CVRPTW
+        (capacidad, ventanas horarias y fin de turno). Los que no tienen
+        coordenadas se agrupan por orden como antes.
+        """
         try:
-            # Asignar rutas optimizadas agrupando servicios cercanos
-            for i, servicio in enumerate(servicios):
-                # Agrupar servicios en rutas de máximo 4 servicios
-                ruta_numero = (i // 4) + 1
-                servicio['ruta_id'] = f'R_{zona[:3].upper()}_{ruta_numero:02d}'
+            prefijo = zona[:3].upper()
+            con_coordenadas = [s for s in servicios if self._coordenadas_servicio(s)]
+            sin_coordenadas = [s for s in servicios if not self._coordenadas_servicio(s)]
+            numero_ruta = 0
+
+            if con_coordenadas:
+                inicio_turno = self._inicio_turno(con_coordenadas)
+                paradas = [self._parada_desde_servicio(s, i, inicio_turno)
+                           for i, s in enumerate(con_coordenadas)]
+                optimizador = OptimizadorRutas(
+                    LogisticaConstants.COORDENADAS_ALMACEN_CENTRAL,
+                    paradas,
+                    flota or ConfiguracionFlota(
+                        capacidad=LogisticaConstants.CAPACIDAD_VEHICULO_KG,
+                        fin_turno=LogisticaConstants.DURACION_TURNO_MINUTOS,
+                        velocidad_kmh=LogisticaConstants.VELOCIDAD_PROMEDIO_KMH,
+                    ),
+                )
+                resultado = optimizador.resolver(LogisticaConstants.PRESUPUESTO_RUTEO_SEGUNDOS)
+
+                por_indice = {str(i): s for i, s in enumerate(con_coordenadas)}
+                for ruta, km in zip(resultado.rutas, resultado.distancias_ruta_km):
+                    numero_ruta += 1
+                    tiempo_ruta = 0
+                    for orden, indice in enumerate(ruta, 1):
+                        servicio = por_indice[indice]
+                        tiempo_ruta += servicio.get('tiempo_estimado_minutos', 0)
+                        servicio['ruta_id'] = f'R_{prefijo}_{numero_ruta:02d}'
+                        servicio['orden_en_ruta'] = orden
+                        servicio['distancia_ruta_km'] = round(km, 2)
+                    for indice in ruta:
+                        por_indice[indice]['tiempo_total_ruta'] = tiempo_ruta
+
+                # Paradas imposibles de cumplir (ventana/turno) quedan sin ruta
+                for indice in resultado.no_asignadas:
+                    por_indice[indice]['ruta_id'] = None
+                    por_indice[indice]['orden_en_ruta'] = None
+
+                ahorro = optimizador.distancia_agrupacion_fija(4) - resultado.distancia_km
+                logger.info(
+                    f"Ruteo {zona}: {len(resultado.rutas)} rutas, {resultado.distancia_km:.1f} km "
+                    f"({ahorro:.1f} km menos que agrupación fija), "
+                    f"{len(resultado.no_asignadas)} sin asignar"
+                )
+
+            # Servicios sin coordenadas: agrupar en rutas de máximo 4 servicios
+            for i, servicio in enumerate(sin_coordenadas):
+                ruta_numero = numero_ruta + (i // 4) + 1
+                servicio['ruta_id'] = f'R_{prefijo}_{ruta_numero:02d}'
                 servicio['orden_en_ruta'] = (i % 4) + 1
-                
-                # Calcular tiempo total de ruta
                 servicio['tiempo_total_ruta'] = servicio['tiempo_estimado_minutos'] * (servicio['orden_en_ruta'] + 1)
-            
+
             logger.debug(f"Rutas optimizadas: {len(set(s['ruta_id'] for s in servicios))} rutas creadas")
             return servicios
             
@@ -558,6 +619,58 @@ model=None,
             logger.warning(f"Error optimizando rutas: {e}, devolviendo servicios sin optimizar")
             return servicios
 
+    @staticmethod
+    def _coordenadas_servicio(servicio):
+        """Devuelve (lat, lng) guardadas del destino del servicio, o None."""
+        coordenadas = servicio.get('coordenadas')
+        if coordenadas and len(coordenadas) == 2:
+            return float(coordenadas[0]), float(coordenadas[1])
+        lat = servicio.get('latitud', servicio.get('lat'))
+        lng = servicio.get('longitud', servicio.get('lng'))
+        if lat is None or lng is None:
+            return None
+        return float(lat), float(lng)
+
+    @staticmethod
+    def _a_datetime(valor):
+        if isinstance(valor, datetime):
+            return valor
+        if isinstance(valor, str) and valor:
+            try:
+                return datetime.fromisoformat(valor)
+            except ValueError:
+                return None
+        return None
+
+    def _inicio_turno(self, servicios):
+        """Inicio del turno: la ventana más temprana o, si no hay, ahora."""
+        inicios = [
+            self._a_datetime(s.get('ventana_inicio') or s.get('fecha_programada'))
+            for s in servicios
+        ]
+        inicios = [i for i in inicios if i is not None]
+        return min(inicios) if inicios else datetime.now()
+
+    def _parada_desde_servicio(self, servicio, indice, inicio_turno):
+        """Convierte un servicio en una Parada del solver."""
+        lat, lng = self._coordenadas_servicio(servicio)
+
+        def minutos(valor, defecto):
+            fecha = self._a_datetime(valor)
+            if fecha is None:
+                return defecto
+            return max(0.0, (fecha - inicio_turno).total_seconds() / 60)
+
+        return Parada(
+            id=str(indice),
+            lat=lat,
+            lng=lng,
+            demanda=float(servicio.get('peso_kg', servicio.get('demanda', 0)) or 0),
+            ventana_inicio=minutos(servicio.get('ventana_inicio'), 0.0),
+            ventana_fin=minutos(servicio.get('ventana_fin'), float('inf')),
+            tiempo_servicio=float(servicio.get('tiempo_estimado_minutos') or 15),
+        )
+
     def _simular_servicios_generados(self, cantidad=0):
         """Simula la generación de servicios para pruebas con datos realistas.
 
@@ -0,0 +1,390 @@
+"""
+Optimizador de Rutas - Módulo de Logística
+
+Resuelve el problema de ruteo de vehículos con capacidad y ventanas horarias
+(CVRPTW) de forma local, sin servicios externos:
+
+1. Matriz de distancias (haversine) construida desde las coordenadas
+   guardadas y cacheada por conjunto de puntos.
+2. Construcción inicial por ahorros de Clarke-Wright, aceptando solo uniones
+   que respetan capacidad, ventanas horarias y fin de turno. Si hay más rutas
+   que vehículos, se disuelven las más cortas reinsertando sus paradas en las
+   demás; las que no entran quedan sin asignar.
+3. Mejora por búsqueda local (relocate entre rutas y 2-opt dentro de cada
+   ruta) hasta agotar el presupuesto de tiempo o no encontrar mejoras.
+
+Los tiempos se expresan en minutos desde el inicio del turno.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rexus.utils.app_logger import get_logger
+
+logger = get_logger("logistica.route_optimizer")
+
+RADIO_TIERRA_KM = 6371.0
+# Matrices cacheadas (por conjunto de coordenadas)
+MAX_MATRICES_CACHE = 16
+
+
+@dataclass
+class Parada:
+    """Punto a visitar."""
+    id: str
+    lat: float
+    lng: float
+    demanda: float = 0.0
+    ventana_inicio: float = 0.0             # minutos desde inicio de turno
+    ventana_fin: float = float("inf")
+    tiempo_servicio: float = 15.0           # minutos en el lugar
+
+
+@dataclass
+class ConfiguracionFlota:
+    """Parámetros de los vehículos disponibles."""
+    capacidad: float = float("inf")
+    fin_turno: float = 9 * 60               # minutos
+    velocidad_kmh: float = 30.0
+    max_vehiculos: Optional[int] = None
+
+
+@dataclass
+class ResultadoRuteo:
+    """Solución del ruteo."""
+    rutas: List[List[str]]
+    distancia_km: float
+    distancias_ruta_km: List[float]
+    cargas: List[float]
+    no_asignadas: List[str] = field(default_factory=list)
+    iteraciones: int = 0
+    tiempo_segundos: float = 0.0
+    # Hubo paradas sin asignar por falta de vehículos (max_vehiculos)
+    excede_flota: bool = False
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Distancia en km sobre la superficie terrestre."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+_matrices: "OrderedDict[tuple, List[List[float]]]" = OrderedDict()
+
+
+def matriz_distancias(puntos: Sequence[Tuple[float, float]]) -> List[List[float]]:
+    """
+    Matriz simétrica de distancias en km (cacheada por coordenadas).
+
+    Args:
+        puntos: [(lat, lng), ...]; el índice 0 suele ser el depósito
+    """
+    clave = tuple((round(lat, 6), round(lng, 6)) for lat, lng in puntos)
+    matriz = _matrices.get(clave)
+    if matriz is not None:
+        _matrices.move_to_end(clave)
+        return matriz
+
+    n = len(clave)
+    matriz = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        lat_i, lng_i = clave[i]
+        fila = matriz[i]
+        for j in range(i + 1, n):
+            d = haversine_km(lat_i, lng_i, clave[j][0], clave[j][1])
+            fila[j] = d
+            matriz[j][i] = d
+
+    _matrices[clave] = matriz
+    if len(_matrices) > MAX_MATRICES_CACHE:
+        _matrices.popitem(last=False)
+    return matriz
+
+
+class OptimizadorRutas:
+    """Solver CVRPTW: ahorros de Clarke-Wright + búsqueda local."""
+
+    def __init__(self, deposito: Tuple[float, float], paradas: Sequence[Parada],
+                 flota: Optional[ConfiguracionFlota] = None):
+        self.deposito = deposito
+        self.paradas = list(paradas)
+        self.flota = flota or ConfiguracionFlota()
+        self.dist = matriz_distancias([deposito] + [(p.lat, p.lng) for p in self.paradas])
+        factor = 60.0 / max(self.flota.velocidad_kmh, 1e-6)
+        self.tiempo = [[d * factor for d in fila] for fila in self.dist]
+
+        # Vectores indexados por nodo (0 = depósito)
+        self.demanda = [0.0] + [p.demanda for p in self.paradas]
+        self.abre = [0.0] + [p.ventana_inicio for p in self.paradas]
+        self.cierra = [self.flota.fin_turno] + [p.ventana_fin for p in self.paradas]
+        self.servicio = [0.0] + [p.tiempo_servicio for p in self.paradas]
+
+    # ---------------------------------------------------------- evaluación
+
+    def _factible(self, ruta: Sequence[int]) -> bool:
+        """Verifica capacidad, ventanas horarias y regreso antes del fin de turno."""
+        if sum(self.demanda[n] for n in ruta) > self.flota.capacidad:
+            return False
+        t = 0.0
+        anterior = 0
+        tiempo, abre, cierra, servicio = self.tiempo, self.abre, self.cierra, self.servicio
+        for nodo in ruta:
+            t += tiempo[anterior][nodo]
+            if t > cierra[nodo]:
+                return False
+            if t < abre[nodo]:
+                t = abre[nodo]  # espera hasta que abra la ventana
+            t += servicio[nodo]
+            anterior = nodo
+        return t + tiempo[anterior][0] <= self.flota.fin_turno
+
+    def _distancia(self, ruta: Sequence[int]) -> float:
+        if not ruta:
+            return 0.0
+        dist = self.dist
+        total = dist[0][ruta[0]] + dist[ruta[-1]][0]
+        for a, b in zip(ruta, ruta[1:]):
+            total += dist[a][b]
+        return total
+
+    # -------------------------------------------------------- construcción
+
+    def _construir(self) -> Tuple[List[List[int]], List[int]]:
+        """Ahorros de Clarke-Wright con control de factibilidad."""
+        n = len(self.paradas)
+        dist = self.dist
+        rutas: Dict[int, List[int]] = {}
+        ruta_de: Dict[int, int] = {}
+        no_asignadas = []
+
+        for nodo in range(1, n + 1):
+            if self._factible([nodo]):
+                rutas[nodo] = [nodo]
+                ruta_de[nodo] = nodo
+            else:
+                no_asignadas.append(nodo)
+
+        ahorros = []
+        nodos = list(ruta_de)
+        for idx, i in enumerate(nodos):
+            d0i = dist[0][i]
+            fila = dist[i]
+            for j in nodos[idx + 1:]:
+                ahorro = d0i + dist[0][j] - fila[j]
+                if ahorro > 0:
+                    ahorros.append((ahorro, i, j))
+        ahorros.sort(reverse=True)
+
+        for _, i, j in ahorros:
+            ri, rj = ruta_de[i], ruta_de[j]
+            if ri == rj:
+                continue
+            a, b = rutas[ri], rutas[rj]
+            if self.demanda_ruta(a) + self.demanda_ruta(b) > self.flota.capacidad:
+                continue
+
+            # Solo se unen extremos: i al final de una ruta y j al inicio de la otra
+            candidatas = []
+            if a[-1] == i and b[0] == j:
+                candidatas.append(a + b)
+            if b[-1] == j and a[0] == i:
+                candidatas.append(b + a)
+            if a[-1] == i and b[-1] == j:
+                candidatas.append(a + b[::-1])
+            if a[0] == i and b[0] == j:
+                candidatas.append(a[::-1] + b)
+
+            for unida in candidatas:
+                if self._factible(unida):
+                    rutas[ri] = unida
+                    del rutas[rj]
+                    for nodo in b:
+                        ruta_de[nodo] = ri
+                    break
+
+        return list(rutas.values()), no_asignadas
+
+    def demanda_ruta(self, ruta: Sequence[int]) -> float:
+        return sum(self.demanda[n] for n in ruta)
+
+    def _limitar_flota(self, rutas: List[List[int]]) -> List[int]:
+        """
+        Reduce las rutas a max_vehiculos.
+
+        Disuelve la ruta con menos paradas (y menor carga) e inserta cada
+        parada en la posición factible más barata de las rutas restantes.
+
+        Returns:
+            Paradas que no entraron en ningún vehículo
+        """
+        maximo = self.flota.max_vehiculos
+        if maximo is None:
+            return []
+
+        dist = self.dist
+        sobrantes = []
+        while len(rutas) > max(maximo, 0):
+            menor = min(range(len(rutas)),
+                        key=lambda r: (len(rutas[r]), self.demanda_ruta(rutas[r])))
+            disuelta = rutas.pop(menor)
+
+            for nodo in disuelta:
+                mejor = None
+                for r, ruta in enumerate(rutas):
+                    if self.demanda_ruta(ruta) + self.demanda[nodo] > self.flota.capacidad:
+                        continue
+                    for q in range(len(ruta) + 1):
+                        p = ruta[q - 1] if q > 0 else 0
+                        s = ruta[q] if q < len(ruta) else 0
+                        costo = dist[p][nodo] + dist[nodo][s] - dist[p][s]
+                        if mejor is not None and costo >= mejor[0]:
+                            continue
+                        if self._factible(ruta[:q] + [nodo] + ruta[q:]):
+                            mejor = (costo, r, q)
+
+                if mejor is None:
+                    sobrantes.append(nodo)
+                else:
+                    _, r, q = mejor
+                    rutas[r].insert(q, nodo)
+
+        return sobrantes
+
+    # ------------------------------------------------------ búsqueda local
+
+    def _two_opt(self, ruta: List[int], limite: float) -> bool:
+        """2-opt dentro de una ruta (primera mejora)."""
+        dist = self.dist
+        n = len(ruta)
+        if n < 3:
+            return False
+        camino = [0] + ruta + [0]
+        for i in range(1, n):
+            if time.perf_counter() > limite:
+                return False
+            a, b = camino[i - 1], camino[i]
+            for j in range(i + 1, n + 1):
+                c, d = camino[j], camino[j + 1]
+                delta = dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d]
+                if delta < -1e-9:
+                    nueva = ruta[:i - 1] + ruta[i - 1:j][::-1] + ruta[j:]
+                    if self._factible(nueva):
+                        ruta[:] = nueva
+                        return True
+        return False
+
+    def _relocate(self, rutas: List[List[int]], limite: float) -> bool:
+        """Mueve una parada a la mejor posición de otra (o la misma) ruta."""
+        dist = self.dist
+        capacidad = self.flota.capacidad
+        cargas = [self.demanda_ruta(r) for r in rutas]
+
+        for ra, origen in enumerate(rutas):
+            for pos, nodo in enumerate(origen):
+                if time.perf_counter() > limite:
+                    return False
+                prev_n = origen[pos - 1] if pos > 0 else 0
+                next_n = origen[pos + 1] if pos + 1 < len(origen) else 0
+                ganancia = dist[prev_n][nodo] + dist[nodo][next_n] - dist[prev_n][next_n]
+                if ganancia <= 1e-9:
+                    continue
+
+                sin_nodo = origen[:pos] + origen[pos + 1:]
+                mejor = None
+                for rb, destino in enumerate(rutas):
+                    base = sin_nodo if rb == ra else destino
+                    if rb != ra and cargas[rb] + self.demanda[nodo] > capacidad:
+                        continue
+                    for q in range(len(base) + 1):
+                        p = base[q - 1] if q > 0 else 0
+                        s = base[q] if q < len(base) else 0
+                        costo = dist[p][nodo] + dist[nodo][s] - dist[p][s]
+                        delta = costo - ganancia
+                        if delta < -1e-9 and (mejor is None or delta < mejor[0]):
+                            mejor = (delta, rb, q)
+
+                if mejor is None:
+                    continue
+                _, rb, q = mejor
+                if rb == ra:
+                    nueva = sin_nodo[:q] + [nodo] + sin_nodo[q:]
+                    if self._factible(nueva):
+                        rutas[ra] = nueva
+                        return True
+                else:
+                    nueva_destino = rutas[rb][:q] + [nodo] + rutas[rb][q:]
+                    if self._factible(nueva_destino) and self._factible(sin_nodo):
+                        rutas[rb] = nueva_destino
+                        rutas[ra] = sin_nodo
+                        if not sin_nodo:
+                            del rutas[ra]
+                        return True
+        return False
+
+    # ------------------------------------------------------------------ API
+
+    def resolver(self, presupuesto_segundos: float = 2.0) -> ResultadoRuteo:
+        """
+        Construye y mejora la solución dentro del presupuesto de tiempo.
+
+        Args:
+            presupuesto_segundos: Tiempo máximo de cálculo
+        """
+        inicio = time.perf_counter()
+        limite = inicio + presupuesto_segundos
+
+        rutas, no_asignadas = self._construir()
+        sin_vehiculo = self._limitar_flota(rutas)
+        if sin_vehiculo:
+            no_asignadas = sorted(no_asignadas + sin_vehiculo)
+
+        iteraciones = 0
+        mejoro = True
+        while mejoro and time.perf_counter() < limite:
+            mejoro = False
+            for ruta in rutas:
+                while self._two_opt(ruta, limite):
+                    mejoro = True
+                    iteraciones += 1
+            while self._relocate(rutas, limite):
+                mejoro = True
+                iteraciones += 1
+
+        ids = [p.id for p in self.paradas]
+        distancias = [self._distancia(r) for r in rutas]
+        resultado = ResultadoRuteo(
+            rutas=[[ids[n - 1] for n in r] for r in rutas],
+            distancia_km=sum(distancias),
+            distancias_ruta_km=distancias,
+            cargas=[self.demanda_ruta(r) for r in rutas],
+            no_asignadas=[ids[n - 1] for n in no_asignadas],
+            iteraciones=iteraciones,
+            tiempo_segundos=time.perf_counter() - inicio,
+            excede_flota=bool(sin_vehiculo),
+        )
+        logger.debug(
+            f"[RUTEO] {len(self.paradas)} paradas -> {len(rutas)} rutas, "
+            f"{resultado.distancia_km:.1f} km en {resultado.tiempo_segundos:.2f}s"
+        )
+        return resultado
+
+    def distancia_agrupacion_fija(self, tamano_grupo: int = 4) -> float:
+        """Km del método anterior (grupos consecutivos de tamano_grupo paradas)."""
+        nodos = list(range(1, len(self.paradas) + 1))
+        return sum(
+            self._distancia(nodos[i:i + tamano_grupo])
+            for i in range(0, len(nodos), tamano_grupo)
+        )
+
+
+def optimizar_rutas(deposito: Tuple[float, float], paradas: Sequence[Parada],
+                    flota: Optional[ConfiguracionFlota] = None,
+                    presupuesto_segundos: float = 2.0) -> ResultadoRuteo:
+    """Atajo: resuelve el CVRPTW para un depósito y sus paradas."""
+    return OptimizadorRutas(deposito, paradas, flota).resolver(presupuesto_segundos)
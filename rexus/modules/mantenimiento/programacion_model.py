@@ -4,9 +4,11 @@ Modelo de Programación de Mantenimiento
 Maneja la programación automática y calendario de mantenimientos.
 """
 
+import calendar
 from datetime import date, timedelta
 from typing import Dict, List, Optional, Any
 from rexus.utils.security import SecurityUtils
+from rexus.utils.sql_query_manager import SQLQueryManager
 
 
 class ProgramacionMantenimientoModel:
@@ -22,6 +24,7 @@ class ProgramacionMantenimientoModel:
         self.db_connection = db_connection
         self.tabla_programacion = "programacion_mantenimiento"
         self.tabla_plantillas = "plantillas_mantenimiento"
+        self.sql_manager = SQLQueryManager()
         self._crear_tablas_si_no_existen()
 
     def _crear_tablas_si_no_existen(self):
@@ -180,9 +183,20 @@ class ProgramacionMantenimientoModel:
             print(f"[ERROR PROGRAMACION] Error obteniendo programaciones: {e}")
             return self._get_programaciones_demo()
 
-    def generar_mantenimientos_pendientes(self) -> List[Dict]:
+    def generar_mantenimientos_pendientes(self, dias_anticipacion: int = 0,
+                                          hoy: date = None) -> List[Dict]:
         """
-        Genera mantenimientos para programaciones que lo requieren.
+        Genera las órdenes de mantenimiento de todas las programaciones que
+        vencen hasta hoy + dias_anticipacion.
+
+        La recurrencia se expande en la base con una sola sentencia
+        (generar_ordenes_programadas) y luego se avanza fecha_proximo de las
+        programaciones expandidas, ambas en la misma transacción. Es
+        idempotente: volver a ejecutarlo no duplica órdenes.
+
+        Args:
+            dias_anticipacion: Días hacia adelante para los que se generan órdenes
+            hoy: Fecha de referencia (por defecto hoy)
 
         Returns:
             List[Dict]: Lista de mantenimientos generados
@@ -190,61 +204,32 @@ class ProgramacionMantenimientoModel:
         if not self.db_connection:
             return []
 
+        hoy = hoy or date.today()
+        horizonte = hoy + timedelta(days=max(dias_anticipacion, 0))
+
         try:
             cursor = self.db_connection.cursor()
 
-            # Buscar programaciones que necesitan generar mantenimiento
-            sql_pendientes = """
-            SELECT
-                p.id, p.equipo_id, p.tipo_mantenimiento, p.descripcion,
-                p.responsable, p.costo_estimado, p.frecuencia_dias
-            FROM programacion_mantenimiento p
-            WHERE p.activo = 1
-            AND p.fecha_proximo <= GETDATE()
-            AND NOT EXISTS (
-                SELECT 1 FROM mantenimientos m
-                WHERE m.equipo_id = p.equipo_id
-                AND m.estado IN ('PROGRAMADO', 'EN_PROGRESO')
-                AND m.fecha_programada >= p.fecha_proximo
+            cursor.execute(
+                self.sql_manager.get_query('mantenimiento', 'generar_ordenes_programadas'),
+                (hoy, horizonte, (horizonte - hoy).days + 1),
             )
-            """
-
-            cursor.execute(sql_pendientes)
-            pendientes = cursor.fetchall()
-
-            mantenimientos_generados = []
-
-            for programacion in pendientes:
-                prog_id, equipo_id, tipo, descripcion, responsable, costo, frecuencia = programacion
-
-                # Crear mantenimiento
-                sql_crear_mant = """
-                INSERT INTO mantenimientos
-                (equipo_id, tipo, descripcion, fecha_programada, estado,
-                 responsable, costo_estimado, fecha_creacion, programacion_id)
-                VALUES (?, ?, ?, GETDATE(), 'PROGRAMADO', ?, ?, GETDATE(), ?)
-                """
-
-                cursor.execute(sql_crear_mant, (
-                    equipo_id, tipo, descripcion, responsable, costo, prog_id
-                ))
-
-                # Actualizar próxima fecha en programación
-                sql_actualizar_prog = """
-                UPDATE programacion_mantenimiento
-                SET fecha_proximo = DATEADD(day, ?, fecha_proximo),
-                    fecha_actualizacion = GETDATE()
-                WHERE id = ?
-                """
-
-                cursor.execute(sql_actualizar_prog, (frecuencia, prog_id))
+            mantenimientos_generados = [
+                {
+                    'id': fila[0],
+                    'equipo_id': fila[1],
+                    'tipo': fila[2],
+                    'descripcion': fila[3],
+                    'fecha_programada': fila[4],
+                    'programacion_id': fila[5],
+                }
+                for fila in cursor.fetchall()
+            ]
 
-                mantenimientos_generados.append({
-                    'equipo_id': equipo_id,
-                    'tipo': tipo,
-                    'descripcion': descripcion,
-                    'programacion_id': prog_id
-                })
+            cursor.execute(
+                self.sql_manager.get_query('mantenimiento', 'avanzar_programaciones'),
+                (horizonte, horizonte),
+            )
 
             self.db_connection.commit()
             print(f"[PROGRAMACION] Generados {len(mantenimientos_generados)} mantenimientos")
@@ -260,9 +245,12 @@ class ProgramacionMantenimientoModel:
         """
         Obtiene calendario de mantenimientos para un rango de fechas.
 
+        Incluye las órdenes del rango y las ocurrencias futuras de cada
+        programación activa (es_programacion=True).
+
         Args:
             fecha_inicio: Fecha inicio del calendario
-            fecha_fin: Fecha fin del calendario
+            fecha_fin: Fecha fin del calendario (inclusive)
 
         Returns:
             List[Dict]: Lista de eventos del calendario
@@ -272,43 +260,10 @@ class ProgramacionMantenimientoModel:
 
         try:
             cursor = self.db_connection.cursor()
-
-            sql_calendario = """
-            SELECT
-                m.id, m.equipo_id, e.nombre as equipo_nombre,
-                m.tipo, m.descripcion, m.fecha_programada, m.estado,
-                m.responsable, m.costo_estimado,
-                p.frecuencia_dias
-            FROM mantenimientos m
-            INNER JOIN equipos e ON m.equipo_id = e.id
-            LEFT JOIN programacion_mantenimiento p ON m.programacion_id = p.id
-            WHERE m.fecha_programada BETWEEN ? AND ?
-
-            UNION ALL
-
-            SELECT
-                NULL as id, p.equipo_id, e.nombre as equipo_nombre,
-                p.tipo_mantenimiento as tipo, p.descripcion, p.fecha_proximo as fecha_programada,
-                'PROGRAMADO' as estado, p.responsable, p.costo_estimado,
-                p.frecuencia_dias
-            FROM programacion_mantenimiento p
-            INNER JOIN equipos e ON p.equipo_id = e.id
-            WHERE p.activo = 1
-            AND p.fecha_proximo BETWEEN ? AND ?
-            AND NOT EXISTS (
-                SELECT 1 FROM mantenimientos m
-                WHERE m.equipo_id = p.equipo_id
-                AND m.fecha_programada = p.fecha_proximo
+            cursor.execute(
+                self.sql_manager.get_query('mantenimiento', 'calendario_mantenimiento'),
+                (fecha_inicio, fecha_fin, max((fecha_fin - fecha_inicio).days + 1, 1)),
             )
-
-            ORDER BY fecha_programada ASC
-            """
-
-            cursor.execute(sql_calendario,
-(fecha_inicio,
-                fecha_fin,
-                fecha_inicio,
-                fecha_fin))
             rows = cursor.fetchall()
 
             columns = [desc[0] for desc in cursor.description]
@@ -332,6 +287,16 @@ class ProgramacionMantenimientoModel:
             print(f"[ERROR PROGRAMACION] Error obteniendo calendario: {e}")
             return self._get_calendario_demo(fecha_inicio, fecha_fin)
 
+    def obtener_calendario_mes(self, anio: int, mes: int) -> List[Dict]:
+        """Calendario de un mes completo."""
+        ultimo_dia = calendar.monthrange(anio, mes)[1]
+        return self.obtener_calendario_mantenimiento(date(anio, mes, 1), date(anio, mes, ultimo_dia))
+
+    def obtener_calendario_semana(self, fecha: date) -> List[Dict]:
+        """Calendario de la semana (lunes a domingo) que contiene la fecha."""
+        lunes = fecha - timedelta(days=fecha.weekday())
+        return self.obtener_calendario_mantenimiento(lunes, lunes + timedelta(days=6))
+
     def crear_plantilla_mantenimiento(
         self,
         nombre: str,
@@ -12,6 +12,14 @@ from datetime import datetime, timedelta
 from rexus.utils.app_logger import get_logger
 
 from rexus.core.auth_manager import admin_required, auth_required
+from rexus.core.event_bus import (
+    EVENTO_NOTIFICACION_CREADA,
+    EVENTO_NOTIFICACION_LEIDA,
+    EVENTO_NOTIFICACIONES_INVALIDADAS,
+    Evento,
+    crear_despachador_qt,
+    get_event_bus,
+)
 from rexus.modules.notificaciones.model import NotificacionesModel, TipoNotificacion
 
 # Configurar logger
@@ -34,8 +42,41 @@ class NotificacionesController:
         self.view = view
         self.usuario_actual = usuario_actual or {}
 
+        # La vista recibe los cambios por el bus en lugar de consultar la BD;
+        # los eventos de dominio se persisten desde el arranque (main/app.py)
+        bus = get_event_bus()
+        despachador = crear_despachador_qt()
+        self._suscripciones = [
+            bus.suscribir(tipo, self._al_cambiar_notificaciones, despachador)
+            for tipo in (EVENTO_NOTIFICACION_CREADA, EVENTO_NOTIFICACION_LEIDA,
+                         EVENTO_NOTIFICACIONES_INVALIDADAS)
+        ]
+
         logger.info("OK [NOTIFICACIONES CONTROLLER] Inicializado correctamente")
 
+    def _al_cambiar_notificaciones(self, evento: Evento):
+        """Empuja a la vista los cambios que afectan al usuario actual."""
+        usuario_id = self.usuario_actual.get('id')
+        if not usuario_id or not self.view:
+            return
+
+        if evento.tipo == EVENTO_NOTIFICACION_LEIDA and \
+                evento.datos.get('usuario_id') != usuario_id:
+            return
+        destino = evento.datos.get('usuario_destino')
+        if evento.tipo == EVENTO_NOTIFICACION_CREADA and destino not in (None, usuario_id):
+            return
+
+        if evento.tipo != EVENTO_NOTIFICACION_LEIDA:
+            self.obtener_notificaciones_usuario()
+        self.actualizar_contador_no_leidas()
+
+    def desconectar_eventos(self):
+        """Cancela las suscripciones al bus (al cerrar la vista)."""
+        for suscripcion in self._suscripciones:
+            suscripcion.cancelar()
+        self._suscripciones = []
+
     @auth_required
     def obtener_notificaciones_usuario(self, solo_no_leidas: bool = False,
                                      limite: int = 50) -> List[Dict]:
@@ -90,9 +131,8 @@ class NotificacionesController:
             resultado = self.model.marcar_como_leida(notificacion_id, usuario_id)
 
             if resultado and self.view:
+                # El contador llega por el evento notificaciones.leida
                 self.view.actualizar_estado_notificacion(notificacion_id, 'leida')
-                # Actualizar contador de no leídas
-                self.actualizar_contador_no_leidas()
 
             return resultado
 
@@ -176,9 +216,8 @@ class NotificacionesController:
 
             if resultado:
                 if self.view:
+                    # La lista y el contador se refrescan con notificaciones.creada
                     self.view.mostrar_mensaje("Notificación creada exitosamente", "success")
-                    # Refrescar la lista si está mostrando notificaciones
-                    self.obtener_notificaciones_usuario()
 
             return resultado
 
@@ -229,13 +268,7 @@ class NotificacionesController:
             bool: True si se procesó exitosamente
         """
         try:
-            resultado = self.model.crear_notificacion_sistema(evento, modulo, detalles)
-
-            if resultado and self.view:
-                # Actualizar vista si está visible
-                self.actualizar_contador_no_leidas()
-
-            return resultado
+            return self.model.crear_notificacion_sistema(evento, modulo, detalles)
 
         except (AttributeError, RuntimeError, ConnectionError, ValueError) as e:
             logger.error(f"[ERROR NOTIFICACIONES CONTROLLER] Error manejando evento: {str(e)}")
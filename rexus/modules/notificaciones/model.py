@@ -8,11 +8,26 @@ Incluye utilidades de seguridad para prevenir SQL injection y XSS.
 import datetime
 import json
 import sys
+import threading
+import time
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from enum import Enum
 
 from rexus.core.auth_manager import admin_required, auth_required
+from rexus.core.event_bus import (
+    EVENTO_LOTE_POR_VENCER,
+    EVENTO_NOTIFICACION_CREADA,
+    EVENTO_NOTIFICACION_LEIDA,
+    EVENTO_NOTIFICACIONES_INVALIDADAS,
+    EVENTO_ORDEN_COMPRA_APROBADA,
+    EVENTO_PEDIDO_APROBADO,
+    EVENTO_RESERVA_VENCIDA,
+    EVENTO_STOCK_BAJO_MINIMO,
+    Evento,
+    get_event_bus,
+)
 from rexus.utils.unified_sanitizer import unified_sanitizer, sanitize_string
 
 # Sistema de cache para optimizar consultas de notificaciones
@@ -66,6 +81,156 @@ class PrioridadNotificacion(Enum):
     CRITICA = 4
 
 
+# Segundos tras los cuales el contador se recalcula desde la BD (cubre
+# cambios hechos desde otras máquinas, que no llegan por el relay local)
+MAX_EDAD_CONTADOR = 300
+
+# Eventos de dominio que generan notificaciones: (titulo, mensaje, tipo, prioridad, modulo)
+EVENTOS_DOMINIO = {
+    EVENTO_STOCK_BAJO_MINIMO: (
+        'Stock bajo mínimo',
+        'El producto {codigo} quedó con {stock_actual} unidades (mínimo {stock_minimo})',
+        'warning', 3, 'inventario',
+    ),
+    EVENTO_RESERVA_VENCIDA: (
+        'Reserva vencida',
+        'La reserva {reserva_id} del producto {producto_id} venció',
+        'warning', 2, 'inventario',
+    ),
+    EVENTO_LOTE_POR_VENCER: (
+        'Lote por vencer',
+        'El lote {numero_lote} del producto {producto_id} vence el {fecha_vencimiento} ({cantidad} unidades)',
+        'warning', 2, 'inventario',
+    ),
+    EVENTO_PEDIDO_APROBADO: (
+        'Pedido aprobado',
+        'El pedido {pedido_id} fue aprobado',
+        'success', 2, 'pedidos',
+    ),
+    EVENTO_ORDEN_COMPRA_APROBADA: (
+        'Orden de compra aprobada',
+        'La orden de compra {orden_id} fue aprobada por {usuario_aprobacion}',
+        'success', 2, 'compras',
+    ),
+}
+
+
+class ContadorNoLeidas:
+    """
+    Contador de notificaciones no leídas por usuario.
+
+    Se inicializa con un COUNT por usuario la primera vez y luego se mantiene
+    con los eventos notificaciones.creada / notificaciones.leida del bus,
+    incluidos los que llegan de otros procesos por el relay local.
+    """
+
+    def __init__(self, bus=None, max_edad: float = MAX_EDAD_CONTADOR):
+        self.max_edad = max_edad
+        self._valores: Dict[int, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        bus = bus or get_event_bus()
+        bus.suscribir(EVENTO_NOTIFICACION_CREADA, self._al_crear)
+        bus.suscribir(EVENTO_NOTIFICACION_LEIDA, self._al_leer)
+        bus.suscribir(EVENTO_NOTIFICACIONES_INVALIDADAS, self._al_invalidar)
+
+    def obtener(self, usuario_id: int, recontar: Callable[[], int]) -> int:
+        """Valor actual; recontar() se usa si no hay valor o está vencido."""
+        with self._lock:
+            actual = self._valores.get(usuario_id)
+        if actual is not None and time.monotonic() - actual[1] < self.max_edad:
+            return actual[0]
+        valor = recontar()
+        with self._lock:
+            self._valores[usuario_id] = (valor, time.monotonic())
+        return valor
+
+    def invalidar(self, usuario_id: Optional[int] = None):
+        with self._lock:
+            if usuario_id is None:
+                self._valores.clear()
+            else:
+                self._valores.pop(usuario_id, None)
+
+    def _ajustar(self, usuario_id: int, delta: int):
+        actual = self._valores.get(usuario_id)
+        if actual is not None:
+            self._valores[usuario_id] = (max(0, actual[0] + delta), actual[1])
+
+    def _al_crear(self, evento: Evento):
+        destino = evento.datos.get('usuario_destino')
+        with self._lock:
+            if destino is None:
+                # Notificación general: cuenta para todos los usuarios conocidos
+                for usuario_id in list(self._valores):
+                    self._ajustar(usuario_id, 1)
+            else:
+                self._ajustar(int(destino), 1)
+        if evento.remoto:
+            _invalidar_cache_consultas()
+
+    def _al_leer(self, evento: Evento):
+        with self._lock:
+            self._ajustar(int(evento.datos['usuario_id']), -1)
+        if evento.remoto:
+            _invalidar_cache_consultas()
+
+    def _al_invalidar(self, evento: Evento):
+        self.invalidar()
+        if evento.remoto:
+            _invalidar_cache_consultas()
+
+
+def _invalidar_cache_consultas():
+    invalidate_cache('obtener_notificaciones_usuario')
+
+
+_contador_no_leidas: Optional[ContadorNoLeidas] = None
+_contador_lock = threading.Lock()
+
+
+def get_contador_no_leidas() -> ContadorNoLeidas:
+    """Contador global de no leídas (suscrito al bus de eventos)."""
+    global _contador_no_leidas
+    if _contador_no_leidas is None:
+        with _contador_lock:
+            if _contador_no_leidas is None:
+                _contador_no_leidas = ContadorNoLeidas()
+    return _contador_no_leidas
+
+
+_suscripciones_dominio: List = []
+
+
+def conectar_eventos_dominio(model: "NotificacionesModel") -> None:
+    """
+    Convierte los eventos de dominio publicados en este proceso en
+    notificaciones persistidas. Los eventos remotos se ignoran: ya los
+    persistió el proceso que los publicó.
+    """
+    with _contador_lock:
+        for suscripcion in _suscripciones_dominio:
+            suscripcion.cancelar()
+        _suscripciones_dominio.clear()
+
+        def notificar(evento: Evento):
+            if evento.remoto:
+                return
+            titulo, mensaje, tipo, prioridad, modulo = EVENTOS_DOMINIO[evento.tipo]
+            model.crear_notificacion(
+                titulo=titulo,
+                mensaje=mensaje.format_map(defaultdict(lambda: '?', evento.datos)),
+                tipo=tipo,
+                prioridad=prioridad,
+                usuario_destino=evento.datos.get('usuario_destino'),
+                modulo_origen=modulo,
+                metadata=evento.datos,
+            )
+
+        bus = get_event_bus()
+        for tipo_evento in EVENTOS_DOMINIO:
+            _suscripciones_dominio.append(bus.suscribir(tipo_evento, notificar))
+
+
 class NotificacionesModel:
     """Modelo para gestionar notificaciones del sistema."""
 
@@ -208,6 +373,15 @@ mensaje,
             # Invalidar cache de notificaciones después de crear una nueva
             self._invalidar_cache_notificaciones()
 
+            get_event_bus().publicar(EVENTO_NOTIFICACION_CREADA, {
+                'notificacion_id': notificacion_id,
+                'titulo': titulo,
+                'tipo': tipo,
+                'prioridad': prioridad,
+                'usuario_destino': usuario_destino,
+                'modulo_origen': modulo_origen,
+            })
+
             print(f"OK [NOTIFICACIONES] Notificación creada: ID {notificacion_id}")
             return True
 
@@ -321,6 +495,14 @@ mensaje,
         try:
             cursor = self.db_connection.cursor()
 
+            cursor.execute("""
+                SELECT leida FROM usuarios_notificaciones
+                WHERE notificacion_id = ? AND usuario_id = ?
+            """, (notificacion_id, usuario_id))
+            fila = cursor.fetchone()
+            if fila and fila[0]:
+                return True  # Ya estaba leída: el contador no cambia
+
             # Actualizar o insertar relación usuario-notificación
             cursor.execute("""
                 IF EXISTS (SELECT 1 FROM usuarios_notificaciones
@@ -340,6 +522,11 @@ mensaje,
             # Invalidar cache después de marcar como leída
             self._invalidar_cache_notificaciones()
 
+            get_event_bus().publicar(EVENTO_NOTIFICACION_LEIDA, {
+                'notificacion_id': notificacion_id,
+                'usuario_id': usuario_id,
+            })
+
             return True
 
         except Exception as e:
@@ -348,12 +535,14 @@ mensaje,
                 self.db_connection.rollback()
             return False
 
-    @cached_query(ttl=30)  # Cache por 30 segundos - contador debe actualizarse frecuentemente
     @auth_required
     def contar_no_leidas(self, usuario_id: int) -> int:
         """
         Cuenta las notificaciones no leídas de un usuario.
 
+        El valor sale del contador incremental; la BD solo se consulta la
+        primera vez o cuando el contador vence (ver MAX_EDAD_CONTADOR).
+
         Args:
             usuario_id: ID del usuario
 
@@ -363,6 +552,12 @@ mensaje,
         if not self.db_connection:
             return 1  # Demo: siempre hay una notificación
 
+        return get_contador_no_leidas().obtener(
+            usuario_id, lambda: self._contar_no_leidas_bd(usuario_id)
+        )
+
+    def _contar_no_leidas_bd(self, usuario_id: int) -> int:
+        """COUNT de no leídas en la BD (inicializa el contador incremental)."""
         try:
             cursor = self.db_connection.cursor()
 
@@ -412,6 +607,8 @@ mensaje,
 
             # Invalidar cache después de eliminar
             self._invalidar_cache_notificaciones()
+            get_event_bus().publicar(EVENTO_NOTIFICACIONES_INVALIDADAS,
+                                     {'notificacion_id': notificacion_id})
 
             return True
 
@@ -489,8 +686,6 @@ mensaje,
         try:
             # Invalidar cache de obtención de notificaciones
             invalidate_cache('obtener_notificaciones_usuario')
-            # Invalidar cache de conteo de no leídas
-            invalidate_cache('contar_no_leidas')
             print("[NOTIFICACIONES] Cache invalidado después de cambios")
         except Exception as e:
             print(f"[WARNING NOTIFICACIONES] Error invalidando cache: {e}")
@@ -524,6 +719,8 @@ mensaje,
 
             if affected_rows > 0:
                 print(f"[NOTIFICACIONES] {affected_rows} notificaciones expiradas limpiadas")
+                get_event_bus().publicar(EVENTO_NOTIFICACIONES_INVALIDADAS,
+                                         {'expiradas': affected_rows})
 
             return affected_rows
 
@@ -29,8 +29,8 @@ Muestra las obras en un cronograma visual para facilitar la planificación y seg
 import datetime
 from typing import Any, Dict, List
 
-from PyQt6.QtCore import QDate, QRect, Qt, pyqtSignal
-from PyQt6.QtGui import QBrush, QColor, QFont, QPainter, QPen
+from PyQt6.QtCore import QDate, QPoint, QRect, Qt, pyqtSignal
+from PyQt6.QtGui import QBrush, QColor, QFont, QPainter, QPen, QPixmap
 from PyQt6.QtWidgets import (
     QComboBox,
     QDateEdit,
@@ -425,10 +425,29 @@ class CronogramaObrasView(QWidget):
 
 
 class CronogramaWidget(QWidget):
-    """Widget personalizado para dibujar el cronograma."""
+    """
+    Widget personalizado para dibujar el cronograma.
+
+    Solo se dibujan las filas y fechas que intersectan el área expuesta. La
+    grilla de tiempo se cachea en QPixmap por versión de escala/rango y ancho,
+    y la geometría de las barras se precalcula al cambiar los datos o el ancho.
+    """
 
     obra_clickeada = pyqtSignal(dict)
 
+    # Alto de la cabecera con las etiquetas de fechas
+    MARGEN_SUPERIOR = 30
+    # Alto de la franja de grilla cacheada (se repite verticalmente)
+    ALTO_TILE_GRILLA = 256
+
+    COLORES_ESTADO = {
+        "PLANIFICACION": QColor(241, 196, 15),  # Amarillo
+        "EN_PROCESO": QColor(46, 204, 113),  # Verde
+        "PAUSADA": QColor(231, 76, 60),  # Rojo
+        "FINALIZADA": QColor(52, 152, 219),  # Azul
+        "CANCELADA": QColor(149, 165, 166),  # Gris
+    }
+
     def __init__(self):
         super().__init__()
         self.obras = []
@@ -439,8 +458,31 @@ class CronogramaWidget(QWidget):
         self.ancho_etiqueta = 200
         self.obra_seleccionada = None
 
+        # Datos precalculados por obra: (obra, dia_inicio, dia_fin | None)
+        self._filas: List[tuple] = []
+        # Geometría en píxeles: (rect_etiqueta, rect_barra | None, color) por fila
+        self._geometria: List[tuple] = []
+        self._geometria_ancho = -1
+        # Pixmaps de la grilla por (versión, ancho, ratio); la versión cambia
+        # solo cuando cambian la escala o el rango de fechas
+        self._cache_grilla: Dict[tuple, tuple] = {}
+        self._parametros_grilla = None
+        self._version_grilla = 0
+
+        # Recursos de dibujo reutilizados en cada paint
+        self._fuente_codigo = QFont("Arial", 10, QFont.Weight.Bold)
+        self._fuente_nombre = QFont("Arial", 9)
+        self._fuente_estado = QFont("Arial", 8, QFont.Weight.Bold)
+        self._fuente_hoy = QFont("Arial", 9, QFont.Weight.Bold)
+        self._color_fondo = QColor(255, 255, 255)
+        self._color_etiqueta = QColor(236, 240, 241)
+        self._pen_etiqueta = QPen(QColor(44, 62, 80), 1)
+        self._pen_texto_barra = QPen(QColor(255, 255, 255), 1)
+        self._color_defecto = QColor(189, 195, 199)
+
         self.setMinimumSize(800, 400)
         self.setMouseTracking(True)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
 
     def actualizar_cronograma(
         self,
@@ -455,32 +497,95 @@ class CronogramaWidget(QWidget):
         self.fecha_fin = fecha_fin
         self.escala = escala
 
+        self._filas = [self._preparar_fila(obra) for obra in obras]
+        self._geometria_ancho = -1
+        # Recargar o filtrar obras no invalida la grilla: solo depende de
+        # la escala y el rango
+        parametros = (escala, fecha_inicio, fecha_fin)
+        if parametros != self._parametros_grilla:
+            self._parametros_grilla = parametros
+            self._version_grilla += 1
+
         # Calcular altura necesaria
         altura_necesaria = len(obras) * self.altura_fila + 100
         self.setMinimumHeight(altura_necesaria)
 
         self.update()
 
+    def _preparar_fila(self, obra: Dict[str, Any]) -> tuple:
+        """Convierte las fechas de la obra a días desde el inicio del rango."""
+        fecha_inicio = obra.get("fecha_inicio")
+        fecha_fin = obra.get("fecha_fin_estimada")
+
+        # Convertir fechas
+        if isinstance(fecha_inicio, str):
+            fecha_inicio = datetime.datetime.strptime(fecha_inicio, "%Y-%m-%d").date()
+        if isinstance(fecha_fin, str):
+            fecha_fin = datetime.datetime.strptime(fecha_fin, "%Y-%m-%d").date()
+
+        if not fecha_inicio:
+            return obra, None, None
+
+        dia_inicio = (fecha_inicio - self.fecha_inicio).days
+        dia_fin = (fecha_fin - self.fecha_inicio).days if fecha_fin else None
+        return obra, dia_inicio, dia_fin
+
+    def _ancho_cronograma(self) -> int:
+        return self.width() - self.ancho_etiqueta - 20
+
+    def _dia_a_x(self, dias: float, dias_totales: int, ancho: int) -> int:
+        return self.ancho_etiqueta + int((dias / dias_totales) * ancho)
+
+    def _asegurar_geometria(self):
+        """Recalcula rectángulos de etiquetas y barras si cambió el ancho."""
+        if self._geometria_ancho == self.width():
+            return
+
+        self._geometria = []
+        self._geometria_ancho = self.width()
+        ancho_cronograma = self._ancho_cronograma()
+        dias_totales = (self.fecha_fin - self.fecha_inicio).days
+
+        y = self.MARGEN_SUPERIOR
+        for obra, dia_inicio, dia_fin in self._filas:
+            etiqueta_rect = QRect(5, y, self.ancho_etiqueta - 10, self.altura_fila - 5)
+            barra_rect = None
+            if dia_inicio is not None and dias_totales > 0:
+                x_barra = self._dia_a_x(dia_inicio, dias_totales, ancho_cronograma)
+                if dia_fin is not None:
+                    ancho_barra = int(((dia_fin - dia_inicio) / dias_totales) * ancho_cronograma)
+                else:
+                    ancho_barra = 50  # Barra por defecto si no hay fecha fin
+
+                # Asegurar que la barra sea visible
+                ancho_barra = max(ancho_barra, 3)
+                barra_rect = QRect(x_barra, y + 5, ancho_barra, self.altura_fila - 15)
+
+            color = self.COLORES_ESTADO.get(obra.get("estado", "PLANIFICACION"), self._color_defecto)
+            self._geometria.append((etiqueta_rect, barra_rect, color))
+            y += self.altura_fila
+
     def paintEvent(self, event):
-        """Dibuja el cronograma."""
+        """Dibuja solo la región expuesta del cronograma."""
+        expuesto = event.rect()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
         # Limpiar fondo
-        painter.fillRect(self.rect(), QColor(255, 255, 255))
+        painter.fillRect(expuesto, self._color_fondo)
 
         if not self.obras:
             self.dibujar_mensaje_vacio(painter)
             return
 
         # Dibujar líneas de tiempo
-        self.dibujar_lineas_tiempo(painter)
+        self.dibujar_lineas_tiempo(painter, expuesto)
 
         # Dibujar obras
-        self.dibujar_obras(painter)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.dibujar_obras(painter, expuesto)
 
         # Dibujar línea de hoy
-        self.dibujar_linea_hoy(painter)
+        self.dibujar_linea_hoy(painter, expuesto)
 
     def dibujar_mensaje_vacio(self, painter: QPainter):
         """Dibuja un mensaje cuando no hay obras."""
@@ -491,49 +596,94 @@ class CronogramaWidget(QWidget):
             rect, Qt.AlignmentFlag.AlignCenter, "No hay obras para mostrar"
         )
 
-    def dibujar_lineas_tiempo(self, painter: QPainter):
-        """Dibuja las líneas de tiempo del cronograma."""
+    def dibujar_lineas_tiempo(self, painter: QPainter, expuesto: QRect):
+        """Dibuja la grilla de tiempo desde los pixmaps cacheados."""
+        dias_totales = (self.fecha_fin - self.fecha_inicio).days
+        if dias_totales <= 0:
+            return
+
+        cabecera, franja = self._obtener_grilla()
+
+        # Cabecera con etiquetas de fechas
+        if expuesto.top() < cabecera.height():
+            painter.drawPixmap(0, 0, cabecera)
+
+        # La franja de líneas verticales se repite hacia abajo
+        top = max(expuesto.top(), self.MARGEN_SUPERIOR)
+        if expuesto.bottom() >= top:
+            painter.drawTiledPixmap(
+                QRect(expuesto.left(), top, expuesto.width(), expuesto.bottom() - top + 1),
+                franja,
+                QPoint(expuesto.left(), 0),
+            )
+
+    def _obtener_grilla(self) -> tuple:
+        """Devuelve (cabecera, franja) de la grilla, renderizándolas si hace falta."""
+        clave = (self._version_grilla, self.width(), self.devicePixelRatioF())
+        grilla = self._cache_grilla.get(clave)
+        if grilla is None:
+            # Descartar versiones anteriores y anchos viejos tras redimensionar
+            self._cache_grilla = {
+                c: g for c, g in self._cache_grilla.items()
+                if c[0] == self._version_grilla
+            }
+            if len(self._cache_grilla) >= 8:
+                self._cache_grilla.clear()
+            grilla = (
+                self._renderizar_grilla(self.MARGEN_SUPERIOR, con_etiquetas=True),
+                self._renderizar_grilla(self.ALTO_TILE_GRILLA, con_etiquetas=False),
+            )
+            self._cache_grilla[clave] = grilla
+        return grilla
+
+    def _renderizar_grilla(self, alto: int, con_etiquetas: bool) -> QPixmap:
+        """Dibuja las líneas de la escala actual en un pixmap."""
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int(alto * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(self._color_fondo)
+
+        painter = QPainter(pixmap)
         painter.setPen(QPen(QColor(189, 195, 199), 1))
 
         # Área de cronograma
         x_inicio = self.ancho_etiqueta
-        ancho_cronograma = self.width() - x_inicio - 20
-
-        # Calcular posiciones de las líneas de tiempo
-        dias_totales = (self.fecha_fin - self.fecha_inicio).days
-        if dias_totales <= 0:
-            return
+        ancho_cronograma = self._ancho_cronograma()
 
         # Dibujar líneas verticales según la escala
         if self.escala == "mensual":
-            self.dibujar_lineas_mensuales(painter, x_inicio, ancho_cronograma)
+            self.dibujar_lineas_mensuales(painter, x_inicio, ancho_cronograma, alto, con_etiquetas)
         elif self.escala == "semanal":
-            self.dibujar_lineas_semanales(painter, x_inicio, ancho_cronograma)
+            self.dibujar_lineas_semanales(painter, x_inicio, ancho_cronograma, alto, con_etiquetas)
         else:  # diario
-            self.dibujar_lineas_diarias(painter, x_inicio, ancho_cronograma)
+            self.dibujar_lineas_diarias(painter, x_inicio, ancho_cronograma, alto, con_etiquetas)
+
+        painter.end()
+        return pixmap
 
     def dibujar_lineas_mensuales(self,
 painter: QPainter,
         x_inicio: int,
-        ancho: int):
+        ancho: int,
+        alto: int,
+        con_etiquetas: bool = True):
         """Dibuja líneas mensuales."""
         painter.setPen(QPen(QColor(127, 140, 141), 1))
         painter.setFont(QFont("Arial", 10))
 
         fecha_actual = self.fecha_inicio.replace(day=1)  # Primer día del mes
+        dias_totales = (self.fecha_fin - self.fecha_inicio).days
 
         while fecha_actual <= self.fecha_fin:
             # Calcular posición X
             dias_desde_inicio = (fecha_actual - self.fecha_inicio).days
-            dias_totales = (self.fecha_fin - self.fecha_inicio).days
+            x = x_inicio + int((dias_desde_inicio / dias_totales) * ancho)
 
-            if dias_totales > 0:
-                x = x_inicio + int((dias_desde_inicio / dias_totales) * ancho)
-
-                # Dibujar línea vertical
-                painter.drawLine(x, 0, x, self.height())
+            # Dibujar línea vertical
+            painter.drawLine(x, 0, x, alto)
 
-                # Dibujar etiqueta de mes
+            # Dibujar etiqueta de mes
+            if con_etiquetas:
                 mes_texto = fecha_actual.strftime("%b %Y")
                 painter.drawText(x + 5, 15, mes_texto)
 
@@ -546,7 +696,9 @@ painter: QPainter,
     def dibujar_lineas_semanales(self,
 painter: QPainter,
         x_inicio: int,
-        ancho: int):
+        ancho: int,
+        alto: int,
+        con_etiquetas: bool = True):
         """Dibuja líneas semanales."""
         painter.setPen(QPen(QColor(127, 140, 141), 1))
         painter.setFont(QFont("Arial", 9))
@@ -556,16 +708,16 @@ painter: QPainter,
         while fecha_actual.weekday() != 0:  # 0 = Lunes
             fecha_actual += datetime.timedelta(days=1)
 
+        dias_totales = (self.fecha_fin - self.fecha_inicio).days
+
         while fecha_actual <= self.fecha_fin:
             dias_desde_inicio = (fecha_actual - self.fecha_inicio).days
-            dias_totales = (self.fecha_fin - self.fecha_inicio).days
-
-            if dias_totales > 0:
-                x = x_inicio + int((dias_desde_inicio / dias_totales) * ancho)
+            x = x_inicio + int((dias_desde_inicio / dias_totales) * ancho)
 
-                painter.drawLine(x, 0, x, self.height())
+            painter.drawLine(x, 0, x, alto)
 
-                # Etiqueta de semana
+            # Etiqueta de semana
+            if con_etiquetas:
                 semana_texto = fecha_actual.strftime("%d/%m")
                 painter.drawText(x + 2, 15, semana_texto)
 
@@ -574,7 +726,9 @@ painter: QPainter,
     def dibujar_lineas_diarias(self,
 painter: QPainter,
         x_inicio: int,
-        ancho: int):
+        ancho: int,
+        alto: int,
+        con_etiquetas: bool = True):
         """Dibuja líneas diarias."""
         painter.setPen(QPen(QColor(189, 195, 199), 1))
         painter.setFont(QFont("Arial", 8))
@@ -589,135 +743,82 @@ painter: QPainter,
             fecha_actual = self.fecha_inicio + datetime.timedelta(days=i)
             x = x_inicio + int((i / dias_totales) * ancho)
 
-            painter.drawLine(x, 0, x, self.height())
+            painter.drawLine(x, 0, x, alto)
 
-            if i % (intervalo * 7) == 0:  # Etiqueta cada semana
+            if con_etiquetas and i % (intervalo * 7) == 0:  # Etiqueta cada semana
                 dia_texto = fecha_actual.strftime("%d/%m")
                 painter.drawText(x + 2, 15, dia_texto)
 
-    def dibujar_obras(self, painter: QPainter):
-        """Dibuja las barras de las obras."""
-        y_actual = 30
-
-        for obra in self.obras:
-            self.dibujar_obra(painter, obra, y_actual)
-            y_actual += self.altura_fila
+    def _filas_visibles(self, expuesto: QRect) -> range:
+        """Índices de las filas que intersectan el área expuesta."""
+        primera = max(0, (expuesto.top() - self.MARGEN_SUPERIOR) // self.altura_fila)
+        ultima = min(len(self._filas) - 1,
+                     (expuesto.bottom() - self.MARGEN_SUPERIOR) // self.altura_fila)
+        return range(primera, ultima + 1)
 
-    def dibujar_obra(self, painter: QPainter, obra: Dict[str, Any], y: int):
-        """Dibuja una obra individual."""
-        # Datos de la obra
-        codigo = obra.get("codigo", "Sin código")
-        nombre = obra.get("nombre", "Sin nombre")
-        obra.get("estado", "PLANIFICACION")
-        fecha_inicio = obra.get("fecha_inicio")
-        fecha_fin = obra.get("fecha_fin_estimada")
+    def dibujar_obras(self, painter: QPainter, expuesto: QRect):
+        """Dibuja las barras de las obras visibles."""
+        self._asegurar_geometria()
 
-        # Convertir fechas
-        if isinstance(fecha_inicio, str):
-            fecha_inicio = datetime.datetime.strptime(fecha_inicio, "%Y-%m-%d").date()
-        if isinstance(fecha_fin, str):
-            fecha_fin = datetime.datetime.strptime(fecha_fin, "%Y-%m-%d").date()
+        for indice in self._filas_visibles(expuesto):
+            self.dibujar_obra(painter, indice, expuesto)
 
-        if not fecha_inicio:
+    def dibujar_obra(self, painter: QPainter, indice: int, expuesto: QRect):
+        """Dibuja una obra individual."""
+        obra, dia_inicio, _ = self._filas[indice]
+        if dia_inicio is None:
             return
 
+        etiqueta_rect, barra_rect, color = self._geometria[indice]
+
         # Dibujar etiqueta de obra
-        etiqueta_rect = QRect(5,
-y,
-            self.ancho_etiqueta - 10,
-            self.altura_fila - 5)
-        painter.fillRect(etiqueta_rect, QColor(236, 240, 241))
-        painter.setPen(QPen(QColor(44, 62, 80), 1))
-        painter.drawRect(etiqueta_rect)
-
-        # Texto de la etiqueta
-        painter.setFont(QFont("Arial", 10, QFont.Weight.Bold))
-        painter.drawText(
-            etiqueta_rect.adjusted(5,
-2,
-                -5,
-                -2),
+        if etiqueta_rect.intersects(expuesto):
+            painter.fillRect(etiqueta_rect, self._color_etiqueta)
+            painter.setPen(self._pen_etiqueta)
+            painter.drawRect(etiqueta_rect)
+
+            # Texto de la etiqueta
+            painter.setFont(self._fuente_codigo)
+            painter.drawText(
+                etiqueta_rect.adjusted(5, 2, -5, -2),
                 Qt.AlignmentFlag.AlignTop,
-                codigo
-        )
+                obra.get("codigo", "Sin código"),
+            )
 
-        painter.setFont(QFont("Arial", 9))
-        painter.drawText(
-            etiqueta_rect.adjusted(5,
-18,
-                -5,
-                -2),
+            painter.setFont(self._fuente_nombre)
+            painter.drawText(
+                etiqueta_rect.adjusted(5, 18, -5, -2),
                 Qt.AlignmentFlag.AlignTop,
-                nombre
-        )
+                obra.get("nombre", "Sin nombre"),
+            )
 
         # Dibujar barra de cronograma
-        self.dibujar_barra_cronograma(painter,
-obra,
-            fecha_inicio,
-            fecha_fin,
-            y)
+        if barra_rect is not None and barra_rect.intersects(expuesto):
+            self.dibujar_barra_cronograma(painter, obra, barra_rect, color)
 
     def dibujar_barra_cronograma(
         self,
         painter: QPainter,
         obra: Dict[str, Any],
-        fecha_inicio: datetime.date,
-        fecha_fin: datetime.date,
-        y: int,
+        barra_rect: QRect,
+        color: QColor,
     ):
         """Dibuja la barra de cronograma de una obra."""
-        estado = obra.get("estado", "PLANIFICACION")
-
-        # Colores por estado
-        colores_estado = {
-            "PLANIFICACION": QColor(241, 196, 15),  # Amarillo
-            "EN_PROCESO": QColor(46, 204, 113),  # Verde
-            "PAUSADA": QColor(231, 76, 60),  # Rojo
-            "FINALIZADA": QColor(52, 152, 219),  # Azul
-            "CANCELADA": QColor(149, 165, 166),  # Gris
-        }
-
-        color = colores_estado.get(estado, QColor(189, 195, 199))
-
-        # Calcular posición y tamaño de la barra
-        x_inicio = self.ancho_etiqueta
-        ancho_cronograma = self.width() - x_inicio - 20
-
-        dias_totales = (self.fecha_fin - self.fecha_inicio).days
-        if dias_totales <= 0:
-            return
-
-        # Posición de inicio
-        dias_hasta_inicio = (fecha_inicio - self.fecha_inicio).days
-        x_barra = x_inicio + int((dias_hasta_inicio / dias_totales) * ancho_cronograma)
-
-        # Ancho de la barra
-        if fecha_fin:
-            dias_duracion = (fecha_fin - fecha_inicio).days
-            ancho_barra = int((dias_duracion / dias_totales) * ancho_cronograma)
-        else:
-            ancho_barra = 50  # Barra por defecto si no hay fecha fin
-
-        # Asegurar que la barra sea visible
-        if ancho_barra < 3:
-            ancho_barra = 3
-
-        # Dibujar barra
-        barra_rect = QRect(x_barra, y + 5, ancho_barra, self.altura_fila - 15)
-
-        # Efecto de gradiente
         painter.setBrush(QBrush(color))
         painter.setPen(QPen(color.darker(120), 2))
         painter.drawRoundedRect(barra_rect, 4, 4)
 
         # Texto del estado en la barra si hay espacio
-        if ancho_barra > 60:
-            painter.setPen(QPen(QColor(255, 255, 255), 1))
-            painter.setFont(QFont("Arial", 8, QFont.Weight.Bold))
-            painter.drawText(barra_rect, Qt.AlignmentFlag.AlignCenter, estado)
+        if barra_rect.width() > 60:
+            painter.setPen(self._pen_texto_barra)
+            painter.setFont(self._fuente_estado)
+            painter.drawText(
+                barra_rect,
+                Qt.AlignmentFlag.AlignCenter,
+                obra.get("estado", "PLANIFICACION"),
+            )
 
-    def dibujar_linea_hoy(self, painter: QPainter):
+    def dibujar_linea_hoy(self, painter: QPainter, expuesto: QRect):
         """Dibuja una línea vertical indicando el día de hoy."""
         hoy = datetime.date.today()
 
@@ -726,29 +827,22 @@ obra,
             dias_totales = (self.fecha_fin - self.fecha_inicio).days
 
             if dias_totales > 0:
-                x_inicio = self.ancho_etiqueta
-                ancho_cronograma = self.width() - x_inicio - 20
-                x_hoy = x_inicio + int(
-                    (dias_hasta_hoy / dias_totales) * ancho_cronograma
-                )
+                x_hoy = self._dia_a_x(dias_hasta_hoy, dias_totales, self._ancho_cronograma())
+                if not (expuesto.left() - 20 <= x_hoy <= expuesto.right() + 20):
+                    return
 
                 # Línea roja para "hoy"
                 painter.setPen(QPen(QColor(231, 76, 60), 3))
-                painter.drawLine(x_hoy, 0, x_hoy, self.height())
+                painter.drawLine(x_hoy, expuesto.top(), x_hoy, expuesto.bottom())
 
                 # Etiqueta "HOY"
-                painter.setPen(QPen(QColor(255, 255, 255), 1))
-                painter.fillRect(x_hoy - 20,
-5,
-                    40,
-                    20,
-                    QBrush(QColor(231,
-                    76,
-                    60)))
-                painter.setFont(QFont("Arial", 9, QFont.Weight.Bold))
-                painter.drawText(
-                    x_hoy - 20, 5, 40, 20, Qt.AlignmentFlag.AlignCenter, "HOY"
-                )
+                if expuesto.top() <= 25:
+                    painter.setPen(self._pen_texto_barra)
+                    painter.fillRect(x_hoy - 20, 5, 40, 20, QBrush(QColor(231, 76, 60)))
+                    painter.setFont(self._fuente_hoy)
+                    painter.drawText(
+                        x_hoy - 20, 5, 40, 20, Qt.AlignmentFlag.AlignCenter, "HOY"
+                    )
 
     def mousePressEvent(self, event):
         """Maneja clics del mouse."""
@@ -5,10 +5,12 @@ from sqlite3 import IntegrityError
 
 from rexus.utils.sql_script_loader import sql_script_loader
 from rexus.utils.sql_query_manager import SQLQueryManager
-from rexus.core.query_optimizer import cached_query, track_performance, prevent_n_plus_one, paginated
+from rexus.core.query_optimizer import cached_query, track_performance, paginated
 from rexus.utils.unified_sanitizer import unified_sanitizer, sanitize_string
 from rexus.utils.unified_sanitizer import sanitize_string
 from rexus.utils.app_logger import get_logger
+from rexus.utils.search_index import crear_cargador_sql, get_search_index
+from rexus.utils.statistics_service import fabrica_conexion, get_statistics_service
 
 # [LOCK] MIGRADO A SQL EXTERNO - Todas las consultas ahora usan SQLQueryManager
 # para prevenir inyección SQL y mejorar mantenibilidad.
@@ -77,6 +79,34 @@ class ObrasModel:
                 logger.error(f"[ERROR OBRAS] Error en conexión automática: {e}")
         
         self._verificar_tablas()
+        self._registrar_indice_busqueda()
+        self._registrar_estadisticas()
+
+    def _registrar_indice_busqueda(self):
+        """Registra obras en el índice de búsqueda local."""
+        if not self.db_connection:
+            return
+        try:
+            get_search_index().registrar(
+                "obras",
+                ("codigo", "nombre", "cliente", "responsable", "direccion"),
+                (10.0, 6.0, 4.0, 2.0, 1.0),
+                crear_cargador_sql(
+                    lambda: self.db_connection,
+                    self.sql_manager.get_query('obras', 'indice_busqueda_obras'),
+                    "COALESCE(updated_at, created_at)",
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"[OBRAS] Índice de búsqueda no registrado: {e}")
+
+    def _registrar_estadisticas(self):
+        """Registra las estadísticas de obras en el servicio compartido."""
+        if not self.db_connection:
+            return
+        get_statistics_service().registrar(
+            "obras", self._calcular_estadisticas, fabrica_conexion(self.db_connection)
+        )
 
     def obtener_obras(self, filtros=None):
         """
@@ -332,6 +362,8 @@ class ObrasModel:
             logger.info(f"Obra creada exitosamente: {datos_limpios.get('codigo')} por usuario {datos_limpios.get('usuario_creacion', 'SISTEMA')}")
             logger.info(f"[OBRAS] Obra creada exitosamente: {datos_limpios.get('codigo')}")
 
+            get_search_index().invalidar("obras")
+            get_statistics_service().invalidar("obras")
             return True, f"Obra {datos_limpios.get('codigo')} creada exitosamente"
 
         except (AttributeError, RuntimeError, ConnectionError, ValueError, IntegrityError) as e:
@@ -405,6 +437,21 @@ class ObrasModel:
             where_conditions = []
             params = []
 
+            filtros = dict(filtros)
+            busqueda = filtros.pop("busqueda", None)
+            if busqueda and busqueda.strip():
+                # Texto libre: IDs del índice local (prefijos, sin acentos)
+                ids = get_search_index().buscar("obras", busqueda)
+                if ids is None:
+                    patron = f"%{self.data_sanitizer.sanitize_sql_input(busqueda)}%"
+                    where_conditions.append("(codigo LIKE ? OR nombre LIKE ? OR cliente LIKE ?)")
+                    params.extend([patron, patron, patron])
+                elif not ids:
+                    return []
+                else:
+                    where_conditions.append(f"id IN ({', '.join('?' for _ in ids)})")
+                    params.extend(ids)
+
             for campo, valor in filtros.items():
                 if valor and valor.strip():
                     # Sanitizar valores de filtro
@@ -574,10 +621,9 @@ page=1,
 
     @cached_query(ttl=600)
     @track_performance
-    @prevent_n_plus_one(batch_key="obras_by_id")
     def obtener_obra_por_id(self, obra_id: int):
         """
-        Obtiene una obra por su ID con cache y prevención N+1.
+        Obtiene una obra por su ID con cache.
 
         Args:
             obra_id: ID de la obra
@@ -673,6 +719,8 @@ obra_id: int,
                 return False, "No se pudo actualizar la obra"
 
             self.db_connection.commit()
+            get_search_index().refrescar("obras", [obra_id_limpio])
+            get_statistics_service().invalidar("obras")
             return True, f"Obra actualizada exitosamente"
 
         except Exception as e:
@@ -726,6 +774,8 @@ obra_id: int,
                 return False, "No se pudo eliminar la obra"
 
             self.db_connection.commit()
+            get_search_index().eliminar("obras", [obra_id_limpio])
+            get_statistics_service().invalidar("obras")
             return True, f"Obra {codigo_obra} eliminada exitosamente"
 
         except Exception as e:
@@ -775,6 +825,7 @@ obra_id: int,
                 return False, "No se pudo cambiar el estado de la obra"
 
             self.db_connection.commit()
+            get_statistics_service().invalidar("obras")
             return True, f"Estado cambiado a {estado_limpio}"
 
         except Exception as e:
@@ -789,45 +840,40 @@ obra_id: int,
             if cursor:
                 cursor.close()
 
-    @cached_query(cache_key="estadisticas_obras", ttl=900)
     @track_performance
     def obtener_estadisticas_obras(self):
-        """Obtiene estadísticas generales de obras con cache de 15 minutos."""
+        """
+        Obtiene estadísticas generales de obras.
+
+        Se sirven desde el servicio de estadísticas: se recalculan en segundo
+        plano tras cada escritura y, como máximo, cada 15 minutos.
+        """
         if not self.db_connection:
             return {}
 
-        cursor = None
         try:
-            cursor = self.db_connection.cursor()
-
-            estadisticas = {}
-
-            # Query optimizada usando SQLQueryManager
-            sql_stats = self.sql_manager.get_query('obras', 'select_estadisticas_completas_obras')
-            cursor.execute(sql_stats)
-
-            row = cursor.fetchone()
-            if row:
-                estadisticas = {
-                    'total_obras': row[0] or 0,
-                    'obras_activas': row[1] or 0,
-                    'obras_finalizadas': row[2] or 0,
-                    'obras_pendientes': row[3] or 0,
-                    'presupuesto_promedio': round(row[4] or 0, 2),
-                    'presupuesto_total_acumulado': round(row[5] or 0, 2)
-                }
-
-            # Presupuesto total
-            sql = self.sql_manager.get_query('obras', 'calcular_presupuesto_total')
-            cursor.execute(sql)
-            result = cursor.fetchone()[0]
-            estadisticas['presupuesto_total'] = float(result) if result else 0.0
-
-            return estadisticas
-
+            return get_statistics_service().obtener("obras", conexion=self.db_connection) or {}
         except Exception as e:
             logger.info(f"[ERROR OBRAS] Error obteniendo estadísticas: {e}")
             return {}
+
+    def _calcular_estadisticas(self, conexion) -> Dict[str, Any]:
+        """Calcula todas las estadísticas de obras en una sola consulta."""
+        cursor = conexion.cursor()
+        try:
+            cursor.execute(self.sql_manager.get_query('obras', 'select_estadisticas_completas_obras'))
+            row = cursor.fetchone()
         finally:
-            if cursor:
-                cursor.close()
+            cursor.close()
+        if not row:
+            return {}
+        presupuesto_total = float(row[5] or 0)
+        return {
+            'total_obras': row[0] or 0,
+            'obras_activas': row[1] or 0,
+            'obras_finalizadas': row[2] or 0,
+            'obras_pendientes': row[3] or 0,
+            'presupuesto_promedio': round(row[4] or 0, 2),
+            'presupuesto_total_acumulado': round(presupuesto_total, 2),
+            'presupuesto_total': presupuesto_total,
+        }
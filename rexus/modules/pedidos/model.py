@@ -13,11 +13,14 @@ MIGRADO A SQL EXTERNO - Todas las consultas ahora usan SQLQueryManager
 para prevenir inyección SQL y mejorar mantenibilidad.
 """
 
-import uuid
 import os
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from rexus.utils.app_logger import get_logger
+from rexus.core.event_bus import EVENTO_PEDIDO_APROBADO, get_event_bus
+from rexus.core.sequence_allocator import get_sequence_allocator, semilla_sql
+from rexus.core.query_optimizer import fetch_rows_by_keys
+from rexus.utils.search_index import get_search_index, ordenar_por_ranking
 
 # Configurar logger
 logger = get_logger(__name__)
@@ -124,6 +127,7 @@ class PedidosModel:
                 sql = self.sql_manager.get_query('pedidos', query_name)
                 if sql:
                     cursor.execute(sql)
+            get_sequence_allocator().crear_tabla(cursor)
 
             self.db_connection.commit()
             logger.info("[PEDIDOS] Tablas verificadas/creadas exitosamente")
@@ -217,37 +221,41 @@ class PedidosModel:
             logger.info(f"[PEDIDOS] Error validando pedido duplicado: {e}")
             return False  # En caso de error, permitir la operación
 
-    def generar_numero_pedido(self) -> str:
-        """Genera un número único de pedido."""
-        try:
-            año_actual = datetime.now().year
-            prefijo = f"PED-{año_actual}-"
-
-            if self.db_connection:
-                cursor = self.db_connection.cursor()
-                cursor.execute(
-                    """
-                    SELECT MAX(CAST(SUBSTRING(numero_pedido, LEN(?)+1, LEN(numero_pedido)) AS INT))
-                    FROM pedidos
-                    WHERE numero_pedido LIKE ?
-                """,
-                    (prefijo, f"{prefijo}%"),
-                )
+    def generar_numero_pedido(self, cursor=None) -> str:
+        """
+        Genera el siguiente número de pedido (PED-<año>-00001).
 
-                result = cursor.fetchone()
-                ultimo_numero = result[0] if result and result[0] else 0
-                nuevo_numero = ultimo_numero + 1
+        Args:
+            cursor: Cursor de la transacción que inserta el pedido. El número
+                queda reservado hasta su commit y vuelve al contador si se
+                hace rollback. Sin cursor se reserva y confirma de inmediato.
 
-                return f"{prefijo}{nuevo_numero:05d}"
-            else:
-                # Fallback sin BD
-                timestamp = datetime.now().strftime("%m%d%H%M")
-                return f"PED-{año_actual}-{timestamp}"
+        Raises:
+            Exception: Si no se puede reservar el número en la base de datos
+        """
+        año_actual = datetime.now().year
+        if not self.db_connection:
+            # Fallback sin BD
+            timestamp = datetime.now().strftime("%m%d%H%M")
+            return f"PED-{año_actual}-{timestamp}"
+
+        # Los errores se propagan: un número inventado podría repetirse o
+        # dejar el contador desfasado respecto de los pedidos guardados
+        if cursor is not None:
+            return get_sequence_allocator().siguiente(
+                cursor, "PED", año_actual, semilla=semilla_sql('pedidos', 'ultimo_numero_pedido')
+            )
 
-        except (ConnectionError, ValueError, TypeError, AttributeError) as e:
-            logger.info(f"[PEDIDOS] Error generando número: {e}")
-            # Fallback con UUID
-            return f"PED-{datetime.now().year}-{str(uuid.uuid4())[:8].upper()}"
+        cursor = self.db_connection.cursor()
+        try:
+            numero = get_sequence_allocator().siguiente(
+                cursor, "PED", año_actual, semilla=semilla_sql('pedidos', 'ultimo_numero_pedido')
+            )
+            self.db_connection.commit()
+            return numero
+        except Exception:
+            self.db_connection.rollback()
+            raise
 
     def validar_cliente_existe(self, cliente_id: int) -> bool:
         """Valida que un cliente existe en el sistema."""
@@ -318,12 +326,8 @@ class PedidosModel:
 
             cursor = self.db_connection.cursor()
 
-            # Generar número de pedido
-            numero_pedido = self.generar_numero_pedido()
-
-            # Verificar que no existe duplicado
-            if self.validar_pedido_duplicado(numero_pedido):
-                numero_pedido = self.generar_numero_pedido()  # Regenerar si existe
+            # Número de pedido reservado en esta misma transacción
+            numero_pedido = self.generar_numero_pedido(cursor)
 
             # Insertar pedido principal con datos sanitizados
             sql = self.sql_manager.get_query('pedidos', 'insertar_pedido_principal')
@@ -423,6 +427,11 @@ None,
             if self.db_connection:
                 self.db_connection.rollback()
             return None
+        except Exception:
+            # Liberar el contador de numeración bloqueado por esta transacción
+            if self.db_connection:
+                self.db_connection.rollback()
+            raise
 
     def obtener_pedidos(
         self, filtros: Optional[Dict[str, Any]] = None
@@ -538,65 +547,50 @@ None,
 
     def obtener_pedido_por_id(self, pedido_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene un pedido específico con todos sus detalles."""
-        if not self.db_connection:
-            return None
+        return self.obtener_pedidos_por_ids([pedido_id]).get(pedido_id)
 
-        try:
-            cursor = self.db_connection.cursor()
+    def obtener_pedidos_por_ids(self, pedido_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Obtiene varios pedidos con sus detalles e historial.
 
-            # Obtener datos del pedido
-            cursor.execute(
-                """
-                self.sql_manager.get_query('pedidos', 'obtener_pedido_completo')
-            """,
-                (pedido_id,),
-            )
+        Usa tres consultas IN en total (pedidos, detalles, historial) en lugar
+        de tres consultas por pedido.
 
-            pedido_data = cursor.fetchone()
-            if not pedido_data:
-                return None
+        Returns:
+            Dict[int, Dict]: {pedido_id: pedido}; los IDs inexistentes no aparecen
+        """
+        if not self.db_connection or not pedido_ids:
+            return {}
 
-            columns = [desc[0] for desc in cursor.description]
-            pedido = dict(zip(columns, pedido_data))
+        try:
+            cursor = self.db_connection.cursor()
 
-            # Obtener detalles del pedido
-            cursor.execute(
-                """
-                self.sql_manager.get_query('pedidos', 'obtener_detalles_pedido')
-                ORDER BY id
-            """,
-                (pedido_id,),
+            pedidos = fetch_rows_by_keys(
+                cursor, self.sql_manager.get_query('pedidos', 'obtener_pedidos_por_ids'),
+                pedido_ids, "id"
             )
+            if not pedidos:
+                return {}
 
-            detalle_columns = [desc[0] for desc in cursor.description]
-            detalles = []
-            for row in cursor.fetchall():
-                detalle = dict(zip(detalle_columns, row))
-                detalles.append(detalle)
-
-            pedido["detalles"] = detalles
-
-            # Obtener historial
-            cursor.execute(
-                """
-                self.sql_manager.get_query('pedidos', 'obtener_historial_completo')
-            """,
-                (pedido_id,),
+            ids_encontrados = list(pedidos)
+            detalles = fetch_rows_by_keys(
+                cursor, self.sql_manager.get_query('pedidos', 'obtener_detalles_pedidos'),
+                ids_encontrados, "pedido_id", many=True
+            )
+            historial = fetch_rows_by_keys(
+                cursor, self.sql_manager.get_query('pedidos', 'obtener_historial_pedidos'),
+                ids_encontrados, "pedido_id", many=True
             )
 
-            historial_columns = [desc[0] for desc in cursor.description]
-            historial = []
-            for row in cursor.fetchall():
-                hist = dict(zip(historial_columns, row))
-                historial.append(hist)
-
-            pedido["historial"] = historial
+            for pedido_id, pedido in pedidos.items():
+                pedido["detalles"] = detalles.get(pedido_id, [])
+                pedido["historial"] = historial.get(pedido_id, [])
 
-            return pedido
+            return pedidos
 
         except (ConnectionError, ValueError, TypeError, AttributeError) as e:
-            logger.info(f"[PEDIDOS] Error obteniendo pedido {pedido_id}: {e}")
-            return None
+            logger.info(f"[PEDIDOS] Error obteniendo pedidos {list(pedido_ids)[:10]}: {e}")
+            return {}
 
     def actualizar_estado(self, pedido_id, nuevo_estado, usuario_id=None, observaciones=""):
         """
@@ -686,6 +680,13 @@ None,
             )
 
             self.db_connection.commit()
+
+            if nuevo_estado == "APROBADO":
+                get_event_bus().publicar(EVENTO_PEDIDO_APROBADO, {
+                    'pedido_id': pedido_id,
+                    'estado_anterior': estado_anterior,
+                    'usuario_id': usuario_id,
+                })
             return True
 
         except (ConnectionError, ValueError, TypeError, AttributeError) as e:
@@ -799,6 +800,15 @@ estado_anterior,
         try:
             cursor = self.db_connection.cursor()
 
+            # Índice de búsqueda local (prefijos, sin acentos, por relevancia)
+            ids = get_search_index().buscar("productos", busqueda, limite=20)
+            if ids is not None:
+                productos = fetch_rows_by_keys(
+                    cursor, self.sql_manager.get_query('inventario', 'select_productos_por_ids'),
+                    ids, "id"
+                )
+                return ordenar_por_ranking(productos.values(), ids)
+
             cursor.execute(
                 """
                 SELECT TOP 20
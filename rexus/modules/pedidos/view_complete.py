@@ -17,6 +17,7 @@ from PyQt6.QtWidgets import (
 from rexus.ui.templates.base_module_view import BaseModuleView
 from rexus.ui.style_manager import style_manager
 from rexus.utils.dialogs import show_success, show_error, show_warning
+from rexus.utils.table_search import SearchDebouncer, TableSearchIndex, normalizar_texto
 from rexus.core.auth_manager import auth_required
 
 
@@ -628,7 +629,8 @@ class PedidosViewComplete(BaseModuleView):
         filtros_layout.addWidget(QLabel("Buscar:"))
         self.le_busqueda = QLineEdit()
         self.le_busqueda.setPlaceholderText("Código, cliente, obra...")
-        self.le_busqueda.textChanged.connect(self.aplicar_filtros)
+        self._debouncer_busqueda = SearchDebouncer(self.aplicar_filtros, parent=self)
+        self.le_busqueda.textChanged.connect(self._debouncer_busqueda.programar)
         filtros_layout.addWidget(self.le_busqueda)
 
         layout.addWidget(filtros_group, 2)
@@ -879,37 +881,19 @@ class PedidosViewComplete(BaseModuleView):
 
     def aplicar_filtros(self):
         """Aplica los filtros seleccionados."""
-        estado = self.cb_filtro_estado.currentText()
-        prioridad = self.cb_filtro_prioridad.currentText()
-        busqueda = self.le_busqueda.text().lower()
-
-        for row in range(self.tabla_pedidos.rowCount()):
-            mostrar_fila = True
-
-            # Filtro por estado
-            if estado != "TODOS":
-                estado_item = self.tabla_pedidos.item(row, 4)
-                if estado_item and estado_item.text() != estado:
-                    mostrar_fila = False
-
-            # Filtro por prioridad
-            if prioridad != "TODAS" and mostrar_fila:
-                prioridad_item = self.tabla_pedidos.item(row, 5)
-                if prioridad_item and prioridad_item.text() != prioridad:
-                    mostrar_fila = False
-
-            # Filtro por búsqueda
-            if busqueda and mostrar_fila:
-                fila_texto = ""
-                for col in [0, 1, 2]:  # Código, Cliente, Obra
-                    item = self.tabla_pedidos.item(row, col)
-                    if item:
-                        fila_texto += item.text().lower() + " "
-
-                if busqueda not in fila_texto:
-                    mostrar_fila = False
-
-            self.tabla_pedidos.setRowHidden(row, not mostrar_fila)
+        estado = normalizar_texto(self.cb_filtro_estado.currentText())
+        prioridad = normalizar_texto(self.cb_filtro_prioridad.currentText())
+        busqueda = self.le_busqueda.text()
+
+        filtros = {}
+        if estado != "todos":
+            filtros[4] = lambda valor: not valor or valor == estado
+        if prioridad != "todas":
+            filtros[5] = lambda valor: not valor or valor == prioridad
+
+        # Código, Cliente, Obra
+        indice = TableSearchIndex.para_tabla(self.tabla_pedidos, (0, 1, 2))
+        indice.filtrar(busqueda, filtros)
 
     def cargar_pedidos(self):
         """Carga la lista de pedidos."""
@@ -17,6 +17,9 @@ from rexus.utils.sql_query_manager import SQLQueryManager
 
 # Sistema de cache inteligente para optimizar consultas frecuentes
 from rexus.utils.intelligent_cache import cached_query, invalidate_cache
+from rexus.utils.search_index import crear_cargador_sql, get_search_index, ordenar_por_ranking
+from rexus.core.event_bus import EVENTO_SESION_REVOCADA, get_event_bus
+from rexus.modules.usuarios.submodules.sessions_manager import get_cache_sesiones
 from rexus.utils.unified_sanitizer import sanitize_string
 
 # [LOCK] DB Authorization Check - Verify user permissions before DB operations
@@ -168,8 +171,34 @@ class UsuariosModel:
         except ImportError:
             self.permissions_manager = None
 
+        try:
+            from rexus.modules.usuarios.submodules.sessions_manager import SessionsManager
+            self.sessions_manager = SessionsManager(db_connection)
+        except ImportError:
+            self.sessions_manager = None
+
         # Las tablas deben existir previamente - no crear desde la aplicación
 
+        self._registrar_indice_busqueda()
+
+    def _registrar_indice_busqueda(self):
+        """Registra usuarios en el índice de búsqueda local."""
+        if not self.db_connection:
+            return
+        try:
+            get_search_index().registrar(
+                "usuarios",
+                ("usuario", "nombre_completo", "email"),
+                (8.0, 5.0, 3.0),
+                crear_cargador_sql(
+                    lambda: self.db_connection,
+                    self.sql_manager.get_query('usuarios', 'indice_busqueda_usuarios'),
+                    "COALESCE(fecha_modificacion, fecha_creacion)",
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"[USUARIOS] Índice de búsqueda no registrado: {e}")
+
     def _validate_database_connection(self) -> bool:
         """Valida que la conexión a la base de datos esté disponible y funcional."""
         try:
@@ -1175,6 +1204,7 @@ username: str,
             self.db_connection.commit()
             # Invalidar cache después de crear usuario
             self._invalidar_cache_usuarios()
+            get_search_index().refrescar("usuarios", [usuario_id])
 
             logger.info(f"Usuario '{datos_usuario['usuario']}' creado exitosamente")
             return True, f"Usuario '{datos_usuario['usuario']}' creado exitosamente"
@@ -1334,49 +1364,62 @@ username: str,
 
             # Sanitizar término de búsqueda antes de usarlo
             termino_limpio = termino_busqueda.strip()[:50]  # Limitar longitud
+
+            # Índice de búsqueda local: prefijos, sin acentos y por relevancia
+            ids = get_search_index().buscar("usuarios", termino_limpio)
+            if ids is not None:
+                if not ids:
+                    return []
+                sql = self.sql_manager.get_query(
+                    'usuarios', 'obtener_usuarios_por_ids_con_permisos'
+                ).format(placeholders=", ".join("?" for _ in ids))
+                cursor.execute(sql, ids)
+                return ordenar_por_ranking(self._agrupar_usuarios_con_permisos(cursor.fetchall()), ids)
+
             termino_parametrizado = f'%{termino_limpio.lower()}%'
 
             # Query optimizada con JOIN para eliminar consultas N+1 en búsqueda
             sql = self.sql_manager.get_query('usuarios', 'buscar_usuarios_con_permisos')
             cursor.execute(sql, (termino_parametrizado, termino_parametrizado, termino_parametrizado))
+            return self._agrupar_usuarios_con_permisos(cursor.fetchall())
 
-            # Procesar resultados agrupando permisos por usuario
-            usuarios_dict = {}
-
-            for row in cursor.fetchall():
-                user_id = row[0]
-
-                if user_id not in usuarios_dict:
-                    # Primera vez que vemos este usuario
-                    usuarios_dict[user_id] = {
-                        "id": row[0],
-                        "usuario": row[1],
-                        "nombre_completo": row[2],
-                        "email": row[3],
-                        "telefono": row[4],
-                        "rol": row[5],
-                        "estado": row[6],
-                        "fecha_creacion": row[7],
-                        "ultimo_acceso": row[8],
-                        "intentos_fallidos": row[9],
-                        "permisos": []
-                    }
+        except Exception as e:
+            logger.error(f"Error buscando usuarios optimizado: {e}", exc_info=True)
+            return []
 
-                    # Agregar textos descriptivos
-                    usuarios_dict[user_id]["rol_texto"] = self.ROLES.get(row[5], row[5])
-                    usuarios_dict[user_id]["estado_texto"] = self.ESTADOS.get(row[6], row[6])
+    def _agrupar_usuarios_con_permisos(self, rows) -> List[Dict[str, Any]]:
+        """Agrupa filas usuario+permiso (una por permiso) en un dict por usuario."""
+        usuarios_dict = {}
+
+        for row in rows:
+            user_id = row[0]
+
+            if user_id not in usuarios_dict:
+                # Primera vez que vemos este usuario
+                usuarios_dict[user_id] = {
+                    "id": row[0],
+                    "usuario": row[1],
+                    "nombre_completo": row[2],
+                    "email": row[3],
+                    "telefono": row[4],
+                    "rol": row[5],
+                    "estado": row[6],
+                    "fecha_creacion": row[7],
+                    "ultimo_acceso": row[8],
+                    "intentos_fallidos": row[9],
+                    "permisos": []
+                }
 
-                # Agregar permiso si existe
-                if row[10]:  # permiso no es NULL
-                    usuarios_dict[user_id]["permisos"].append(row[10])
+                # Agregar textos descriptivos
+                usuarios_dict[user_id]["rol_texto"] = self.ROLES.get(row[5], row[5])
+                usuarios_dict[user_id]["estado_texto"] = self.ESTADOS.get(row[6], row[6])
 
-            # Convertir dict a lista manteniendo orden
-            usuarios = list(usuarios_dict.values())
-            return usuarios
+            # Agregar permiso si existe
+            if row[10]:  # permiso no es NULL
+                usuarios_dict[user_id]["permisos"].append(row[10])
 
-        except Exception as e:
-            logger.error(f"Error buscando usuarios optimizado: {e}", exc_info=True)
-            return []
+        # Convertir dict a lista manteniendo orden
+        return list(usuarios_dict.values())
 
     def obtener_usuario_por_id(self, usuario_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene un usuario por su ID."""
@@ -1457,6 +1500,7 @@ username: str,
                     )
 
             self.db_connection.commit()
+            get_search_index().refrescar("usuarios", [usuario_id])
             return True, "Usuario actualizado exitosamente"
 
         except Exception as e:
@@ -1506,6 +1550,13 @@ username: str,
             cursor.execute(sql_cerrar_sesiones, (usuario_id,))
 
             self.db_connection.commit()
+
+            # Las sesiones validadas en memoria dejan de valer en este proceso
+            # y en los demás (relay local)
+            get_cache_sesiones().invalidar_usuario(usuario_id)
+            get_event_bus().publicar(EVENTO_SESION_REVOCADA, {'usuario_id': usuario_id})
+
+            get_search_index().eliminar("usuarios", [usuario_id])
             return True, f"Usuario '{nombre_usuario}' eliminado exitosamente"
 
         except Exception as e:
@@ -7,26 +7,51 @@ Responsabilidades:
 - Control de sesiones concurrentes
 - Timeout automático de sesiones
 - Auditoría de actividad de sesión
+- Cache en memoria de sesiones validadas
+
+Las sesiones validadas se guardan en un cache acotado (LRU) con expiración
+deslizante: validar_sesion no toca la BD mientras la entrada esté vigente y
+la última actividad se escribe en lote cada INTERVALO_ESCRITURA_ACTIVIDAD
+segundos. Cerrar o revocar una sesión la quita del cache en el acto y avisa
+por el bus de eventos a las demás instancias del equipo; para cambios hechos
+desde otra máquina, cada entrada se vuelve a verificar contra la BD cada
+TTL_VERIFICACION_SEGUNDOS.
+
+Cada revocación queda sellada con una generación del cache: validar_sesion
+toma la generación antes de leer la BD y no guarda la entrada si la sesión
+(o su usuario) se revocó mientras tanto.
 """
 
 import datetime
 import secrets
 import logging
-from typing import Dict, Any, List
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
+from rexus.core.event_bus import EVENTO_SESION_REVOCADA, Evento, get_event_bus
+
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 # Importar utilidades de seguridad
 try:
     from rexus.core.auth_decorators import admin_required, auth_required
+    from rexus.utils.unified_sanitizer import unified_sanitizer as DataSanitizer
 except ImportError:
     logger.warning("Security utilities not fully available")
     DataSanitizer = None
     admin_required = lambda x: x
     auth_required = lambda x: x
 
+# Cache de sesiones validadas
+MAX_SESIONES_CACHE = 5000
+TTL_VERIFICACION_SEGUNDOS = 30
+INTERVALO_ESCRITURA_ACTIVIDAD = 60
+
 
 @dataclass
 class SessionInfo:
@@ -41,12 +66,171 @@ class SessionInfo:
     is_active: bool
 
 
+@dataclass
+class _SesionCacheada:
+    usuario_id: int
+    username: str
+    created_at: Optional[datetime.datetime]
+    last_activity: datetime.datetime
+    verificada: float  # time.monotonic() de la última lectura en BD
+
+
+class CacheSesiones:
+    """
+    Cache LRU de sesiones validadas con escritura diferida de actividad.
+
+    Las revocaciones se registran con un número de generación creciente;
+    guardar rechaza entradas leídas de la BD antes de una revocación de la
+    sesión, de su usuario o de todo el cache.
+    """
+
+    def __init__(self, max_entradas: int = MAX_SESIONES_CACHE,
+                 ttl_verificacion: float = TTL_VERIFICACION_SEGUNDOS):
+        self.max_entradas = max_entradas
+        self.ttl_verificacion = ttl_verificacion
+        self._entradas: "OrderedDict[str, _SesionCacheada]" = OrderedDict()
+        self._pendientes: Dict[str, datetime.datetime] = {}
+        self._ultima_escritura = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Generación de las revocaciones (ver generacion y guardar)
+        self._generacion = 0
+        self._sesiones_revocadas: "OrderedDict[str, int]" = OrderedDict()
+        self._usuarios_revocados: "OrderedDict[int, int]" = OrderedDict()
+        self._revocacion_total = 0
+        # Generación más alta olvidada al acotar los registros de revocación
+        self._revocacion_olvidada = 0
+
+    def generacion(self) -> int:
+        """Generación actual; se toma antes de leer la sesión en la BD."""
+        with self._lock:
+            return self._generacion
+
+    def obtener(self, session_id: str) -> Optional[_SesionCacheada]:
+        """Entrada vigente (verificada hace menos de ttl_verificacion) o None."""
+        with self._lock:
+            entrada = self._entradas.get(session_id)
+            if entrada is None:
+                return None
+            if time.monotonic() - entrada.verificada >= self.ttl_verificacion:
+                return None
+            self._entradas.move_to_end(session_id)
+            return entrada
+
+    def guardar(self, session_id: str, entrada: _SesionCacheada,
+                generacion: Optional[int] = None) -> bool:
+        """
+        Guarda una sesión leída de la BD.
+
+        Si se indica la generación tomada antes de la lectura y desde entonces
+        se revocó la sesión o su usuario, no la guarda y devuelve False.
+        """
+        with self._lock:
+            if generacion is not None and self._revocada_desde(session_id, entrada.usuario_id, generacion):
+                return False
+            self._entradas[session_id] = entrada
+            self._entradas.move_to_end(session_id)
+            # La lectura en BD ya actualizó last_activity
+            self._pendientes.pop(session_id, None)
+            # La actividad pendiente de las expulsadas queda en _pendientes
+            # y se escribe en el próximo lote
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+            return True
+
+    def registrar_actividad(self, session_id: str, momento: datetime.datetime):
+        with self._lock:
+            entrada = self._entradas.get(session_id)
+            if entrada is not None:
+                entrada.last_activity = momento
+                self._pendientes[session_id] = momento
+
+    def actividad_pendiente(self, session_id: str) -> Optional[datetime.datetime]:
+        with self._lock:
+            return self._pendientes.get(session_id)
+
+    def tomar_pendientes(self, forzar: bool = False,
+                         intervalo: float = INTERVALO_ESCRITURA_ACTIVIDAD) -> Dict[str, datetime.datetime]:
+        """Devuelve y vacía la actividad pendiente si corresponde escribirla."""
+        with self._lock:
+            ahora = time.monotonic()
+            if not self._pendientes or (not forzar and ahora - self._ultima_escritura < intervalo):
+                return {}
+            pendientes, self._pendientes = self._pendientes, {}
+            self._ultima_escritura = ahora
+            return pendientes
+
+    def invalidar(self, session_id: str):
+        with self._lock:
+            self._registrar_revocacion(self._sesiones_revocadas, session_id)
+            self._entradas.pop(session_id, None)
+            self._pendientes.pop(session_id, None)
+
+    def invalidar_usuario(self, usuario_id: int):
+        with self._lock:
+            self._registrar_revocacion(self._usuarios_revocados, usuario_id)
+            for session_id in [s for s, e in self._entradas.items() if e.usuario_id == usuario_id]:
+                self._entradas.pop(session_id, None)
+                self._pendientes.pop(session_id, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._generacion += 1
+            self._revocacion_total = self._generacion
+            self._entradas.clear()
+            self._pendientes.clear()
+
+    def _registrar_revocacion(self, revocaciones: OrderedDict, clave):
+        self._generacion += 1
+        revocaciones[clave] = self._generacion
+        revocaciones.move_to_end(clave)
+        while len(revocaciones) > self.max_entradas:
+            _, generacion = revocaciones.popitem(last=False)
+            self._revocacion_olvidada = max(self._revocacion_olvidada, generacion)
+
+    def _revocada_desde(self, session_id: str, usuario_id: int, generacion: int) -> bool:
+        ultima = max(
+            self._sesiones_revocadas.get(session_id, 0),
+            self._usuarios_revocados.get(usuario_id, 0),
+            self._revocacion_total,
+            self._revocacion_olvidada,
+        )
+        return ultima > generacion
+
+    def _al_revocar(self, evento: Evento):
+        if not evento.remoto:
+            return  # Las revocaciones locales ya invalidaron el cache
+        if evento.datos.get('session_id'):
+            self.invalidar(evento.datos['session_id'])
+        elif evento.datos.get('usuario_id') is not None:
+            self.invalidar_usuario(int(evento.datos['usuario_id']))
+        else:
+            self.limpiar()
+
+
+_cache_sesiones: Optional[CacheSesiones] = None
+_cache_sesiones_lock = threading.Lock()
+
+
+def get_cache_sesiones() -> CacheSesiones:
+    """Cache de sesiones del proceso, compartido por todos los SessionsManager."""
+    global _cache_sesiones
+    if _cache_sesiones is None:
+        with _cache_sesiones_lock:
+            if _cache_sesiones is None:
+                cache = CacheSesiones()
+                get_event_bus().suscribir(EVENTO_SESION_REVOCADA, cache._al_revocar)
+                _cache_sesiones = cache
+    return _cache_sesiones
+
+
 class SessionsManager:
     """Gestor especializado de sesiones de usuarios."""
 
     def __init__(self, db_connection=None):
         self.db_connection = db_connection
-        self.sanitizer = DataSanitizer() if DataSanitizer else None
+        self.sanitizer = DataSanitizer
+        self.cache = get_cache_sesiones()
 
         # Configuración de sesiones
         self.session_timeout_minutes = 120  # 2 horas
@@ -125,16 +309,38 @@ class SessionsManager:
         """
         Valida si una sesión es válida y actualiza la última actividad.
 
+        Resuelve desde el cache mientras la entrada esté vigente; la BD se
+        consulta en el primer acceso y cada TTL_VERIFICACION_SEGUNDOS.
+
         Args:
             session_id: ID de la sesión
 
         Returns:
             Información de validación de sesión
         """
-        try:
-            if not self.db_connection or not session_id:
-                return {'valid': False, 'message': 'Sesión inválida'}
+        if not self.db_connection or not session_id:
+            return {'valid': False, 'message': 'Sesión inválida'}
+
+        now = datetime.datetime.now()
+        entrada = self.cache.obtener(session_id)
+        if entrada is not None:
+            if (now - entrada.last_activity).total_seconds() > self.session_timeout_minutes * 60:
+                self.cerrar_sesion(session_id)
+                return {'valid': False, 'message': 'Sesión expirada por inactividad'}
+            self.cache.registrar_actividad(session_id, now)
+            self._escribir_actividad_pendiente()
+            return {
+                'valid': True,
+                'usuario_id': entrada.usuario_id,
+                'username': entrada.username,
+                'created_at': entrada.created_at,
+                'last_activity': now
+            }
 
+        # Una revocación posterior a este punto invalida lo leído de la BD
+        generacion = self.cache.generacion()
+
+        try:
             cursor = self.db_connection.cursor()
 
             # Obtener información de la sesión
@@ -150,8 +356,12 @@ class SessionsManager:
 
             usuario_id, username, created_at, last_activity, is_active = result
 
+            # La actividad en cache puede ser más reciente que la escrita en BD
+            pendiente = self.cache.actividad_pendiente(session_id)
+            if pendiente and (not last_activity or pendiente > last_activity):
+                last_activity = pendiente
+
             # Verificar timeout
-            now = datetime.datetime.now()
             if last_activity:
                 tiempo_inactivo = now - last_activity
                 if tiempo_inactivo.total_seconds() > (self.session_timeout_minutes * 60):
@@ -168,6 +378,11 @@ class SessionsManager:
 
             self.db_connection.commit()
 
+            if not self.cache.guardar(session_id, _SesionCacheada(
+                usuario_id, username, created_at, now, time.monotonic()
+            ), generacion):
+                return {'valid': False, 'message': 'Sesión revocada'}
+
             return {
                 'valid': True,
                 'usuario_id': usuario_id,
@@ -193,6 +408,10 @@ class SessionsManager:
         Returns:
             Resultado de la operación
         """
+        # Invalidar antes de tocar la BD: la sesión deja de ser válida ya
+        self.cache.invalidar(session_id)
+        get_event_bus().publicar(EVENTO_SESION_REVOCADA, {'session_id': session_id})
+
         try:
             if not self.db_connection:
                 return {'success': False, 'message': 'Sin conexión a base de datos'}
@@ -237,6 +456,9 @@ class SessionsManager:
         Returns:
             Resultado de la operación
         """
+        self.cache.invalidar_usuario(usuario_id)
+        get_event_bus().publicar(EVENTO_SESION_REVOCADA, {'usuario_id': usuario_id})
+
         try:
             if not self.db_connection:
                 return {'success': False, 'message': 'Sin conexión a base de datos'}
@@ -385,6 +607,29 @@ created_at,
             if 'cursor' in locals():
                 cursor.close()
 
+    def _escribir_actividad_pendiente(self, forzar: bool = False) -> None:
+        """Escribe en lote la última actividad acumulada en el cache."""
+        pendientes = self.cache.tomar_pendientes(forzar)
+        if not pendientes or not self.db_connection:
+            return
+
+        try:
+            cursor = self.db_connection.cursor()
+            cursor.executemany("""
+                UPDATE sesiones_usuario
+                SET last_activity = ?
+                WHERE session_id = ? AND is_active = 1
+                AND (last_activity IS NULL OR last_activity < ?)
+            """, [(momento, session_id, momento) for session_id, momento in pendientes.items()])
+            self.db_connection.commit()
+
+        except Exception as e:
+            # Solo se pierde precisión de last_activity; el cache sigue vigente
+            logger.warning(f"Error escribiendo actividad de sesiones: {e}")
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+
     def _generar_session_id(self) -> str:
         """
         Genera un ID de sesión seguro y único.
@@ -462,6 +707,9 @@ created_at,
             if not self.db_connection:
                 return
 
+            # Sin la actividad pendiente se cerrarían sesiones que siguen en uso
+            self._escribir_actividad_pendiente(forzar=True)
+
             cursor = self.db_connection.cursor()
 
             # Calcular tiempo límite
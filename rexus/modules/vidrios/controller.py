@@ -353,6 +353,28 @@ obra_id,
         except Exception as e:
             self.mostrar_error(f"Error creando pedido: {e}")
 
+    def planificar_cortes(self, obra_ids, hojas_stock=None):
+        """Genera el plan de corte de los vidrios asignados a las obras."""
+        if not self.model:
+            return None
+
+        try:
+            plan = self.model.planificar_cortes_obras(obra_ids, hojas_stock)
+            if not plan:
+                self.mostrar_error("No se pudo generar el plan de corte")
+                return None
+            mensaje = (
+                f"Plan de corte: {plan['total_piezas']} piezas en "
+                f"{len(plan['hojas'])} hojas, desperdicio {plan['desperdicio_pct']}%"
+            )
+            if plan["sin_colocar"]:
+                mensaje += f" ({len(plan['sin_colocar'])} piezas exceden la hoja)"
+            self.mostrar_mensaje(mensaje)
+            return plan
+        except Exception as e:
+            self.mostrar_error(f"Error planificando cortes: {e}")
+            return None
+
     def filtrar_vidrios(self, filtros):
         """Filtra vidrios por criterios específicos."""
         self.cargar_datos(filtros)
@@ -0,0 +1,287 @@
+"""
+Optimizador de Cortes - Módulo de Vidrios
+
+Planifica cómo cortar las piezas pendientes de una o varias obras a partir
+de hojas de stock, con cortes de guillotina (cada corte atraviesa la hoja o
+el retazo de lado a lado, como en la mesa de corte de vidrio).
+
+- Las piezas se agrupan por tipo de hoja (tipo, espesor, color)
+- Colocación best-area-fit sobre rectángulos libres, con rotación opcional
+- División del espacio libre por el eje de sobrante más corto
+- Se prueban varios órdenes de piezas y se queda el plan con menos hojas
+  y menor desperdicio
+- Los rectángulos libres que superan un tamaño mínimo se informan como
+  retazos reutilizables
+
+Las medidas se expresan en milímetros.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from rexus.utils.app_logger import get_logger
+
+logger = get_logger("vidrios.cutting_optimizer")
+
+# Hoja de float estándar (mm)
+HOJA_ESTANDAR = (3600, 2500)
+# Ancho del corte (mm)
+KERF_MM = 3
+# Un retazo es reutilizable si ambos lados superan este mínimo (mm)
+RETAZO_MINIMO_MM = 300
+
+_NUMERO_UNIDAD = r"(\d+(?:[.,]\d+)?)(?:\s*(mm|cm|m)\b)?"
+_PATRON_MEDIDAS = re.compile(_NUMERO_UNIDAD + r"\s*[xX×*]\s*" + _NUMERO_UNIDAD, re.IGNORECASE)
+# Unidad -> milímetros
+_FACTOR_UNIDAD = {"mm": 1, "cm": 10, "m": 1000}
+
+
+@dataclass
+class Pieza:
+    """Pieza a cortar."""
+    id: str
+    ancho: float
+    alto: float
+    tipo_hoja: str = "estandar"
+    puede_rotar: bool = True
+    referencia: Optional[dict] = None    # Datos de origen (obra, vidrio...)
+
+
+@dataclass
+class Colocacion:
+    pieza_id: str
+    x: float
+    y: float
+    ancho: float
+    alto: float
+    rotada: bool = False
+
+
+@dataclass
+class HojaCorte:
+    """Plan de corte de una hoja de stock."""
+    tipo_hoja: str
+    ancho: float
+    alto: float
+    colocaciones: List[Colocacion] = field(default_factory=list)
+    retazos: List[Tuple[float, float, float, float]] = field(default_factory=list)
+
+    @property
+    def area_usada(self) -> float:
+        return sum(c.ancho * c.alto for c in self.colocaciones)
+
+    @property
+    def aprovechamiento(self) -> float:
+        return self.area_usada / (self.ancho * self.alto)
+
+
+@dataclass
+class PlanCorte:
+    """Resultado de la planificación."""
+    hojas: List[HojaCorte]
+    sin_colocar: List[str]
+    tiempo_segundos: float = 0.0
+
+    @property
+    def desperdicio_pct(self) -> float:
+        total = sum(h.ancho * h.alto for h in self.hojas)
+        if not total:
+            return 0.0
+        return 100.0 * (1 - sum(h.area_usada for h in self.hojas) / total)
+
+    def hojas_por_tipo(self) -> Dict[str, int]:
+        conteo: Dict[str, int] = {}
+        for hoja in self.hojas:
+            conteo[hoja.tipo_hoja] = conteo.get(hoja.tipo_hoja, 0) + 1
+        return conteo
+
+    def como_dict(self) -> dict:
+        return {
+            "hojas": [
+                {
+                    "tipo_hoja": h.tipo_hoja,
+                    "ancho": h.ancho,
+                    "alto": h.alto,
+                    "aprovechamiento_pct": round(100 * h.aprovechamiento, 2),
+                    "piezas": [c.__dict__ for c in h.colocaciones],
+                    "retazos": [
+                        {"x": x, "y": y, "ancho": w, "alto": a} for x, y, w, a in h.retazos
+                    ],
+                }
+                for h in self.hojas
+            ],
+            "hojas_por_tipo": self.hojas_por_tipo(),
+            "desperdicio_pct": round(self.desperdicio_pct, 2),
+            "sin_colocar": list(self.sin_colocar),
+            "tiempo_segundos": round(self.tiempo_segundos, 3),
+        }
+
+
+def parsear_medidas(medidas: str) -> Optional[Tuple[float, float]]:
+    """
+    Interpreta medidas como "1200x800" y las devuelve en milímetros.
+
+    Acepta la unidad explícita ("120 x 80 cm", "1.2m x 0.8m"); una unidad
+    escrita en un solo valor vale para ambos. Sin unidad se toman como
+    metros solo los valores con separador decimal y de hasta 10 ("1.2 x
+    0.8", "1,5 x 2"); el resto son milímetros ("8 x 6" son 8 x 6 mm).
+    """
+    if not medidas:
+        return None
+    coincidencia = _PATRON_MEDIDAS.search(str(medidas))
+    if not coincidencia:
+        return None
+    texto_ancho, unidad_ancho, texto_alto, unidad_alto = coincidencia.groups()
+    ancho = float(texto_ancho.replace(",", "."))
+    alto = float(texto_alto.replace(",", "."))
+    unidad_ancho = (unidad_ancho or unidad_alto or "").lower()
+    unidad_alto = (unidad_alto or unidad_ancho or "").lower()
+    if not unidad_ancho:
+        decimales = any(c in texto_ancho + texto_alto for c in ".,")
+        unidad_ancho = unidad_alto = "m" if decimales and ancho <= 10 and alto <= 10 else "mm"
+    ancho *= _FACTOR_UNIDAD[unidad_ancho]
+    alto *= _FACTOR_UNIDAD[unidad_alto]
+    if ancho <= 0 or alto <= 0:
+        return None
+    return ancho, alto
+
+
+class _Hoja:
+    """Estado de una hoja durante el empaquetado (rectángulos libres)."""
+
+    def __init__(self, ancho: float, alto: float):
+        self.ancho = ancho
+        self.alto = alto
+        self.libres: List[Tuple[float, float, float, float]] = [(0.0, 0.0, ancho, alto)]
+        self.colocaciones: List[Colocacion] = []
+
+    def mejor_posicion(self, ancho: float, alto: float, puede_rotar: bool):
+        """Rectángulo libre con menor área sobrante (best-area-fit)."""
+        mejor = None
+        for indice, (_, _, lw, la) in enumerate(self.libres):
+            area_sobrante = lw * la - ancho * alto
+            if area_sobrante < 0:
+                continue
+            if ancho <= lw and alto <= la:
+                clave = (area_sobrante, min(lw - ancho, la - alto))
+                if mejor is None or clave < mejor[0]:
+                    mejor = (clave, indice, False)
+            if puede_rotar and ancho != alto and alto <= lw and ancho <= la:
+                clave = (area_sobrante, min(lw - alto, la - ancho))
+                if mejor is None or clave < mejor[0]:
+                    mejor = (clave, indice, True)
+        return mejor
+
+    def colocar(self, indice: int, pieza_id: str, ancho: float, alto: float,
+                rotada: bool, kerf: float):
+        x, y, lw, la = self.libres.pop(indice)
+        if rotada:
+            ancho, alto = alto, ancho
+        self.colocaciones.append(Colocacion(pieza_id, x, y, ancho, alto, rotada))
+
+        # Guillotina: se corta primero a lo largo del eje con sobrante más corto,
+        # dejando el rectángulo grande lo más entero posible.
+        ancho_k = min(lw, ancho + kerf)
+        alto_k = min(la, alto + kerf)
+        sobra_w = lw - ancho_k
+        sobra_a = la - alto_k
+        if sobra_w < sobra_a:
+            derecha = (x + ancho_k, y, sobra_w, alto_k)
+            arriba = (x, y + alto_k, lw, sobra_a)
+        else:
+            derecha = (x + ancho_k, y, sobra_w, la)
+            arriba = (x, y + alto_k, ancho_k, sobra_a)
+        for rect in (derecha, arriba):
+            if rect[2] > 0 and rect[3] > 0:
+                self.libres.append(rect)
+
+
+def _empaquetar(piezas: Sequence[Pieza], ancho: float, alto: float, kerf: float) -> Tuple[List[_Hoja], List[str]]:
+    hojas: List[_Hoja] = []
+    sin_colocar: List[str] = []
+    for pieza in piezas:
+        mejor = None
+        for hoja in hojas:
+            candidato = hoja.mejor_posicion(pieza.ancho, pieza.alto, pieza.puede_rotar)
+            if candidato is not None and (mejor is None or candidato[0] < mejor[0][0]):
+                mejor = (candidato, hoja)
+        if mejor is None:
+            hoja = _Hoja(ancho, alto)
+            candidato = hoja.mejor_posicion(pieza.ancho, pieza.alto, pieza.puede_rotar)
+            if candidato is None:
+                sin_colocar.append(pieza.id)   # Más grande que la hoja
+                continue
+            hojas.append(hoja)
+            mejor = (candidato, hoja)
+        (_, indice, rotada), hoja = mejor
+        hoja.colocar(indice, pieza.id, pieza.ancho, pieza.alto, rotada, kerf)
+    return hojas, sin_colocar
+
+
+_ORDENES = (
+    lambda p: -(p.ancho * p.alto),
+    lambda p: -max(p.ancho, p.alto),
+    lambda p: -(p.ancho + p.alto),
+    lambda p: (-min(p.ancho, p.alto), -max(p.ancho, p.alto)),
+)
+
+
+def planificar_cortes(piezas: Iterable[Pieza],
+                      hojas_stock: Optional[Dict[str, Tuple[float, float]]] = None,
+                      kerf: float = KERF_MM,
+                      retazo_minimo: float = RETAZO_MINIMO_MM,
+                      presupuesto_segundos: float = 1.0) -> PlanCorte:
+    """
+    Genera el plan de corte para un conjunto de piezas.
+
+    Args:
+        piezas: Piezas a cortar (pueden ser de distintos tipos de hoja)
+        hojas_stock: {tipo_hoja: (ancho, alto)}; los tipos sin entrada
+            usan HOJA_ESTANDAR
+        kerf: Ancho del corte en mm
+        retazo_minimo: Lado mínimo para considerar reutilizable un retazo
+        presupuesto_segundos: Tiempo máximo para probar órdenes alternativos
+
+    Returns:
+        PlanCorte
+    """
+    inicio = time.perf_counter()
+    hojas_stock = hojas_stock or {}
+
+    grupos: Dict[str, List[Pieza]] = {}
+    for pieza in piezas:
+        grupos.setdefault(pieza.tipo_hoja, []).append(pieza)
+
+    hojas_resultado: List[HojaCorte] = []
+    sin_colocar: List[str] = []
+    for tipo_hoja, grupo in grupos.items():
+        ancho, alto = hojas_stock.get(tipo_hoja, HOJA_ESTANDAR)
+        limite = time.perf_counter() + presupuesto_segundos / max(1, len(grupos))
+
+        mejor = None
+        for orden in _ORDENES:
+            hojas, fuera = _empaquetar(sorted(grupo, key=orden), ancho, alto, kerf)
+            # Menos hojas y, a igualdad, la última hoja más vacía (más retazo útil)
+            area_ultima = sum(c.ancho * c.alto for c in hojas[-1].colocaciones) if hojas else 0
+            clave = (len(fuera), len(hojas), area_ultima)
+            if mejor is None or clave < mejor[0]:
+                mejor = (clave, hojas, fuera)
+            if time.perf_counter() > limite:
+                break
+
+        _, hojas, fuera = mejor
+        sin_colocar.extend(fuera)
+        for hoja in hojas:
+            retazos = [r for r in hoja.libres if r[2] >= retazo_minimo and r[3] >= retazo_minimo]
+            retazos.sort(key=lambda r: r[2] * r[3], reverse=True)
+            hojas_resultado.append(HojaCorte(tipo_hoja, ancho, alto, hoja.colocaciones, retazos))
+
+    plan = PlanCorte(hojas_resultado, sin_colocar, time.perf_counter() - inicio)
+    logger.debug(
+        f"[CORTES] {sum(len(h.colocaciones) for h in plan.hojas)} piezas en "
+        f"{len(plan.hojas)} hojas, desperdicio {plan.desperdicio_pct:.1f}% "
+        f"({plan.tiempo_segundos:.3f}s)"
+    )
+    return plan
@@ -27,6 +27,7 @@ import os
 
 # Importar sistema de logging centralizado
 from rexus.utils.app_logger import get_logger
+from rexus.modules.vidrios.cutting_optimizer import KERF_MM, Pieza, parsear_medidas, planificar_cortes
 
 # Configurar logger específico para el módulo
 logger = get_logger("vidrios.model")
@@ -480,7 +481,7 @@ class VidriosModel:
                     obra_id,
                     metros_cuadrados,
                     medidas_especificas,
-                    propiedades,
+                    observaciones,
                 ),
             )
             self.db_connection.connection.commit()
@@ -544,6 +545,75 @@ class VidriosModel:
             logger.error(f"Error creando pedido: {e}")
             return None
 
+    def planificar_cortes_obras(self, obra_ids, hojas_stock=None, kerf=KERF_MM):
+        """
+        Planifica el corte de las piezas asignadas a una o varias obras.
+
+        Cada asignación aporta tantas piezas de medidas_especificas como
+        entren en sus metros cuadrados requeridos (mínimo una). Las piezas se
+        agrupan por tipo de hoja (tipo/espesor/color).
+
+        Args:
+            obra_ids (List[int]): Obras a planificar
+            hojas_stock (dict): {tipo_hoja: (ancho_mm, alto_mm)} opcional
+            kerf (float): Ancho de corte en mm
+
+        Returns:
+            dict: Plan de corte (hojas, retazos, desperdicio) o None si falla
+        """
+        if not self.db_connection or not obra_ids:
+            return None
+
+        try:
+            cursor = self.db_connection.connection.cursor()
+            obra_ids = list(obra_ids)
+            query = self.sql_manager.get_query('vidrios', 'select_piezas_corte_obras')
+            cursor.execute(query.format(placeholders=", ".join("?" for _ in obra_ids)), obra_ids)
+            columnas = [column[0] for column in cursor.description]
+
+            piezas = []
+            sin_medidas = 0
+            for fila in cursor.fetchall():
+                asignacion = dict(zip(columnas, fila))
+                medidas = parsear_medidas(asignacion.get("medidas_especificas"))
+                if medidas is None:
+                    sin_medidas += 1
+                    continue
+                ancho, alto = medidas
+                tipo_hoja = "{}-{}mm-{}".format(
+                    asignacion.get("tipo") or "vidrio",
+                    asignacion.get("espesor") or "",
+                    asignacion.get("color") or "incoloro",
+                )
+                area_m2 = ancho * alto / 1_000_000
+                metros = float(asignacion.get("metros_cuadrados_requeridos") or 0)
+                cantidad = max(1, round(metros / area_m2)) if area_m2 else 1
+                for n in range(cantidad):
+                    piezas.append(Pieza(
+                        id=f"{asignacion['obra_id']}-{asignacion['vidrio_id']}-{n + 1}",
+                        ancho=ancho,
+                        alto=alto,
+                        tipo_hoja=tipo_hoja,
+                        referencia={"obra_id": asignacion["obra_id"],
+                                    "vidrio_id": asignacion["vidrio_id"]},
+                    ))
+
+            if sin_medidas:
+                logger.warning(f"{sin_medidas} asignaciones de vidrio sin medidas interpretables")
+
+            plan = planificar_cortes(piezas, hojas_stock=hojas_stock, kerf=kerf)
+            resultado = plan.como_dict()
+            resultado["total_piezas"] = len(piezas)
+            logger.info(
+                f"Plan de corte obras {obra_ids}: {len(piezas)} piezas, "
+                f"{len(plan.hojas)} hojas, desperdicio {plan.desperdicio_pct:.1f}%"
+            )
+            return resultado
+
+        except Exception as e:
+            logger.error(f"Error planificando cortes: {e}")
+            return None
+
     def obtener_estadisticas(self):
         """
         Obtiene estadísticas generales de vidrios.
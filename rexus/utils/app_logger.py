@@ -14,6 +14,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from rexus.utils.log_pipeline import get_log_pipeline, get_log_pipeline_stats
+
 
 class RexusLogger:
     """
@@ -25,6 +27,7 @@ class RexusLogger:
     - Rotación automática de archivos de log
     - Formato consistente con timestamps e información del módulo
     - Filtrado por módulo/componente
+    - Escritura en segundo plano (log_pipeline): el hilo que loguea solo encola
     """
     
     _instance = None
@@ -87,10 +90,9 @@ class RexusLogger:
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
         
-        # Agregar handlers al logger
-        self.logger.addHandler(console_handler)
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(error_handler)
+        # Los handlers corren en el hilo del pipeline; el logger solo encola
+        self.pipeline = get_log_pipeline()
+        self.pipeline.attach(self.logger, [console_handler, file_handler, error_handler])
         
         # Configurar loggers específicos para componentes
         self._setup_component_loggers(formatter)
@@ -118,7 +120,7 @@ class RexusLogger:
             )
             component_handler.setLevel(logging.DEBUG)
             component_handler.setFormatter(formatter)
-            component_logger.addHandler(component_handler)
+            self.pipeline.attach(component_logger, [component_handler])
     
     def get_logger(self, name: str = "rexus") -> logging.Logger:
         """
@@ -201,11 +203,15 @@ class RexusLogger:
         Args:
             level: Nivel de logging (logging.DEBUG, INFO, WARNING, ERROR, CRITICAL)
         """
-        for handler in self.logger.handlers:
+        for handler in get_log_pipeline().handlers_for(self.logger.name):
             if isinstance(handler, logging.StreamHandler) and handler.stream == sys.stdout:
                 handler.setLevel(level)
                 break
 
+    def get_pipeline_stats(self) -> dict:
+        """Métricas del pipeline de logging (encolados, descartados, en cola)."""
+        return get_log_pipeline_stats()
+
 
 # Instancia global del logger
 app_logger = RexusLogger()
@@ -16,16 +16,95 @@ except ImportError:
     PANDAS_AVAILABLE = False
 
 try:
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
+    import openpyxl  # noqa: F401
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
-import csv
-from PyQt6.QtWidgets import QFileDialog, QWidget
+import threading
 
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtWidgets import QFileDialog, QProgressDialog, QWidget
+
+from rexus.utils.label_engine import (
+    REPORTLAB_AVAILABLE as LABELS_PDF_AVAILABLE, Etiqueta, FormatoHoja,
+    ResultadoEtiquetas, get_motor_etiquetas
+)
 from rexus.utils.message_system import show_success, show_error, show_warning
+from rexus.utils.streaming_export import (
+    ExportResult, ExportSource, available_formats, dict_rows,
+    export_source, stream_export
+)
+
+_FILE_DIALOG = {
+    'excel': ("Guardar archivo Excel", "xlsx", "Archivos Excel (*.xlsx);;Todos los archivos (*)"),
+    'csv': ("Guardar archivo CSV", "csv", "Archivos CSV (*.csv);;Todos los archivos (*)"),
+    'pdf': ("Guardar archivo PDF", "pdf", "Archivos PDF (*.pdf);;Todos los archivos (*)"),
+}
+
+
+class StreamingExportWorker(QThread):
+    """Ejecuta una exportación en streaming fuera del hilo de la interfaz."""
+
+    progreso = pyqtSignal(int, int)         # filas escritas, total (-1 si se desconoce)
+    finalizado = pyqtSignal(object)         # ExportResult
+
+    def __init__(self, source: ExportSource, file_path: str, export_format: str, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.file_path = file_path
+        self.export_format = export_format
+        self._cancel_event = threading.Event()
+
+    def cancelar(self):
+        self._cancel_event.set()
+
+    def _on_progress(self, rows: int, total: Optional[int]):
+        self.progreso.emit(rows, total if total is not None else -1)
+
+    def run(self):
+        try:
+            result = export_source(self.source, self.file_path, self.export_format,
+                                   progress=self._on_progress,
+                                   cancel_event=self._cancel_event)
+        except Exception as e:
+            logging.error(f"Error en exportación en segundo plano: {e}")
+            result = ExportResult(False, self.file_path, error=str(e), format=self.export_format)
+        self.finalizado.emit(result)
+
+
+class EtiquetasWorker(QThread):
+    """Genera hojas de etiquetas (códigos de barras / QR) fuera del hilo de la interfaz."""
+
+    progreso = pyqtSignal(int, int)         # etiquetas ubicadas, total (-1 si se desconoce)
+    finalizado = pyqtSignal(object)         # ResultadoEtiquetas
+
+    def __init__(self, etiquetas, file_path: str, total: Optional[int] = None,
+                 formato: Optional[FormatoHoja] = None, titulo: str = "", parent=None):
+        super().__init__(parent)
+        self.etiquetas = etiquetas
+        self.file_path = file_path
+        self.total = total
+        self.formato = formato
+        self.titulo = titulo
+        self._cancel_event = threading.Event()
+
+    def cancelar(self):
+        self._cancel_event.set()
+
+    def _on_progress(self, hechas: int, total: Optional[int]):
+        self.progreso.emit(hechas, total if total is not None else -1)
+
+    def run(self):
+        try:
+            result = get_motor_etiquetas().generar_hojas(
+                self.etiquetas, self.file_path, self.formato, total=self.total,
+                titulo=self.titulo, progreso=self._on_progress,
+                cancelar=self._cancel_event)
+        except Exception as e:
+            logging.error(f"Error generando etiquetas en segundo plano: {e}")
+            result = ResultadoEtiquetas(False, self.file_path, error=str(e))
+        self.finalizado.emit(result)
 
 
 class ExportManager:
@@ -34,6 +113,8 @@ class ExportManager:
     def __init__(self):
         self.supported_formats = ['excel', 'csv', 'pdf']
         self.default_export_dir = self._get_default_export_directory()
+        # Referencias a los workers activos para que no sean recolectados
+        self._workers = set()
 
     def _get_default_export_directory(self) -> str:
         """Obtiene el directorio por defecto para exportaciones."""
@@ -107,6 +188,39 @@ headers,
             show_error(parent_widget, "Error", f"Error durante la exportación: {str(e)}")
             return False
 
+    def _ask_file_path(self, export_format: str, filename: str,
+                       parent_widget: Optional[QWidget]) -> str:
+        """Pide la ruta de destino. Devuelve '' si el usuario cancela."""
+        caption, extension, filters = _FILE_DIALOG[export_format]
+        file_path, _ = QFileDialog.getSaveFileName(
+            parent_widget,
+            caption,
+            os.path.join(self.default_export_dir, f"{filename}.{extension}"),
+            filters
+        )
+        return file_path
+
+    def _export_rows(self,
+                     data: List[Dict],
+                     headers: List[str],
+                     filename: str,
+                     parent_widget: QWidget,
+                     export_format: str) -> bool:
+        """Exporta registros ya cargados usando los writers en streaming."""
+        file_path = self._ask_file_path(export_format, filename, parent_widget)
+        if not file_path:
+            return False  # Usuario canceló
+
+        result = stream_export(dict_rows(data, headers), headers, file_path,
+                               export_format=export_format, total=len(data))
+        if not result.success:
+            show_error(parent_widget, "Error", f"Error exportando a {export_format.upper()}: {result.error}")
+            return False
+
+        show_success(parent_widget, "Exportación Exitosa",
+                     f"Datos exportados a {export_format.upper()}:\n{file_path}")
+        return True
+
     def _export_to_excel(self,
 data: List[Dict],
         headers: List[str],
@@ -118,60 +232,7 @@ data: List[Dict],
             return False
 
         try:
-            # Seleccionar ubicación del archivo
-            file_path, _ = QFileDialog.getSaveFileName(
-                parent_widget,
-                "Guardar archivo Excel",
-                os.path.join(self.default_export_dir, f"{filename}.xlsx"),
-                "Archivos Excel (*.xlsx);;Todos los archivos (*)"
-            )
-
-            if not file_path:
-                return False  # Usuario canceló
-
-            # Crear workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Datos Exportados"
-
-            # Configurar estilos
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill("solid", fgColor="366092")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-
-            # Agregar encabezados
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-
-            # Agregar datos
-            for row_idx, record in enumerate(data, 2):
-                for col_idx, header in enumerate(headers, 1):
-                    value = record.get(header, "")
-                    ws.cell(row=row_idx, column=col_idx, value=value)
-
-            # Ajustar ancho de columnas
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except (ValueError, TypeError, AttributeError):
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-
-            # Guardar archivo
-            wb.save(file_path)
-
-            show_success(parent_widget, "Exportación Exitosa",
-                        f"Datos exportados a Excel:\n{file_path}")
-            return True
-
+            return self._export_rows(data, headers, filename, parent_widget, 'excel')
         except Exception as e:
             logging.error(f"Error exportando a Excel: {e}")
             show_error(parent_widget, "Error", f"Error exportando a Excel: {str(e)}")
@@ -184,34 +245,7 @@ data: List[Dict],
         parent_widget: QWidget) -> bool:
         """Exporta datos a formato CSV."""
         try:
-            # Seleccionar ubicación del archivo
-            file_path, _ = QFileDialog.getSaveFileName(
-                parent_widget,
-                "Guardar archivo CSV",
-                os.path.join(self.default_export_dir, f"{filename}.csv"),
-                "Archivos CSV (*.csv);;Todos los archivos (*)"
-            )
-
-            if not file_path:
-                return False  # Usuario canceló
-
-            # Escribir archivo CSV
-            with open(file_path,
-'w',
-                newline='',
-                encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=headers)
-                writer.writeheader()
-
-                for record in data:
-                    # Filtrar solo los campos que están en headers
-                    filtered_record = {header: record.get(header, "") for header in headers}
-                    writer.writerow(filtered_record)
-
-            show_success(parent_widget, "Exportación Exitosa",
-                        f"Datos exportados a CSV:\n{file_path}")
-            return True
-
+            return self._export_rows(data, headers, filename, parent_widget, 'csv')
         except Exception as e:
             logging.error(f"Error exportando a CSV: {e}")
             show_error(parent_widget, "Error", f"Error exportando a CSV: {str(e)}")
@@ -222,27 +256,148 @@ data: List[Dict],
         headers: List[str],
         filename: str,
         parent_widget: QWidget) -> bool:
-        """Exporta datos a formato PDF (implementación básica)."""
+        """Exporta datos a formato PDF (requiere reportlab)."""
         try:
-            # Por ahora, exportar como CSV y mostrar mensaje
-            show_warning(
-                parent_widget,
-                "Funcionalidad PDF",
-                "Exportación PDF en desarrollo.\nExportando como CSV en su lugar."
-            )
-            return self._export_to_csv(data, headers, filename, parent_widget)
+            if 'pdf' not in available_formats():
+                show_warning(
+                    parent_widget,
+                    "Funcionalidad PDF",
+                    "reportlab no disponible.\nExportando como CSV en su lugar."
+                )
+                return self._export_to_csv(data, headers, filename, parent_widget)
+            return self._export_rows(data, headers, filename, parent_widget, 'pdf')
 
         except Exception as e:
             logging.error(f"Error exportando a PDF: {e}")
             show_error(parent_widget, "Error", f"Error exportando a PDF: {str(e)}")
             return False
 
+    def export_source_async(self,
+                            source: ExportSource,
+                            module_name: str,
+                            export_format: str = 'excel',
+                            filename: Optional[str] = None,
+                            parent_widget: Optional[QWidget] = None) -> Optional[StreamingExportWorker]:
+        """
+        Exporta el conjunto de datos completo de un origen (p. ej. un cursor
+        con los filtros actuales) en segundo plano, con progreso y cancelación.
+
+        Returns:
+            El worker en ejecución, o None si no se inició la exportación
+        """
+        if export_format == 'pdf' and 'pdf' not in available_formats():
+            show_warning(parent_widget, "Funcionalidad PDF",
+                         "reportlab no disponible.\nExportando como CSV en su lugar.")
+            export_format = 'csv'
+        if export_format not in available_formats():
+            show_error(parent_widget, "Error", f"Formato {export_format} no disponible")
+            return None
+
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{module_name}_{timestamp}"
+        file_path = self._ask_file_path(export_format, filename, parent_widget)
+        if not file_path:
+            return None
+
+        worker = StreamingExportWorker(source, file_path, export_format, parent_widget)
+        dialogo = QProgressDialog("Exportando datos...", "Cancelar", 0, source.total or 0, parent_widget)
+        dialogo.setWindowTitle("Exportación")
+        dialogo.setMinimumDuration(500)
+        dialogo.canceled.connect(worker.cancelar)
+
+        def on_progreso(filas: int, total: int):
+            if total > 0:
+                dialogo.setMaximum(total)
+                dialogo.setValue(min(filas, total))
+            dialogo.setLabelText(f"Exportando datos... {filas:,} filas")
+
+        def on_finalizado(result: ExportResult):
+            dialogo.close()
+            self._workers.discard(worker)
+            if result.success:
+                show_success(parent_widget, "Exportación Exitosa",
+                             f"{result.rows:,} filas exportadas a {export_format.upper()}:\n{result.file_path}")
+            elif result.cancelled:
+                show_warning(parent_widget, "Exportación", "Exportación cancelada")
+            else:
+                show_error(parent_widget, "Error", f"Error durante la exportación: {result.error}")
+
+        worker.progreso.connect(on_progreso)
+        worker.finalizado.connect(on_finalizado)
+        self._workers.add(worker)
+        worker.start()
+        return worker
+
+    def generar_etiquetas_async(self,
+                                etiquetas: List[Etiqueta],
+                                module_name: str,
+                                formato: Optional[FormatoHoja] = None,
+                                filename: Optional[str] = None,
+                                parent_widget: Optional[QWidget] = None) -> Optional[EtiquetasWorker]:
+        """
+        Genera un PDF con hojas de etiquetas en segundo plano, con progreso y
+        cancelación.
+
+        Returns:
+            El worker en ejecución, o None si no se inició la generación
+        """
+        if not LABELS_PDF_AVAILABLE:
+            show_error(parent_widget, "Funcionalidad PDF", "reportlab no disponible")
+            return None
+        if not etiquetas:
+            show_warning(parent_widget, "Etiquetas", "No hay productos para etiquetar")
+            return None
+
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{module_name}_etiquetas_{timestamp}"
+        file_path = self._ask_file_path('pdf', filename, parent_widget)
+        if not file_path:
+            return None
+
+        total = sum(max(etiqueta.copias, 1) for etiqueta in etiquetas)
+        worker = EtiquetasWorker(etiquetas, file_path, total, formato,
+                                 titulo=module_name.capitalize(), parent=parent_widget)
+        dialogo = QProgressDialog("Generando etiquetas...", "Cancelar", 0, total, parent_widget)
+        dialogo.setWindowTitle("Etiquetas")
+        dialogo.setMinimumDuration(500)
+        dialogo.canceled.connect(worker.cancelar)
+
+        def on_progreso(hechas: int, total: int):
+            if total > 0:
+                dialogo.setMaximum(total)
+                dialogo.setValue(min(hechas, total))
+            dialogo.setLabelText(f"Generando etiquetas... {hechas:,}")
+
+        def on_finalizado(result: ResultadoEtiquetas):
+            dialogo.close()
+            self._workers.discard(worker)
+            if result.success:
+                mensaje = (f"{result.etiquetas:,} etiquetas en {result.paginas} páginas:\n"
+                           f"{result.file_path}")
+                if result.errores:
+                    mensaje += f"\n\n{len(result.errores)} códigos no se pudieron generar"
+                show_success(parent_widget, "Etiquetas Generadas", mensaje)
+            elif result.cancelled:
+                show_warning(parent_widget, "Etiquetas", "Generación de etiquetas cancelada")
+            else:
+                show_error(parent_widget, "Error", f"Error generando etiquetas: {result.error}")
+
+        worker.progreso.connect(on_progreso)
+        worker.finalizado.connect(on_finalizado)
+        self._workers.add(worker)
+        worker.start()
+        return worker
+
     def get_export_dialog_filters(self) -> str:
         """Retorna los filtros para diálogos de exportación."""
         filters = []
         if OPENPYXL_AVAILABLE:
             filters.append("Excel (*.xlsx)")
         filters.append("CSV (*.csv)")
+        if 'pdf' in available_formats():
+            filters.append("PDF (*.pdf)")
         filters.append("Todos los archivos (*)")
         return ";;".join(filters)
 
@@ -284,11 +439,24 @@ class ModuleExportMixin:
         Exporta los datos de la tabla principal del módulo.
         Debe ser sobrescrito por cada módulo.
         """
+        module_name = self.__class__.__name__.replace('View', '').lower()
+
+        # Si el módulo puede consultar el resultado filtrado completo, se
+        # exporta desde la base de datos y no solo la página visible.
+        source = self._get_export_source()
+        if source is not None:
+            worker = self.export_manager.export_source_async(
+                source,
+                module_name=module_name,
+                export_format=export_format,
+                parent_widget=self
+            )
+            return worker is not None
+
         # Esta es una implementación base que debe ser personalizada
         if hasattr(self, 'tabla_principal'):
             data = self._extract_table_data()
             headers = self._get_table_headers()
-            module_name = self.__class__.__name__.replace('View', '').lower()
 
             return self.export_manager.export_data(
                 data=data,
@@ -301,6 +469,15 @@ class ModuleExportMixin:
             show_error(self, "Error", "No se encontró tabla principal para exportar")
             return False
 
+    def _get_export_source(self) -> Optional[ExportSource]:
+        """
+        Origen de datos para exportar el conjunto filtrado completo.
+
+        Los módulos con datos paginados lo sobrescriben (normalmente
+        delegando en el modelo); None exporta la tabla en pantalla.
+        """
+        return None
+
     def _extract_table_data(self) -> List[Dict[str, Any]]:
         """Extrae datos de la tabla principal."""
         data = []
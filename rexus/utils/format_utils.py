@@ -5,7 +5,7 @@ Proporciona funciones para formatear datos de manera consistente en toda la apli
 """
 
 from datetime import datetime, date
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 from decimal import Decimal, ROUND_HALF_UP
 
 
@@ -592,3 +592,14 @@ def format_for_display(value: Any, data_type: str = 'text') -> str:
         return text_formatter.format_phone(value)
     else:
         return str(value)
+
+
+def a_fecha(valor) -> Optional[date]:
+    """date, datetime o texto ISO -> date (None y "" -> None)."""
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor)[:10])
@@ -0,0 +1,561 @@
+"""
+Motor de Etiquetas - Rexus.app
+
+Genera códigos de barras y QR en lote y arma hojas de etiquetas listas para
+imprimir (PDF), para etiquetar un ingreso completo o todo el catálogo sin
+dibujar una imagen por vez en el hilo que llama.
+
+- Las imágenes se dibujan en un pool de procesos (ProcessPoolExecutor, con
+  procesos spawn), por tramos y con una ventana acotada de tramos en vuelo.
+  Los lotes chicos se dibujan en el mismo proceso
+- Cache por contenido: la clave es el hash de simbología + contenido, así las
+  copias de una misma etiqueta y las reimpresiones no se vuelven a dibujar.
+  En memoria (LRU acotado por bytes) y opcionalmente en disco
+- Hojas PDF (reportlab) en grilla configurable, escritas por ventanas de
+  etiquetas a medida que llegan las imágenes: memoria plana aunque sea el
+  catálogo completo
+- Progreso por callback y cancelación con threading.Event; se escribe a un
+  archivo temporal que solo reemplaza al destino si termina
+
+Dependencias opcionales: qrcode (QR), python-barcode (barras) y reportlab
+(hojas PDF).
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from io import BytesIO
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rexus.utils.app_logger import get_logger
+
+try:
+    import qrcode
+    QRCODE_AVAILABLE = True
+except ImportError:
+    QRCODE_AVAILABLE = False
+
+try:
+    import barcode
+    from barcode.writer import ImageWriter
+    BARCODE_AVAILABLE = True
+except ImportError:
+    BARCODE_AVAILABLE = False
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas as pdf_canvas
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+logger = get_logger("utils.label_engine")
+
+SIMBOLOGIA_QR = "qr"
+SIMBOLOGIA_BARRAS = "barras"        # EAN-13 si son 13 dígitos, si no Code 128
+SIMBOLOGIAS = (SIMBOLOGIA_QR, SIMBOLOGIA_BARRAS, "ean13", "code128")
+
+TAMANO_TRAMO = 32                   # imágenes por tarea enviada al pool
+UMBRAL_PARALELO = 64                # por debajo se dibuja en el mismo proceso
+VENTANA_PAGINAS = 10                # páginas de etiquetas por ventana
+MAX_BYTES_CACHE = 64 * 1024 * 1024
+
+# progreso(etiquetas_escritas, total o None)
+Progreso = Callable[[int, Optional[int]], None]
+
+
+class EtiquetasCanceladas(Exception):
+    """La generación de etiquetas fue cancelada por el usuario."""
+
+
+@dataclass(frozen=True)
+class Etiqueta:
+    """Una etiqueta de la hoja."""
+    contenido: str                  # lo que codifica el código
+    titulo: str = ""                # texto principal (p. ej. descripción)
+    subtitulo: str = ""             # texto secundario (p. ej. código)
+    simbologia: str = SIMBOLOGIA_BARRAS
+    copias: int = 1
+
+    @property
+    def clave(self) -> str:
+        return clave_imagen(self.simbologia, self.contenido)
+
+
+@dataclass
+class FormatoHoja:
+    """Grilla de etiquetas por página (medidas en milímetros)."""
+    columnas: int = 3
+    filas: int = 8
+    margen_mm: float = 10.0
+    separacion_mm: float = 2.0
+    relleno_mm: float = 2.0
+
+    @property
+    def por_pagina(self) -> int:
+        return self.columnas * self.filas
+
+
+@dataclass
+class ResultadoEtiquetas:
+    """Resultado de una generación de hojas de etiquetas."""
+    success: bool
+    file_path: str
+    etiquetas: int = 0              # etiquetas impresas (con copias)
+    paginas: int = 0
+    dibujadas: int = 0              # imágenes nuevas
+    desde_cache: int = 0            # imágenes reutilizadas
+    cancelled: bool = False
+    error: str = ""
+    errores: List[str] = field(default_factory=list)   # contenidos no codificables
+    segundos: float = 0.0
+
+
+def clave_imagen(simbologia: str, contenido: str) -> str:
+    """Clave de cache de la imagen de un código."""
+    return hashlib.sha1(f"{simbologia}\x1f{contenido}".encode("utf-8")).hexdigest()
+
+
+def simbologias_disponibles() -> List[str]:
+    """Simbologías que se pueden dibujar con las dependencias instaladas."""
+    disponibles = []
+    if QRCODE_AVAILABLE:
+        disponibles.append(SIMBOLOGIA_QR)
+    if BARCODE_AVAILABLE:
+        disponibles.extend(SIMBOLOGIAS[1:])
+    return disponibles
+
+
+def renderizar_codigo(simbologia: str, contenido: str) -> bytes:
+    """
+    Imagen PNG del código (se ejecuta en los procesos del pool). Se genera en
+    escala de grises: reportlab incrusta un byte por píxel en lugar de tres,
+    y armar la hoja es varias veces más rápido.
+    """
+    buffer = BytesIO()
+    if simbologia == SIMBOLOGIA_QR:
+        if not QRCODE_AVAILABLE:
+            raise RuntimeError("Se requiere la librería qrcode")
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=4,
+        )
+        qr.add_data(contenido)
+        qr.make(fit=True)
+        imagen = qr.make_image(fill_color="black", back_color="white")
+        imagen.convert("L").save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    if simbologia not in SIMBOLOGIAS:
+        raise ValueError(f"Simbología no soportada: {simbologia}")
+    if not BARCODE_AVAILABLE:
+        raise RuntimeError("Se requiere la librería python-barcode")
+    tipo = simbologia
+    if simbologia == SIMBOLOGIA_BARRAS:
+        contenido = contenido.replace("-", "").strip()
+        tipo = "ean13" if len(contenido) == 13 and contenido.isdigit() else "code128"
+    barcode.get(tipo, contenido, writer=ImageWriter(mode="L")).write(buffer)
+    return buffer.getvalue()
+
+
+def _renderizar_tramo(pedidos: List[Tuple[str, str, str]]) -> List[Tuple[str, Optional[bytes], str]]:
+    """(clave, simbologia, contenido) -> (clave, png o None, error)."""
+    resultados = []
+    for clave, simbologia, contenido in pedidos:
+        try:
+            resultados.append((clave, renderizar_codigo(simbologia, contenido), ""))
+        except Exception as e:
+            resultados.append((clave, None, str(e)))
+    return resultados
+
+
+class _CacheImagenes:
+    """LRU en memoria acotado por bytes, con copia opcional en disco."""
+
+    def __init__(self, max_bytes: int, directorio: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.directorio = directorio
+        self._imagenes: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+    def obtener(self, clave: str) -> Optional[bytes]:
+        with self._lock:
+            imagen = self._imagenes.get(clave)
+            if imagen is not None:
+                self._imagenes.move_to_end(clave)
+                return imagen
+        if not self.directorio:
+            return None
+        try:
+            with open(self._ruta(clave), "rb") as archivo:
+                imagen = archivo.read()
+        except OSError:
+            return None
+        self._guardar_memoria(clave, imagen)
+        return imagen
+
+    def guardar(self, clave: str, imagen: bytes):
+        self._guardar_memoria(clave, imagen)
+        if not self.directorio:
+            return
+        ruta = self._ruta(clave)
+        try:
+            with open(f"{ruta}.part", "wb") as archivo:
+                archivo.write(imagen)
+            os.replace(f"{ruta}.part", ruta)
+        except OSError as e:
+            logger.warning(f"[ETIQUETAS] No se pudo guardar la imagen en cache: {e}")
+
+    def _guardar_memoria(self, clave: str, imagen: bytes):
+        with self._lock:
+            anterior = self._imagenes.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior)
+            self._imagenes[clave] = imagen
+            self._bytes += len(imagen)
+            while self._bytes > self.max_bytes and len(self._imagenes) > 1:
+                _, descartada = self._imagenes.popitem(last=False)
+                self._bytes -= len(descartada)
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.png")
+
+    def limpiar(self):
+        with self._lock:
+            self._imagenes.clear()
+            self._bytes = 0
+
+
+class MotorEtiquetas:
+    """Dibujo de códigos en lote con cache por contenido y hojas PDF."""
+
+    def __init__(self, procesos: Optional[int] = None, max_bytes_cache: int = MAX_BYTES_CACHE,
+                 directorio_cache: Optional[str] = None, tamano_tramo: int = TAMANO_TRAMO):
+        """
+        Args:
+            procesos: Procesos del pool (None = núcleos - 1; 1 = sin pool)
+            max_bytes_cache: Tope de la cache en memoria
+            directorio_cache: Carpeta para conservar las imágenes entre sesiones
+            tamano_tramo: Imágenes por tarea enviada al pool
+        """
+        self.procesos = procesos if procesos is not None else max(1, (os.cpu_count() or 2) - 1)
+        self.tamano_tramo = tamano_tramo
+        self.cache = _CacheImagenes(max_bytes_cache, directorio_cache)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    # Imágenes
+
+    def imagen(self, simbologia: str, contenido: str) -> Optional[bytes]:
+        """PNG de un código, desde la cache si ya se dibujó (None si no se puede)."""
+        clave = clave_imagen(simbologia, contenido)
+        imagen = self.cache.obtener(clave)
+        if imagen is not None:
+            return imagen
+        try:
+            imagen = renderizar_codigo(simbologia, contenido)
+        except Exception as e:
+            logger.error(f"[ERROR ETIQUETAS] No se pudo generar {simbologia} para {contenido!r}: {e}")
+            return None
+        self.cache.guardar(clave, imagen)
+        return imagen
+
+    def renderizar(self, etiquetas: Iterable[Etiqueta],
+                   cancelar: Optional[threading.Event] = None) -> Tuple[Dict[str, bytes], Dict[str, str], int]:
+        """
+        Imágenes de las etiquetas: de la cache o dibujadas en el pool.
+
+        Returns:
+            (imágenes por clave, errores por clave, imágenes dibujadas)
+        """
+        imagenes: Dict[str, bytes] = {}
+        pendientes: Dict[str, Tuple[str, str, str]] = {}
+        for etiqueta in etiquetas:
+            clave = etiqueta.clave
+            if clave in imagenes or clave in pendientes:
+                continue
+            imagen = self.cache.obtener(clave)
+            if imagen is not None:
+                imagenes[clave] = imagen
+            else:
+                pendientes[clave] = (clave, etiqueta.simbologia, etiqueta.contenido)
+
+        errores: Dict[str, str] = {}
+        for clave, imagen, error in self._dibujar(list(pendientes.values()), cancelar):
+            if imagen is None:
+                errores[clave] = error
+                continue
+            self.cache.guardar(clave, imagen)
+            imagenes[clave] = imagen
+        return imagenes, errores, len(pendientes) - len(errores)
+
+    def _dibujar(self, pedidos: List[Tuple[str, str, str]],
+                 cancelar: Optional[threading.Event]) -> Iterator[Tuple[str, Optional[bytes], str]]:
+        tramos = [pedidos[i:i + self.tamano_tramo] for i in range(0, len(pedidos), self.tamano_tramo)]
+        if self.procesos <= 1 or len(pedidos) < UMBRAL_PARALELO:
+            for tramo in tramos:
+                self._verificar_cancelacion(cancelar)
+                yield from _renderizar_tramo(tramo)
+            return
+
+        try:
+            pool = self._obtener_pool()
+            # Ventana acotada de tramos en vuelo para poder cancelar a tiempo
+            restantes = iter(tramos)
+            en_vuelo = {pool.submit(_renderizar_tramo, t) for t in islice(restantes, self.procesos * 2)}
+            while en_vuelo:
+                if cancelar is not None and cancelar.is_set():
+                    for futuro in en_vuelo:
+                        futuro.cancel()
+                    raise EtiquetasCanceladas()
+                listos, en_vuelo = wait(en_vuelo, timeout=0.2, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    yield from futuro.result()
+                    siguiente = next(restantes, None)
+                    if siguiente is not None:
+                        en_vuelo.add(pool.submit(_renderizar_tramo, siguiente))
+        except BrokenProcessPool as e:
+            # Sin procesos (p. ej. entorno congelado sin freeze_support): se sigue en este
+            logger.warning(f"[ETIQUETAS] Pool de procesos no disponible, se dibuja en serie: {e}")
+            self._cerrar_pool()
+            self.procesos = 1
+            pendientes = [p for p in pedidos if self.cache.obtener(p[0]) is None]
+            yield from self._dibujar(pendientes, cancelar)
+
+    def _obtener_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: un fork de la aplicación (Qt, hilos, conexiones
+                # abiertas) puede heredar locks tomados y colgar al hijo
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.procesos, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _cerrar_pool(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _verificar_cancelacion(cancelar: Optional[threading.Event]):
+        if cancelar is not None and cancelar.is_set():
+            raise EtiquetasCanceladas()
+
+    # Hojas
+
+    def generar_hojas(self, etiquetas: Iterable[Etiqueta], file_path: str,
+                      formato: Optional[FormatoHoja] = None, total: Optional[int] = None,
+                      titulo: str = "", progreso: Optional[Progreso] = None,
+                      cancelar: Optional[threading.Event] = None) -> ResultadoEtiquetas:
+        """
+        Escribe las hojas de etiquetas en un PDF.
+
+        Args:
+            etiquetas: Etiquetas a imprimir (se recorren una vez, por ventanas)
+            file_path: PDF de destino
+            formato: Grilla de la hoja (por defecto, A4 de 3 x 8)
+            total: Etiquetas esperadas (con copias), para el progreso
+            titulo: Título del documento
+            progreso: callback(etiquetas_escritas, total)
+            cancelar: Si se activa, se aborta y se elimina el archivo parcial
+
+        Returns:
+            ResultadoEtiquetas
+        """
+        inicio = time.perf_counter()
+        resultado = ResultadoEtiquetas(False, file_path)
+        if not REPORTLAB_AVAILABLE:
+            resultado.error = "reportlab no disponible"
+            return resultado
+
+        formato = formato or FormatoHoja()
+        temp_path = f"{file_path}.part"
+        hoja = None
+        try:
+            hoja = _HojaEtiquetas(temp_path, formato, titulo)
+            iterador = iter(etiquetas)
+            ventana = formato.por_pagina * VENTANA_PAGINAS
+            while True:
+                lote = list(islice(iterador, ventana))
+                if not lote:
+                    break
+                imagenes, errores, dibujadas = self.renderizar(lote, cancelar)
+                resultado.dibujadas += dibujadas
+                resultado.desde_cache += len({e.clave for e in lote}) - dibujadas - len(errores)
+                for etiqueta in lote:
+                    imagen = imagenes.get(etiqueta.clave)
+                    if imagen is None:
+                        resultado.errores.append(f"{etiqueta.contenido}: {errores.get(etiqueta.clave, '')}")
+                        continue
+                    for _ in range(max(1, etiqueta.copias)):
+                        hoja.agregar(etiqueta, imagen)
+                        resultado.etiquetas += 1
+                self._verificar_cancelacion(cancelar)
+                if progreso:
+                    progreso(resultado.etiquetas, total)
+
+            hoja.cerrar()
+            resultado.paginas = hoja.paginas
+            hoja = None
+            os.replace(temp_path, file_path)
+            resultado.success = True
+            if progreso:
+                progreso(resultado.etiquetas, total if total is not None else resultado.etiquetas)
+
+        except EtiquetasCanceladas:
+            resultado.cancelled = True
+            logger.info(f"[ETIQUETAS] Generación cancelada tras {resultado.etiquetas} etiquetas")
+        except Exception as e:
+            resultado.error = str(e)
+            logger.error(f"[ERROR ETIQUETAS] Error generando hojas de etiquetas: {e}")
+        finally:
+            if hoja is not None:
+                try:
+                    hoja.cerrar()
+                except Exception:
+                    pass  # El archivo parcial se descarta igual
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError as e:
+                    logger.warning(f"[ETIQUETAS] No se pudo eliminar archivo parcial {temp_path}: {e}")
+
+        resultado.segundos = time.perf_counter() - inicio
+        if resultado.success:
+            logger.info(
+                f"[ETIQUETAS] {resultado.etiquetas} etiquetas en {resultado.paginas} páginas "
+                f"({resultado.dibujadas} imágenes nuevas, {resultado.desde_cache} desde cache) "
+                f"en {resultado.segundos:.2f}s: {file_path}"
+            )
+        return resultado
+
+    def cerrar(self):
+        """Detiene el pool de procesos."""
+        self._cerrar_pool()
+
+
+class _HojaEtiquetas:
+    """Grilla de etiquetas; cada página se emite al completarse."""
+
+    FUENTE = "Helvetica"
+    TAMANO_TITULO = 7
+    TAMANO_SUBTITULO = 6
+
+    def __init__(self, path: str, formato: FormatoHoja, titulo: str = ""):
+        self.formato = formato
+        self._size = A4
+        self._canvas = pdf_canvas.Canvas(path, pagesize=self._size, pageCompression=1)
+        if titulo:
+            self._canvas.setTitle(titulo)
+        margen = formato.margen_mm * mm
+        separacion = formato.separacion_mm * mm
+        self._margen = margen
+        self._separacion = separacion
+        self._ancho = (self._size[0] - 2 * margen - (formato.columnas - 1) * separacion) / formato.columnas
+        self._alto = (self._size[1] - 2 * margen - (formato.filas - 1) * separacion) / formato.filas
+        self._posicion = 0
+        self.paginas = 0
+        # Un ImageReader por imagen: las copias se incrustan una sola vez
+        self._lectores: "OrderedDict[str, ImageReader]" = OrderedDict()
+
+    def agregar(self, etiqueta: Etiqueta, imagen: bytes):
+        if self._posicion == 0:
+            self.paginas += 1
+        fila, columna = divmod(self._posicion, self.formato.columnas)
+        x = self._margen + columna * (self._ancho + self._separacion)
+        y = self._size[1] - self._margen - (fila + 1) * self._alto - fila * self._separacion
+        self._dibujar(etiqueta, imagen, x, y)
+        self._posicion += 1
+        if self._posicion == self.formato.por_pagina:
+            self._canvas.showPage()
+            self._posicion = 0
+
+    def _dibujar(self, etiqueta: Etiqueta, imagen: bytes, x: float, y: float):
+        c = self._canvas
+        relleno = self.formato.relleno_mm * mm
+        ancho = self._ancho - 2 * relleno
+        arriba = y + self._alto - relleno
+        for texto, tamano, negrita in ((etiqueta.titulo, self.TAMANO_TITULO, True),
+                                       (etiqueta.subtitulo, self.TAMANO_SUBTITULO, False)):
+            if not texto:
+                continue
+            fuente = f"{self.FUENTE}-Bold" if negrita else self.FUENTE
+            c.setFont(fuente, tamano)
+            arriba -= tamano
+            c.drawString(x + relleno, arriba, self._recortar(str(texto), fuente, tamano, ancho))
+            arriba -= 1
+
+        lector = self._lector(etiqueta.clave, imagen)
+        ancho_img, alto_img = lector.getSize()
+        alto = arriba - (y + relleno)
+        escala = min(ancho / ancho_img, alto / alto_img)
+        if escala <= 0:
+            return
+        w, h = ancho_img * escala, alto_img * escala
+        c.drawImage(lector, x + relleno + (ancho - w) / 2, y + relleno + (alto - h) / 2, w, h)
+
+    def _lector(self, clave: str, imagen: bytes) -> "ImageReader":
+        lector = self._lectores.get(clave)
+        if lector is None:
+            lector = ImageReader(BytesIO(imagen))
+            self._lectores[clave] = lector
+            if len(self._lectores) > self.formato.por_pagina * 2:
+                self._lectores.popitem(last=False)
+        return lector
+
+    def _recortar(self, texto: str, fuente: str, tamano: float, ancho: float) -> str:
+        if self._canvas.stringWidth(texto, fuente, tamano) <= ancho:
+            return texto
+        while texto and self._canvas.stringWidth(texto + "…", fuente, tamano) > ancho:
+            texto = texto[:-1]
+        return texto + "…"
+
+    def cerrar(self):
+        self._canvas.save()
+
+
+_motor_etiquetas: Optional[MotorEtiquetas] = None
+_motor_etiquetas_lock = threading.Lock()
+
+
+def get_motor_etiquetas() -> MotorEtiquetas:
+    """Obtiene el motor de etiquetas global."""
+    global _motor_etiquetas
+    if _motor_etiquetas is None:
+        with _motor_etiquetas_lock:
+            if _motor_etiquetas is None:
+                _motor_etiquetas = MotorEtiquetas()
+    return _motor_etiquetas
+
+
+def init_motor_etiquetas(procesos: Optional[int] = None,
+                         directorio_cache: Optional[str] = None) -> MotorEtiquetas:
+    """
+    Inicializa el motor global.
+
+    Args:
+        procesos: Procesos del pool (1 = sin pool)
+        directorio_cache: Carpeta para conservar las imágenes entre sesiones
+    """
+    global _motor_etiquetas
+    with _motor_etiquetas_lock:
+        if _motor_etiquetas is not None:
+            _motor_etiquetas.cerrar()
+        _motor_etiquetas = MotorEtiquetas(procesos=procesos, directorio_cache=directorio_cache)
+    return _motor_etiquetas
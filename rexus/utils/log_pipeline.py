@@ -0,0 +1,286 @@
+"""
+Pipeline de Logging No Bloqueante - Rexus.app
+
+Los loggers de la aplicación solo encolan registros (QueueHandler). Un único
+hilo en segundo plano (QueueListener) se encarga de todo el trabajo costoso:
+interpolar el mensaje, enmascarar datos sensibles, formatear/serializar a
+JSON y escribir/rotar los archivos.
+
+Características:
+- Cola acotada con política de descarte o contrapresión (backpressure)
+- Los registros ERROR/CRITICAL nunca se descartan sin antes esperar
+- Enmascarado del mensaje ya interpolado, una sola vez y fuera del hilo
+  que loguea; los handlers del logger raíz (basicConfig) se adoptan para
+  que también pasen por la cola
+- Métricas de registros encolados, procesados y descartados
+- Un solo hilo para todos los handlers, detenido y drenado al salir
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# Políticas cuando la cola está llena
+POLICY_DROP = "drop"    # Descarta el registro nuevo (salvo >= never_drop_level)
+POLICY_BLOCK = "block"  # Espera hasta block_timeout antes de descartar
+
+
+class LogPipelineStats:
+    """Contadores del pipeline, actualizados desde los hilos que loguean y el de escritura."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.dropped_by_level: Dict[str, int] = {}
+        self.max_depth = 0
+        self.handler_errors = 0
+
+    def add(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def record_enqueued(self, depth: int):
+        with self._lock:
+            self.enqueued += 1
+            if depth > self.max_depth:
+                self.max_depth = depth
+
+    def record_drop(self, level: str):
+        with self._lock:
+            self.dropped += 1
+            self.dropped_by_level[level] = self.dropped_by_level.get(level, 0) + 1
+
+    def as_dict(self, depth: int) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "dropped_by_level": dict(self.dropped_by_level),
+                "queued": depth,
+                "max_depth": self.max_depth,
+                "handler_errors": self.handler_errors,
+            }
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler con cola acotada que no formatea en el hilo llamador."""
+
+    def __init__(self, pipeline: "LogPipeline"):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+
+    def emit(self, record: logging.LogRecord):
+        # Un mismo registro llega una vez por cada logger ancestro con este
+        # handler; solo se encola la primera vez.
+        if getattr(record, "_rexus_enqueued", False):
+            return
+        record._rexus_enqueued = True
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # La cola es en proceso: no hace falta volver el registro
+        # serializable. Interpolar, enmascarar y formatear queda para el
+        # hilo de escritura.
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        pipeline = self.pipeline
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if pipeline.policy == POLICY_BLOCK or record.levelno >= pipeline.never_drop_level:
+                try:
+                    self.queue.put(record, timeout=pipeline.block_timeout)
+                except queue.Full:
+                    pipeline._record_drop(record)
+                    return
+            else:
+                pipeline._record_drop(record)
+                return
+
+        pipeline.stats.record_enqueued(self.queue.qsize())
+
+
+class _PipelineListener(logging.handlers.QueueListener):
+    """Listener que reparte cada registro a los handlers de su logger."""
+
+    def __init__(self, pipeline: "LogPipeline"):
+        super().__init__(pipeline.queue, respect_handler_level=True)
+        self.pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return self.pipeline._prepare(record)
+
+    def enqueue_sentinel(self):
+        # Con la cola llena put_nowait fallaría; el hilo sigue drenando.
+        self.queue.put(self._sentinel)
+
+    def handle(self, record: logging.LogRecord):
+        record = self.prepare(record)
+        for handler in self.pipeline._handlers_snapshot():
+            if record.levelno < handler.level:
+                continue
+            try:
+                handler.handle(record)
+            except Exception:
+                self.pipeline.stats.add("handler_errors")
+        self.pipeline.stats.add("processed")
+
+
+class LogPipeline:
+    """Cola de logging compartida con un único hilo de escritura."""
+
+    def __init__(self,
+                 max_queue_size: int = 10000,
+                 policy: str = POLICY_DROP,
+                 block_timeout: float = 0.05,
+                 never_drop_level: int = logging.ERROR,
+                 mask_sensitive: bool = True):
+        """
+        Args:
+            max_queue_size: Registros máximos en espera
+            policy: POLICY_DROP o POLICY_BLOCK cuando la cola está llena
+            block_timeout: Segundos de espera en contrapresión
+            never_drop_level: Nivel a partir del cual siempre se espera
+                block_timeout antes de descartar
+            mask_sensitive: Enmascara datos sensibles en el hilo de escritura
+        """
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max_queue_size)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.never_drop_level = never_drop_level
+        self.mask_sensitive = mask_sensitive
+        self.stats = LogPipelineStats()
+
+        self._masker = None
+        self._routes: Dict[str, List[logging.Handler]] = {}
+        self._handlers: tuple = ()
+        self._lock = threading.Lock()
+        self.queue_handler = NonBlockingQueueHandler(self)
+        self._listener: Optional[_PipelineListener] = None
+
+    # ------------------------------------------------------------------ API
+
+    def attach(self, logger: logging.Logger, handlers: Iterable[logging.Handler],
+               replace: bool = False):
+        """
+        Registra handlers para los registros de logger (y sus hijos) y deja
+        en el logger solo el handler de cola.
+
+        Args:
+            logger: Logger cuyos registros deben llegar a los handlers
+            handlers: Handlers que se ejecutarán en el hilo de escritura
+            replace: Si es True, reemplaza los handlers registrados antes
+                para ese mismo logger
+        """
+        handlers = list(handlers)
+        for handler in handlers:
+            handler.addFilter(logging.Filter(logger.name if logger.name != "root" else ""))
+
+        with self._lock:
+            if replace:
+                for old in self._routes.pop(logger.name, []):
+                    old.close()
+            self._routes.setdefault(logger.name, []).extend(handlers)
+            self._handlers = tuple(h for hs in self._routes.values() for h in hs)
+
+        logger.addHandler(self.queue_handler)
+        self.start()
+
+    def adopt(self, logger: logging.Logger):
+        """
+        Pasa por la cola los handlers que ya tiene logger (p. ej. los que
+        basicConfig deja en el logger raíz), para que se enmascaren y
+        escriban en el hilo del pipeline como el resto.
+        """
+        handlers = [h for h in logger.handlers if h is not self.queue_handler]
+        for handler in handlers:
+            logger.removeHandler(handler)
+        if handlers:
+            self.attach(logger, handlers)
+
+    def handlers_for(self, logger_name: str) -> List[logging.Handler]:
+        """Handlers registrados para un logger."""
+        with self._lock:
+            return list(self._routes.get(logger_name, []))
+
+    def start(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = _PipelineListener(self)
+                self._listener.start()
+
+    def stop(self):
+        """Drena la cola y detiene el hilo de escritura."""
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+        for handler in self._handlers_snapshot():
+            try:
+                handler.flush()
+            except Exception:
+                pass  # El handler pudo cerrarse antes
+
+    def get_stats(self) -> Dict[str, object]:
+        """Métricas de registros encolados, procesados y descartados."""
+        return self.stats.as_dict(self.queue.qsize())
+
+    # ------------------------------------------------------------- internos
+
+    def _handlers_snapshot(self) -> tuple:
+        return self._handlers
+
+    def _record_drop(self, record: logging.LogRecord):
+        self.stats.record_drop(record.levelname)
+
+    def _prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Interpola y enmascara el mensaje una sola vez (en el hilo de escritura)."""
+        try:
+            message = record.getMessage()
+        except Exception:
+            message = str(record.msg)
+        if self.mask_sensitive:
+            masker = self._get_masker()
+            if masker is not None:
+                message = masker.mask_sensitive_data(message)
+        record.msg = message
+        record.args = None
+        return record
+
+    def _get_masker(self):
+        if self._masker is None:
+            try:
+                from rexus.utils.secure_logger import SensitiveDataMasker
+                self._masker = SensitiveDataMasker()
+            except ImportError:
+                self.mask_sensitive = False
+        return self._masker
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """Obtiene el pipeline global (se crea al primer uso)."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = LogPipeline()
+            atexit.register(_pipeline.stop)
+        return _pipeline
+
+
+def get_log_pipeline_stats() -> Dict[str, object]:
+    """Métricas del pipeline global."""
+    return get_log_pipeline().get_stats()
@@ -0,0 +1,398 @@
+"""
+Índice de Búsqueda Local - Rexus.app
+
+Índice de texto completo SQLite FTS5 que acompaña a la base principal para
+las cajas de búsqueda (productos, usuarios, obras, proveedores). Reemplaza
+los LIKE '%término%' sobre varias columnas, que recorren la tabla completa
+en cada tecla.
+
+- Coincidencia por prefijo ("alu" encuentra "aluminio") con índices de
+  prefijo de 2 y 3 caracteres
+- Sin distinguir mayúsculas ni acentos (tokenizer unicode61 remove_diacritics)
+- Resultados ordenados por relevancia (bm25 con pesos por columna)
+
+Sincronización:
+- Primera búsqueda de una entidad: carga completa desde la base principal
+- Escrituras locales: refrescar(entidad, ids) relee esas filas; invalidar()
+  fuerza una sincronización incremental en la próxima búsqueda
+- Cambios hechos por otros puestos: sincronización incremental por fecha de
+  modificación, como máximo cada INTERVALO_SINCRONIZACION segundos
+
+Si SQLite no tiene FTS5 o el índice no puede abrirse, buscar() devuelve None
+y el llamador usa su consulta LIKE de siempre.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from rexus.utils.app_logger import get_logger
+
+logger = get_logger("utils.search_index")
+
+RUTA_INDICE = os.path.join("cache", "search_index.db")
+INTERVALO_SINCRONIZACION = 30       # segundos entre sincronizaciones incrementales
+MARGEN_SINCRONIZACION = timedelta(minutes=2)   # tolera desfase de reloj con el servidor
+LIMITE_RESULTADOS = 200
+# Coincidencias máximas que se puntúan con bm25. Un prefijo corto puede
+# coincidir con decenas de miles de filas; al seguir escribiendo el conjunto
+# baja de este tope y el orden vuelve a ser exacto.
+CANDIDATOS_RANKING = 2000
+
+_PATRON_TOKEN = re.compile(r"\w+", re.UNICODE)
+_PATRON_ENTIDAD = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+# cargador(desde, ids) -> filas {"id": ..., "activo": ..., campo: valor, ...}
+Cargador = Callable[[Optional[datetime], Optional[Sequence[int]]], Iterable[Dict[str, Any]]]
+
+
+def normalizar_busqueda(texto) -> str:
+    """Minúsculas sin acentos."""
+    if texto is None:
+        return ""
+    texto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def consulta_prefijos(termino: str) -> str:
+    """Convierte el texto del usuario en una consulta FTS5 de prefijos (AND)."""
+    tokens = _PATRON_TOKEN.findall(normalizar_busqueda(termino))
+    return " ".join(f'"{token}"*' for token in tokens[:10])
+
+
+@dataclass
+class EntidadIndexada:
+    nombre: str
+    campos: Sequence[str]
+    pesos: Sequence[float]
+    cargador: Optional[Cargador] = None
+    construida: bool = False
+    pendiente: bool = False
+    ultima_sincronizacion: float = 0.0
+    marca: Optional[datetime] = None    # desde dónde pedir cambios al servidor
+
+
+class SearchIndex:
+    """Índice FTS5 local con una tabla virtual por entidad."""
+
+    def __init__(self, ruta: str = RUTA_INDICE):
+        self.ruta = ruta
+        self._lock = threading.RLock()
+        self._entidades: Dict[str, EntidadIndexada] = {}
+        self._conexion: Optional[sqlite3.Connection] = None
+        self.disponible = self._abrir()
+
+    def _abrir(self) -> bool:
+        try:
+            if self.ruta != ":memory:":
+                os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+            conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.execute(
+                "CREATE TABLE IF NOT EXISTS indice_meta ("
+                "entidad TEXT PRIMARY KEY, campos TEXT NOT NULL, marca TEXT)"
+            )
+            # Verifica que FTS5 esté compilado en este SQLite
+            conexion.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts_check USING fts5(x)")
+            self._conexion = conexion
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"[SEARCH] Índice de búsqueda no disponible, se usará LIKE: {e}")
+            return False
+
+    @staticmethod
+    def _tabla(entidad: str) -> str:
+        return f"fts_{entidad}"
+
+    def registrar(self, entidad: str, campos: Sequence[str],
+                  pesos: Optional[Sequence[float]] = None,
+                  cargador: Optional[Cargador] = None):
+        """
+        Declara una entidad indexable.
+
+        Args:
+            entidad: Nombre (se usa como nombre de tabla: solo [a-z0-9_])
+            campos: Columnas de texto indexadas, en orden
+            pesos: Peso bm25 de cada campo (mayor = más relevante)
+            cargador: Función que lee filas de la base principal; recibe
+                (desde, ids) y devuelve dicts con "id", "activo" opcional y
+                los campos
+        """
+        if not _PATRON_ENTIDAD.match(entidad) or not all(_PATRON_ENTIDAD.match(c) for c in campos):
+            raise ValueError(f"Nombre de entidad o campo inválido: {entidad} {campos}")
+        pesos = tuple(pesos) if pesos else (1.0,) * len(campos)
+        if len(pesos) != len(campos):
+            raise ValueError("pesos y campos deben tener la misma longitud")
+
+        with self._lock:
+            anterior = self._entidades.get(entidad)
+            registro = EntidadIndexada(entidad, tuple(campos), pesos, cargador)
+            if anterior and tuple(anterior.campos) == registro.campos:
+                registro.construida = anterior.construida
+                registro.marca = anterior.marca
+            self._entidades[entidad] = registro
+            if self.disponible:
+                self._preparar_tabla(registro)
+
+    def _preparar_tabla(self, registro: EntidadIndexada):
+        conexion = self._conexion
+        tabla = self._tabla(registro.nombre)
+        campos_txt = ",".join(registro.campos)
+        fila = conexion.execute(
+            "SELECT campos, marca FROM indice_meta WHERE entidad = ?", (registro.nombre,)
+        ).fetchone()
+
+        if fila and fila[0] != campos_txt:
+            # Cambió la definición: se descarta el índice y se reconstruye
+            conexion.execute(f"DROP TABLE IF EXISTS {tabla}")
+            conexion.execute("DELETE FROM indice_meta WHERE entidad = ?", (registro.nombre,))
+            fila = None
+
+        conexion.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabla} USING fts5("
+            f"{campos_txt}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        if fila and fila[1]:
+            registro.construida = True
+            registro.marca = datetime.fromisoformat(fila[1])
+        conexion.commit()
+
+    def _guardar_marca(self, registro: EntidadIndexada):
+        self._conexion.execute(
+            "INSERT OR REPLACE INTO indice_meta (entidad, campos, marca) VALUES (?, ?, ?)",
+            (registro.nombre, ",".join(registro.campos),
+             registro.marca.isoformat() if registro.marca else None),
+        )
+
+    def _aplicar_filas(self, registro: EntidadIndexada, filas: Iterable[Dict[str, Any]]) -> int:
+        """Inserta/reemplaza (o elimina si activo es falso) cada fila. Sin commit."""
+        tabla = self._tabla(registro.nombre)
+        campos = registro.campos
+        marcadores = ", ".join("?" for _ in campos)
+        sql_borrar = f"DELETE FROM {tabla} WHERE rowid = ?"
+        sql_insertar = f"INSERT INTO {tabla} (rowid, {', '.join(campos)}) VALUES (?, {marcadores})"
+
+        cantidad = 0
+        for fila in filas:
+            rowid = int(fila["id"])
+            self._conexion.execute(sql_borrar, (rowid,))
+            if fila.get("activo", 1) not in (0, False, None):
+                valores = [("" if fila.get(c) is None else str(fila.get(c))) for c in campos]
+                self._conexion.execute(sql_insertar, [rowid] + valores)
+            cantidad += 1
+        return cantidad
+
+    def indexar(self, entidad: str, filas: Iterable[Dict[str, Any]]) -> int:
+        """Agrega o reemplaza filas ya leídas por el llamador."""
+        registro = self._entidades.get(entidad)
+        if not self.disponible or registro is None:
+            return 0
+        with self._lock:
+            cantidad = self._aplicar_filas(registro, filas)
+            self._conexion.commit()
+            return cantidad
+
+    def eliminar(self, entidad: str, ids: Iterable[int]):
+        """Quita filas del índice."""
+        if not self.disponible or entidad not in self._entidades:
+            return
+        with self._lock:
+            tabla = self._tabla(entidad)
+            self._conexion.executemany(
+                f"DELETE FROM {tabla} WHERE rowid = ?", [(int(i),) for i in ids]
+            )
+            self._conexion.commit()
+
+    def refrescar(self, entidad: str, ids: Sequence[int]):
+        """Relee del servidor las filas indicadas (llamar tras update/delete)."""
+        registro = self._entidades.get(entidad)
+        if not self.disponible or registro is None or registro.cargador is None or not ids:
+            return
+        ids = [int(i) for i in ids]
+        try:
+            filas = list(registro.cargador(None, ids))
+        except Exception as e:
+            logger.warning(f"[SEARCH] No se pudo refrescar {entidad} {ids}: {e}")
+            self.invalidar(entidad)
+            return
+        encontrados = {int(f["id"]) for f in filas}
+        with self._lock:
+            self._aplicar_filas(registro, filas)
+            faltantes = [i for i in ids if i not in encontrados]
+            if faltantes:
+                self._conexion.executemany(
+                    f"DELETE FROM {self._tabla(entidad)} WHERE rowid = ?", [(i,) for i in faltantes]
+                )
+            self._conexion.commit()
+
+    def invalidar(self, entidad: str):
+        """Marca la entidad para sincronizar cambios en la próxima búsqueda."""
+        registro = self._entidades.get(entidad)
+        if registro:
+            registro.pendiente = True
+
+    def reconstruir(self, entidad: str) -> int:
+        """Carga completa desde el servidor, reemplazando el contenido del índice."""
+        registro = self._entidades.get(entidad)
+        if not self.disponible or registro is None or registro.cargador is None:
+            return 0
+
+        inicio_sync = datetime.now()
+        filas = registro.cargador(None, None)
+        with self._lock:
+            tabla = self._tabla(entidad)
+            self._conexion.execute(f"DELETE FROM {tabla}")
+            cantidad = self._aplicar_filas(registro, filas)
+            self._conexion.execute(f"INSERT INTO {tabla}({tabla}) VALUES ('optimize')")
+            registro.construida = True
+            registro.pendiente = False
+            registro.marca = inicio_sync - MARGEN_SINCRONIZACION
+            registro.ultima_sincronizacion = time.monotonic()
+            self._guardar_marca(registro)
+            self._conexion.commit()
+        logger.info(f"[SEARCH] Índice '{entidad}' reconstruido: {cantidad} filas")
+        return cantidad
+
+    def sincronizar(self, entidad: str) -> int:
+        """Aplica los cambios del servidor posteriores a la última marca."""
+        registro = self._entidades.get(entidad)
+        if not self.disponible or registro is None or registro.cargador is None:
+            return 0
+        if not registro.construida or registro.marca is None:
+            return self.reconstruir(entidad)
+
+        inicio_sync = datetime.now()
+        filas = registro.cargador(registro.marca, None)
+        with self._lock:
+            cantidad = self._aplicar_filas(registro, filas)
+            registro.pendiente = False
+            registro.marca = inicio_sync - MARGEN_SINCRONIZACION
+            registro.ultima_sincronizacion = time.monotonic()
+            self._guardar_marca(registro)
+            self._conexion.commit()
+        return cantidad
+
+    def _asegurar_actualizado(self, registro: EntidadIndexada):
+        vencido = time.monotonic() - registro.ultima_sincronizacion > INTERVALO_SINCRONIZACION
+        if registro.construida and not registro.pendiente and not vencido:
+            return
+        try:
+            self.sincronizar(registro.nombre)
+        except Exception as e:
+            # Con un índice ya construido se sigue respondiendo con lo que hay
+            logger.warning(f"[SEARCH] Error sincronizando '{registro.nombre}': {e}")
+            registro.ultima_sincronizacion = time.monotonic()
+            if not registro.construida:
+                raise
+
+    def buscar(self, entidad: str, termino: str,
+               limite: int = LIMITE_RESULTADOS) -> Optional[List[int]]:
+        """
+        IDs que coinciden con el término, del más al menos relevante.
+
+        Returns:
+            Lista de IDs (vacía si no hay coincidencias) o None si el índice
+            no está disponible para la entidad (el llamador debe usar LIKE)
+        """
+        registro = self._entidades.get(entidad)
+        if not self.disponible or registro is None:
+            return None
+
+        consulta = consulta_prefijos(termino)
+        if not consulta:
+            return None
+
+        try:
+            self._asegurar_actualizado(registro)
+        except Exception:
+            return None
+
+        tabla = self._tabla(entidad)
+        pesos = ", ".join(str(float(p)) for p in registro.pesos)
+        with self._lock:
+            try:
+                filas = self._conexion.execute(
+                    f"SELECT rowid FROM ("
+                    f"  SELECT rowid, bm25({tabla}, {pesos}) AS puntaje FROM {tabla}"
+                    f"  WHERE {tabla} MATCH ? LIMIT ?"
+                    f") ORDER BY puntaje LIMIT ?",
+                    (consulta, max(CANDIDATOS_RANKING, int(limite)), int(limite)),
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"[SEARCH] Error consultando índice '{entidad}': {e}")
+                return None
+        return [fila[0] for fila in filas]
+
+
+def crear_cargador_sql(obtener_conexion: Callable[[], Any], sql_template: str,
+                       columna_fecha: str) -> Cargador:
+    """
+    Cargador genérico a partir de una consulta con marcador {filtro}.
+
+    Args:
+        obtener_conexion: Devuelve la conexión a la base principal
+        sql_template: SELECT con "WHERE {filtro}" (columnas: id, activo, campos)
+        columna_fecha: Expresión de fecha de última modificación
+    """
+    def cargar(desde: Optional[datetime], ids: Optional[Sequence[int]]):
+        if ids:
+            filtro = f"id IN ({', '.join('?' for _ in ids)})"
+            params: List[Any] = list(ids)
+        elif desde is not None:
+            filtro = f"{columna_fecha} >= ?"
+            params = [desde.strftime("%Y-%m-%d %H:%M:%S")]
+        else:
+            filtro = "1 = 1"
+            params = []
+
+        cursor = obtener_conexion().cursor()
+        try:
+            cursor.execute(sql_template.format(filtro=filtro), params)
+            columnas = [desc[0] for desc in cursor.description]
+            filas = []
+            while True:
+                lote = cursor.fetchmany(5000)
+                if not lote:
+                    break
+                filas.extend(dict(zip(columnas, fila)) for fila in lote)
+            return filas
+        finally:
+            cursor.close()
+
+    return cargar
+
+
+def ordenar_por_ranking(filas: Iterable[Dict[str, Any]], ids: Sequence[int],
+                        clave: str = "id") -> List[Dict[str, Any]]:
+    """Ordena filas leídas con IN (...) según el orden de relevancia del índice."""
+    posicion = {rid: i for i, rid in enumerate(ids)}
+    return sorted(filas, key=lambda f: posicion.get(f.get(clave), len(posicion)))
+
+
+_search_index: Optional[SearchIndex] = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Obtiene la instancia global del índice de búsqueda."""
+    global _search_index
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                _search_index = SearchIndex()
+    return _search_index
+
+
+def init_search_index(ruta: str = RUTA_INDICE) -> SearchIndex:
+    """Inicializa el índice global con una ruta específica."""
+    global _search_index
+    with _search_index_lock:
+        _search_index = SearchIndex(ruta)
+    return _search_index
@@ -30,6 +30,8 @@ import hashlib
 from typing import Any, Dict, List, Pattern
 from datetime import datetime
 
+from rexus.utils.log_pipeline import get_log_pipeline
+
 
 class SensitiveDataMasker:
     """Enmascarador de datos sensibles en logs."""
@@ -176,7 +178,13 @@ class SensitiveDataMasker:
 
 
 class SecureLogRecord(logging.LogRecord):
-    """LogRecord que enmascara automáticamente datos sensibles."""
+    """
+    LogRecord que enmascara automáticamente datos sensibles.
+
+    No se instala como factory global: enmascararía cada registro en el hilo
+    que loguea y otra vez en el pipeline. SecureLogger adopta en su lugar los
+    handlers del logger raíz en el pipeline de logging.
+    """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -239,8 +247,11 @@ class SecureLogger:
         self.logger = logging.getLogger(name)
         self.logger.setLevel(getattr(logging, level.upper()))
 
-        # Usar nuestro LogRecord personalizado
-        logging.setLogRecordFactory(SecureLogRecord)
+        # El enmascarado se hace una vez, en el hilo del pipeline; los
+        # handlers del logger raíz (basicConfig) pasan también por la cola
+        self.pipeline = get_log_pipeline()
+        self.pipeline.mask_sensitive = True
+        self.pipeline.adopt(logging.getLogger())
 
         # Configurar handler si no existe
         if not self.logger.handlers:
@@ -256,7 +267,7 @@ class SecureLogger:
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
+        handlers = [console_handler]
 
         # Handler de archivo (si está configurado)
         try:
@@ -270,12 +281,14 @@ class SecureLogger:
                     '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
                 )
                 file_handler.setFormatter(file_formatter)
-                self.logger.addHandler(file_handler)
+                handlers.append(file_handler)
 
         except Exception as e:
             # Fallback silencioso si no se puede configurar archivo
             pass
 
+        self.pipeline.attach(self.logger, handlers)
+
     def debug(self, msg, *args, **kwargs):
         """Log debug con enmascarado."""
         self.logger.debug(msg, *args, **kwargs)
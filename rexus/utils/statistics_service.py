@@ -0,0 +1,346 @@
+"""
+Servicio de Estadísticas - Rexus.app
+
+Cache compartido de los contadores que muestran los dashboards y encabezados
+de cada módulo (obras, compras, inventario, auditoría). Cada módulo registra
+una función que calcula todas sus estadísticas con una consulta agrupada; el
+servicio guarda el resultado y lo sirve sin volver a la base de datos.
+
+Vigencia:
+- Escrituras locales: el modelo llama a invalidar(modulo) después de cada
+  commit. El valor anterior se sigue sirviendo mientras un hilo en segundo
+  plano lo recalcula (agrupando ráfagas de escrituras en un solo recálculo)
+- Otros clientes de la máquina: la invalidación se difunde por el bus de
+  eventos (EVENTO_ESTADISTICAS_INVALIDADAS)
+- Cambios hechos desde otros puestos: los valores vencen a los MAX_EDAD
+  segundos y se recalculan en segundo plano
+
+El hilo de refresco usa una conexión propia por módulo (connection_factory);
+sin ella, el recálculo se hace en el hilo que consulta, con su conexión.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from rexus.core.event_bus import (
+    EVENTO_ESTADISTICAS_INVALIDADAS, Despachador, Evento, EventBus, get_event_bus
+)
+from rexus.utils.app_logger import get_logger
+
+logger = get_logger("utils.statistics_service")
+
+MAX_EDAD = 15 * 60          # segundos de vigencia sin escrituras locales
+DEMORA_REFRESCO = 0.5       # agrupa las invalidaciones de una ráfaga de escrituras
+
+# calcular(conexion, *args) -> Dict con las estadísticas del módulo
+Calculador = Callable[..., Dict[str, Any]]
+Clave = Tuple[str, Tuple[Any, ...]]
+
+
+@dataclass
+class ModuloEstadisticas:
+    """Módulo registrado en el servicio."""
+    modulo: str
+    calcular: Calculador
+    connection_factory: Optional[Callable[[], Any]] = None
+    max_edad: float = MAX_EDAD
+    generacion: int = 0
+
+
+@dataclass(frozen=True)
+class _Entrada:
+    valor: Dict[str, Any]
+    generacion: int
+    calculado_en: float
+
+
+@dataclass
+class _Suscriptor:
+    callback: Callable[[Dict[str, Any]], None]
+    despachador: Optional[Despachador] = None
+
+
+def fabrica_conexion(db_connection) -> Optional[Callable[[], Any]]:
+    """
+    Fábrica de conexiones dedicadas a la misma base que db_connection, para
+    que el refresco en segundo plano no comparta la conexión de la interfaz.
+    Devuelve None si la conexión no indica su base de datos.
+    """
+    database = getattr(db_connection, "database", None)
+    if not database:
+        return None
+
+    def factory():
+        from rexus.core.database import DatabaseConnection
+
+        conn = DatabaseConnection(database=database)
+        return conn if conn.connect() else None
+
+    return factory
+
+
+class StatisticsService:
+    """Estadísticas por módulo con invalidación por escritura y refresco en segundo plano."""
+
+    def __init__(self, bus: Optional[EventBus] = None, demora: float = DEMORA_REFRESCO):
+        self.demora = demora
+        self._modulos: Dict[str, ModuloEstadisticas] = {}
+        self._entradas: Dict[Clave, _Entrada] = {}
+        self._suscriptores: Dict[Clave, List[_Suscriptor]] = {}
+        self._ultima_difusion: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._hay_trabajo = threading.Condition(self._lock)
+        self._pendientes: Set[Clave] = set()
+        self._conexiones: Dict[str, Any] = {}   # solo las usa el hilo de refresco
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = False
+        self._bus = bus
+        self._suscripcion_bus = None
+        if bus is not None:
+            self._suscripcion_bus = bus.suscribir(
+                EVENTO_ESTADISTICAS_INVALIDADAS, self._al_invalidar_remoto
+            )
+
+    def registrar(self, modulo: str, calcular: Calculador,
+                  connection_factory: Optional[Callable[[], Any]] = None,
+                  max_edad: float = MAX_EDAD):
+        """
+        Registra (o reemplaza) el cálculo de estadísticas de un módulo.
+
+        Args:
+            modulo: Nombre del módulo ("obras", "compras"...)
+            calcular: Función (conexion, *args) -> Dict
+            connection_factory: Abre una conexión dedicada para el refresco en
+                segundo plano (None = recalcular en el hilo que consulta)
+            max_edad: Segundos de vigencia sin escrituras locales
+        """
+        with self._lock:
+            anterior = self._modulos.get(modulo)
+            self._modulos[modulo] = ModuloEstadisticas(
+                modulo, calcular, connection_factory, max_edad,
+                anterior.generacion if anterior else 0,
+            )
+
+    def obtener(self, modulo: str, *args, conexion=None) -> Optional[Dict[str, Any]]:
+        """
+        Estadísticas del módulo.
+
+        Si hay un valor vigente se devuelve sin consultar la base. Si está
+        vencido o invalidado y el módulo tiene connection_factory, se devuelve
+        el valor anterior y se recalcula en segundo plano. Solo se calcula en
+        este hilo (con conexion) la primera vez o cuando no hay refresco en
+        segundo plano.
+
+        Returns:
+            Dict con las estadísticas, o None si no hay valor ni conexión
+        """
+        clave = (modulo, args)
+        registro = self._modulos.get(modulo)
+        if registro is None:
+            raise KeyError(f"Módulo de estadísticas no registrado: {modulo}")
+        entrada = self._entradas.get(clave)
+        if entrada is not None and self._vigente(registro, entrada):
+            return dict(entrada.valor)
+
+        if entrada is not None and registro.connection_factory is not None:
+            self._programar(clave)
+            return dict(entrada.valor)
+
+        if conexion is None:
+            if registro.connection_factory is not None:
+                self._programar(clave)
+            return None
+
+        generacion = registro.generacion
+        valor = registro.calcular(conexion, *args)
+        self._guardar(clave, valor, generacion)
+        return dict(valor)
+
+    @staticmethod
+    def _vigente(registro: ModuloEstadisticas, entrada: _Entrada) -> bool:
+        return (
+            entrada.generacion == registro.generacion
+            and time.monotonic() - entrada.calculado_en < registro.max_edad
+        )
+
+    def invalidar(self, modulo: str, difundir: bool = True):
+        """
+        Marca como desactualizadas las estadísticas del módulo (llamar después
+        del commit de una escritura) y programa su recálculo.
+        """
+        with self._lock:
+            registro = self._modulos.get(modulo)
+            if registro is not None:
+                registro.generacion += 1
+            ahora = time.monotonic()
+            # En una ráfaga de escrituras se difunde una vez por ventana: los
+            # demás clientes esperan self.demora antes de recalcular y la
+            # consulta ya incluye las escrituras de la ventana
+            difundir = difundir and ahora - self._ultima_difusion.get(modulo, 0.0) >= self.demora / 2
+            if difundir:
+                self._ultima_difusion[modulo] = ahora
+            claves = [c for c in (*self._entradas, *self._suscriptores) if c[0] == modulo]
+            if registro is not None and registro.connection_factory is not None:
+                self._pendientes.update(claves)
+                self._asegurar_hilo()
+                self._hay_trabajo.notify()
+        if difundir and self._bus is not None:
+            self._bus.publicar(EVENTO_ESTADISTICAS_INVALIDADAS, {"modulo": modulo})
+
+    def _al_invalidar_remoto(self, evento: Evento):
+        if evento.remoto and evento.datos.get("modulo"):
+            self.invalidar(evento.datos["modulo"], difundir=False)
+
+    def suscribir(self, modulo: str, callback: Callable[[Dict[str, Any]], None],
+                  *args, despachador: Optional[Despachador] = None) -> Callable[[], None]:
+        """
+        Recibe las estadísticas cada vez que se recalculan. Mantiene el valor
+        precalculado aunque nadie lo consulte.
+
+        Returns:
+            Función que cancela la suscripción
+        """
+        clave = (modulo, args)
+        suscriptor = _Suscriptor(callback, despachador)
+        with self._lock:
+            self._suscriptores[clave] = self._suscriptores.get(clave, []) + [suscriptor]
+        if clave not in self._entradas:
+            self._programar(clave)
+
+        def cancelar():
+            with self._lock:
+                restantes = [s for s in self._suscriptores.get(clave, []) if s is not suscriptor]
+                if restantes:
+                    self._suscriptores[clave] = restantes
+                else:
+                    self._suscriptores.pop(clave, None)
+
+        return cancelar
+
+    def _guardar(self, clave: Clave, valor: Dict[str, Any], generacion: int):
+        with self._lock:
+            actual = self._entradas.get(clave)
+            # Un cálculo que empezó antes que otro más reciente no lo pisa
+            if actual is not None and actual.generacion > generacion:
+                return
+            self._entradas[clave] = _Entrada(valor, generacion, time.monotonic())
+            suscriptores = self._suscriptores.get(clave, [])
+        for suscriptor in suscriptores:
+            self._notificar(suscriptor, dict(valor))
+
+    @staticmethod
+    def _notificar(suscriptor: _Suscriptor, valor: Dict[str, Any]):
+        def invocar():
+            try:
+                suscriptor.callback(valor)
+            except Exception as e:
+                logger.error(f"[ERROR ESTADISTICAS] Suscriptor: {e}")
+
+        if suscriptor.despachador is None:
+            invocar()
+            return
+        try:
+            suscriptor.despachador(invocar)
+        except Exception as e:
+            logger.error(f"[ERROR ESTADISTICAS] Despachador de suscriptor: {e}")
+
+    # Refresco en segundo plano
+
+    def _programar(self, clave: Clave):
+        with self._lock:
+            registro = self._modulos.get(clave[0])
+            if registro is None or registro.connection_factory is None:
+                return
+            self._pendientes.add(clave)
+            self._asegurar_hilo()
+            self._hay_trabajo.notify()
+
+    def _asegurar_hilo(self):
+        if self._hilo is None or not self._hilo.is_alive():
+            self._detener = False
+            self._hilo = threading.Thread(
+                target=self._bucle, name="rexus-estadisticas", daemon=True
+            )
+            self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            with self._lock:
+                while not self._pendientes and not self._detener:
+                    self._hay_trabajo.wait()
+                if self._detener:
+                    break
+            # Se espera un poco para recalcular una sola vez por ráfaga
+            time.sleep(self.demora)
+            with self._lock:
+                pendientes, self._pendientes = self._pendientes, set()
+            for clave in pendientes:
+                self._refrescar(clave)
+        self._cerrar_conexiones()
+
+    def _refrescar(self, clave: Clave):
+        modulo, args = clave
+        registro = self._modulos.get(modulo)
+        if registro is None or registro.connection_factory is None:
+            return
+        generacion = registro.generacion
+        conexion = self._conexiones.get(modulo)
+        try:
+            if conexion is None:
+                conexion = registro.connection_factory()
+                if conexion is None:
+                    return
+                self._conexiones[modulo] = conexion
+            valor = registro.calcular(conexion, *args)
+        except Exception as e:
+            logger.error(f"[ERROR ESTADISTICAS] Refrescando {modulo}: {e}")
+            self._cerrar_conexion(modulo)
+            return
+        self._guardar(clave, valor, generacion)
+
+    def _cerrar_conexion(self, modulo: str):
+        conexion = self._conexiones.pop(modulo, None)
+        if conexion is not None:
+            try:
+                conexion.close()
+            except Exception:
+                pass
+
+    def _cerrar_conexiones(self):
+        for modulo in list(self._conexiones):
+            self._cerrar_conexion(modulo)
+
+    def cerrar(self, timeout: float = 5.0):
+        """Detiene el hilo de refresco y cierra sus conexiones."""
+        with self._lock:
+            self._detener = True
+            self._hay_trabajo.notify()
+            hilo = self._hilo
+        if hilo is not None:
+            hilo.join(timeout)
+        if self._suscripcion_bus is not None:
+            self._suscripcion_bus.cancelar()
+            self._suscripcion_bus = None
+
+
+_statistics_service: Optional[StatisticsService] = None
+_statistics_service_lock = threading.Lock()
+
+
+def get_statistics_service() -> StatisticsService:
+    """Obtiene el servicio de estadísticas global (conectado al bus global)."""
+    global _statistics_service
+    if _statistics_service is None:
+        with _statistics_service_lock:
+            if _statistics_service is None:
+                _statistics_service = StatisticsService(get_event_bus())
+    return _statistics_service
+
+
+def init_statistics_service(demora: float = DEMORA_REFRESCO) -> StatisticsService:
+    """Inicializa el servicio global."""
+    service = get_statistics_service()
+    service.demora = demora
+    return service
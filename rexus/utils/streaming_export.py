@@ -0,0 +1,385 @@
+"""
+Exportación en Streaming - Rexus.app
+
+Escribe filas a Excel, CSV o PDF a medida que se leen, sin materializar el
+conjunto completo en memoria. Las filas pueden venir de un cursor de base de
+datos (fetchmany por lotes) o de cualquier iterable, por lo que sirve tanto
+para exportar el resultado filtrado completo de un módulo como la tabla en
+pantalla.
+
+- Excel: workbook de openpyxl en modo write_only (memoria constante)
+- CSV: escritura directa con csv.writer
+- PDF: reportlab, una página a la vez (opcional)
+- Progreso por callback y cancelación con threading.Event
+- Se escribe a un archivo temporal que solo reemplaza al destino si termina
+"""
+
+import csv
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+from rexus.utils.app_logger import get_logger
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, PatternFill
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+try:
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas as pdf_canvas
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# Filas leídas por cada fetchmany
+DEFAULT_BATCH_SIZE = 2000
+# Filas usadas para estimar el ancho de columnas en Excel
+WIDTH_SAMPLE_ROWS = 200
+# Cada cuántas filas se notifica el progreso
+PROGRESS_EVERY = 1000
+
+
+class ExportCancelled(Exception):
+    """La exportación fue cancelada por el usuario."""
+
+
+@dataclass
+class ExportSource:
+    """Origen de datos de una exportación.
+
+    open_rows se invoca dentro del hilo de exportación y debe devolver un
+    iterable de filas (secuencias alineadas con headers).
+    """
+    headers: List[str]
+    open_rows: Callable[[], Iterable[Sequence[Any]]]
+    total: Optional[int] = None
+    title: str = ""
+
+
+@dataclass
+class ExportResult:
+    """Resultado de una exportación."""
+    success: bool
+    file_path: str
+    rows: int = 0
+    cancelled: bool = False
+    error: str = ""
+    format: str = ""
+    extra: dict = field(default_factory=dict)
+
+
+def iter_cursor_rows(cursor, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Sequence[Any]]:
+    """Itera las filas de un cursor en lotes de fetchmany."""
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        for row in batch:
+            yield row
+
+
+def cursor_source(connection_factory: Callable[[], Any],
+                  sql: str,
+                  params: Sequence[Any] = (),
+                  headers: Optional[List[str]] = None,
+                  total: Optional[int] = None,
+                  batch_size: int = DEFAULT_BATCH_SIZE,
+                  title: str = "") -> ExportSource:
+    """
+    Crea un ExportSource que ejecuta una consulta y recorre su cursor.
+
+    Args:
+        connection_factory: Devuelve una conexión propia para el hilo de
+            exportación (las conexiones pyodbc no se comparten entre hilos)
+        sql: Consulta completa (con filtros, sin paginación)
+        params: Parámetros de la consulta
+        headers: Encabezados a mostrar (por defecto, nombres de columna)
+        total: Cantidad de filas esperada, para el progreso
+        batch_size: Filas por fetchmany
+        title: Título del documento
+    """
+    source = ExportSource(headers=list(headers or []), open_rows=lambda: iter(()),
+                          total=total, title=title)
+
+    def open_rows():
+        connection = connection_factory()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, tuple(params))
+            if not source.headers and cursor.description:
+                source.headers = [desc[0] for desc in cursor.description]
+            yield from iter_cursor_rows(cursor, batch_size)
+        finally:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.warning(f"[EXPORT] Error cerrando conexión de exportación: {e}")
+
+    source.open_rows = open_rows
+    return source
+
+
+def dict_rows(data: Iterable[dict], headers: Sequence[str]) -> Iterator[tuple]:
+    """Convierte registros dict en filas alineadas con headers."""
+    for record in data:
+        yield tuple(record.get(header, "") for header in headers)
+
+
+# --------------------------------------------------------------------- writers
+
+
+class _CsvWriter:
+    def __init__(self, path: str, headers: Sequence[str], title: str = ""):
+        # utf-8-sig para que Excel reconozca los acentos al abrir el CSV
+        self._file = open(path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+
+    def write_rows(self, rows: List[Sequence[Any]]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ExcelWriter:
+    def __init__(self, path: str, headers: Sequence[str], title: str = ""):
+        self._path = path
+        self._headers = list(headers)
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet(title=(title or "Datos Exportados")[:31])
+        self._sample: Optional[List[Sequence[Any]]] = []
+
+    def _flush_sample(self):
+        # En modo write_only los anchos deben fijarse antes de la primera fila:
+        # se estiman con el encabezado y una muestra inicial.
+        sample, self._sample = self._sample, None
+        ws = self._ws
+        for idx, header in enumerate(self._headers):
+            max_length = len(str(header))
+            for row in sample:
+                if idx < len(row) and row[idx] is not None:
+                    max_length = max(max_length, len(str(row[idx])))
+            letter = _column_letter(idx + 1)
+            ws.column_dimensions[letter].width = min(max_length + 2, 50)
+
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill("solid", fgColor="366092")
+        header_alignment = Alignment(horizontal="center", vertical="center")
+        header_cells = []
+        for header in self._headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        for row in sample:
+            ws.append(list(row))
+
+    def write_rows(self, rows: List[Sequence[Any]]):
+        if self._sample is not None:
+            self._sample.extend(rows)
+            if len(self._sample) < WIDTH_SAMPLE_ROWS:
+                return
+            self._flush_sample()
+            return
+        append = self._ws.append
+        for row in rows:
+            append(list(row))
+
+    def close(self):
+        if self._sample is not None:
+            self._flush_sample()
+        self._wb.save(self._path)
+
+
+class _PdfWriter:
+    """Tabla simple paginada; cada página se emite al completarse."""
+
+    FONT_SIZE = 7
+    LINE_HEIGHT = 10
+    MARGIN = 30
+
+    def __init__(self, path: str, headers: Sequence[str], title: str = ""):
+        self._headers = [str(h) for h in headers]
+        self._title = title
+        self._size = landscape(A4)
+        self._canvas = pdf_canvas.Canvas(path, pagesize=self._size, pageCompression=1)
+        width = self._size[0] - 2 * self.MARGIN
+        self._col_width = width / max(1, len(self._headers))
+        self._max_chars = max(4, int(self._col_width / (self.FONT_SIZE * 0.5)))
+        self._page = 0
+        self._y = 0.0
+        self._new_page()
+
+    def _new_page(self):
+        if self._page:
+            self._canvas.showPage()
+        self._page += 1
+        c = self._canvas
+        top = self._size[1] - self.MARGIN
+        if self._title:
+            c.setFont("Helvetica-Bold", 11)
+            c.drawString(self.MARGIN, top, self._title)
+            top -= 16
+        c.setFont("Helvetica-Bold", self.FONT_SIZE)
+        self._draw_row(self._headers, top)
+        c.setFont("Helvetica", self.FONT_SIZE)
+        c.drawRightString(self._size[0] - self.MARGIN, self.MARGIN / 2, f"Página {self._page}")
+        self._y = top - self.LINE_HEIGHT * 1.5
+
+    def _draw_row(self, values: Sequence[Any], y: float):
+        x = self.MARGIN
+        for value in values:
+            text = "" if value is None else str(value)
+            if len(text) > self._max_chars:
+                text = text[:self._max_chars - 1] + "…"
+            self._canvas.drawString(x, y, text)
+            x += self._col_width
+
+    def write_rows(self, rows: List[Sequence[Any]]):
+        for row in rows:
+            if self._y < self.MARGIN:
+                self._new_page()
+            self._draw_row(row, self._y)
+            self._y -= self.LINE_HEIGHT
+
+    def close(self):
+        self._canvas.save()
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+_WRITERS = {"csv": _CsvWriter}
+if OPENPYXL_AVAILABLE:
+    _WRITERS["excel"] = _ExcelWriter
+if REPORTLAB_AVAILABLE:
+    _WRITERS["pdf"] = _PdfWriter
+
+
+def available_formats() -> List[str]:
+    """Formatos soportados con las dependencias instaladas."""
+    return list(_WRITERS)
+
+
+def stream_export(rows: Iterable[Sequence[Any]],
+                  headers: Sequence[str],
+                  file_path: str,
+                  export_format: str = "csv",
+                  title: str = "",
+                  total: Optional[int] = None,
+                  progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                  cancel_event: Optional[threading.Event] = None,
+                  chunk_size: int = 500) -> ExportResult:
+    """
+    Escribe filas al archivo de destino en streaming.
+
+    Args:
+        rows: Iterable de filas alineadas con headers
+        headers: Encabezados de columna (o callable que los devuelve una vez
+            abierto el origen)
+        file_path: Archivo de destino
+        export_format: 'excel', 'csv' o 'pdf'
+        title: Título de la hoja/documento
+        total: Total esperado de filas (solo para el progreso)
+        progress: callback(filas_escritas, total)
+        cancel_event: Si se activa, se aborta y se elimina el archivo parcial
+        chunk_size: Filas que se pasan juntas al writer
+
+    Returns:
+        ExportResult
+    """
+    writer_class = _WRITERS.get(export_format)
+    if writer_class is None:
+        return ExportResult(False, file_path, error=f"Formato {export_format} no disponible",
+                            format=export_format)
+
+    temp_path = f"{file_path}.part"
+    written = 0
+    writer = None
+    try:
+        iterator = iter(rows)
+        # El primer next() abre el cursor: los headers pueden depender de él
+        first = next(iterator, None)
+        if callable(headers):
+            headers = headers()
+        writer = writer_class(temp_path, list(headers), title)
+
+        chunk: List[Sequence[Any]] = [] if first is None else [first]
+        next_progress = PROGRESS_EVERY
+        for row in iterator:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExportCancelled()
+                writer.write_rows(chunk)
+                written += len(chunk)
+                chunk = []
+                if progress and written >= next_progress:
+                    progress(written, total)
+                    next_progress = written + PROGRESS_EVERY
+        if chunk:
+            writer.write_rows(chunk)
+            written += len(chunk)
+
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        writer.close()
+        writer = None
+        os.replace(temp_path, file_path)
+        if progress:
+            progress(written, total if total is not None else written)
+        logger.info(f"[EXPORT] {written} filas exportadas a {export_format}: {file_path}")
+        return ExportResult(True, file_path, rows=written, format=export_format)
+
+    except ExportCancelled:
+        logger.info(f"[EXPORT] Exportación cancelada tras {written} filas")
+        return ExportResult(False, file_path, rows=written, cancelled=True, format=export_format)
+    except Exception as e:
+        logger.error(f"[ERROR EXPORT] Error exportando a {export_format}: {e}")
+        return ExportResult(False, file_path, rows=written, error=str(e), format=export_format)
+    finally:
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass  # El archivo parcial se descarta igual
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError as e:
+                logger.warning(f"[EXPORT] No se pudo eliminar archivo parcial {temp_path}: {e}")
+
+
+def export_source(source: ExportSource,
+                  file_path: str,
+                  export_format: str = "csv",
+                  progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                  cancel_event: Optional[threading.Event] = None) -> ExportResult:
+    """Exporta un ExportSource completo (se ejecuta en el hilo que lo llama)."""
+    return stream_export(
+        source.open_rows(),
+        lambda: source.headers,
+        file_path,
+        export_format=export_format,
+        title=source.title,
+        total=source.total,
+        progress=progress,
+        cancel_event=cancel_event,
+    )
@@ -0,0 +1,173 @@
+"""
+Búsqueda Indexada en Tablas - Rexus.app
+
+Reemplaza los filtros que recorrían cada celda de un QTableWidget en cada
+tecla. El índice normaliza una sola vez el texto de las filas cargadas
+(minúsculas y sin acentos) y devuelve solo las filas que coinciden; la tabla
+se actualiza cambiando únicamente las filas cuya visibilidad cambió.
+
+Componentes:
+- normalizar_texto: minúsculas sin acentos
+- TableSearchIndex: índice en memoria de las filas de un QTableWidget,
+  invalidado automáticamente cuando cambian los datos del modelo
+- SearchDebouncer: agrupa las pulsaciones y ejecuta la búsqueda una vez
+"""
+
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from PyQt6.QtCore import QTimer
+
+
+def normalizar_texto(texto) -> str:
+    """Convierte a minúsculas y elimina acentos/diacríticos."""
+    if texto is None:
+        return ""
+    texto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+class TableSearchIndex:
+    """Índice de búsqueda en memoria sobre las filas de un QTableWidget."""
+
+    def __init__(self, tabla, columnas_busqueda: Optional[Sequence[int]] = None):
+        """
+        Args:
+            tabla: QTableWidget a indexar
+            columnas_busqueda: Columnas incluidas en la búsqueda por texto
+                (None = todas)
+        """
+        self.tabla = tabla
+        self.columnas_busqueda = columnas_busqueda
+        self._textos: List[str] = []
+        self._columnas: List[List[str]] = []
+        self._sucio = True
+        self._ultimo_termino = ""
+        self._ultimo_resultado: Optional[List[int]] = None
+
+        # Cualquier cambio en los datos invalida el índice (se reconstruye
+        # una vez en la siguiente búsqueda, no en cada tecla)
+        modelo = tabla.model()
+        modelo.dataChanged.connect(self.invalidar)
+        modelo.rowsInserted.connect(self.invalidar)
+        modelo.rowsRemoved.connect(self.invalidar)
+        modelo.modelReset.connect(self.invalidar)
+
+    @classmethod
+    def para_tabla(cls, tabla, columnas_busqueda: Optional[Sequence[int]] = None) -> "TableSearchIndex":
+        """Obtiene (o crea) el índice asociado a una tabla."""
+        indice = getattr(tabla, "_rexus_search_index", None)
+        if indice is None or indice.columnas_busqueda != columnas_busqueda:
+            indice = cls(tabla, columnas_busqueda)
+            tabla._rexus_search_index = indice
+        return indice
+
+    def invalidar(self, *args):
+        self._sucio = True
+
+    def _reconstruir(self):
+        tabla = self.tabla
+        total_columnas = tabla.columnCount()
+        columnas = self.columnas_busqueda
+        if columnas is None:
+            columnas = range(total_columnas)
+
+        self._columnas = []
+        self._textos = []
+        for row in range(tabla.rowCount()):
+            valores = []
+            for col in range(total_columnas):
+                item = tabla.item(row, col)
+                valores.append(normalizar_texto(item.text()) if item else "")
+            self._columnas.append(valores)
+            self._textos.append("\x1f".join(valores[c] for c in columnas if c < total_columnas))
+
+        self._sucio = False
+        self._ultimo_termino = ""
+        self._ultimo_resultado = None
+
+    def buscar(self, termino: str = "",
+               filtros_columna: Optional[Dict[int, Callable[[str], bool]]] = None) -> List[int]:
+        """
+        Devuelve los índices de fila que coinciden.
+
+        Args:
+            termino: Texto a buscar (sin distinguir mayúsculas ni acentos)
+            filtros_columna: {columna: predicado(valor_normalizado)} adicionales
+
+        Returns:
+            Lista de filas que cumplen el término y todos los filtros
+        """
+        if self._sucio:
+            self._reconstruir()
+
+        termino = normalizar_texto(termino.strip())
+
+        # Si el término extiende al anterior, basta con refinar el resultado previo
+        if (self._ultimo_resultado is not None and self._ultimo_termino
+                and termino.startswith(self._ultimo_termino)):
+            candidatas: Iterable[int] = self._ultimo_resultado
+        else:
+            candidatas = range(len(self._textos))
+
+        textos = self._textos
+        if termino:
+            coincidencias = [row for row in candidatas if termino in textos[row]]
+        else:
+            coincidencias = list(candidatas)
+
+        self._ultimo_termino = termino
+        self._ultimo_resultado = coincidencias
+
+        if filtros_columna:
+            columnas = self._columnas
+            coincidencias = [
+                row for row in coincidencias
+                if all(pred(columnas[row][col]) for col, pred in filtros_columna.items())
+            ]
+        return coincidencias
+
+    def aplicar(self, visibles: Iterable[int]):
+        """Muestra solo las filas indicadas, tocando solo las que cambian."""
+        tabla = self.tabla
+        visibles = set(visibles)
+        # Se consulta el estado real: otros filtros pueden haber ocultado filas
+        cambios = [
+            row for row in range(tabla.rowCount())
+            if tabla.isRowHidden(row) == (row in visibles)
+        ]
+        if not cambios:
+            return
+
+        tabla.setUpdatesEnabled(False)
+        try:
+            for row in cambios:
+                tabla.setRowHidden(row, row not in visibles)
+        finally:
+            tabla.setUpdatesEnabled(True)
+
+    def filtrar(self, termino: str = "",
+                filtros_columna: Optional[Dict[int, Callable[[str], bool]]] = None) -> List[int]:
+        """Busca y aplica la visibilidad en la tabla. Devuelve las filas visibles."""
+        visibles = self.buscar(termino, filtros_columna)
+        self.aplicar(visibles)
+        return visibles
+
+
+class SearchDebouncer:
+    """Ejecuta una búsqueda una sola vez tras una pausa en la escritura."""
+
+    def __init__(self, callback: Callable[[], None], delay_ms: int = 250, parent=None):
+        self._callback = callback
+        self._timer = QTimer(parent)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._callback)
+
+    def programar(self, *args):
+        """Reinicia la espera (se puede conectar directo a textChanged)."""
+        self._timer.start()
+
+    def ejecutar_ahora(self):
+        self._timer.stop()
+        self._callback()
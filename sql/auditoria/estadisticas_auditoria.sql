@@ -0,0 +1,12 @@
+-- Estadísticas de auditoría agrupadas por módulo y usuario en una sola consulta
+-- Los totales, críticas y fallidas se suman en Python
+-- Parámetros: fecha_limite
+SELECT
+    modulo,
+    usuario,
+    COUNT(*) AS cantidad,
+    SUM(CASE WHEN nivel_criticidad IN ('ALTA', 'CRÍTICA') THEN 1 ELSE 0 END) AS criticas,
+    SUM(CASE WHEN resultado = 'FALLIDO' THEN 1 ELSE 0 END) AS fallidas
+FROM auditoria_log
+WHERE fecha_hora >= ?
+GROUP BY modulo, usuario
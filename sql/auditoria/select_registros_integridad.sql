@@ -0,0 +1,9 @@
+-- Registros sellados de la cadena de integridad, en orden de inserción
+-- Parámetros: desde (registros ya certificados por el último checkpoint)
+SELECT
+    id, timestamp, event_type, user_id, resource, action, details,
+    ip_address, user_agent, session_id, content_hash, previous_hash,
+    chain_hash, signature, integrity_sealed, created_by_system
+FROM auditoria_integridad
+ORDER BY secuencia
+OFFSET ? ROWS;
\ No newline at end of file
@@ -0,0 +1,9 @@
+-- Tramo de la cadena de integridad cerrado por un checkpoint
+-- Parámetros: desde, cantidad (checkpoint.segment_count)
+SELECT
+    id, timestamp, event_type, user_id, resource, action, details,
+    ip_address, user_agent, session_id, content_hash, previous_hash,
+    chain_hash, signature, integrity_sealed, created_by_system
+FROM auditoria_integridad
+ORDER BY secuencia
+OFFSET ? ROWS FETCH NEXT ? ROWS ONLY;
\ No newline at end of file
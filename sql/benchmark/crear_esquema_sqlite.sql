@@ -0,0 +1,84 @@
+-- Esquema SQLite para el dataset sintético de benchmarks (tools/generar_dataset.py)
+-- Las consultas del repositorio usan nombres distintos para las mismas columnas
+-- (stock/stock_actual, precio/precio_unitario, tipo/categoria): los alias son
+-- columnas generadas para que ambas variantes funcionen sin duplicar datos.
+
+CREATE TABLE IF NOT EXISTS inventario_perfiles (
+    id INTEGER PRIMARY KEY,
+    codigo TEXT NOT NULL UNIQUE,
+    descripcion TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    acabado TEXT,
+    proveedor TEXT,
+    stock_actual REAL NOT NULL DEFAULT 0,
+    stock_minimo REAL NOT NULL DEFAULT 0,
+    precio_unitario REAL NOT NULL DEFAULT 0,
+    unidad_medida TEXT,
+    ubicacion TEXT,
+    activo INTEGER NOT NULL DEFAULT 1,
+    fecha_creacion TEXT NOT NULL,
+    fecha_modificacion TEXT NOT NULL,
+    tipo TEXT GENERATED ALWAYS AS (categoria) VIRTUAL,
+    stock REAL GENERATED ALWAYS AS (stock_actual) VIRTUAL,
+    precio REAL GENERATED ALWAYS AS (precio_unitario) VIRTUAL
+);
+
+CREATE TABLE IF NOT EXISTS historial (
+    id INTEGER PRIMARY KEY,
+    producto_id INTEGER NOT NULL,
+    tipo_movimiento TEXT NOT NULL,
+    cantidad REAL NOT NULL,
+    fecha_movimiento TEXT NOT NULL,
+    accion TEXT,
+    descripcion TEXT,
+    usuario TEXT,
+    obra_id INTEGER,
+    fecha TEXT GENERATED ALWAYS AS (fecha_movimiento) VIRTUAL
+);
+
+CREATE TABLE IF NOT EXISTS reserva_materiales (
+    id INTEGER PRIMARY KEY,
+    producto_id INTEGER NOT NULL,
+    obra_id INTEGER NOT NULL,
+    cantidad_reservada REAL NOT NULL,
+    estado TEXT NOT NULL,
+    fecha_reserva TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS obras (
+    id INTEGER PRIMARY KEY,
+    codigo TEXT NOT NULL UNIQUE,
+    nombre TEXT NOT NULL,
+    cliente TEXT,
+    direccion TEXT,
+    estado TEXT NOT NULL,
+    presupuesto_total REAL,
+    fecha_inicio TEXT,
+    activo INTEGER NOT NULL DEFAULT 1,
+    fecha_creacion TEXT NOT NULL,
+    fecha_modificacion TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY,
+    usuario TEXT NOT NULL UNIQUE,
+    nombre_completo TEXT NOT NULL,
+    email TEXT,
+    rol TEXT NOT NULL,
+    activo INTEGER NOT NULL DEFAULT 1,
+    fecha_creacion TEXT NOT NULL,
+    fecha_modificacion TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS auditoria_log (
+    id INTEGER PRIMARY KEY,
+    usuario TEXT,
+    modulo TEXT NOT NULL,
+    accion TEXT NOT NULL,
+    descripcion TEXT,
+    tabla_afectada TEXT,
+    registro_id INTEGER,
+    nivel_criticidad TEXT NOT NULL,
+    resultado TEXT NOT NULL,
+    fecha_hora TEXT NOT NULL
+);
@@ -0,0 +1,10 @@
+-- Índices del dataset sintético; se crean después de la carga masiva
+-- (equivalentes SQLite de sql/performance/performance_indexes.sql)
+
+CREATE INDEX IF NOT EXISTS idx_inventario_activo_id ON inventario_perfiles (activo, id);
+CREATE INDEX IF NOT EXISTS idx_inventario_fecha_modificacion ON inventario_perfiles (fecha_modificacion);
+CREATE INDEX IF NOT EXISTS idx_historial_producto_fecha ON historial (producto_id, fecha_movimiento);
+CREATE INDEX IF NOT EXISTS idx_historial_fecha ON historial (fecha_movimiento);
+CREATE INDEX IF NOT EXISTS idx_reserva_producto_estado ON reserva_materiales (producto_id, estado);
+CREATE INDEX IF NOT EXISTS idx_auditoria_fecha ON auditoria_log (fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_auditoria_modulo_fecha ON auditoria_log (modulo, fecha_hora);
@@ -0,0 +1,19 @@
+-- Estadísticas de compras agrupadas por proveedor y estado en una sola consulta
+-- Los totales generales, por estado y por proveedor se suman en Python
+-- Parámetros: inicio_dia, inicio_semana, inicio_mes, inicio_mes_anterior, inicio_mes
+SELECT
+    c.proveedor,
+    c.estado,
+    COUNT(*) AS ordenes,
+    SUM(COALESCE(d.subtotal, 0) - c.descuento + c.impuestos) AS monto_total,
+    SUM(CASE WHEN c.fecha_creacion >= ? THEN 1 ELSE 0 END) AS compras_hoy,
+    SUM(CASE WHEN c.fecha_creacion >= ? THEN 1 ELSE 0 END) AS compras_semana,
+    SUM(CASE WHEN c.fecha_creacion >= ? THEN 1 ELSE 0 END) AS compras_mes,
+    SUM(CASE WHEN c.fecha_creacion >= ? AND c.fecha_creacion < ? THEN 1 ELSE 0 END) AS compras_mes_anterior
+FROM compras c
+LEFT JOIN (
+    SELECT compra_id, SUM(cantidad * precio_unitario) AS subtotal
+    FROM detalle_compras
+    GROUP BY compra_id
+) d ON d.compra_id = c.id
+GROUP BY c.proveedor, c.estado
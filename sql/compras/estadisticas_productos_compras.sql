@@ -0,0 +1,11 @@
+-- Detalle de compras agrupado por producto y categoría (análisis de productos)
+SELECT
+    dc.descripcion,
+    dc.categoria,
+    COUNT(*) AS lineas,
+    SUM(dc.cantidad) AS cantidad_total,
+    SUM(dc.precio_unitario) AS suma_precios,
+    COUNT(dc.precio_unitario) AS cantidad_precios
+FROM detalle_compras dc
+INNER JOIN compras c ON dc.compra_id = c.id
+GROUP BY dc.descripcion, dc.categoria
@@ -0,0 +1,10 @@
+-- Suma de todas las líneas de cada producto en un solo UPDATE
+UPDATE inventario_perfiles
+SET stock_actual = stock_actual + r.cantidad_total,
+    fecha_modificacion = GETDATE()
+FROM (
+    SELECT producto_id, SUM(cantidad) AS cantidad_total
+    FROM #recepcion_lineas
+    GROUP BY producto_id
+) AS r
+WHERE r.producto_id = inventario_perfiles.id
@@ -0,0 +1,7 @@
+-- Líneas de una recepción de compra (entrada tabular de la recepción masiva)
+CREATE TABLE #recepcion_lineas (
+    linea INT NOT NULL PRIMARY KEY,
+    producto_id INT NULL,
+    codigo NVARCHAR(100) NULL,
+    cantidad DECIMAL(18, 4) NOT NULL
+)
@@ -0,0 +1,6 @@
+DELETE FROM #recepcion_lineas
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM inventario_perfiles p
+    WHERE p.id = #recepcion_lineas.producto_id AND p.activo = 1
+)
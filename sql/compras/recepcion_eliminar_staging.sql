@@ -0,0 +1 @@
+DROP TABLE #recepcion_lineas
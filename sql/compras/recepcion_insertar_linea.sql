@@ -0,0 +1,2 @@
+INSERT INTO #recepcion_lineas (linea, producto_id, codigo, cantidad)
+VALUES (?, ?, ?, ?)
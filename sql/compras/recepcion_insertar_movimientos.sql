@@ -0,0 +1,8 @@
+-- Un movimiento de entrada por línea recibida
+-- Parámetros: descripción (referencia de la compra), usuario
+INSERT INTO historial (
+    producto_id, tipo_movimiento, cantidad, fecha_movimiento, accion, descripcion, usuario
+)
+SELECT r.producto_id, 'ENTRADA', r.cantidad, GETDATE(), 'INVENTARIO_ENTRADA', ?, ?
+FROM #recepcion_lineas r
+ORDER BY r.linea
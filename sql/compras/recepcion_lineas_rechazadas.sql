@@ -0,0 +1,8 @@
+-- Líneas cuyo producto no existe o está inactivo
+SELECT r.linea
+FROM #recepcion_lineas r
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM inventario_perfiles p
+    WHERE p.id = r.producto_id AND p.activo = 1
+)
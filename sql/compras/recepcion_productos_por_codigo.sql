@@ -0,0 +1,4 @@
+-- Productos activos de un lote de códigos (resolución de las líneas de una compra)
+SELECT id, codigo, descripcion
+FROM inventario_perfiles
+WHERE activo = 1 AND codigo IN ({placeholders})
@@ -0,0 +1,8 @@
+-- Líneas identificadas por código: se resuelve el id del producto
+UPDATE #recepcion_lineas
+SET producto_id = (
+    SELECT p.id
+    FROM inventario_perfiles p
+    WHERE p.codigo = #recepcion_lineas.codigo
+)
+WHERE producto_id IS NULL AND codigo IS NOT NULL
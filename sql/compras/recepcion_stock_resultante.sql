@@ -0,0 +1,4 @@
+-- Producto resuelto de cada línea aplicada y su stock después de la recepción
+SELECT r.linea, r.producto_id, p.stock_actual
+FROM #recepcion_lineas r
+INNER JOIN inventario_perfiles p ON p.id = r.producto_id
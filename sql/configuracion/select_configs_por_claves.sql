@@ -0,0 +1,2 @@
+-- Valores vigentes de un lote de claves (recarga tras cambios de otro cliente)
+SELECT clave, valor FROM configuracion WHERE activo = 1 AND clave IN ({placeholders})
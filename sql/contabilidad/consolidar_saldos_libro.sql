@@ -0,0 +1,16 @@
+-- Saldos mensuales del libro contable por tipo de asiento
+-- Parámetros: desde, desde (NULL = desde el inicio), hasta (exclusivo)
+INSERT INTO saldos_periodo (origen, cuenta, periodo, debe, haber, saldo, movimientos)
+SELECT
+    'LIBRO',
+    ISNULL(tipo_asiento, ''),
+    DATEFROMPARTS(YEAR(fecha_asiento), MONTH(fecha_asiento), 1),
+    ISNULL(SUM(debe), 0),
+    ISNULL(SUM(haber), 0),
+    ISNULL(SUM(saldo), 0),
+    COUNT(*)
+FROM libro_contable
+WHERE estado = 'ACTIVO'
+    AND (? IS NULL OR fecha_asiento >= ?)
+    AND fecha_asiento < ?
+GROUP BY ISNULL(tipo_asiento, ''), DATEFROMPARTS(YEAR(fecha_asiento), MONTH(fecha_asiento), 1)
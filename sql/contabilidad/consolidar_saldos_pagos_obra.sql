@@ -0,0 +1,15 @@
+-- Egresos mensuales por categoría de pago de obra (en haber)
+-- Parámetros: desde, desde (NULL = desde el inicio), hasta (exclusivo)
+INSERT INTO saldos_periodo (origen, cuenta, periodo, debe, haber, saldo, movimientos)
+SELECT
+    'PAGOS_OBRA',
+    ISNULL(categoria, ''),
+    DATEFROMPARTS(YEAR(fecha_pago), MONTH(fecha_pago), 1),
+    0,
+    ISNULL(SUM(monto), 0),
+    -ISNULL(SUM(monto), 0),
+    COUNT(*)
+FROM pagos_obra
+WHERE (? IS NULL OR fecha_pago >= ?)
+    AND fecha_pago < ?
+GROUP BY ISNULL(categoria, ''), DATEFROMPARTS(YEAR(fecha_pago), MONTH(fecha_pago), 1)
@@ -0,0 +1,15 @@
+-- Ingresos mensuales por tipo de recibo (en debe)
+-- Parámetros: desde, desde (NULL = desde el inicio), hasta (exclusivo)
+INSERT INTO saldos_periodo (origen, cuenta, periodo, debe, haber, saldo, movimientos)
+SELECT
+    'RECIBOS',
+    ISNULL(tipo_recibo, ''),
+    DATEFROMPARTS(YEAR(fecha_emision), MONTH(fecha_emision), 1),
+    ISNULL(SUM(monto), 0),
+    0,
+    ISNULL(SUM(monto), 0),
+    COUNT(*)
+FROM recibos
+WHERE (? IS NULL OR fecha_emision >= ?)
+    AND fecha_emision < ?
+GROUP BY ISNULL(tipo_recibo, ''), DATEFROMPARTS(YEAR(fecha_emision), MONTH(fecha_emision), 1)
@@ -0,0 +1,25 @@
+-- Saldos mensuales consolidados de los períodos cerrados
+-- origen: LIBRO (libro_contable por tipo_asiento), RECIBOS (por tipo_recibo),
+-- PAGOS_OBRA (por categoria)
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='saldos_periodo' AND xtype='U')
+BEGIN
+    CREATE TABLE saldos_periodo (
+        origen VARCHAR(20) NOT NULL,
+        cuenta NVARCHAR(100) NOT NULL,
+        periodo DATE NOT NULL,              -- primer día del mes
+        debe DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        haber DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        saldo DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        movimientos INT NOT NULL DEFAULT 0,
+        CONSTRAINT PK_saldos_periodo PRIMARY KEY (origen, periodo, cuenta)
+    );
+END;
+
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='saldos_periodo_cierre' AND xtype='U')
+BEGIN
+    CREATE TABLE saldos_periodo_cierre (
+        origen VARCHAR(20) NOT NULL PRIMARY KEY,
+        cerrado_hasta DATE NOT NULL,        -- primer día del primer mes abierto
+        fecha_actualizacion DATETIME NOT NULL DEFAULT GETDATE()
+    );
+END;
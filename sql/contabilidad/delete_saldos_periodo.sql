@@ -0,0 +1,5 @@
+-- Parámetros: origen, desde (NULL = desde el inicio), hasta (exclusivo)
+DELETE FROM saldos_periodo
+WHERE origen = ?
+    AND (? IS NULL OR periodo >= ?)
+    AND periodo < ?
@@ -0,0 +1,2 @@
+INSERT INTO saldos_periodo_cierre (origen, cerrado_hasta, fecha_actualizacion)
+VALUES (?, ?, GETDATE())
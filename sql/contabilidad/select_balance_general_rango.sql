@@ -0,0 +1,12 @@
+-- Balance del libro contable en [desde, hasta) (NULL = sin límite)
+SELECT
+    ISNULL(tipo_asiento, '') AS tipo_asiento,
+    SUM(debe) as total_debe,
+    SUM(haber) as total_haber,
+    SUM(saldo) as saldo_neto
+FROM libro_contable
+WHERE
+    estado = 'ACTIVO'
+    AND (? IS NULL OR fecha_asiento >= ?)
+    AND (? IS NULL OR fecha_asiento < ?)
+GROUP BY ISNULL(tipo_asiento, '')
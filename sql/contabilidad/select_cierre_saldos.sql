@@ -0,0 +1,2 @@
+SELECT origen, cerrado_hasta
+FROM saldos_periodo_cierre
@@ -0,0 +1,7 @@
+-- Egresos por categoría de pago de obra en [desde, hasta) (NULL = sin límite)
+SELECT ISNULL(categoria, ''), 0, SUM(monto), -SUM(monto)
+FROM pagos_obra
+WHERE
+    (? IS NULL OR fecha_pago >= ?)
+    AND (? IS NULL OR fecha_pago < ?)
+GROUP BY ISNULL(categoria, '')
@@ -0,0 +1,7 @@
+-- Ingresos por tipo de recibo en [desde, hasta) (NULL = sin límite)
+SELECT ISNULL(tipo_recibo, ''), SUM(monto), 0, SUM(monto)
+FROM recibos
+WHERE
+    (? IS NULL OR fecha_emision >= ?)
+    AND (? IS NULL OR fecha_emision < ?)
+GROUP BY ISNULL(tipo_recibo, '')
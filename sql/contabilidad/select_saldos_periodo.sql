@@ -0,0 +1,8 @@
+-- Saldos consolidados de un rango de meses cerrados
+-- Parámetros: origen, desde (NULL = desde el inicio), hasta (exclusivo)
+SELECT cuenta, SUM(debe), SUM(haber), SUM(saldo)
+FROM saldos_periodo
+WHERE origen = ?
+    AND (? IS NULL OR periodo >= ?)
+    AND periodo < ?
+GROUP BY cuenta
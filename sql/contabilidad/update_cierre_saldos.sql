@@ -0,0 +1,3 @@
+UPDATE saldos_periodo_cierre
+SET cerrado_hasta = ?, fecha_actualizacion = GETDATE()
+WHERE origen = ?
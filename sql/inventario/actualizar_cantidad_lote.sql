@@ -0,0 +1,5 @@
+-- Cantidad restante de un lote después de una salida
+-- Parámetros: cantidad, id
+UPDATE lotes_inventario
+SET cantidad = ?
+WHERE id = ?;
@@ -0,0 +1,66 @@
+-- Análisis ABC calculado en el servidor con funciones de ventana
+-- Parámetros: fecha_desde_movimientos, criterio, criterio, limite_a, limite_b
+-- criterio: 'valor' | 'movimiento' | 'cantidad'
+WITH movimientos AS (
+    SELECT
+        producto_id,
+        COUNT(*) AS total_movimientos,
+        SUM(ABS(cantidad)) AS cantidad_movida
+    FROM historial
+    WHERE fecha_movimiento >= ?
+    GROUP BY producto_id
+),
+base AS (
+    SELECT
+        p.id, p.codigo, p.descripcion, p.categoria,
+        p.stock_actual, p.precio_unitario,
+        p.stock_actual * p.precio_unitario AS valor_total,
+        ISNULL(m.total_movimientos, 0) AS total_movimientos,
+        ISNULL(m.cantidad_movida, 0) AS cantidad_movida,
+        CAST(CASE ?
+            WHEN 'valor' THEN p.stock_actual * p.precio_unitario
+            WHEN 'movimiento' THEN ISNULL(m.total_movimientos, 0)
+            ELSE p.stock_actual
+        END AS FLOAT) AS valor_analisis
+    FROM inventario_perfiles p
+    LEFT JOIN movimientos m ON m.producto_id = p.id
+    WHERE p.activo = 1
+      AND (? = 'movimiento' OR p.stock_actual > 0)
+),
+acumulado AS (
+    SELECT
+        base.*,
+        ROW_NUMBER() OVER (ORDER BY valor_analisis DESC, cantidad_movida DESC, id) AS posicion,
+        SUM(valor_analisis) OVER (
+            ORDER BY valor_analisis DESC, cantidad_movida DESC, id
+            ROWS UNBOUNDED PRECEDING
+        ) AS valor_acumulado,
+        SUM(valor_analisis) OVER () AS total_valor_analisis,
+        COUNT(*) OVER () AS total_productos
+    FROM base
+),
+porcentajes AS (
+    SELECT
+        acumulado.*,
+        CASE WHEN total_valor_analisis > 0
+             THEN 100.0 * valor_analisis / total_valor_analisis ELSE 0 END AS porcentaje_individual,
+        CASE WHEN total_valor_analisis > 0
+             THEN 100.0 * valor_acumulado / total_valor_analisis ELSE 0 END AS porcentaje_acumulado
+    FROM acumulado
+),
+clasificado AS (
+    SELECT
+        porcentajes.*,
+        CASE
+            WHEN porcentaje_acumulado <= ? THEN 'A'
+            WHEN porcentaje_acumulado <= ? THEN 'B'
+            ELSE 'C'
+        END AS categoria_abc
+    FROM porcentajes
+)
+SELECT
+    clasificado.*,
+    COUNT(*) OVER (PARTITION BY categoria_abc) AS productos_categoria,
+    SUM(valor_analisis) OVER (PARTITION BY categoria_abc) AS valor_categoria
+FROM clasificado
+ORDER BY posicion
@@ -0,0 +1,57 @@
+-- Rotación y stock inmovilizado por producto
+-- Parámetros: fecha_desde_periodo, dias_periodo, dias_inmovilizado, dias_inmovilizado
+-- Convención de historial: cantidad > 0 entrada, cantidad < 0 salida
+WITH periodo AS (
+    SELECT
+        producto_id,
+        COUNT(*) AS movimientos_periodo,
+        SUM(CASE WHEN cantidad > 0 THEN cantidad ELSE 0 END) AS unidades_entrada,
+        SUM(CASE WHEN cantidad < 0 THEN -cantidad ELSE 0 END) AS unidades_salida
+    FROM historial
+    WHERE fecha_movimiento >= ?
+    GROUP BY producto_id
+),
+ultimo AS (
+    SELECT producto_id, MAX(fecha_movimiento) AS ultimo_movimiento
+    FROM historial
+    GROUP BY producto_id
+),
+base AS (
+    SELECT
+        p.id, p.codigo, p.descripcion, p.categoria,
+        p.stock_actual, p.precio_unitario,
+        p.stock_actual * p.precio_unitario AS valor_stock,
+        ISNULL(m.movimientos_periodo, 0) AS movimientos_periodo,
+        ISNULL(m.unidades_entrada, 0) AS unidades_entrada,
+        ISNULL(m.unidades_salida, 0) AS unidades_salida,
+        u.ultimo_movimiento,
+        DATEDIFF(day, ISNULL(u.ultimo_movimiento, p.fecha_creacion), GETDATE()) AS dias_sin_movimiento,
+        -- Stock promedio: media entre el stock al inicio del período y el actual
+        (2.0 * p.stock_actual - ISNULL(m.unidades_entrada, 0) + ISNULL(m.unidades_salida, 0)) / 2.0
+            AS stock_promedio
+    FROM inventario_perfiles p
+    LEFT JOIN periodo m ON m.producto_id = p.id
+    LEFT JOIN ultimo u ON u.producto_id = p.id
+    WHERE p.activo = 1
+),
+indicadores AS (
+    SELECT
+        base.*,
+        CASE WHEN stock_promedio > 0 THEN unidades_salida / stock_promedio ELSE 0 END AS rotacion,
+        CASE WHEN unidades_salida > 0
+             THEN stock_actual / (unidades_salida / CAST(? AS FLOAT))
+             ELSE NULL END AS dias_cobertura,
+        CASE WHEN stock_actual > 0 AND ISNULL(dias_sin_movimiento, ?) >= ?
+             THEN 1 ELSE 0 END AS inmovilizado
+    FROM base
+)
+SELECT
+    indicadores.*,
+    COUNT(*) OVER () AS total_productos,
+    SUM(valor_stock) OVER () AS valor_stock_total,
+    SUM(inmovilizado) OVER () AS productos_inmovilizados,
+    SUM(CASE WHEN inmovilizado = 1 THEN valor_stock ELSE 0 END) OVER () AS valor_inmovilizado,
+    SUM(unidades_salida) OVER () AS unidades_salida_total,
+    SUM(stock_promedio) OVER () AS stock_promedio_total
+FROM indicadores
+ORDER BY inmovilizado DESC, valor_stock DESC
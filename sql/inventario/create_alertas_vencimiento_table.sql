@@ -0,0 +1,11 @@
+-- Avisos de vencimiento ya emitidos: un aviso por lote y fecha de vencimiento,
+-- aunque la revisión corra en varios puestos
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='lotes_alertas_vencimiento' AND xtype='U')
+BEGIN
+    CREATE TABLE lotes_alertas_vencimiento (
+        lote_id INT NOT NULL,
+        fecha_vencimiento DATE NOT NULL,
+        fecha_alerta DATETIME NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_lotes_alertas_vencimiento PRIMARY KEY (lote_id, fecha_vencimiento)
+    );
+END;
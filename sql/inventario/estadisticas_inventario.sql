@@ -0,0 +1,9 @@
+-- Estadísticas generales del inventario en una sola consulta
+-- Parámetros: inicio_mes (fecha desde la que se cuentan los movimientos del mes)
+SELECT
+    COUNT(*) AS total_productos,
+    SUM(CASE WHEN stock_actual <= stock_minimo THEN 1 ELSE 0 END) AS stock_bajo,
+    SUM(stock_actual * precio_unitario) AS valor_total,
+    (SELECT COUNT(*) FROM historial WHERE fecha_movimiento >= ?) AS movimientos_mes
+FROM inventario_perfiles
+WHERE activo = 1
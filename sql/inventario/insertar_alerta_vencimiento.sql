@@ -0,0 +1,8 @@
+-- Reclama el aviso de vencimiento de un lote (0 filas = ya avisado)
+-- Parámetros: lote_id, fecha_vencimiento, lote_id, fecha_vencimiento
+INSERT INTO lotes_alertas_vencimiento (lote_id, fecha_vencimiento)
+SELECT ?, ?
+WHERE NOT EXISTS (
+    SELECT 1 FROM lotes_alertas_vencimiento
+    WHERE lote_id = ? AND fecha_vencimiento = ?
+);
@@ -1,4 +1,5 @@
 INSERT INTO lotes_inventario
 (producto_id, numero_lote, fecha_vencimiento, cantidad,
  proveedor, fecha_recepcion, serie, usuario, observaciones)
+OUTPUT INSERTED.id
 VALUES (?, ?, ?, ?, ?, GETDATE(), ?, ?, ?)
\ No newline at end of file
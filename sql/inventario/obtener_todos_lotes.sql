@@ -0,0 +1,17 @@
+-- Lotes del inventario con su producto, en orden de vencimiento
+-- Parámetros: activo (1 = activos, 0 = inactivos)
+SELECT
+    l.id,
+    l.producto_id,
+    l.numero_lote,
+    l.cantidad,
+    l.fecha_vencimiento,
+    l.proveedor,
+    l.serie,
+    l.fecha_recepcion,
+    ip.descripcion AS producto_nombre,
+    ip.codigo AS producto_codigo
+FROM lotes_inventario l
+LEFT JOIN inventario_perfiles ip ON l.producto_id = ip.id
+WHERE l.activo = ?
+ORDER BY CASE WHEN l.fecha_vencimiento IS NULL THEN 1 ELSE 0 END, l.fecha_vencimiento, l.id;
@@ -0,0 +1,14 @@
+-- Lotes con stock de un producto en orden FEFO, bloqueados hasta el commit
+-- para descontar una salida. Usa idx_lotes_producto_vencimiento
+-- Parámetros: producto_id
+SELECT
+    id,
+    producto_id,
+    numero_lote,
+    fecha_vencimiento,
+    cantidad
+FROM lotes_inventario WITH (UPDLOCK, ROWLOCK)
+WHERE producto_id = ?
+  AND activo = 1
+  AND cantidad > 0
+ORDER BY CASE WHEN fecha_vencimiento IS NULL THEN 1 ELSE 0 END, fecha_vencimiento, id;
@@ -0,0 +1,13 @@
+-- Lotes con stock y fecha de vencimiento, para el índice de vencimientos
+-- Usa idx_lotes_vencimiento (filtrado: activo = 1 AND cantidad > 0)
+SELECT
+    id,
+    producto_id,
+    numero_lote,
+    fecha_vencimiento,
+    cantidad
+FROM lotes_inventario
+WHERE activo = 1
+  AND cantidad > 0
+  AND fecha_vencimiento IS NOT NULL
+ORDER BY fecha_vencimiento, id;
@@ -0,0 +1,17 @@
+-- Lotes activos de un producto, en orden de vencimiento (FEFO)
+-- Parámetros: producto_id
+SELECT
+    id,
+    producto_id,
+    numero_lote,
+    fecha_vencimiento,
+    cantidad,
+    proveedor,
+    fecha_recepcion,
+    serie,
+    usuario,
+    observaciones
+FROM lotes_inventario
+WHERE producto_id = ?
+  AND activo = 1
+ORDER BY CASE WHEN fecha_vencimiento IS NULL THEN 1 ELSE 0 END, fecha_vencimiento, id;
@@ -0,0 +1,8 @@
+-- Productos activos para imprimir etiquetas (catálogo completo)
+SELECT
+    id,
+    codigo,
+    descripcion
+FROM inventario_perfiles
+WHERE activo = 1
+ORDER BY codigo;
@@ -0,0 +1,18 @@
+-- Exportación completa de productos (sin paginación)
+-- Las condiciones de filtro se agregan como "AND campo LIKE ?" y luego ORDER BY
+SELECT
+    id,
+    codigo,
+    descripcion,
+    tipo as categoria,
+    acabado as subcategoria,
+    stock as stock_actual,
+    stock_minimo,
+    precio as precio_unitario,
+    unidad_medida,
+    ubicacion,
+    proveedor,
+    fecha_creacion,
+    fecha_modificacion
+FROM inventario_perfiles
+WHERE activo = 1
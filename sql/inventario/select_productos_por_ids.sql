@@ -0,0 +1,17 @@
+-- Productos por lote de IDs (resultados del índice de búsqueda)
+SELECT
+    id,
+    codigo,
+    descripcion,
+    tipo as categoria,
+    acabado as subcategoria,
+    stock as stock_actual,
+    stock_minimo,
+    precio as precio_unitario,
+    unidad_medida,
+    ubicacion,
+    proveedor,
+    activo,
+    fecha_modificacion as fecha_actualizacion
+FROM inventario_perfiles
+WHERE id IN ({placeholders}) AND activo = 1
@@ -0,0 +1,17 @@
+-- Valoración agregada por categoría, con participación sobre el total
+SELECT
+    i.categoria,
+    COUNT(*) AS total_productos,
+    SUM(i.stock_actual) AS total_unidades,
+    SUM(i.stock_actual * i.precio_unitario) AS valor_total_categoria,
+    AVG(i.precio_unitario) AS precio_promedio,
+    MAX(i.precio_unitario) AS precio_maximo,
+    MIN(i.precio_unitario) AS precio_minimo,
+    CASE WHEN SUM(SUM(i.stock_actual * i.precio_unitario)) OVER () > 0
+         THEN 100.0 * SUM(i.stock_actual * i.precio_unitario)
+              / SUM(SUM(i.stock_actual * i.precio_unitario)) OVER ()
+         ELSE 0 END AS porcentaje_valor
+FROM inventario_perfiles i
+WHERE i.activo = 1
+GROUP BY i.categoria
+ORDER BY SUM(i.stock_actual * i.precio_unitario) DESC
@@ -0,0 +1,33 @@
+-- Valoración por producto con totales generales calculados en el servidor
+-- Las reservas activas se agregan una sola vez por producto
+WITH reservas AS (
+    SELECT producto_id, SUM(cantidad_reservada) AS stock_reservado
+    FROM reserva_materiales
+    WHERE estado = 'ACTIVA'
+    GROUP BY producto_id
+),
+valores AS (
+    SELECT
+        i.id, i.codigo, i.descripcion, i.categoria, i.proveedor,
+        i.stock_actual, i.precio_unitario, i.unidad_medida,
+        i.fecha_creacion, i.fecha_modificacion,
+        i.stock_actual * i.precio_unitario AS valor_total,
+        ISNULL(r.stock_reservado, 0) AS stock_reservado,
+        ISNULL(r.stock_reservado, 0) * i.precio_unitario AS valor_reservado,
+        i.stock_actual - ISNULL(r.stock_reservado, 0) AS stock_disponible,
+        (i.stock_actual - ISNULL(r.stock_reservado, 0)) * i.precio_unitario AS valor_disponible
+    FROM inventario_perfiles i
+    LEFT JOIN reservas r ON r.producto_id = i.id
+    WHERE i.activo = 1
+)
+SELECT
+    valores.*,
+    COUNT(*) OVER () AS total_productos,
+    SUM(valor_total) OVER () AS suma_valor_total,
+    SUM(valor_reservado) OVER () AS suma_valor_reservado,
+    SUM(valor_disponible) OVER () AS suma_valor_disponible,
+    SUM(stock_actual) OVER () AS suma_stock_total,
+    SUM(stock_reservado) OVER () AS suma_stock_reservado,
+    SUM(stock_disponible) OVER () AS suma_stock_disponible
+FROM valores
+ORDER BY valor_total DESC
@@ -0,0 +1,11 @@
+-- Mueve fecha_proximo de las programaciones expandidas a la primera
+-- ocurrencia posterior al horizonte (las anteriores ya son órdenes)
+-- Parámetros: horizonte, horizonte
+UPDATE p
+SET fecha_proximo = DATEADD(day,
+        p.frecuencia_dias * (DATEDIFF(day, p.fecha_proximo, ?) / p.frecuencia_dias + 1),
+        p.fecha_proximo),
+    fecha_actualizacion = GETDATE()
+FROM programacion_mantenimiento p
+INNER JOIN equipos e ON e.id = p.equipo_id AND e.activo = 1
+WHERE p.activo = 1 AND p.frecuencia_dias > 0 AND p.fecha_proximo <= ?;
@@ -0,0 +1,58 @@
+-- Calendario de un rango de fechas (vista de mes o semana): órdenes de trabajo
+-- del rango más las ocurrencias futuras de cada programación, proyectadas
+-- desde fecha_proximo (las anteriores ya existen como órdenes). Una ocurrencia
+-- que ya tiene orden de trabajo (programacion_id, fecha_programada) no se
+-- proyecta: se muestra solo la orden
+-- Parámetros: inicio, fin, máximo de ocurrencias por programación (días del rango)
+-- Índices: idx_mantenimientos_fecha_programada, idx_programacion_proximo_activo
+SET NOCOUNT ON;
+
+DECLARE @inicio DATE = ?;
+DECLARE @fin DATE = ?;
+DECLARE @max_ocurrencias INT = ?;
+
+WITH numeros AS (
+    SELECT TOP (@max_ocurrencias) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS n
+    FROM sys.all_objects a CROSS JOIN sys.all_objects b
+),
+proyectadas AS (
+    -- Primera ocurrencia dentro del rango
+    SELECT
+        p.id, p.equipo_id, p.tipo_mantenimiento, p.descripcion, p.responsable,
+        p.costo_estimado, p.frecuencia_dias,
+        DATEADD(day, p.frecuencia_dias *
+            CASE WHEN p.fecha_proximo < @inicio
+                 THEN (DATEDIFF(day, p.fecha_proximo, @inicio) + p.frecuencia_dias - 1) / p.frecuencia_dias
+                 ELSE 0 END,
+            p.fecha_proximo) AS primera
+    FROM programacion_mantenimiento p
+    WHERE p.activo = 1 AND p.frecuencia_dias > 0 AND p.fecha_proximo <= @fin
+)
+SELECT
+    m.id, m.equipo_id, e.nombre AS equipo_nombre,
+    m.tipo, m.descripcion, m.fecha_programada, m.estado,
+    m.responsable, m.costo_estimado,
+    p.frecuencia_dias
+FROM mantenimientos m
+INNER JOIN equipos e ON m.equipo_id = e.id
+LEFT JOIN programacion_mantenimiento p ON m.programacion_id = p.id
+WHERE m.fecha_programada >= @inicio AND m.fecha_programada < DATEADD(day, 1, @fin)
+
+UNION ALL
+
+SELECT
+    NULL AS id, pr.equipo_id, e.nombre AS equipo_nombre,
+    pr.tipo_mantenimiento AS tipo, pr.descripcion,
+    DATEADD(day, n.n * pr.frecuencia_dias, pr.primera) AS fecha_programada,
+    'PROGRAMADO' AS estado, pr.responsable, pr.costo_estimado,
+    pr.frecuencia_dias
+FROM proyectadas pr
+INNER JOIN equipos e ON pr.equipo_id = e.id AND e.activo = 1
+INNER JOIN numeros n ON n.n * pr.frecuencia_dias <= DATEDIFF(day, pr.primera, @fin)
+WHERE NOT EXISTS (
+    SELECT 1 FROM mantenimientos m
+    WHERE m.programacion_id = pr.id
+      AND m.fecha_programada = DATEADD(day, n.n * pr.frecuencia_dias, pr.primera)
+)
+
+ORDER BY fecha_programada ASC;
@@ -0,0 +1,52 @@
+-- Expande la recurrencia de las programaciones activas en órdenes de trabajo
+-- PROGRAMADO hasta el horizonte, en una sola sentencia.
+-- Parámetros: hoy, horizonte, máximo de ocurrencias por programación
+-- Idempotente: no repite (programacion_id, fecha_programada); el índice único
+-- UX_mantenimientos_programacion_fecha lo garantiza ante ejecuciones simultáneas
+SET NOCOUNT ON;
+
+DECLARE @hoy DATE = ?;
+DECLARE @horizonte DATE = ?;
+DECLARE @max_ocurrencias INT = ?;
+
+WITH numeros AS (
+    SELECT TOP (@max_ocurrencias) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS n
+    FROM sys.all_objects a CROSS JOIN sys.all_objects b
+),
+programas AS (
+    -- Las ocurrencias atrasadas se resumen en la última anterior a hoy: no se
+    -- genera una orden por cada período en que el programador no corrió
+    SELECT
+        p.id, p.equipo_id, p.tipo_mantenimiento, p.descripcion, p.responsable,
+        p.costo_estimado, p.frecuencia_dias,
+        DATEADD(day, p.frecuencia_dias *
+            CASE WHEN p.fecha_proximo < @hoy
+                 THEN DATEDIFF(day, p.fecha_proximo, @hoy) / p.frecuencia_dias
+                 ELSE 0 END,
+            p.fecha_proximo) AS primera
+    FROM programacion_mantenimiento p
+    INNER JOIN equipos e ON e.id = p.equipo_id AND e.activo = 1
+    WHERE p.activo = 1 AND p.frecuencia_dias > 0 AND p.fecha_proximo <= @horizonte
+),
+ocurrencias AS (
+    SELECT
+        pr.id, pr.equipo_id, pr.tipo_mantenimiento, pr.descripcion, pr.responsable,
+        pr.costo_estimado,
+        DATEADD(day, n.n * pr.frecuencia_dias, pr.primera) AS fecha_programada
+    FROM programas pr
+    INNER JOIN numeros n ON n.n * pr.frecuencia_dias <= DATEDIFF(day, pr.primera, @horizonte)
+)
+INSERT INTO mantenimientos
+    (equipo_id, tipo, descripcion, fecha_programada, estado,
+     responsable, costo_estimado, fecha_creacion, programacion_id)
+OUTPUT
+    INSERTED.id, INSERTED.equipo_id, INSERTED.tipo, INSERTED.descripcion,
+    INSERTED.fecha_programada, INSERTED.programacion_id
+SELECT
+    o.equipo_id, o.tipo_mantenimiento, o.descripcion, o.fecha_programada, 'PROGRAMADO',
+    o.responsable, o.costo_estimado, GETDATE(), o.id
+FROM ocurrencias o
+WHERE NOT EXISTS (
+    SELECT 1 FROM mantenimientos m
+    WHERE m.programacion_id = o.id AND m.fecha_programada = o.fecha_programada
+);
@@ -0,0 +1,12 @@
+-- Filas para el índice de búsqueda local (rexus/utils/search_index.py)
+-- {filtro}: carga completa, cambios desde una fecha o IDs puntuales
+SELECT
+    id,
+    activo,
+    codigo,
+    nombre,
+    cliente,
+    responsable,
+    direccion
+FROM obras
+WHERE {filtro}
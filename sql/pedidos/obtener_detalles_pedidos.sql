@@ -0,0 +1,2 @@
+-- Detalles de varios pedidos en una sola consulta
+SELECT * FROM pedidos_detalle WHERE pedido_id IN ({placeholders}) ORDER BY pedido_id, id
@@ -0,0 +1,4 @@
+-- Historial de varios pedidos en una sola consulta
+SELECT * FROM pedidos_historial
+WHERE pedido_id IN ({placeholders})
+ORDER BY pedido_id, fecha_cambio DESC
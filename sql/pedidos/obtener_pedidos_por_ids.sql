@@ -0,0 +1,2 @@
+-- Pedidos por lote de IDs (reemplaza N consultas por id)
+SELECT * FROM pedidos WHERE id IN ({placeholders}) AND activo = 1
@@ -0,0 +1,5 @@
+-- Último número usado con un prefijo (semilla de la secuencia, una vez por año)
+-- Parámetros: prefijo, patron_like
+SELECT MAX(TRY_CAST(SUBSTRING(numero_pedido, LEN(?) + 1, 20) AS INT))
+FROM pedidos
+WHERE numero_pedido LIKE ?
@@ -43,6 +43,50 @@ BEGIN
     INCLUDE ([producto_id], [cantidad], [precio_unitario]);
 END
 GO
+IF EXISTS (SELECT * FROM sys.tables WHERE name = 'historial')
+   AND COL_LENGTH('dbo.historial', 'producto_id') IS NOT NULL
+BEGIN
+    -- Analítica de inventario (rotación, stock inmovilizado, ABC por movimiento)
+    CREATE NONCLUSTERED INDEX [idx_historial_producto_fecha]
+    ON [dbo].[historial] ([producto_id] ASC, [fecha_movimiento] DESC)
+    INCLUDE ([tipo_movimiento], [cantidad]);
+END
+GO
+IF EXISTS (SELECT * FROM sys.tables WHERE name = 'mantenimientos')
+   AND COL_LENGTH('dbo.mantenimientos', 'programacion_id') IS NOT NULL
+BEGIN
+    -- Calendario de mantenimiento por rango (vistas de mes y semana)
+    CREATE NONCLUSTERED INDEX [idx_mantenimientos_fecha_programada]
+    ON [dbo].[mantenimientos] ([fecha_programada] ASC)
+    INCLUDE ([equipo_id], [tipo], [estado], [responsable], [costo_estimado], [programacion_id]);
+    -- Una sola orden por ocurrencia de cada programación (programador idempotente)
+    CREATE UNIQUE NONCLUSTERED INDEX [UX_mantenimientos_programacion_fecha]
+    ON [dbo].[mantenimientos] ([programacion_id] ASC, [fecha_programada] ASC)
+    WHERE [programacion_id] IS NOT NULL;
+END
+GO
+IF EXISTS (SELECT * FROM sys.tables WHERE name = 'programacion_mantenimiento')
+BEGIN
+    -- Programaciones vencidas o dentro del rango del calendario
+    CREATE NONCLUSTERED INDEX [idx_programacion_proximo_activo]
+    ON [dbo].[programacion_mantenimiento] ([fecha_proximo] ASC)
+    INCLUDE ([equipo_id], [tipo_mantenimiento], [frecuencia_dias], [responsable], [costo_estimado])
+    WHERE [activo] = 1;
+END
+GO
+IF EXISTS (SELECT * FROM sys.tables WHERE name = 'lotes_inventario')
+BEGIN
+    -- Índice de vencimientos: lotes con stock por fecha (próximos a vencer, avisos)
+    CREATE NONCLUSTERED INDEX [idx_lotes_vencimiento]
+    ON [dbo].[lotes_inventario] ([fecha_vencimiento] ASC, [id] ASC)
+    INCLUDE ([producto_id], [numero_lote], [cantidad])
+    WHERE [activo] = 1 AND [cantidad] > 0;
+    -- Sugerencias FEFO y descuento de salidas por producto
+    CREATE NONCLUSTERED INDEX [idx_lotes_producto_vencimiento]
+    ON [dbo].[lotes_inventario] ([producto_id] ASC, [fecha_vencimiento] ASC, [id] ASC)
+    INCLUDE ([numero_lote], [cantidad], [activo]);
+END
+GO
 USE auditoria;
 GO
 IF EXISTS (SELECT * FROM sys.tables WHERE name = 'auditoria')
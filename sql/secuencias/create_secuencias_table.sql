@@ -0,0 +1,8 @@
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='secuencias_documentos' AND xtype='U')
+CREATE TABLE secuencias_documentos (
+    prefijo NVARCHAR(20) NOT NULL,
+    anio INT NOT NULL,
+    ultimo_numero INT NOT NULL DEFAULT 0,
+    fecha_modificacion DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_secuencias_documentos PRIMARY KEY (prefijo, anio)
+);
@@ -0,0 +1,8 @@
+-- Incrementa el contador; el bloqueo de la fila se mantiene hasta el commit
+-- de la transacción del llamador, lo que serializa solo a quienes numeran
+-- el mismo prefijo y año
+-- Parámetros: cantidad, prefijo, anio
+UPDATE secuencias_documentos
+SET ultimo_numero = ultimo_numero + ?,
+    fecha_modificacion = GETDATE()
+WHERE prefijo = ? AND anio = ?
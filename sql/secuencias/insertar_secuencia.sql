@@ -0,0 +1,5 @@
+-- Primera numeración de un prefijo y año; ultimo_numero parte del último
+-- número ya usado en la tabla del documento (semilla)
+-- Parámetros: prefijo, anio, ultimo_numero
+INSERT INTO secuencias_documentos (prefijo, anio, ultimo_numero, fecha_modificacion)
+VALUES (?, ?, ?, GETDATE())
@@ -0,0 +1,4 @@
+-- Parámetros: prefijo, anio
+SELECT ultimo_numero
+FROM secuencias_documentos
+WHERE prefijo = ? AND anio = ?
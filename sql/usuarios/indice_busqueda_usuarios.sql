@@ -0,0 +1,10 @@
+-- Filas para el índice de búsqueda local (rexus/utils/search_index.py)
+-- {filtro}: carga completa, cambios desde una fecha o IDs puntuales
+SELECT
+    id,
+    activo,
+    usuario,
+    nombre_completo,
+    email
+FROM usuarios
+WHERE {filtro}
@@ -0,0 +1,16 @@
+-- Usuarios por lote de IDs con sus permisos (resultados del índice de búsqueda)
+SELECT
+    u.id,
+    u.usuario,
+    u.nombre_completo,
+    u.email,
+    u.telefono,
+    u.rol,
+    u.estado,
+    u.fecha_creacion,
+    u.ultimo_acceso,
+    u.intentos_fallidos,
+    p.modulo
+FROM usuarios u
+LEFT JOIN permisos_usuario p ON p.usuario_id = u.id
+WHERE u.id IN ({placeholders}) AND u.activo = 1
@@ -0,0 +1,9 @@
+-- Piezas asignadas a obras (con medidas) para planificar cortes
+SELECT
+    vo.obra_id, vo.vidrio_id, vo.medidas_especificas,
+    vo.metros_cuadrados_requeridos, v.tipo, v.espesor, v.color
+FROM [vidrios_obra] vo
+INNER JOIN [vidrios] v ON v.id = vo.vidrio_id
+WHERE vo.obra_id IN ({placeholders})
+  AND vo.medidas_especificas IS NOT NULL
+ORDER BY vo.obra_id, v.tipo, v.espesor
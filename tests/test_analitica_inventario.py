@@ -0,0 +1,220 @@
+"""
+Tests de la analítica de inventario en el servidor
+(rexus.modules.inventario.submodules.analitica_manager).
+
+Las consultas de sql/inventario usan funciones de ventana; se ejecutan
+sobre SQLite (esquema de sql/benchmark/) con ISNULL y DATEDIFF traducidos.
+
+Verifican:
+- Clasificación ABC por valor y por movimientos, y su resumen por categoría
+- La clasificación coincide con acumular en Python para datos al azar
+- Valoración con reservas activas y participación por categoría
+- Rotación, días de cobertura y stock inmovilizado
+"""
+
+import random
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from rexus.modules.inventario.submodules.analitica_manager import (
+    LIMITE_CATEGORIA_A,
+    LIMITE_CATEGORIA_B,
+    AnaliticaManager,
+)
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+ESQUEMA = Path(__file__).parent.parent / "sql" / "benchmark" / "crear_esquema_sqlite.sql"
+AHORA = datetime.now()
+
+
+def hace(dias):
+    return (AHORA - timedelta(days=dias)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _datediff_dias(desde, hasta):
+    if desde is None or hasta is None:
+        return None
+    return (datetime.fromisoformat(str(hasta)[:10]) - datetime.fromisoformat(str(desde)[:10])).days
+
+
+class SQLSobreSQLite(SQLQueryManager):
+    """Traduce ISNULL y DATEDIFF(day, ...) de T-SQL a SQLite."""
+
+    def get_query(self, modulo, nombre, **kwargs):
+        sql = super().get_query(modulo, nombre, **kwargs).replace("ISNULL(", "IFNULL(")
+        return re.sub(r"DATEDIFF\(day,", "DATEDIFF_DIAS(", sql)
+
+
+@pytest.fixture
+def base():
+    conexion = sqlite3.connect(":memory:")
+    conexion.create_function("GETDATE", 0, lambda: AHORA.strftime("%Y-%m-%d %H:%M:%S"))
+    conexion.create_function("DATEDIFF_DIAS", 2, _datediff_dias)
+    conexion.executescript(ESQUEMA.read_text(encoding="utf-8"))
+    yield conexion
+    conexion.close()
+
+
+@pytest.fixture
+def analitica(base):
+    analitica = AnaliticaManager(base)
+    analitica.sql_manager = SQLSobreSQLite()
+    return analitica
+
+
+def producto(base, id_producto, stock, precio, categoria="Perfiles", activo=1, creado=400):
+    base.execute(
+        "INSERT INTO inventario_perfiles (id, codigo, descripcion, categoria, stock_actual, "
+        "precio_unitario, activo, fecha_creacion, fecha_modificacion) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (id_producto, f"P-{id_producto}", f"Producto {id_producto}", categoria, stock, precio,
+         activo, hace(creado), hace(creado)),
+    )
+
+
+def movimiento(base, id_producto, cantidad, dias):
+    base.execute(
+        "INSERT INTO historial (producto_id, tipo_movimiento, cantidad, fecha_movimiento) "
+        "VALUES (?, ?, ?, ?)",
+        (id_producto, "ENTRADA" if cantidad > 0 else "SALIDA", cantidad, hace(dias)),
+    )
+
+
+class TestAnalisisAbc:
+
+    def test_clasifica_por_valor(self, base, analitica):
+        for id_producto, valor in ((1, 500), (2, 300), (3, 100), (4, 50), (5, 50)):
+            producto(base, id_producto, stock=10, precio=valor / 10)
+        producto(base, 6, stock=0, precio=1000)              # sin stock
+        producto(base, 7, stock=10, precio=1000, activo=0)   # inactivo
+
+        resultado = analitica.analisis_abc("valor")
+
+        assert resultado["campo_analisis"] == "valor_total"
+        assert [(p["id"], p["categoria_abc"]) for p in resultado["productos"]] == [
+            (1, "A"), (2, "A"), (3, "B"), (4, "B"), (5, "C")]
+        resumen = resultado["resumen"]
+        assert resumen["total_productos_analizados"] == 5
+        assert resumen["total_valor_analizado"] == pytest.approx(1000)
+        assert resumen["categoria_A"]["cantidad_productos"] == 2
+        assert resumen["categoria_A"]["porcentaje_valor"] == pytest.approx(80)
+        assert resumen["categoria_B"]["valor_total"] == pytest.approx(150)
+        assert resumen["categoria_C"]["porcentaje_productos"] == pytest.approx(20)
+        assert "productos_categoria" not in resultado["productos"][0]
+
+    def test_clasifica_por_movimientos_en_la_ventana(self, base, analitica):
+        producto(base, 1, stock=0, precio=10)
+        producto(base, 2, stock=5, precio=10)
+        for _ in range(8):
+            movimiento(base, 1, -1, dias=5)
+        movimiento(base, 2, -1, dias=5)
+        for _ in range(20):
+            movimiento(base, 2, -1, dias=200)               # fuera de la ventana
+
+        resultado = analitica.analisis_abc("movimiento", dias_movimiento=90)
+
+        assert [(p["id"], p["total_movimientos"]) for p in resultado["productos"]] == [(1, 8), (2, 1)]
+        # 8 de 9 movimientos: 88,9 % acumulado
+        assert [p["categoria_abc"] for p in resultado["productos"]] == ["B", "C"]
+
+    def test_sin_productos(self, analitica):
+        resultado = analitica.analisis_abc("cantidad")
+
+        assert resultado["productos"] == []
+        assert resultado["resumen"]["categoria_A"]["cantidad_productos"] == 0
+
+    def test_criterio_desconocido(self, analitica):
+        with pytest.raises(ValueError):
+            analitica.analisis_abc("precio")
+
+    def test_coincide_con_acumular_en_python(self, base, analitica):
+        azar = random.Random(35)
+        valores = {}
+        for id_producto in range(1, 301):
+            stock, precio = azar.randrange(1, 100), azar.randrange(1, 500)
+            producto(base, id_producto, stock=stock, precio=precio)
+            valores[id_producto] = stock * precio
+
+        resultado = analitica.analisis_abc("valor")
+
+        total = sum(valores.values())
+        acumulado = 0
+        esperado = []
+        for id_producto in sorted(valores, key=lambda i: (-valores[i], i)):
+            acumulado += valores[id_producto]
+            porcentaje = 100.0 * acumulado / total
+            categoria = ("A" if porcentaje <= LIMITE_CATEGORIA_A
+                         else "B" if porcentaje <= LIMITE_CATEGORIA_B else "C")
+            esperado.append((id_producto, categoria))
+        assert [(p["id"], p["categoria_abc"]) for p in resultado["productos"]] == esperado
+        for categoria in "ABC":
+            assert resultado["resumen"][f"categoria_{categoria}"]["cantidad_productos"] == \
+                sum(1 for _, c in esperado if c == categoria)
+
+
+class TestValoracion:
+
+    def test_totales_con_reservas(self, base, analitica):
+        producto(base, 1, stock=10, precio=100, categoria="Perfiles")
+        producto(base, 2, stock=4, precio=50, categoria="Vidrios")
+        producto(base, 3, stock=100, precio=1, categoria="Vidrios", activo=0)
+        base.executemany(
+            "INSERT INTO reserva_materiales (producto_id, obra_id, cantidad_reservada, estado, "
+            "fecha_reserva) VALUES (?, 1, ?, ?, '2026-01-01')",
+            [(1, 3, "ACTIVA"), (1, 2, "ACTIVA"), (1, 5, "LIBERADA"), (2, 1, "ACTIVA")],
+        )
+
+        resultado = analitica.valoracion()
+
+        por_id = {p["id"]: p for p in resultado["productos"]}
+        assert [p["id"] for p in resultado["productos"]] == [1, 2]
+        assert (por_id[1]["stock_reservado"], por_id[1]["stock_disponible"]) == (5, 5)
+        assert por_id[1]["valor_disponible"] == pytest.approx(500)
+        assert resultado["totales"] == {
+            "productos": 2, "valor_total": 1200, "valor_reservado": 550,
+            "valor_disponible": 650, "stock_total": 14, "stock_reservado": 6,
+            "stock_disponible": 8,
+        }
+        categorias = {c["categoria"]: c for c in resultado["categorias"]}
+        assert [c["categoria"] for c in resultado["categorias"]] == ["Perfiles", "Vidrios"]
+        assert categorias["Perfiles"]["porcentaje_valor"] == pytest.approx(100 * 1000 / 1200)
+        assert categorias["Vidrios"]["total_productos"] == 1
+
+    def test_sin_productos(self, analitica):
+        resultado = analitica.valoracion()
+
+        assert resultado["productos"] == [] and resultado["categorias"] == []
+        assert resultado["totales"]["valor_total"] == 0
+
+
+class TestRotacion:
+
+    def test_rotacion_cobertura_e_inmovilizados(self, base, analitica):
+        producto(base, 1, stock=40, precio=10)
+        movimiento(base, 1, 20, dias=10)
+        movimiento(base, 1, -60, dias=5)
+        producto(base, 2, stock=10, precio=5)
+        movimiento(base, 2, -5, dias=200)            # sin movimientos recientes
+        producto(base, 3, stock=10, precio=1, creado=30)   # nuevo, sin movimientos
+        producto(base, 4, stock=0, precio=100)       # sin stock: no inmovilizado
+
+        resultado = analitica.rotacion(dias_periodo=90, dias_inmovilizado=180)
+
+        por_id = {p["id"]: p for p in resultado["productos"]}
+        assert por_id[1]["stock_promedio"] == pytest.approx(60)
+        assert por_id[1]["rotacion"] == pytest.approx(1.0)
+        assert por_id[1]["dias_cobertura"] == pytest.approx(60)
+        assert por_id[2]["dias_sin_movimiento"] == 200
+        assert por_id[3]["dias_cobertura"] is None
+        assert [p["id"] for p in resultado["inmovilizados"]] == [2]
+        assert resultado["productos"][0]["id"] == 2      # inmovilizados primero
+
+        resumen = resultado["resumen"]
+        assert resumen["total_productos"] == 4
+        assert resumen["productos_inmovilizados"] == 1
+        assert resumen["valor_stock_total"] == pytest.approx(460)
+        assert resumen["porcentaje_valor_inmovilizado"] == pytest.approx(100 * 50 / 460)
+        assert resumen["rotacion_global"] == pytest.approx(60 / (60 + 10 + 10 + 0))
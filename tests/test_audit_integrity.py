@@ -0,0 +1,210 @@
+"""
+Tests de la cadena de integridad de auditoría (rexus.core.audit_integrity).
+
+Verifican:
+- Una cadena válida y la detección de una fila alterada
+- Reanudar desde un checkpoint firmado, volviendo a verificar su tramo y
+  su raíz Merkle
+- La verificación en un pool de procesos da el mismo resultado
+- AuditoriaModel.verificar_integridad recorre la tabla y guarda el
+  checkpoint entre ejecuciones
+"""
+
+import json
+import sqlite3
+from dataclasses import replace
+
+import pytest
+
+from rexus.core.audit_integrity import (
+    CRYPTOGRAPHY_AVAILABLE,
+    AuditIntegrityManager,
+    load_checkpoint,
+    merkle_root,
+    save_checkpoint,
+)
+from rexus.modules.auditoria import model as auditoria_model
+from rexus.modules.auditoria.model import AuditoriaModel
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+pytestmark = pytest.mark.skipif(not CRYPTOGRAPHY_AVAILABLE, reason="requiere cryptography")
+
+
+@pytest.fixture(scope="module")
+def gestor():
+    return AuditIntegrityManager(secret_key="pruebas")
+
+
+@pytest.fixture
+def registros(gestor):
+    gestor.last_record_hash = None
+    return [
+        gestor.create_audit_record("ACCION", 1, "inventario", f"accion_{i}", {"n": i})
+        for i in range(12)
+    ]
+
+
+def alterar(registro):
+    return replace(registro, details={"n": -1})
+
+
+class TestCadena:
+
+    def test_cadena_valida(self, gestor, registros):
+        reporte = gestor.verify_chain_integrity(registros)
+
+        assert reporte.chain_integrity and reporte.signature_validity
+        assert reporte.valid_records == 12
+        assert reporte.issues == []
+
+    def test_detecta_fila_alterada(self, gestor, registros):
+        registros[3] = alterar(registros[3])
+
+        reporte = gestor.verify_chain_integrity(registros)
+
+        assert not reporte.chain_integrity
+        assert reporte.corrupted_records == 1
+        assert {issue["record_index"] for issue in reporte.issues} == {3}
+
+    def test_merkle_root(self):
+        assert merkle_root(["a", "b", "c"]) == merkle_root(["a", "b", "c", "c"])
+        assert merkle_root(["a", "b"]) != merkle_root(["b", "a"])
+
+
+class TestCheckpoints:
+
+    def test_reanuda_desde_checkpoint(self, gestor, registros, tmp_path):
+        inicial = gestor.verify_chain_integrity(registros[:10], checkpoint_every=5)
+        assert [c.record_count for c in inicial.checkpoints] == [5, 10]
+
+        ruta = str(tmp_path / "checkpoint.json")
+        save_checkpoint(inicial.checkpoints[-1], ruta)
+        checkpoint = load_checkpoint(ruta)
+
+        reporte = gestor.verify_chain_integrity(
+            registros[10:], checkpoint=checkpoint, checkpoint_segment=registros[5:10]
+        )
+
+        assert reporte.chain_integrity
+        assert reporte.resumed_from == 10
+        assert reporte.total_records == 2
+
+    def test_tramo_alterado_tras_el_checkpoint(self, gestor, registros):
+        checkpoint = gestor.verify_chain_integrity(registros[:10], checkpoint_every=5).checkpoints[-1]
+        tramo = registros[5:10]
+        tramo[2] = alterar(tramo[2])
+
+        sin_tramo = gestor.verify_chain_integrity(registros[10:], checkpoint=checkpoint)
+        con_tramo = gestor.verify_chain_integrity(
+            registros[10:], checkpoint=checkpoint, checkpoint_segment=tramo
+        )
+
+        # Solo con la firma la alteración pasa inadvertida
+        assert sin_tramo.chain_integrity
+        assert not con_tramo.chain_integrity
+        assert con_tramo.total_records == 0
+        assert all(issue["record_id"] == "CHECKPOINT" for issue in con_tramo.issues)
+
+    def test_rechaza_checkpoint_modificado(self, gestor, registros):
+        checkpoint = gestor.verify_chain_integrity(registros[:5], checkpoint_every=5).checkpoints[-1]
+
+        reporte = gestor.verify_chain_integrity(
+            registros[5:], checkpoint=replace(checkpoint, record_count=3)
+        )
+
+        assert not reporte.chain_integrity and not reporte.signature_validity
+
+    def test_no_certifica_tramos_invalidos(self, gestor, registros):
+        registros[2] = alterar(registros[2])
+
+        reporte = gestor.verify_chain_integrity(registros, checkpoint_every=5)
+
+        assert reporte.checkpoints == []
+
+
+class TestVerificacionParalela:
+
+    def test_mismo_resultado_que_en_proceso(self, gestor, registros):
+        registros[7] = alterar(registros[7])
+
+        serie = gestor.verify_chain_integrity(registros)
+        paralelo = gestor.verify_chain_integrity(iter(registros), workers=2, chunk_size=4)
+
+        assert paralelo.total_records == serie.total_records == 12
+        assert paralelo.corrupted_records == serie.corrupted_records == 1
+        assert paralelo.issues == serie.issues
+
+
+class SQLSobreSQLite(SQLQueryManager):
+    """Traduce la paginación OFFSET/FETCH de T-SQL a LIMIT/OFFSET."""
+
+    def get_query(self, modulo, nombre, **kwargs):
+        return (super().get_query(modulo, nombre, **kwargs)
+                .replace("OFFSET ? ROWS FETCH NEXT ? ROWS ONLY", "LIMIT ?2 OFFSET ?1")
+                .replace("OFFSET ? ROWS", "LIMIT -1 OFFSET ?"))
+
+
+class ConexionPrueba:
+    def __init__(self, connection):
+        self.connection = connection
+
+
+@pytest.fixture
+def conexion(registros):
+    conexion = sqlite3.connect(":memory:")
+    conexion.execute(
+        "CREATE TABLE auditoria_integridad (secuencia INTEGER PRIMARY KEY, id TEXT, timestamp TEXT, "
+        "event_type TEXT, user_id INT, resource TEXT, action TEXT, details TEXT, ip_address TEXT, "
+        "user_agent TEXT, session_id TEXT, content_hash TEXT, previous_hash TEXT, chain_hash TEXT, "
+        "signature TEXT, integrity_sealed INT, created_by_system TEXT)"
+    )
+    conexion.executemany(
+        "INSERT INTO auditoria_integridad VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(r.id, r.timestamp, r.event_type, r.user_id, r.resource, r.action, json.dumps(r.details),
+          r.ip_address, r.user_agent, r.session_id, r.content_hash, r.previous_hash, r.chain_hash,
+          r.signature, 1, r.created_by_system) for r in registros],
+    )
+    yield conexion
+    conexion.close()
+
+
+@pytest.fixture
+def modelo(conexion, gestor, monkeypatch):
+    monkeypatch.setattr(auditoria_model, "get_audit_integrity_manager", lambda: gestor)
+    monkeypatch.setattr(auditoria_model, "CHECKPOINT_INTEGRIDAD_CADA", 5)
+    modelo = AuditoriaModel.__new__(AuditoriaModel)
+    modelo.db_connection = ConexionPrueba(conexion)
+    modelo.sql_manager = SQLSobreSQLite()
+    return modelo
+
+
+class TestVerificarIntegridadModelo:
+
+    def test_reanuda_entre_ejecuciones(self, modelo, tmp_path):
+        ruta = str(tmp_path / "data" / "checkpoint.json")
+
+        primera = modelo.verificar_integridad(ruta)
+        segunda = modelo.verificar_integridad(ruta)
+
+        assert primera.chain_integrity and primera.total_records == 12
+        assert load_checkpoint(ruta).record_count == 10
+        assert segunda.chain_integrity
+        assert (segunda.resumed_from, segunda.total_records) == (10, 2)
+
+    def test_detecta_alteracion_antes_del_checkpoint(self, modelo, conexion, tmp_path):
+        ruta = str(tmp_path / "checkpoint.json")
+        modelo.verificar_integridad(ruta)
+
+        conexion.execute("UPDATE auditoria_integridad SET details = '{\"n\": -1}' WHERE secuencia = 8")
+
+        reporte = modelo.verificar_integridad(ruta)
+        assert not reporte.chain_integrity
+        assert reporte.issues[0]["record_id"] == "CHECKPOINT"
+
+    def test_sin_gestor_de_integridad(self, modelo, monkeypatch):
+        def sin_gestor():
+            raise RuntimeError("no inicializado")
+
+        monkeypatch.setattr(auditoria_model, "get_audit_integrity_manager", sin_gestor)
+
+        assert modelo.verificar_integridad() is None
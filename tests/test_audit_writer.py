@@ -0,0 +1,163 @@
+"""
+Tests del escritor asíncrono de auditoría (rexus.core.audit_writer).
+
+Verifican:
+- Escritura por lotes con INSERT multi-fila
+- Respaldo local mientras la BD no está disponible, sin reprocesarlo en
+  cada vaciado, y recuperación tras la primera escritura exitosa
+- Retención en memoria cuando el respaldo tampoco se puede escribir
+- Contadores consistentes con envíos desde varios hilos
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from rexus.core import audit_writer
+from rexus.core.audit_writer import AsyncAuditWriter, AuditTarget
+
+EVENTOS = AuditTarget("eventos", ("usuario", "accion"))
+
+
+class BaseDatos:
+    """Fábrica de conexiones SQLite que se puede 'caer' y 'levantar'."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.disponible = True
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE eventos (usuario TEXT, accion TEXT)")
+        conn.commit()
+        conn.close()
+
+    def __call__(self):
+        if not self.disponible:
+            return None
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def filas(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT usuario, accion FROM eventos ORDER BY rowid").fetchall()
+        finally:
+            conn.close()
+
+
+@pytest.fixture
+def base(tmp_path):
+    return BaseDatos(tmp_path / "audit.db")
+
+
+@pytest.fixture
+def crear_writer(tmp_path, monkeypatch):
+    # El respaldo se reprocesa buscando el destino por nombre de tabla
+    monkeypatch.setitem(audit_writer._TARGETS, EVENTOS.table, EVENTOS)
+    writers = []
+
+    def crear(factory, **kwargs):
+        kwargs.setdefault("flush_interval", 60)
+        kwargs.setdefault("spill_path", str(tmp_path / "spill.jsonl"))
+        writer = AsyncAuditWriter(factory, **kwargs)
+        writers.append(writer)
+        return writer
+
+    yield crear
+    for writer in writers:
+        writer.close()
+
+
+class TestAsyncAuditWriter:
+
+    def test_escribe_eventos_por_lotes(self, base, crear_writer):
+        writer = crear_writer(base, batch_size=50)
+        for i in range(120):
+            writer.submit(EVENTOS, (f"u{i}", "login"))
+
+        assert writer.flush()
+        assert len(base.filas()) == 120
+        assert writer.stats["written"] == 120
+        assert writer.stats["batches"] <= 3
+
+    def test_valida_cantidad_de_columnas(self, base, crear_writer):
+        writer = crear_writer(base)
+        with pytest.raises(ValueError):
+            writer.submit(EVENTOS, ("solo_usuario",))
+
+    def test_respaldo_no_se_reprocesa_mientras_la_bd_esta_caida(self, base, crear_writer):
+        base.disponible = False
+        writer = crear_writer(base)
+        writer.submit(EVENTOS, ("ana", "login"))
+        assert writer.flush()
+        contenido = writer.spill_path.read_text(encoding="utf-8")
+        assert writer.stats["spilled"] == 1
+
+        reprocesos = []
+        original = writer._replay_spill
+        writer._replay_spill = lambda: reprocesos.append(1) or original()
+        for _ in range(3):
+            writer._flush_once()
+
+        assert reprocesos == []
+        assert writer.spill_path.read_text(encoding="utf-8") == contenido
+
+    def test_respaldo_se_recupera_tras_escritura_exitosa(self, base, crear_writer):
+        base.disponible = False
+        writer = crear_writer(base)
+        writer.submit(EVENTOS, ("ana", "login"))
+        assert writer.flush()
+        assert base.filas() == []
+
+        base.disponible = True
+        writer._retry_after = 0.0
+        writer.submit(EVENTOS, ("luis", "logout"))
+        assert writer.flush()
+
+        assert sorted(base.filas()) == [("ana", "login"), ("luis", "logout")]
+        assert not writer.spill_path.exists()
+
+    def test_retiene_en_memoria_si_el_respaldo_falla(self, base, crear_writer, tmp_path):
+        # El "archivo" de respaldo es un directorio: open() falla con OSError
+        spill = tmp_path / "no_es_archivo"
+        spill.mkdir()
+        base.disponible = False
+        writer = crear_writer(base, spill_path=str(spill))
+
+        assert writer.submit(EVENTOS, ("ana", "login"))
+        assert writer.flush()
+        assert writer.stats["retained"] == 1
+        assert writer.pending == 1
+
+        base.disponible = True
+        writer._retry_after = 0.0
+        writer._flush_once()
+
+        assert base.filas() == [("ana", "login")]
+        assert writer.pending == 0
+
+    def test_retencion_en_memoria_acotada(self, base, crear_writer, tmp_path):
+        spill = tmp_path / "no_es_archivo"
+        spill.mkdir()
+        base.disponible = False
+        writer = crear_writer(base, spill_path=str(spill), max_queue_size=5)
+
+        writer._spill([(EVENTOS, (f"u{i}", "login")) for i in range(8)])
+
+        assert writer.pending == 5
+        assert writer.stats["dropped"] == 3
+
+    def test_contadores_con_varios_hilos(self, base, crear_writer):
+        writer = crear_writer(base, batch_size=10_000)
+        hilos = [
+            threading.Thread(target=lambda: [writer.submit(EVENTOS, ("u", "a")) for _ in range(500)])
+            for _ in range(8)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert writer.flush()
+        assert writer.stats["enqueued"] == 4000
+        assert writer.stats["written"] == 4000
+        assert len(base.filas()) == 4000
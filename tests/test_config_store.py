@@ -0,0 +1,129 @@
+"""
+Tests del almacén de configuración (rexus.core.config_store).
+
+Verifican:
+- Valores decodificados y notificación de las claves que cambiaron
+- La difusión por el bus lleva solo nombres de claves
+- Un evento remoto solo invalida: los valores se releen con el lector
+  registrado y nunca se toman del evento
+- El modelo relee las claves desde la BD
+"""
+
+import sqlite3
+
+import pytest
+
+from rexus.core.config_store import ConfigStore
+from rexus.core.event_bus import EVENTO_CONFIGURACION_CAMBIADA, EventBus
+from rexus.modules.configuracion.model import ConfiguracionModel
+
+
+def evento_remoto(bus, datos):
+    """Simula un evento llegado por el relay desde otro proceso."""
+    bus.recibir_remoto(EVENTO_CONFIGURACION_CAMBIADA, datos, "otro_proceso", 0.0)
+
+
+class TestConfigStore:
+
+    def test_decodifica_y_notifica_cambios(self):
+        store = ConfigStore(defaults={"limite": "10"})
+        recibidos = []
+        store.suscribir(recibidos.append, claves=["modo_*"])
+
+        store.cargar({"modo_oscuro": "true", "otra": "x"})
+        store.aplicar({"modo_oscuro": "false", "otra": "y"})
+
+        assert store.obtener("limite") == 10
+        assert store.obtener("modo_oscuro") is False
+        assert recibidos == [{"modo_oscuro": True}, {"modo_oscuro": False}]
+
+    def test_difunde_solo_nombres_de_claves(self):
+        bus = EventBus()
+        publicados = []
+        bus.suscribir(EVENTO_CONFIGURACION_CAMBIADA, publicados.append)
+        store = ConfigStore(bus)
+
+        store.aplicar({"smtp_password": "secreto", "tema": "oscuro"})
+
+        assert [e.datos for e in publicados] == [{"claves": ["smtp_password", "tema"]}]
+
+    def test_evento_remoto_relee_desde_el_lector(self):
+        bus = EventBus()
+        store = ConfigStore(bus)
+        store.cargar({"tema": "claro", "borrada": "1"})
+        fuente = {"tema": "oscuro"}
+        leidas = []
+        store.establecer_lector(lambda claves: leidas.append(claves) or fuente)
+
+        evento_remoto(bus, {"claves": ["tema", "borrada"], "cambios": {"tema": "inyectado"}})
+
+        assert leidas == [["tema", "borrada"]]
+        assert store.obtener("tema") == "oscuro"
+        assert "borrada" not in store
+
+    def test_ignora_valores_remotos_sin_lector(self):
+        bus = EventBus()
+        store = ConfigStore(bus)
+        store.cargar({"tema": "claro"})
+
+        evento_remoto(bus, {"cambios": {"tema": "inyectado"}})
+        evento_remoto(bus, {"claves": ["tema"]})
+
+        assert store.obtener("tema") == "claro"
+
+    def test_ignora_invalidaciones_mal_formadas(self):
+        bus = EventBus()
+        store = ConfigStore(bus)
+        leidas = []
+        store.establecer_lector(lambda claves: leidas.append(claves) or {})
+
+        evento_remoto(bus, {"claves": "tema"})
+        evento_remoto(bus, {"claves": ["x"] * 10000})
+        evento_remoto(bus, {"claves": [1, None, "a" * 500]})
+
+        assert leidas == []
+
+    def test_recarga_en_el_despachador(self):
+        bus = EventBus()
+        store = ConfigStore(bus)
+        encolados = []
+        store.establecer_lector(lambda claves: {"tema": "oscuro"}, despachador=encolados.append)
+
+        evento_remoto(bus, {"claves": ["tema"]})
+        assert "tema" not in store
+
+        encolados[0]()
+        assert store.obtener("tema") == "oscuro"
+
+    def test_error_del_lector_no_modifica_el_almacen(self):
+        bus = EventBus()
+        store = ConfigStore(bus)
+        store.cargar({"tema": "claro"})
+
+        def lector(claves):
+            raise RuntimeError("BD caída")
+
+        store.establecer_lector(lector)
+        evento_remoto(bus, {"claves": ["tema"]})
+
+        assert store.obtener("tema") == "claro"
+
+
+class TestLectorModelo:
+
+    @pytest.fixture
+    def conexion(self):
+        conexion = sqlite3.connect(":memory:")
+        conexion.execute("CREATE TABLE configuracion (clave TEXT, valor TEXT, activo INTEGER)")
+        conexion.executemany(
+            "INSERT INTO configuracion VALUES (?, ?, ?)",
+            [("tema", "oscuro", 1), ("idioma", "es", 1), ("vieja", "x", 0)],
+        )
+        yield conexion
+        conexion.close()
+
+    def test_lee_claves_de_la_bd(self, conexion):
+        modelo = ConfiguracionModel.__new__(ConfiguracionModel)
+        modelo.db_connection = conexion
+
+        assert modelo._leer_claves(["tema", "vieja", "inexistente"]) == {"tema": "oscuro"}
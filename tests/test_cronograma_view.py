@@ -0,0 +1,259 @@
+"""
+Tests del dibujo del cronograma de obras (rexus.modules.obras.cronograma_view).
+
+El widget se arma sin ventana: el ancho es fijo, QRect se reemplaza por un
+rectángulo en Python con la misma semántica (right/bottom inclusivos) y el
+painter solo registra las llamadas.
+
+Verifican:
+- Solo se dibujan las filas que intersectan el área expuesta, y de cada
+  fila solo la etiqueta o la barra que caen dentro
+- La geometría se calcula una vez por ancho
+- La grilla se renderiza una vez por versión de escala/rango y ancho;
+  recargar o filtrar obras con el mismo rango la reutiliza
+"""
+
+import datetime
+import random
+
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from rexus.modules.obras import cronograma_view
+from rexus.modules.obras.cronograma_view import CronogramaWidget
+
+INICIO = datetime.date(2026, 1, 1)
+FIN = datetime.date(2026, 12, 31)
+ANCHO = 1200
+
+
+class Rect:
+    def __init__(self, x, y, ancho, alto):
+        self.x, self.y, self.ancho, self.alto = x, y, ancho, alto
+
+    def left(self):
+        return self.x
+
+    def top(self):
+        return self.y
+
+    def right(self):
+        return self.x + self.ancho - 1
+
+    def bottom(self):
+        return self.y + self.alto - 1
+
+    def width(self):
+        return self.ancho
+
+    def height(self):
+        return self.alto
+
+    def intersects(self, otro):
+        return (self.x <= otro.right() and otro.left() <= self.right()
+                and self.y <= otro.bottom() and otro.top() <= self.bottom())
+
+    def adjusted(self, dx1, dy1, dx2, dy2):
+        return Rect(self.x + dx1, self.y + dy1, self.ancho - dx1 + dx2, self.alto - dy1 + dy2)
+
+
+class Pintor:
+    """Painter que registra el nombre de cada llamada."""
+
+    def __init__(self):
+        self.llamadas = []
+
+    def __getattr__(self, nombre):
+        return lambda *args: self.llamadas.append((nombre, args))
+
+    def textos(self):
+        return [args[-1] for nombre, args in self.llamadas if nombre == "drawText"]
+
+    def barras(self):
+        return sum(1 for nombre, _ in self.llamadas if nombre == "drawRoundedRect")
+
+
+class CronogramaPrueba(CronogramaWidget):
+    """Cronograma sin ventana: ancho fijo y sin repintados."""
+
+    def width(self):
+        return self.ancho_fijo
+
+    def devicePixelRatioF(self):
+        return 1.0
+
+    def setMinimumHeight(self, alto):
+        pass
+
+    def update(self):
+        pass
+
+
+def obra(indice, inicio=INICIO, dias=30):
+    return {
+        "codigo": f"OB-{indice}",
+        "nombre": f"Obra {indice}",
+        "estado": "EN_PROCESO",
+        "fecha_inicio": inicio.isoformat(),
+        "fecha_fin_estimada": (inicio + datetime.timedelta(days=dias)).isoformat(),
+    }
+
+
+@pytest.fixture
+def cronograma(monkeypatch):
+    monkeypatch.setattr(cronograma_view, "QRect", Rect)
+    widget = CronogramaPrueba.__new__(CronogramaPrueba)
+    widget.ancho_fijo = ANCHO
+    widget.altura_fila = 40
+    widget.ancho_etiqueta = 200
+    widget.obras = []
+    widget._filas = []
+    widget._geometria = []
+    widget._geometria_ancho = -1
+    widget._cache_grilla = {}
+    widget._parametros_grilla = None
+    widget._version_grilla = 0
+    widget._color_defecto = cronograma_view.QColor(189, 195, 199)
+    for atributo in ("_fuente_codigo", "_fuente_nombre", "_fuente_estado", "_color_etiqueta",
+                     "_pen_etiqueta", "_pen_texto_barra"):
+        setattr(widget, atributo, None)
+
+    renderizadas = []
+    widget._renderizar_grilla = lambda alto, con_etiquetas: renderizadas.append(
+        (widget._version_grilla, widget.ancho_fijo, alto)) or Rect(0, 0, widget.ancho_fijo, alto)
+    widget.renderizadas = renderizadas
+    return widget
+
+
+def dibujadas(widget, expuesto):
+    filas = []
+    original = widget.dibujar_obra
+    widget.dibujar_obra = lambda painter, indice, rect: filas.append(indice) or original(painter, indice, rect)
+    try:
+        widget.dibujar_obras(Pintor(), expuesto)
+    finally:
+        del widget.dibujar_obra
+    return filas
+
+
+class TestFilasVisibles:
+
+    def test_solo_las_filas_expuestas(self, cronograma):
+        cronograma.actualizar_cronograma([obra(i) for i in range(1000)], INICIO, FIN, "mensual")
+
+        # Filas 100, 101 y 102 (cada una de 40 px tras la cabecera de 30)
+        assert dibujadas(cronograma, Rect(0, 30 + 40 * 100, ANCHO, 120)) == [100, 101, 102]
+
+    def test_area_parcial_incluye_filas_cortadas(self, cronograma):
+        cronograma.actualizar_cronograma([obra(i) for i in range(10)], INICIO, FIN, "mensual")
+
+        assert dibujadas(cronograma, Rect(0, 30 + 40 * 2 + 39, ANCHO, 2)) == [2, 3]
+
+    def test_cabecera_y_debajo_de_la_ultima_fila(self, cronograma):
+        cronograma.actualizar_cronograma([obra(i) for i in range(5)], INICIO, FIN, "mensual")
+
+        assert dibujadas(cronograma, Rect(0, 0, ANCHO, 30)) == []
+        assert dibujadas(cronograma, Rect(0, 30 + 40 * 5, ANCHO, 500)) == []
+
+    def test_coincide_con_intersectar_cada_fila(self, cronograma):
+        cronograma.actualizar_cronograma([obra(i) for i in range(300)], INICIO, FIN, "semanal")
+        azar = random.Random(29)
+
+        for _ in range(200):
+            top, alto = azar.randrange(0, 13000), azar.randrange(1, 900)
+            esperado = [i for i in range(300)
+                        if 30 + 40 * i <= top + alto - 1 and top <= 30 + 40 * i + 39]
+            assert dibujadas(cronograma, Rect(0, top, ANCHO, alto)) == esperado
+
+
+class TestRecorteHorizontal:
+
+    def test_solo_la_etiqueta(self, cronograma):
+        cronograma.actualizar_cronograma([obra(0, INICIO + datetime.timedelta(days=180))],
+                                         INICIO, FIN, "mensual")
+        pintor = Pintor()
+
+        cronograma.dibujar_obras(pintor, Rect(0, 0, 200, 400))
+
+        assert pintor.textos() == ["OB-0", "Obra 0"]
+        assert pintor.barras() == 0
+
+    def test_solo_la_barra(self, cronograma):
+        cronograma.actualizar_cronograma([obra(0, INICIO + datetime.timedelta(days=180))],
+                                         INICIO, FIN, "mensual")
+        pintor = Pintor()
+
+        cronograma.dibujar_obras(pintor, Rect(600, 0, 400, 400))
+
+        assert "OB-0" not in pintor.textos()
+        assert pintor.barras() == 1
+
+    def test_nada_fuera_de_la_barra(self, cronograma):
+        cronograma.actualizar_cronograma([obra(0, INICIO, dias=10)], INICIO, FIN, "mensual")
+        pintor = Pintor()
+
+        cronograma.dibujar_obras(pintor, Rect(900, 0, 300, 400))
+
+        assert pintor.llamadas == []
+
+    def test_obra_sin_fecha_no_se_dibuja(self, cronograma):
+        sin_fecha = dict(obra(0), fecha_inicio=None)
+        cronograma.actualizar_cronograma([sin_fecha], INICIO, FIN, "mensual")
+        pintor = Pintor()
+
+        cronograma.dibujar_obras(pintor, Rect(0, 0, ANCHO, 400))
+
+        assert pintor.llamadas == []
+
+
+class TestGeometria:
+
+    def test_se_calcula_una_vez_por_ancho(self, cronograma):
+        cronograma.actualizar_cronograma([obra(i) for i in range(3)], INICIO, FIN, "mensual")
+        cronograma.dibujar_obras(Pintor(), Rect(0, 0, ANCHO, 400))
+        geometria = cronograma._geometria
+
+        cronograma.dibujar_obras(Pintor(), Rect(0, 100, ANCHO, 40))
+        assert cronograma._geometria is geometria
+
+        cronograma.ancho_fijo = 1600
+        cronograma.dibujar_obras(Pintor(), Rect(0, 0, 1600, 400))
+        assert cronograma._geometria is not geometria
+        assert cronograma._geometria[0][1].width() > geometria[0][1].width()
+
+
+class TestCacheGrilla:
+
+    def test_recargar_obras_reutiliza_la_grilla(self, cronograma):
+        cronograma.actualizar_cronograma([obra(i) for i in range(3)], INICIO, FIN, "mensual")
+        grilla = cronograma._obtener_grilla()
+
+        cronograma.actualizar_cronograma([obra(7)], INICIO, FIN, "mensual")
+
+        assert cronograma._obtener_grilla() is grilla
+        assert len(cronograma.renderizadas) == 2  # cabecera y franja
+
+    def test_cambiar_escala_o_rango_vuelve_a_renderizar(self, cronograma):
+        obras = [obra(0)]
+        cronograma.actualizar_cronograma(obras, INICIO, FIN, "mensual")
+        mensual = cronograma._obtener_grilla()
+
+        cronograma.actualizar_cronograma(obras, INICIO, FIN, "semanal")
+        semanal = cronograma._obtener_grilla()
+        cronograma.actualizar_cronograma(obras, INICIO, datetime.date(2026, 6, 30), "semanal")
+        cronograma._obtener_grilla()
+
+        assert semanal is not mensual
+        assert len(cronograma.renderizadas) == 6
+        # Solo quedan los pixmaps de la versión actual
+        assert list(cronograma._cache_grilla) == [(cronograma._version_grilla, ANCHO, 1.0)]
+
+    def test_un_pixmap_por_ancho(self, cronograma):
+        cronograma.actualizar_cronograma([obra(0)], INICIO, FIN, "mensual")
+        for ancho in (1200, 1400, 1200, 1400):
+            cronograma.ancho_fijo = ancho
+            cronograma._obtener_grilla()
+
+        assert [(ancho, alto) for _, ancho, alto in cronograma.renderizadas] == [
+            (1200, 30), (1200, 256), (1400, 30), (1400, 256)]
@@ -0,0 +1,137 @@
+"""
+Tests del optimizador de cortes de vidrio (rexus.modules.vidrios.cutting_optimizer).
+
+Verifican:
+- Interpretación de medidas con y sin unidad
+- Las piezas entran en la hoja sin superponerse, rotando si hace falta
+- Desperdicio y retazos reutilizables
+- Las piezas más grandes que la hoja quedan sin colocar
+"""
+
+import random
+
+import pytest
+
+from rexus.modules.vidrios.cutting_optimizer import (
+    HOJA_ESTANDAR,
+    Pieza,
+    parsear_medidas,
+    planificar_cortes,
+)
+
+
+class TestParsearMedidas:
+
+    @pytest.mark.parametrize("texto, esperado", [
+        ("1200x800", (1200, 800)),
+        ("1200 X 800 mm", (1200, 800)),
+        ("120 x 80 cm", (1200, 800)),
+        ("1.2m x 0.8m", (1200, 800)),
+        ("2 m x 1 m", (2000, 1000)),
+        ("1.2 x 0.8", (1200, 800)),
+        ("1,5 x 2", (1500, 2000)),
+        ("Paño fijo 6mm 900×450", (900, 450)),
+    ])
+    def test_medidas_validas(self, texto, esperado):
+        assert parsear_medidas(texto) == esperado
+
+    def test_enteros_chicos_sin_unidad_son_milimetros(self):
+        assert parsear_medidas("8 x 6") == (8, 6)
+
+    def test_decimales_de_mas_de_10_son_milimetros(self):
+        assert parsear_medidas("1200.5 x 800") == (1200.5, 800)
+
+    @pytest.mark.parametrize("texto", [None, "", "sin medidas", "0 x 800"])
+    def test_medidas_invalidas(self, texto):
+        assert parsear_medidas(texto) is None
+
+
+def superpuestas(a, b):
+    return (a.x < b.x + b.ancho and b.x < a.x + a.ancho
+            and a.y < b.y + b.alto and b.y < a.y + a.alto)
+
+
+def verificar_plan(plan):
+    for hoja in plan.hojas:
+        for c in hoja.colocaciones:
+            assert c.x >= 0 and c.y >= 0
+            assert c.x + c.ancho <= hoja.ancho and c.y + c.alto <= hoja.alto
+        for i, a in enumerate(hoja.colocaciones):
+            for b in hoja.colocaciones[i + 1:]:
+                assert not superpuestas(a, b), (a, b)
+
+
+class TestPlanificarCortes:
+
+    def test_cuatro_cuartos_en_una_hoja(self):
+        piezas = [Pieza(str(i), 1800, 1250, puede_rotar=False) for i in range(4)]
+
+        plan = planificar_cortes(piezas, kerf=0)
+
+        verificar_plan(plan)
+        assert len(plan.hojas) == 1
+        assert plan.sin_colocar == []
+        assert plan.desperdicio_pct == pytest.approx(0)
+
+    def test_el_corte_ocupa_lugar(self):
+        piezas = [Pieza(str(i), 1800, 1250, puede_rotar=False) for i in range(4)]
+
+        plan = planificar_cortes(piezas, kerf=3)
+
+        # Con el ancho del corte ninguna otra pieza entra al lado ni encima
+        verificar_plan(plan)
+        assert len(plan.hojas) == 4
+
+    def test_rota_la_pieza_que_solo_entra_girada(self):
+        plan = planificar_cortes([Pieza("alta", 2000, 3000)])
+
+        colocacion = plan.hojas[0].colocaciones[0]
+        assert colocacion.rotada
+        assert (colocacion.ancho, colocacion.alto) == (3000, 2000)
+
+    def test_sin_rotacion_no_entra(self):
+        plan = planificar_cortes([Pieza("alta", 2000, 3000, puede_rotar=False)])
+
+        assert plan.hojas == []
+        assert plan.sin_colocar == ["alta"]
+
+    def test_pieza_mas_grande_que_la_hoja(self):
+        plan = planificar_cortes([Pieza("grande", 4000, 3000), Pieza("chica", 500, 500)])
+
+        assert plan.sin_colocar == ["grande"]
+        assert [c.pieza_id for c in plan.hojas[0].colocaciones] == ["chica"]
+
+    def test_desperdicio_y_retazos(self):
+        plan = planificar_cortes([Pieza("a", 1800, 2500)], kerf=0)
+
+        hoja = plan.hojas[0]
+        assert plan.desperdicio_pct == pytest.approx(50)
+        assert hoja.retazos == [(1800, 0, 1800, 2500)]
+
+    def test_retazos_chicos_no_se_informan(self):
+        plan = planificar_cortes([Pieza("a", 3500, 2400)], kerf=0)
+
+        assert plan.hojas[0].retazos == []
+
+    def test_agrupa_por_tipo_de_hoja(self):
+        piezas = [Pieza("a", 500, 500, tipo_hoja="float-4mm"),
+                  Pieza("b", 500, 500, tipo_hoja="laminado-6mm")]
+
+        plan = planificar_cortes(piezas, hojas_stock={"laminado-6mm": (3210, 2250)})
+
+        assert plan.hojas_por_tipo() == {"float-4mm": 1, "laminado-6mm": 1}
+        tamanos = {h.tipo_hoja: (h.ancho, h.alto) for h in plan.hojas}
+        assert tamanos == {"float-4mm": HOJA_ESTANDAR, "laminado-6mm": (3210, 2250)}
+
+    def test_piezas_al_azar_sin_superposiciones(self):
+        azar = random.Random(34)
+        piezas = [Pieza(str(i), azar.randrange(200, 1800), azar.randrange(200, 1800))
+                  for i in range(60)]
+
+        plan = planificar_cortes(piezas)
+
+        verificar_plan(plan)
+        colocadas = [c.pieza_id for h in plan.hojas for c in h.colocaciones]
+        assert sorted(colocadas) == sorted(p.id for p in piezas)
+        area_piezas = sum(p.ancho * p.alto for p in piezas)
+        assert len(plan.hojas) >= area_piezas / (HOJA_ESTANDAR[0] * HOJA_ESTANDAR[1])
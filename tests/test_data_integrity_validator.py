@@ -0,0 +1,247 @@
+"""
+Tests del validador de integridad de datos (rexus.utils.data_integrity_validator).
+
+Usa tres bases SQLite en archivos (users, inventario, auditoria) para que
+los chequeos en paralelo abran sus propias conexiones.
+
+Verifican:
+- Cada chequeo detecta su violación; en paralelo el resultado es el mismo
+  que en secuencia y las violaciones se entregan en el hilo que llama
+- Las violaciones se entregan por lotes y solo se guardan
+  MAX_STORED_VIOLATIONS por chequeo, aunque el reporte las cuente todas
+- El modo incremental solo revisa filas modificadas desde la última
+  ejecución limpia, con una ejecución completa periódica
+- Sin columna de modificación el chequeo revisa la tabla completa
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from rexus.utils import data_integrity_validator as validador
+from rexus.utils.data_integrity_validator import CHECKS, DataIntegrityValidator
+
+ANTIGUA = "2020-01-01 00:00:00"
+
+ESQUEMAS = {
+    "users": """
+        CREATE TABLE usuarios (id INTEGER PRIMARY KEY, username TEXT);
+        INSERT INTO usuarios (username) VALUES ('ana'), ('luis');
+    """,
+    "inventario": f"""
+        CREATE TABLE productos (
+            id INTEGER PRIMARY KEY, codigo_producto TEXT, stock_actual REAL, stock_minimo REAL,
+            precio REAL, usuario_creacion TEXT, fecha_actualizacion TEXT
+        );
+        CREATE TABLE movimientos_inventario (
+            id INTEGER PRIMARY KEY, producto_id INT, obra_id INT, fecha_movimiento TEXT
+        );
+        CREATE TABLE obras (
+            id INTEGER PRIMARY KEY, codigo_obra TEXT, fecha_inicio TEXT, fecha_fin_estimada TEXT,
+            fecha_modificacion TEXT
+        );
+        INSERT INTO productos VALUES
+            (1, 'P-1', 10, 5, 10, 'ana', '{ANTIGUA}'),
+            (2, 'P-2', -5, 0, 10, 'fantasma', '{ANTIGUA}'),
+            (3, 'P-3', 10, 0, 0, 'luis', '{ANTIGUA}'),
+            (4, 'DUP', 10, 0, 10, 'ana', '{ANTIGUA}'),
+            (5, 'DUP', 10, 0, 10, 'ana', '{ANTIGUA}'),
+            (6, 'P-6', 2, 5, 10, 'ana', '{ANTIGUA}');
+        INSERT INTO obras VALUES
+            (1, 'O-1', '2026-01-01', '2026-06-01', '{ANTIGUA}'),
+            (2, 'O-2', '2026-06-01', '2026-01-01', '{ANTIGUA}');
+        INSERT INTO movimientos_inventario VALUES
+            (1, 1, 1, '{ANTIGUA}'),
+            (2, 99, 7, '{ANTIGUA}');
+    """,
+    "auditoria": f"""
+        CREATE TABLE auditoria_eventos (
+            id INTEGER PRIMARY KEY, tabla_afectada TEXT, registro_id INT, usuario TEXT, fecha_hora TEXT
+        );
+        INSERT INTO auditoria_eventos VALUES
+            (1, 'productos', 1, 'ana', '{ANTIGUA}'),
+            (2, 'productos', 77, 'fantasma', '{ANTIGUA}');
+    """,
+}
+
+# Una violación por chequeo salvo stock (negativo y bajo mínimo)
+ESPERADAS = {
+    "user_references_inventario": 1,
+    "product_references_auditoria": 1,
+    "obra_references": 1,
+    "stock_consistency": 2,
+    "date_logic": 1,
+    "price_ranges": 1,
+    "orphaned_movements": 1,
+    "orphaned_audit_records": 1,
+    "duplicates": 1,
+}
+
+
+@pytest.fixture
+def bases(tmp_path):
+    rutas = {}
+    for nombre, esquema in ESQUEMAS.items():
+        rutas[nombre] = str(tmp_path / f"{nombre}.db")
+        conexion = sqlite3.connect(rutas[nombre])
+        conexion.executescript(esquema)
+        conexion.commit()
+        conexion.close()
+    return rutas
+
+
+@pytest.fixture
+def conexiones(bases):
+    conexiones = {nombre: sqlite3.connect(ruta) for nombre, ruta in bases.items()}
+    yield conexiones
+    for conexion in conexiones.values():
+        conexion.close()
+
+
+def fabricas(bases):
+    return {nombre: (lambda ruta=ruta: sqlite3.connect(ruta)) for nombre, ruta in bases.items()}
+
+
+def por_chequeo(reporte):
+    return {nombre: r["violations"] for nombre, r in reporte["checks"].items()}
+
+
+class TestEjecucion:
+
+    def test_secuencial_detecta_cada_violacion(self, conexiones):
+        validator = DataIntegrityValidator(conexiones, max_workers=1, state_path=None)
+
+        reporte = validator.validate_all()
+
+        assert por_chequeo(reporte) == ESPERADAS
+        assert reporte["total_violations"] == 10
+        assert reporte["violations_by_type"] == {
+            "foreign_key_violation": 3, "business_rule_violation": 4,
+            "orphaned_record": 2, "duplicate_record": 1,
+        }
+        assert all(r["status"] == "ok" for r in reporte["checks"].values())
+
+    def test_paralelo_igual_que_secuencial(self, bases, conexiones):
+        hilos = set()
+
+        def recibir(lote):
+            hilos.add(threading.current_thread())
+
+        secuencial = DataIntegrityValidator(conexiones, max_workers=1, state_path=None).validate_all()
+        paralelo = DataIntegrityValidator(
+            connection_factories=fabricas(bases), max_workers=4, state_path=None
+        ).validate_all(on_violations=recibir)
+
+        assert por_chequeo(paralelo) == por_chequeo(secuencial)
+        assert paralelo["violations_by_severity"] == secuencial["violations_by_severity"]
+        assert sorted(v["description"] for v in paralelo["violations"]) == \
+            sorted(v["description"] for v in secuencial["violations"])
+        assert hilos == {threading.current_thread()}
+
+    def test_omite_chequeos_sin_conexion(self, conexiones):
+        del conexiones["users"]
+
+        reporte = DataIntegrityValidator(conexiones, max_workers=1, state_path=None).validate_all()
+
+        assert reporte["checks"]["user_references_inventario"]["status"] == "skipped"
+        assert reporte["checks"]["orphaned_audit_records"]["status"] == "skipped"
+        assert reporte["checks"]["duplicates"]["status"] == "ok"
+
+    def test_error_en_un_chequeo_no_corta_los_demas(self, conexiones):
+        conexiones["inventario"].execute("DROP TABLE obras")
+
+        reporte = DataIntegrityValidator(conexiones, max_workers=1, state_path=None).validate_all()
+
+        assert reporte["checks"]["date_logic"]["status"] == "error"
+        assert reporte["checks"]["price_ranges"]["violations"] == 1
+
+
+class TestEntregaPorLotes:
+
+    def test_lotes_y_tope_de_violaciones_guardadas(self, bases, conexiones, monkeypatch):
+        monkeypatch.setattr(validador, "CHUNK_SIZE", 10)
+        monkeypatch.setattr(validador, "MAX_STORED_VIOLATIONS", 25)
+        monkeypatch.setattr(validador, "FETCH_SIZE", 7)
+        conexiones["inventario"].executemany(
+            "INSERT INTO productos VALUES (NULL, ?, -1, 0, 10, 'ana', ?)",
+            [(f"N-{i}", ANTIGUA) for i in range(59)],
+        )
+        conexiones["inventario"].commit()
+        lotes = []
+
+        reporte = DataIntegrityValidator(
+            connection_factories=fabricas(bases), max_workers=2, state_path=None
+        ).validate_all(on_violations=lambda lote: lotes.append(len(lote)), checks=["stock_consistency"])
+
+        # 60 con stock negativo y 1 bajo el mínimo
+        assert reporte["total_violations"] == 61
+        assert len(reporte["violations"]) == 25
+        assert reporte["violations_omitted"] == 36
+        assert reporte["checks"]["stock_consistency"]["stored"] == 25
+        assert sum(lotes) == 61 and max(lotes) == 10
+
+
+class TestIncremental:
+
+    def test_solo_revisa_filas_modificadas(self, conexiones, tmp_path):
+        estado = str(tmp_path / "estado.json")
+        validator = DataIntegrityValidator(conexiones, max_workers=1, state_path=estado)
+        validator.validate_all(incremental=True)
+        marcas = json.loads(open(estado, encoding="utf-8").read())
+        # Solo avanzan los chequeos que terminaron limpios
+        assert set(marcas) == {"_full_run"}
+
+        conexiones["inventario"].execute("DELETE FROM productos WHERE id IN (2, 3, 5, 6)")
+        conexiones["inventario"].commit()
+        assert validator.validate_all(incremental=True)["checks"]["stock_consistency"]["violations"] == 0
+        assert "stock_consistency" in json.loads(open(estado, encoding="utf-8").read())
+
+        ahora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conexiones["inventario"].executemany(
+            "INSERT INTO productos VALUES (?, ?, -1, 0, 10, 'ana', ?)",
+            [(20, "VIEJO", ANTIGUA), (21, "NUEVO", ahora)],
+        )
+        conexiones["inventario"].commit()
+
+        reporte = validator.validate_all(incremental=True, checks=["stock_consistency"])
+
+        resultado = reporte["checks"]["stock_consistency"]
+        assert reporte["mode"] == "incremental"
+        assert resultado["mode"] == "incremental"
+        assert [v["record_id"] for v in reporte["violations"]] == [21]
+
+    def test_ejecucion_completa_periodica(self, conexiones, tmp_path):
+        estado = tmp_path / "estado.json"
+        vencida = (datetime.now() - validador.FULL_RUN_MAX_AGE - timedelta(days=1)).isoformat()
+        estado.write_text(json.dumps({"_full_run": vencida, "stock_consistency": "2099-01-01 00:00:00"}))
+
+        reporte = DataIntegrityValidator(conexiones, max_workers=1, state_path=str(estado)).validate_all(
+            incremental=True, checks=["stock_consistency"])
+
+        assert reporte["mode"] == "full"
+        assert reporte["checks"]["stock_consistency"]["violations"] == 2
+
+    def test_sin_columna_de_modificacion_revisa_todo(self, conexiones, tmp_path):
+        estado = tmp_path / "estado.json"
+        reciente = datetime.now().isoformat()
+        estado.write_text(json.dumps({"_full_run": reciente, "date_logic": "2099-01-01 00:00:00"}))
+        inventario = conexiones["inventario"]
+        inventario.executescript("""
+            CREATE TABLE obras_sin_fecha AS SELECT id, codigo_obra, fecha_inicio, fecha_fin_estimada FROM obras;
+            DROP TABLE obras;
+            ALTER TABLE obras_sin_fecha RENAME TO obras;
+        """)
+
+        reporte = DataIntegrityValidator(conexiones, max_workers=1, state_path=str(estado)).validate_all(
+            incremental=True, checks=["date_logic"])
+
+        assert reporte["checks"]["date_logic"]["mode"] == "full"
+        assert reporte["checks"]["date_logic"]["violations"] == 1
+
+
+def test_cada_chequeo_tiene_su_metodo():
+    validator = DataIntegrityValidator(state_path=None)
+    assert all(callable(getattr(validator, check.method)) for check in CHECKS)
@@ -0,0 +1,189 @@
+"""
+Tests del bus de eventos (rexus.core.event_bus).
+
+Verifican:
+- Entrega local por tipo exacto, módulo y comodín
+- Secreto del relay en el perfil: creación con permisos 0600 y reutilización
+- Relay local: los procesos con el mismo secreto comparten eventos y un par
+  con otro secreto es rechazado sin entregar nada
+- Un par que deja de leer se desconecta sin bloquear al que publica
+"""
+
+import json
+import os
+import socket
+import time
+
+import pytest
+
+from rexus.core import event_bus
+from rexus.core.event_bus import EventBus, obtener_secreto_relay, puerto_relay
+
+SECRETO = b"a" * 64
+
+
+def puerto_libre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def esperar(condicion, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.05)
+    return condicion()
+
+
+@pytest.fixture
+def buses():
+    creados = []
+
+    def crear():
+        bus = EventBus()
+        creados.append(bus)
+        return bus
+
+    yield crear
+    for bus in creados:
+        bus.cerrar()
+
+
+class TestEntregaLocal:
+
+    def test_suscripcion_por_tipo_modulo_y_comodin(self):
+        bus = EventBus()
+        recibidos = []
+        bus.suscribir("inventario.stock_bajo_minimo", lambda e: recibidos.append("tipo"))
+        bus.suscribir("inventario.*", lambda e: recibidos.append("modulo"))
+        suscripcion = bus.suscribir("*", lambda e: recibidos.append("todos"))
+
+        bus.publicar("inventario.stock_bajo_minimo", {"producto_id": 1})
+        suscripcion.cancelar()
+        bus.publicar("pedidos.aprobado")
+
+        assert recibidos == ["tipo", "modulo", "todos"]
+
+    def test_suscriptor_con_error_no_afecta_al_resto(self):
+        bus = EventBus()
+        recibidos = []
+        bus.suscribir("x.y", lambda e: 1 / 0)
+        bus.suscribir("x.y", lambda e: recibidos.append(e.datos))
+
+        bus.publicar("x.y", {"a": 1})
+
+        assert recibidos == [{"a": 1}]
+
+
+class TestSecretoRelay:
+
+    def test_crea_y_reutiliza_secreto(self, tmp_path):
+        ruta = str(tmp_path / "perfil" / "event_relay.token")
+
+        secreto = obtener_secreto_relay(ruta)
+
+        assert secreto and len(secreto) >= 32
+        assert obtener_secreto_relay(ruta) == secreto
+        if os.name == "posix":
+            assert os.stat(ruta).st_mode & 0o777 == 0o600
+
+    @pytest.mark.skipif(os.name != "posix", reason="permisos POSIX")
+    def test_rechaza_secreto_legible_por_otros(self, tmp_path):
+        ruta = tmp_path / "event_relay.token"
+        ruta.write_text("b" * 64, encoding="utf-8")
+        ruta.chmod(0o644)
+
+        assert obtener_secreto_relay(str(ruta)) is None
+
+    def test_sin_secreto_no_activa_relay(self, monkeypatch):
+        monkeypatch.setattr(event_bus, "obtener_secreto_relay", lambda *a: None)
+        bus = EventBus()
+
+        assert bus.conectar_relay(puerto_libre()) is None
+
+    def test_puerto_derivado_del_secreto(self, monkeypatch):
+        monkeypatch.delenv("REXUS_EVENT_RELAY_PORT", raising=False)
+        assert puerto_relay(SECRETO) == puerto_relay(SECRETO)
+        assert puerto_relay(SECRETO) != puerto_relay(b"c" * 64)
+
+
+class TestRelayLocal:
+
+    def test_comparte_eventos_con_el_mismo_secreto(self, buses):
+        puerto = puerto_libre()
+        origen, destino = buses(), buses()
+        recibidos = []
+        destino.suscribir("pedidos.*", recibidos.append)
+
+        relay_origen = origen.conectar_relay(puerto, SECRETO)
+        assert esperar(lambda: relay_origen.es_concentrador)
+        relay_destino = destino.conectar_relay(puerto, SECRETO)
+        assert esperar(lambda: relay_destino.conectado and len(relay_origen._pares) == 1)
+
+        origen.publicar("pedidos.aprobado", {"pedido_id": 7})
+
+        assert esperar(lambda: recibidos)
+        assert recibidos[0].datos == {"pedido_id": 7}
+        assert recibidos[0].remoto
+
+    def test_rechaza_par_con_otro_secreto(self, buses):
+        puerto = puerto_libre()
+        legitimo, intruso = buses(), buses()
+        recibidos = []
+        legitimo.suscribir("*", recibidos.append)
+
+        relay = legitimo.conectar_relay(puerto, SECRETO)
+        assert esperar(lambda: relay.es_concentrador)
+        relay_intruso = intruso.conectar_relay(puerto, b"z" * 64)
+
+        assert esperar(lambda: relay_intruso._aviso_rechazo)
+        intruso.publicar("configuracion.cambiada", {"clave": "x"})
+        time.sleep(0.3)
+        assert relay._pares == []
+        assert recibidos == []
+
+    def test_rechaza_cliente_sin_handshake(self, buses):
+        puerto = puerto_libre()
+        bus = buses()
+        recibidos = []
+        bus.suscribir("*", recibidos.append)
+        relay = bus.conectar_relay(puerto, SECRETO)
+        assert esperar(lambda: relay.es_concentrador)
+
+        with socket.create_connection(("127.0.0.1", puerto), timeout=2) as sock:
+            sock.recv(1024)  # reto
+            sock.sendall(b'{"tipo": "x.y", "datos": {}, "origen": "o", "ts": 0}\n')
+            time.sleep(0.3)
+
+        assert relay._pares == []
+        assert recibidos == []
+
+    def test_desconecta_par_que_no_lee(self, buses, monkeypatch):
+        monkeypatch.setattr(event_bus, "TIEMPO_ENVIO_RELAY_SEGUNDOS", 0.2)
+        puerto = puerto_libre()
+        bus = buses()
+        relay = bus.conectar_relay(puerto, SECRETO)
+        assert esperar(lambda: relay.es_concentrador)
+
+        lento = socket.socket()
+        lento.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        lento.connect(("127.0.0.1", puerto))
+        try:
+            reto = json.loads(lento.recv(1024))["reto"]
+            respuesta = {"respuesta": relay._firma(reto, "cliente"), "reto": "r"}
+            lento.sendall((json.dumps(respuesta) + "\n").encode("utf-8"))
+            assert esperar(lambda: len(relay._pares) == 1)
+
+            # El par no lee nunca: se llenan los buffers y el envío vence
+            inicio = time.monotonic()
+            for _ in range(2000):
+                bus.publicar("inventario.stock_bajo_minimo", {"relleno": "x" * 60000})
+                if not relay._pares:
+                    break
+
+            assert relay._pares == []
+            assert time.monotonic() - inicio < 5
+        finally:
+            lento.close()
@@ -0,0 +1,275 @@
+"""
+Tests del índice de vencimientos y la salida FEFO de lotes
+(rexus.modules.inventario.submodules.indice_vencimientos).
+
+Verifican:
+- Consultas por rango de vencimiento y actualización incremental del índice
+- Orden FEFO: vigentes, sin vencimiento y por último los vencidos
+- Un solo aviso por lote aunque revisen varias veces o varios puestos
+- Las bajas de stock del inventario descuentan de los lotes en orden FEFO
+"""
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+from rexus.core.event_bus import EVENTO_LOTE_POR_VENCER, EventBus
+from rexus.modules.inventario import model as inventario_model
+from rexus.modules.inventario.model import InventarioModel
+from rexus.modules.inventario.submodules import movimientos_manager
+from rexus.modules.inventario.submodules.indice_vencimientos import (
+    IndiceVencimientos,
+    LoteVencimiento,
+    orden_fefo,
+    tomar_fefo,
+)
+from rexus.modules.inventario.submodules.movimientos_manager import MovimientosManager
+from rexus.utils.format_utils import a_fecha
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+HOY = date(2026, 5, 1)
+
+
+def lote(lote_id, producto_id, vencimiento, cantidad=10.0):
+    return LoteVencimiento(lote_id, producto_id, f"L{lote_id}",
+                           date.fromisoformat(vencimiento) if vencimiento else None, cantidad)
+
+
+@pytest.fixture
+def indice():
+    indice = IndiceVencimientos(EventBus())
+    indice.cargar([
+        lote(1, 100, "2026-05-20"),
+        lote(2, 100, "2026-05-05"),
+        lote(3, 200, "2026-06-15"),
+        lote(4, 100, "2026-04-20"),
+        lote(5, 200, None),
+        lote(6, 200, "2026-05-10", cantidad=0),
+    ])
+    return indice
+
+
+class TestAFecha:
+
+    def test_convierte_valores(self):
+        assert a_fecha(None) is None
+        assert a_fecha("") is None
+        assert a_fecha("2026-05-01T10:30:00") == HOY
+        assert a_fecha(HOY) == HOY
+
+
+class TestIndiceVencimientos:
+
+    def test_guarda_solo_lotes_con_stock_y_vencimiento(self, indice):
+        assert len(indice) == 4
+
+    def test_consultas_por_rango(self, indice):
+        proximos = indice.proximos_a_vencer(dias=30, hoy=HOY)
+
+        assert [l.lote_id for l in proximos] == [2, 1]
+        assert [l.lote_id for l in indice.vencidos(hoy=HOY)] == [4]
+        assert [l.lote_id for l in indice.entre("2026-05-01", "2026-06-30", producto_id=200)] == [3]
+
+    def test_actualizar_reordena_y_quita_lotes_agotados(self, indice):
+        indice.actualizar([lote(3, 200, "2026-05-02"), lote(2, 100, "2026-05-05", cantidad=0)])
+
+        assert [l.lote_id for l in indice.proximos_a_vencer(dias=30, hoy=HOY)] == [3, 1]
+
+    def test_aplica_cambios_de_otro_proceso(self):
+        bus = EventBus()
+        indice = IndiceVencimientos(bus)
+        indice.cargar([])
+
+        bus.recibir_remoto("inventario.lotes_actualizados",
+                           {"lotes": [[9, 100, "L9", "2026-05-03", 4]]}, "otro_proceso", 0.0)
+
+        assert [l.lote_id for l in indice.proximos_a_vencer(dias=5, hoy=HOY)] == [9]
+
+
+class TestFefo:
+
+    def test_orden_vigentes_sin_fecha_y_vencidos(self):
+        lotes = [lote(4, 1, "2026-04-20"), lote(2, 1, "2026-05-05"),
+                 lote(1, 1, "2026-05-20"), lote(5, 1, None)]
+
+        assert [l.lote_id for l in orden_fefo(lotes, hoy=HOY)] == [2, 1, 5, 4]
+
+    def test_reparte_y_reporta_faltante(self):
+        lotes = [lote(1, 1, "2026-05-05", 3), lote(2, 1, "2026-05-20", 0), lote(3, 1, "2026-06-01", 4)]
+
+        sugerencias, faltante = tomar_fefo(lotes, 9)
+
+        assert [(s.lote.lote_id, s.cantidad) for s in sugerencias] == [(1, 3), (3, 4)]
+        assert faltante == 2
+
+    def test_sugerencia_excluye_vencidos(self, indice):
+        sugerencias, faltante = indice.sugerir_fefo(100, 15, hoy=HOY)
+        con_vencidos, _ = indice.sugerir_fefo(100, 25, hoy=HOY, incluir_vencidos=True)
+
+        assert [(s.lote.lote_id, s.cantidad) for s in sugerencias] == [(2, 10), (1, 5)]
+        assert faltante == 0
+        assert [s.lote.lote_id for s in con_vencidos] == [2, 1, 4]
+
+
+@pytest.fixture
+def conexion_alertas(tmp_path):
+    conexion = sqlite3.connect(str(tmp_path / "alertas.db"))
+    conexion.execute(
+        "CREATE TABLE lotes_alertas_vencimiento (lote_id INT, fecha_vencimiento DATE, "
+        "PRIMARY KEY (lote_id, fecha_vencimiento))"
+    )
+    yield conexion
+    conexion.close()
+
+
+def puesto(lotes, conexion=None):
+    bus = EventBus()
+    avisos = []
+    bus.suscribir(EVENTO_LOTE_POR_VENCER, avisos.append)
+    indice = IndiceVencimientos(bus)
+    indice.cargar(lotes)
+    # La tabla de avisos ya existe (su DDL es T-SQL)
+    indice._tabla_alertas = conexion is not None
+    return indice, avisos
+
+
+class TestAvisos:
+
+    def test_avisa_una_sola_vez_por_lote(self):
+        indice, avisos = puesto([lote(1, 1, "2026-05-10"), lote(2, 1, "2026-06-20")])
+
+        assert [l.lote_id for l in indice.revisar_vencimientos(30, hoy=HOY)] == [1]
+        assert indice.revisar_vencimientos(30, hoy=HOY) == []
+        # Al avanzar el horizonte solo se revisa el tramo nuevo
+        assert [l.lote_id for l in indice.revisar_vencimientos(30, hoy=date(2026, 5, 25))] == [2]
+        assert [e.datos["lote_id"] for e in avisos] == [1, 2]
+
+    def test_lote_nuevo_dentro_del_horizonte_revisado(self):
+        indice, _ = puesto([lote(1, 1, "2026-05-10")])
+        indice.revisar_vencimientos(30, hoy=HOY)
+
+        indice.actualizar([lote(7, 1, "2026-05-15")])
+
+        assert [l.lote_id for l in indice.revisar_vencimientos(30, hoy=HOY)] == [7]
+
+    def test_varios_puestos_avisan_una_vez(self, conexion_alertas):
+        lotes = [lote(1, 1, "2026-05-10"), lote(2, 1, "2026-05-12")]
+        primero, avisos_primero = puesto(lotes, conexion_alertas)
+        segundo, avisos_segundo = puesto(lotes, conexion_alertas)
+
+        primero.revisar_vencimientos(30, hoy=HOY, conexion=conexion_alertas)
+        segundo.revisar_vencimientos(30, hoy=HOY, conexion=conexion_alertas)
+
+        assert [e.datos["lote_id"] for e in avisos_primero] == [1, 2]
+        assert avisos_segundo == []
+
+
+class SQLSinBloqueos(SQLQueryManager):
+    """Quita los hints de bloqueo de T-SQL para ejecutar sobre SQLite."""
+
+    def get_query(self, modulo, nombre):
+        return super().get_query(modulo, nombre).replace("WITH (UPDLOCK, ROWLOCK)", "")
+
+
+class IndicePrueba:
+    def __init__(self):
+        self.actualizados = []
+
+    def actualizar(self, lotes):
+        self.actualizados.extend(lotes)
+
+
+class EstadisticasPrueba:
+    def __init__(self):
+        self.invalidados = []
+
+    def invalidar(self, modulo):
+        self.invalidados.append(modulo)
+
+
+@pytest.fixture
+def conexion_inventario():
+    conexion = sqlite3.connect(":memory:")
+    conexion.create_function("GETDATE", 0, lambda: "2026-05-01 00:00:00")
+    conexion.executescript("""
+        CREATE TABLE inventario (id INTEGER PRIMARY KEY, codigo TEXT, stock_actual REAL,
+                                 stock_minimo REAL, fecha_modificacion TEXT);
+        CREATE TABLE movimientos_inventario (
+            producto_id INT, tipo_movimiento TEXT, cantidad REAL, stock_anterior REAL,
+            stock_nuevo REAL, observaciones TEXT, obra_id INT, usuario TEXT, fecha_movimiento TEXT
+        );
+        CREATE TABLE lotes_inventario (id INTEGER PRIMARY KEY, producto_id INT, numero_lote TEXT,
+                                       fecha_vencimiento TEXT, cantidad REAL, activo INT);
+        INSERT INTO inventario VALUES (100, 'P-100', 20, 0, NULL);
+        INSERT INTO lotes_inventario VALUES
+            (1, 100, 'L1', '2099-09-01', 8, 1),
+            (2, 100, 'L2', '2099-06-01', 5, 1),
+            (3, 100, 'L3', NULL, 7, 1);
+    """)
+    yield conexion
+    conexion.close()
+
+
+@pytest.fixture
+def modelo(conexion_inventario, monkeypatch):
+    indice = IndicePrueba()
+    monkeypatch.setattr(inventario_model, "get_indice_vencimientos", lambda: indice)
+    monkeypatch.setattr(movimientos_manager, "get_indice_vencimientos", lambda: indice)
+    estadisticas = EstadisticasPrueba()
+    monkeypatch.setattr(movimientos_manager, "get_statistics_service", lambda: estadisticas)
+    modelo = InventarioModel.__new__(InventarioModel)
+    modelo.db_connection = conexion_inventario
+    modelo.sql_manager = SQLSinBloqueos()
+    modelo._tabla_lotes = True
+    modelo.indice_prueba = indice
+    modelo.estadisticas_prueba = estadisticas
+    return modelo
+
+
+def cantidades_lotes(conexion):
+    return dict(conexion.execute("SELECT id, cantidad FROM lotes_inventario ORDER BY id"))
+
+
+class TestSalidasFefo:
+
+    def test_descuenta_primero_lo_que_vence_antes(self, modelo, conexion_inventario):
+        modificados = modelo._descontar_lotes_fefo(conexion_inventario.cursor(), 100, 10)
+
+        assert cantidades_lotes(conexion_inventario) == {1: 3, 2: 0, 3: 7}
+        assert [(l.lote_id, l.cantidad) for l in modificados] == [(2, 0), (1, 3)]
+
+    def test_movimiento_de_salida_descuenta_lotes(self, modelo, conexion_inventario):
+        gestor = MovimientosManager(conexion_inventario, descontar_lotes=modelo._descontar_lotes_fefo)
+        gestor.current_user = {"id": 1, "role": "admin"}
+
+        assert gestor.registrar_movimiento(100, "SALIDA", 6, "Obra 12")
+
+        assert cantidades_lotes(conexion_inventario) == {1: 7, 2: 0, 3: 7}
+        assert [l.lote_id for l in modelo.indice_prueba.actualizados] == [2, 1]
+        assert modelo.estadisticas_prueba.invalidados == ["inventario"]
+
+    def test_entrada_no_modifica_lotes(self, modelo, conexion_inventario):
+        gestor = MovimientosManager(conexion_inventario, descontar_lotes=modelo._descontar_lotes_fefo)
+        gestor.current_user = {"id": 1, "role": "admin"}
+
+        assert gestor.registrar_movimiento(100, "ENTRADA", 6)
+
+        assert cantidades_lotes(conexion_inventario) == {1: 8, 2: 5, 3: 7}
+
+    def test_ajuste_de_stock_pasa_por_los_movimientos(self, modelo, monkeypatch):
+        registrados = []
+
+        class GestorPrueba:
+            def registrar_movimiento(self, *args):
+                registrados.append(args)
+                return True
+
+        modelo.managers_available = True
+        modelo.movimientos_manager = GestorPrueba()
+        monkeypatch.setattr(modelo, "obtener_producto_por_id", lambda _: {"stock_actual": 20})
+
+        resultado = modelo.actualizar_stock_producto(100, 12, "Conteo físico")
+
+        assert registrados == [(100, "AJUSTE", -8, "Conteo físico")]
+        assert resultado["success"] and resultado["diferencia"] == -8
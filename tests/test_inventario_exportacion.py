@@ -0,0 +1,141 @@
+"""
+Tests de la exportación filtrada de inventario.
+
+La vista guarda sus filtros en filtros_activos con las claves search,
+categoria y stock_filter; la exportación debe aplicarlos todos.
+Se ejecuta la consulta generada contra SQLite con el esquema de
+sql/benchmark/.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from rexus.modules.inventario import model as inventario_model
+from rexus.modules.inventario.model import InventarioModel
+
+ESQUEMA = Path(__file__).parent.parent / "sql" / "benchmark" / "crear_esquema_sqlite.sql"
+
+PRODUCTOS = [
+    # codigo, descripcion, categoria, stock, stock_minimo, activo
+    ("HER-001", "Bisagra acero", "Herrajes", 50, 10, 1),
+    ("HER-002", "Manija aluminio", "Herrajes", 0, 5, 1),
+    ("HER-003", "Cerradura", "Herrajes", 4, 5, 1),
+    ("HER-004", "Bisagra bronce", "Herrajes", 7, 5, 1),
+    ("VID-001", "Vidrio templado", "Vidrios", 30, 10, 1),
+    ("VID-002", "Vidrio laminado", "Vidrios", 20, 5, 0),
+]
+
+
+class ConexionPrueba:
+    """Conexión SQLite con el atributo database de DatabaseConnection."""
+
+    database = "inventario_test"
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def cursor(self):
+        return self.conexion.cursor()
+
+    def commit(self):
+        self.conexion.commit()
+
+    def rollback(self):
+        self.conexion.rollback()
+
+
+@pytest.fixture
+def base():
+    conexion = sqlite3.connect(":memory:")
+    conexion.executescript(ESQUEMA.read_text(encoding="utf-8"))
+    conexion.executemany(
+        """INSERT INTO inventario_perfiles (codigo, descripcion, categoria, stock_actual,
+               stock_minimo, activo, fecha_creacion, fecha_modificacion)
+           VALUES (?, ?, ?, ?, ?, ?, '2025-01-01', '2025-01-01')""",
+        PRODUCTOS,
+    )
+    yield conexion
+    conexion.close()
+
+
+@pytest.fixture
+def exportar(base, monkeypatch):
+    """Ejecuta la consulta de exportación generada y devuelve los códigos."""
+    consultas = []
+    monkeypatch.setattr(
+        inventario_model, "cursor_source",
+        lambda factory, sql, params, **kwargs: consultas.append((sql, params)),
+    )
+    modelo = InventarioModel(db_connection=ConexionPrueba(base))
+
+    def ejecutar(filtros):
+        modelo.crear_fuente_exportacion(filtros)
+        sql, params = consultas.pop()
+        return sorted(fila[1] for fila in base.execute(sql, params).fetchall())
+
+    return ejecutar
+
+
+class TestExportacionFiltrada:
+
+    def test_sin_filtros_exporta_activos(self, exportar):
+        assert exportar(None) == ["HER-001", "HER-002", "HER-003", "HER-004", "VID-001"]
+
+    def test_busqueda(self, exportar):
+        assert exportar({"search": "bisagra"}) == ["HER-001", "HER-004"]
+
+    def test_categoria(self, exportar):
+        assert exportar({"categoria": "Vidrios"}) == ["VID-001"]
+
+    def test_filtros_de_stock(self, exportar):
+        assert exportar({"stock_filter": "Sin stock"}) == ["HER-002"]
+        assert exportar({"stock_filter": "Stock crítico"}) == ["HER-003"]
+        assert exportar({"stock_filter": "Stock bajo"}) == ["HER-004"]
+        assert exportar({"stock_filter": "Con stock"}) == ["HER-001", "HER-003", "HER-004", "VID-001"]
+
+    def test_estado_no_filtra(self, exportar):
+        # Las consultas base solo devuelven productos activos
+        activos = ["HER-001", "HER-002", "HER-003", "HER-004", "VID-001"]
+        assert exportar({"estado": "Activo"}) == activos
+        assert exportar({"estado": "Inactivo"}) == activos
+
+    def test_filtros_combinados(self, exportar):
+        filtros = {"search": "bisagra", "categoria": "Herrajes", "stock_filter": "Con stock"}
+        assert exportar(filtros) == ["HER-001", "HER-004"]
+
+    def test_valor_desconocido_se_ignora(self, exportar):
+        assert exportar({"stock_filter": "'; DROP TABLE x --"}) == [
+            "HER-001", "HER-002", "HER-003", "HER-004", "VID-001"
+        ]
+
+
+class IndicePrueba:
+    """Índice de búsqueda que devuelve como mucho limite IDs coincidentes."""
+
+    def __init__(self, base):
+        self.base = base
+
+    def buscar(self, entidad, termino, limite):
+        filas = self.base.execute(
+            "SELECT id FROM inventario_perfiles WHERE descripcion LIKE ? ORDER BY id LIMIT ?",
+            (f"%{termino}%", limite),
+        )
+        return [fila[0] for fila in filas]
+
+
+class TestBusquedaConIndice:
+
+    def test_mas_coincidencias_que_el_tope(self, base, exportar, monkeypatch):
+        total = inventario_model.MAX_IDS_BUSQUEDA + 200
+        base.executemany(
+            """INSERT INTO inventario_perfiles (codigo, descripcion, categoria, stock_actual,
+                   stock_minimo, activo, fecha_creacion, fecha_modificacion)
+               VALUES (?, 'Tornillo autoperforante', 'Herrajes', 10, 1, 1, '2025-01-01', '2025-01-01')""",
+            [(f"TOR-{i:04d}",) for i in range(total)],
+        )
+        monkeypatch.setattr(inventario_model, "get_search_index", lambda: IndicePrueba(base))
+
+        assert len(exportar({"search": "tornillo"})) == total
+        assert exportar({"search": "bisagra"}) == ["HER-001", "HER-004"]
@@ -0,0 +1,152 @@
+"""
+Tests del motor de etiquetas (rexus.utils.label_engine).
+
+Verifican:
+- Cache por contenido: LRU acotado por bytes y copia en disco
+- Cada código distinto se dibuja una sola vez y los errores se informan
+  por etiqueta
+- El pool de procesos usa spawn
+- Hojas PDF con copias, cancelación sin dejar archivos parciales
+"""
+
+import threading
+
+import pytest
+
+from rexus.utils import label_engine
+from rexus.utils.label_engine import (
+    BARCODE_AVAILABLE,
+    REPORTLAB_AVAILABLE,
+    SIMBOLOGIA_BARRAS,
+    SIMBOLOGIA_QR,
+    Etiqueta,
+    FormatoHoja,
+    MotorEtiquetas,
+    _CacheImagenes,
+    clave_imagen,
+)
+
+
+@pytest.fixture
+def dibujados(monkeypatch):
+    """Reemplaza el dibujo por una imagen falsa y registra los pedidos."""
+    pedidos = []
+
+    def renderizar(simbologia, contenido):
+        pedidos.append((simbologia, contenido))
+        if contenido == "ilegible":
+            raise ValueError("contenido no codificable")
+        return f"{simbologia}:{contenido}".encode("utf-8")
+
+    monkeypatch.setattr(label_engine, "renderizar_codigo", renderizar)
+    return pedidos
+
+
+class TestCacheImagenes:
+
+    def test_clave_por_simbologia_y_contenido(self):
+        assert clave_imagen(SIMBOLOGIA_QR, "A1") == clave_imagen(SIMBOLOGIA_QR, "A1")
+        assert clave_imagen(SIMBOLOGIA_QR, "A1") != clave_imagen(SIMBOLOGIA_BARRAS, "A1")
+
+    def test_descarta_las_menos_usadas_al_superar_el_tope(self):
+        cache = _CacheImagenes(max_bytes=10)
+        cache.guardar("a", b"1234")
+        cache.guardar("b", b"1234")
+        cache.obtener("a")
+        cache.guardar("c", b"1234")
+
+        assert cache.obtener("b") is None
+        assert cache.obtener("a") == b"1234"
+        assert cache.obtener("c") == b"1234"
+
+    def test_conserva_imagenes_en_disco(self, tmp_path):
+        _CacheImagenes(1024, str(tmp_path)).guardar("a", b"png")
+
+        assert _CacheImagenes(1024, str(tmp_path)).obtener("a") == b"png"
+
+
+class TestRenderizar:
+
+    def test_dibuja_cada_codigo_una_vez(self, dibujados):
+        motor = MotorEtiquetas(procesos=1)
+        etiquetas = [Etiqueta("A1"), Etiqueta("A1", copias=3), Etiqueta("A1", simbologia=SIMBOLOGIA_QR)]
+
+        imagenes, errores, nuevas = motor.renderizar(etiquetas)
+        motor.renderizar(etiquetas)
+
+        assert nuevas == 2
+        assert errores == {}
+        assert len(imagenes) == 2
+        assert sorted(dibujados) == [(SIMBOLOGIA_BARRAS, "A1"), (SIMBOLOGIA_QR, "A1")]
+
+    def test_informa_errores_por_etiqueta(self, dibujados):
+        motor = MotorEtiquetas(procesos=1)
+
+        imagenes, errores, nuevas = motor.renderizar([Etiqueta("ok"), Etiqueta("ilegible")])
+
+        assert nuevas == 1
+        assert list(imagenes) == [Etiqueta("ok").clave]
+        assert errores == {Etiqueta("ilegible").clave: "contenido no codificable"}
+
+    def test_cancelacion(self, dibujados):
+        motor = MotorEtiquetas(procesos=1)
+        cancelar = threading.Event()
+        cancelar.set()
+
+        with pytest.raises(label_engine.EtiquetasCanceladas):
+            motor.renderizar([Etiqueta("A1")], cancelar)
+
+
+class TestPoolDeProcesos:
+
+    def test_usa_procesos_spawn(self):
+        motor = MotorEtiquetas(procesos=2)
+        try:
+            assert motor._obtener_pool()._mp_context.get_start_method() == "spawn"
+        finally:
+            motor.cerrar()
+
+    @pytest.mark.skipif(not BARCODE_AVAILABLE, reason="requiere python-barcode")
+    def test_dibuja_en_el_pool(self):
+        motor = MotorEtiquetas(procesos=2, tamano_tramo=8)
+        etiquetas = [Etiqueta(f"PROD-{i:04d}") for i in range(label_engine.UMBRAL_PARALELO)]
+        try:
+            imagenes, errores, nuevas = motor.renderizar(etiquetas)
+        finally:
+            motor.cerrar()
+
+        assert errores == {}
+        assert nuevas == len(etiquetas)
+        assert all(imagen.startswith(b"\x89PNG") for imagen in imagenes.values())
+
+
+@pytest.mark.skipif(not (REPORTLAB_AVAILABLE and BARCODE_AVAILABLE),
+                    reason="requiere reportlab y python-barcode")
+class TestGenerarHojas:
+
+    def test_hojas_con_copias(self, tmp_path):
+        motor = MotorEtiquetas(procesos=1)
+        destino = tmp_path / "etiquetas.pdf"
+        progreso = []
+
+        resultado = motor.generar_hojas(
+            [Etiqueta("A1", "Perfil", copias=5), Etiqueta("B2")], str(destino),
+            formato=FormatoHoja(columnas=2, filas=2),
+            progreso=lambda hechas, total: progreso.append((hechas, total)),
+        )
+
+        assert resultado.success, resultado.error
+        assert (resultado.etiquetas, resultado.paginas, resultado.dibujadas) == (6, 2, 2)
+        assert destino.read_bytes().startswith(b"%PDF")
+        assert progreso[-1] == (6, 6)
+
+    def test_cancelada_no_deja_archivos(self, tmp_path):
+        motor = MotorEtiquetas(procesos=1)
+        destino = tmp_path / "etiquetas.pdf"
+        cancelar = threading.Event()
+        cancelar.set()
+
+        resultado = motor.generar_hojas([Etiqueta("A1")], str(destino), cancelar=cancelar)
+
+        assert resultado.cancelled and not resultado.success
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,129 @@
+"""
+Tests del ruteo de servicios de logística.
+
+Verifican:
+- Solver CVRPTW: capacidad, ventanas horarias y paradas imposibles
+- El límite de vehículos reubica paradas o las deja sin asignar
+- Los servicios generados por el controlador llevan coordenadas y se
+  rutean con el solver usando su duración estimada
+"""
+
+from rexus.modules.logistica.constants import LogisticaConstants
+from rexus.modules.logistica.controller import LogisticaController
+from rexus.modules.logistica.route_optimizer import (
+    ConfiguracionFlota,
+    OptimizadorRutas,
+    Parada,
+)
+
+DEPOSITO = LogisticaConstants.COORDENADAS_ALMACEN_CENTRAL
+
+
+class TestOptimizadorRutas:
+
+    def test_respeta_capacidad(self):
+        paradas = [Parada(id=str(i), lat=-34.92 + i * 0.005, lng=-57.95, demanda=400)
+                   for i in range(5)]
+        resultado = OptimizadorRutas(DEPOSITO, paradas, ConfiguracionFlota(capacidad=1000)).resolver(0.5)
+
+        assert sorted(p for ruta in resultado.rutas for p in ruta) == [str(i) for i in range(5)]
+        assert all(carga <= 1000 for carga in resultado.cargas)
+        assert len(resultado.rutas) >= 3
+
+    def test_parada_fuera_de_turno_queda_sin_asignar(self):
+        paradas = [
+            Parada(id="a", lat=-34.93, lng=-57.96),
+            Parada(id="b", lat=-34.94, lng=-57.97, ventana_inicio=600, ventana_fin=620),
+        ]
+        resultado = OptimizadorRutas(DEPOSITO, paradas, ConfiguracionFlota(fin_turno=540)).resolver(0.5)
+
+        assert resultado.rutas == [["a"]]
+        assert resultado.no_asignadas == ["b"]
+
+
+class TestLimiteFlota:
+
+    def test_reubica_paradas_de_rutas_sobrantes(self):
+        # Lados opuestos del depósito: el ahorro no las une en una ruta
+        lat, lng = DEPOSITO
+        paradas = [Parada(id="norte", lat=lat + 0.02, lng=lng),
+                   Parada(id="sur", lat=lat - 0.02, lng=lng)]
+
+        libre = OptimizadorRutas(DEPOSITO, paradas).resolver(0.5)
+        limitado = OptimizadorRutas(DEPOSITO, paradas, ConfiguracionFlota(max_vehiculos=1)).resolver(0.5)
+
+        assert len(libre.rutas) == 2
+        assert len(limitado.rutas) == 1
+        assert sorted(limitado.rutas[0]) == ["norte", "sur"]
+        assert limitado.no_asignadas == [] and not limitado.excede_flota
+
+    def test_sin_lugar_quedan_sin_asignar(self):
+        paradas = [Parada(id=str(i), lat=-34.92 + i * 0.005, lng=-57.95, demanda=400)
+                   for i in range(5)]
+        flota = ConfiguracionFlota(capacidad=1000, max_vehiculos=2)
+
+        resultado = OptimizadorRutas(DEPOSITO, paradas, flota).resolver(0.5)
+
+        assert len(resultado.rutas) == 2
+        assert all(carga <= 1000 for carga in resultado.cargas)
+        assert len(resultado.no_asignadas) == 1
+        asignadas = [p for ruta in resultado.rutas for p in ruta]
+        assert sorted(asignadas + resultado.no_asignadas) == [str(i) for i in range(5)]
+        assert resultado.excede_flota
+
+    def test_flota_suficiente_no_cambia_la_solucion(self):
+        paradas = [Parada(id=str(i), lat=-34.92 + i * 0.005, lng=-57.95, demanda=400)
+                   for i in range(5)]
+
+        libre = OptimizadorRutas(DEPOSITO, paradas, ConfiguracionFlota(capacidad=1000)).resolver(0.5)
+        limitado = OptimizadorRutas(
+            DEPOSITO, paradas, ConfiguracionFlota(capacidad=1000, max_vehiculos=len(libre.rutas))
+        ).resolver(0.5)
+
+        assert limitado.rutas == libre.rutas
+        assert limitado.no_asignadas == [] and not limitado.excede_flota
+
+    def test_sin_vehiculos(self):
+        paradas = [Parada(id="a", lat=-34.93, lng=-57.96)]
+
+        resultado = OptimizadorRutas(DEPOSITO, paradas, ConfiguracionFlota(max_vehiculos=0)).resolver(0.5)
+
+        assert resultado.rutas == []
+        assert resultado.no_asignadas == ["a"]
+        assert resultado.excede_flota
+
+
+class TestRuteoServiciosGenerados:
+
+    def test_servicios_generados_tienen_coordenadas(self):
+        controller = LogisticaController()
+        for zona in ("metropolitana", "interior", "costa"):
+            servicio = controller._crear_servicio_automatico(1, "entrega", zona, "media", {})
+            assert controller._coordenadas_servicio(servicio) is not None
+
+    def test_parada_usa_tiempo_estimado_del_servicio(self):
+        controller = LogisticaController()
+        servicio = controller._crear_servicio_automatico(1, "entrega", "metropolitana", "alta", {})
+        parada = controller._parada_desde_servicio(servicio, 0, controller._inicio_turno([servicio]))
+
+        assert parada.tiempo_servicio == servicio["tiempo_estimado_minutos"]
+
+    def test_generacion_rutea_con_solver(self, monkeypatch):
+        llamadas = []
+        original = OptimizadorRutas.resolver
+
+        def resolver(self, *args, **kwargs):
+            llamadas.append(len(self.paradas))
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(OptimizadorRutas, "resolver", resolver)
+        controller = LogisticaController()
+        servicios = [controller._crear_servicio_automatico(i + 1, "mixto", "metropolitana", "media", {})
+                     for i in range(8)]
+
+        resultado = controller._optimizar_rutas_servicios(servicios, "metropolitana")
+
+        assert llamadas == [8]
+        asignados = [s for s in resultado if s["ruta_id"]]
+        assert asignados
+        assert all("distancia_ruta_km" in s for s in asignados)
@@ -0,0 +1,201 @@
+"""
+Tests del programador de mantenimiento preventivo
+(rexus.modules.mantenimiento.programacion_model).
+
+Las consultas de sql/mantenimiento son T-SQL; se ejecutan sobre SQLite con
+una traducción mínima (DECLARE, tabla de números, DATEADD/DATEDIFF, OUTPUT y
+UPDATE ... FROM).
+
+Verifican:
+- Expansión de la recurrencia hasta el horizonte y resumen de los períodos
+  atrasados en la última ocurrencia anterior a hoy
+- Volver a ejecutar el programador no duplica órdenes
+- El calendario proyecta las ocurrencias futuras sin repetir las que ya
+  tienen orden de trabajo
+"""
+
+import re
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from rexus.modules.mantenimiento.programacion_model import ProgramacionMantenimientoModel
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+
+def _dateadd(dias, fecha):
+    return (date.fromisoformat(str(fecha)[:10]) + timedelta(days=int(dias))).isoformat()
+
+
+def _datediff(desde, hasta):
+    return (date.fromisoformat(str(hasta)[:10]) - date.fromisoformat(str(desde)[:10])).days
+
+
+def traducir(sql):
+    """Traduce a SQLite las construcciones T-SQL usadas por el programador."""
+    sql = sql.replace("SET NOCOUNT ON;", "")
+    nombres = re.findall(r"DECLARE @(\w+) \w+ = \?;", sql)
+    sql = re.sub(r"DECLARE @\w+ \w+ = \?;", "", sql)
+    sql = re.sub(r"@(\w+)", r":\1", sql)
+    sql = re.sub(
+        r"SELECT TOP \(:max_ocurrencias\).*?CROSS JOIN sys\.all_objects b",
+        "SELECT n FROM numeros_base WHERE n < :max_ocurrencias",
+        sql, flags=re.S,
+    )
+    sql = sql.replace("DATEADD(day,", "DATEADD_DIAS(").replace("DATEDIFF(day,", "DATEDIFF_DIAS(")
+    salida = re.search(r"OUTPUT\s+(.*?)\nSELECT", sql, flags=re.S)
+    if salida:
+        columnas = salida.group(1).replace("INSERTED.", "")
+        sql = sql.replace(salida.group(0), "SELECT").rstrip().rstrip(";")
+        sql += f"\nRETURNING {columnas};"
+    if "UPDATE p\n" in sql:
+        sql = sql.replace("UPDATE p\n", "UPDATE programacion_mantenimiento AS p\n").replace(
+            "FROM programacion_mantenimiento p\nINNER JOIN equipos e ON e.id = p.equipo_id AND e.activo = 1\nWHERE",
+            "FROM equipos e\nWHERE e.id = p.equipo_id AND e.activo = 1 AND",
+        )
+    return sql, nombres
+
+
+class CursorTraducido:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, sql, params=()):
+        sql, nombres = traducir(sql)
+        if nombres:
+            params = {nombre: str(valor) if isinstance(valor, date) else valor
+                      for nombre, valor in zip(nombres, params)}
+        else:
+            params = tuple(str(v) if isinstance(v, date) else v for v in params)
+        self.cursor.execute(sql, params)
+
+    def __getattr__(self, nombre):
+        return getattr(self.cursor, nombre)
+
+
+class ConexionTraducida:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def cursor(self):
+        return CursorTraducido(self.conexion.cursor())
+
+    def __getattr__(self, nombre):
+        return getattr(self.conexion, nombre)
+
+
+HOY = date(2026, 3, 10)
+
+
+@pytest.fixture
+def conexion():
+    conexion = sqlite3.connect(":memory:")
+    conexion.create_function("DATEADD_DIAS", 2, _dateadd)
+    conexion.create_function("DATEDIFF_DIAS", 2, _datediff)
+    conexion.create_function("GETDATE", 0, lambda: "2026-03-10 08:00:00")
+    conexion.executescript("""
+        CREATE TABLE numeros_base (n INTEGER PRIMARY KEY);
+        CREATE TABLE equipos (id INTEGER PRIMARY KEY, nombre TEXT, activo INTEGER);
+        CREATE TABLE programacion_mantenimiento (
+            id INTEGER PRIMARY KEY, equipo_id INTEGER, tipo_mantenimiento TEXT,
+            descripcion TEXT, responsable TEXT, costo_estimado REAL,
+            frecuencia_dias INTEGER, fecha_proximo TEXT, activo INTEGER,
+            fecha_actualizacion TEXT
+        );
+        CREATE TABLE mantenimientos (
+            id INTEGER PRIMARY KEY, equipo_id INTEGER, tipo TEXT, descripcion TEXT,
+            fecha_programada TEXT, estado TEXT, responsable TEXT, costo_estimado REAL,
+            fecha_creacion TEXT, programacion_id INTEGER
+        );
+        INSERT INTO equipos VALUES (1, 'Compresor', 1), (2, 'Torno viejo', 0);
+    """)
+    conexion.executemany("INSERT INTO numeros_base VALUES (?)", [(n,) for n in range(400)])
+    yield conexion
+    conexion.close()
+
+
+@pytest.fixture
+def modelo(conexion):
+    modelo = ProgramacionMantenimientoModel.__new__(ProgramacionMantenimientoModel)
+    modelo.db_connection = ConexionTraducida(conexion)
+    modelo.sql_manager = SQLQueryManager()
+    return modelo
+
+
+def programar(conexion, id_programa, frecuencia, proximo, equipo_id=1):
+    conexion.execute(
+        "INSERT INTO programacion_mantenimiento VALUES (?, ?, 'PREVENTIVO', 'Revisión', "
+        "'Ana', 100, ?, ?, 1, NULL)",
+        (id_programa, equipo_id, frecuencia, proximo.isoformat()),
+    )
+
+
+def ordenes(conexion):
+    return [fila[0] for fila in conexion.execute(
+        "SELECT fecha_programada FROM mantenimientos ORDER BY fecha_programada")]
+
+
+class TestGenerarMantenimientos:
+
+    def test_expande_hasta_el_horizonte(self, modelo, conexion):
+        programar(conexion, 1, 7, HOY)
+
+        generados = modelo.generar_mantenimientos_pendientes(dias_anticipacion=14, hoy=HOY)
+
+        assert [g["fecha_programada"] for g in generados] == ["2026-03-10", "2026-03-17", "2026-03-24"]
+        proximo = conexion.execute("SELECT fecha_proximo FROM programacion_mantenimiento").fetchone()[0]
+        assert proximo == "2026-03-31"
+
+    def test_resume_periodos_atrasados(self, modelo, conexion):
+        # Cinco semanas sin ejecutar el programador: una sola orden atrasada
+        programar(conexion, 1, 7, HOY - timedelta(days=37))
+
+        modelo.generar_mantenimientos_pendientes(hoy=HOY)
+
+        assert ordenes(conexion) == ["2026-03-08"]
+
+    def test_reejecutar_no_duplica(self, modelo, conexion):
+        programar(conexion, 1, 7, HOY)
+        modelo.generar_mantenimientos_pendientes(dias_anticipacion=14, hoy=HOY)
+        conexion.execute("UPDATE programacion_mantenimiento SET fecha_proximo = ?", (HOY.isoformat(),))
+
+        assert modelo.generar_mantenimientos_pendientes(dias_anticipacion=14, hoy=HOY) == []
+        assert len(ordenes(conexion)) == 3
+
+    def test_ignora_equipos_inactivos(self, modelo, conexion):
+        programar(conexion, 1, 7, HOY, equipo_id=2)
+
+        assert modelo.generar_mantenimientos_pendientes(dias_anticipacion=14, hoy=HOY) == []
+
+
+class TestCalendario:
+
+    def test_proyecta_ocurrencias_futuras(self, modelo, conexion):
+        programar(conexion, 1, 7, date(2026, 4, 2))
+
+        eventos = modelo.obtener_calendario_mes(2026, 4)
+
+        assert [e["fecha_programada"] for e in eventos] == [
+            "2026-04-02", "2026-04-09", "2026-04-16", "2026-04-23", "2026-04-30"]
+        assert all(e["es_programacion"] for e in eventos)
+
+    def test_no_repite_ocurrencias_con_orden(self, modelo, conexion):
+        programar(conexion, 1, 7, date(2026, 4, 2))
+        conexion.execute(
+            "INSERT INTO mantenimientos VALUES (50, 1, 'PREVENTIVO', 'Revisión', '2026-04-09', "
+            "'PROGRAMADO', 'Ana', 100, NULL, 1)"
+        )
+
+        eventos = modelo.obtener_calendario_mes(2026, 4)
+        del_dia = [e for e in eventos if e["fecha_programada"] == "2026-04-09"]
+
+        assert len(eventos) == 5
+        assert [e["id"] for e in del_dia] == [50]
+
+    def test_semana_de_lunes_a_domingo(self, modelo, conexion):
+        programar(conexion, 1, 3, date(2026, 3, 1))
+
+        eventos = modelo.obtener_calendario_semana(date(2026, 3, 11))
+
+        assert [e["fecha_programada"] for e in eventos] == ["2026-03-10", "2026-03-13"]
@@ -0,0 +1,180 @@
+"""
+Tests de la carga por lotes de rexus.core.query_optimizer (DataLoader,
+sql_in_loader y fetch_rows_by_keys).
+
+Verifican:
+- Las claves pedidas antes de consumir un resultado viajan en un solo lote,
+  deduplicadas y cortadas en max_batch_size
+- Caché por clave, prime/clear y que los errores no queden cacheados
+- fetch_rows_by_keys parte el IN en tramos de MAX_IN_PARAMS y agrupa las
+  filas por clave
+"""
+
+import sqlite3
+
+import pytest
+
+from rexus.core import query_optimizer
+from rexus.core.query_optimizer import DataLoader, fetch_rows_by_keys, sql_in_loader
+
+
+class Lotes:
+    """batch_load_fn que registra cada lote y devuelve el doble de la clave."""
+
+    def __init__(self, faltantes=()):
+        self.lotes = []
+        self.faltantes = set(faltantes)
+
+    def __call__(self, claves):
+        self.lotes.append(list(claves))
+        return {clave: clave * 2 for clave in claves if clave not in self.faltantes}
+
+
+class TestDataLoader:
+
+    def test_agrupa_las_claves_pedidas_en_un_lote(self):
+        lotes = Lotes()
+        loader = DataLoader(lotes)
+
+        futuros = [loader.load(clave) for clave in (3, 1, 3, 2)]
+
+        assert lotes.lotes == []
+        assert [futuro.result() for futuro in futuros] == [6, 2, 6, 4]
+        assert lotes.lotes == [[3, 1, 2]]
+        assert loader.batches_dispatched == 1
+
+    def test_respeta_el_tamano_maximo_de_lote(self):
+        lotes = Lotes()
+        loader = DataLoader(lotes, max_batch_size=2)
+
+        assert loader.get_many(range(5)) == [0, 2, 4, 6, 8]
+        assert lotes.lotes == [[0, 1], [2, 3], [4]]
+
+    def test_cachea_por_clave(self):
+        lotes = Lotes()
+        loader = DataLoader(lotes)
+        loader.get_many([1, 2])
+
+        assert loader.get_many([2, 1, 5]) == [4, 2, 10]
+        assert lotes.lotes == [[1, 2], [5]]
+
+    def test_sin_cache_vuelve_a_cargar(self):
+        lotes = Lotes()
+        loader = DataLoader(lotes, cache=False)
+        loader.get_many([1])
+        loader.get_many([1])
+
+        assert lotes.lotes == [[1], [1]]
+
+    def test_default_para_claves_no_encontradas(self):
+        loader = DataLoader(Lotes(faltantes={7}), default=0)
+
+        assert loader.get_many([7, 8]) == [0, 16]
+
+    def test_prime_y_clear(self):
+        lotes = Lotes()
+        loader = DataLoader(lotes)
+        loader.prime(1, "conocido")
+
+        assert loader.load(1).result() == "conocido"
+        loader.clear(1)
+        assert loader.load(1).result() == 2
+        assert lotes.lotes == [[1]]
+
+    def test_los_errores_no_quedan_cacheados(self):
+        llamadas = []
+
+        def cargar(claves):
+            llamadas.append(claves)
+            if len(llamadas) == 1:
+                raise ConnectionError("sin conexión")
+            return {clave: clave for clave in claves}
+
+        loader = DataLoader(cargar)
+        with pytest.raises(ConnectionError):
+            loader.load(1).result()
+
+        assert loader.load(1).result() == 1
+        assert len(llamadas) == 2
+
+
+class CursorContador:
+    """Cursor sqlite3 que cuenta las consultas ejecutadas."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.consultas = []
+
+    def execute(self, sql, params=()):
+        self.consultas.append((sql, list(params)))
+        return self.cursor.execute(sql, params)
+
+    def __getattr__(self, nombre):
+        return getattr(self.cursor, nombre)
+
+
+@pytest.fixture
+def conexion():
+    conexion = sqlite3.connect(":memory:")
+    conexion.executescript("""
+        CREATE TABLE pedidos (id INTEGER PRIMARY KEY, cliente TEXT);
+        CREATE TABLE detalles (id INTEGER PRIMARY KEY, pedido_id INT, producto TEXT);
+    """)
+    conexion.executemany("INSERT INTO pedidos VALUES (?, ?)", [(i, f"cliente {i}") for i in range(1, 11)])
+    conexion.executemany("INSERT INTO detalles (pedido_id, producto) VALUES (?, ?)",
+                         [(1, "perfil"), (1, "vidrio"), (2, "herraje"), (9, "sellador")])
+    yield conexion
+    conexion.close()
+
+
+class TestFetchRowsByKeys:
+
+    def test_parte_el_in_en_tramos(self, conexion, monkeypatch):
+        monkeypatch.setattr(query_optimizer, "MAX_IN_PARAMS", 3)
+        cursor = CursorContador(conexion.cursor())
+
+        filas = fetch_rows_by_keys(
+            cursor, "SELECT id, cliente FROM pedidos WHERE id IN ({placeholders})",
+            [1, 2, 2, 3, 4, 5, 6, 7, 99], "id",
+        )
+
+        assert sorted(filas) == [1, 2, 3, 4, 5, 6, 7]
+        assert filas[4] == {"id": 4, "cliente": "cliente 4"}
+        assert [params for _, params in cursor.consultas] == [[1, 2, 3], [4, 5, 6], [7, 99]]
+
+    def test_agrupa_filas_de_uno_a_muchos(self, conexion):
+        filas = fetch_rows_by_keys(
+            conexion.cursor(),
+            "SELECT pedido_id, producto FROM detalles WHERE pedido_id IN ({placeholders}) ORDER BY id",
+            [1, 2, 3], "pedido_id", many=True,
+        )
+
+        assert {clave: [f["producto"] for f in valor] for clave, valor in filas.items()} == {
+            1: ["perfil", "vidrio"], 2: ["herraje"]}
+
+    def test_sin_claves_no_consulta(self, conexion):
+        cursor = CursorContador(conexion.cursor())
+
+        assert fetch_rows_by_keys(cursor, "SELECT id FROM pedidos WHERE id IN ({placeholders})", [], "id") == {}
+        assert cursor.consultas == []
+
+
+class TestSqlInLoader:
+
+    def test_una_consulta_para_todas_las_claves(self, conexion):
+        cursores = []
+
+        def nuevo_cursor():
+            cursores.append(CursorContador(conexion.cursor()))
+            return cursores[-1]
+
+        loader = sql_in_loader(
+            nuevo_cursor,
+            "SELECT pedido_id, producto FROM detalles WHERE pedido_id IN ({placeholders}) ORDER BY id",
+            "pedido_id", many=True,
+        )
+
+        detalles = loader.get_many([9, 1, 4])
+
+        assert [[d["producto"] for d in lista] for lista in detalles] == [["sellador"], ["perfil", "vidrio"], []]
+        assert sum(len(c.consultas) for c in cursores) == 1
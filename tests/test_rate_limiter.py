@@ -0,0 +1,163 @@
+"""
+Tests del limitador de velocidad (rexus.core.rate_limiter).
+
+Verifican:
+- Ventana deslizante: límite, ponderación de la ventana anterior y descarte
+  de claves inactivas
+- LoginRateLimiter: bloqueo progresivo, persistencia por usuario en SQLite
+  y migración del archivo JSON anterior
+"""
+
+import datetime
+import json
+
+import pytest
+
+from rexus.core.rate_limiter import (
+    LoginRateLimiter,
+    RateLimitConfig,
+    SlidingWindowRateLimiter,
+)
+
+
+class Reloj:
+    def __init__(self, ahora=1000.0):
+        self.ahora = ahora
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def crear_login(tmp_path, monkeypatch):
+    # El archivo JSON anterior se busca en data/ relativo al directorio actual
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(LoginRateLimiter, "_log_security_event", lambda *args: None)
+
+    def crear(**config):
+        return LoginRateLimiter(RateLimitConfig(**config), db_file=tmp_path / "rate.db")
+
+    return crear
+
+
+class TestSlidingWindowRateLimiter:
+
+    def test_limita_dentro_de_la_ventana(self):
+        reloj = Reloj()
+        limitador = SlidingWindowRateLimiter(max_requests=3, window_seconds=10, clock=reloj)
+
+        assert [limitador.is_allowed("ip") for _ in range(4)] == [True, True, True, False]
+        assert limitador.is_allowed("otra_ip")
+
+    def test_pondera_la_ventana_anterior(self):
+        reloj = Reloj(1000.0)
+        limitador = SlidingWindowRateLimiter(max_requests=10, window_seconds=10, clock=reloj)
+        for _ in range(10):
+            limitador.hit("ip")
+
+        reloj.ahora = 1015.0   # mitad de la ventana siguiente
+        assert limitador.count("ip") == pytest.approx(5.0)
+
+        reloj.ahora = 1020.0   # ventana anterior completamente fuera
+        assert limitador.count("ip") == 0.0
+
+    def test_descarta_claves_inactivas(self):
+        reloj = Reloj(1000.0)
+        limitador = SlidingWindowRateLimiter(max_requests=5, window_seconds=10, clock=reloj)
+        limitador.hit("vieja")
+
+        reloj.ahora = 1030.0
+        limitador.hit("nueva")
+
+        assert len(limitador) == 1
+        assert limitador.count("vieja") == 0.0
+
+    def test_respeta_max_keys(self):
+        limitador = SlidingWindowRateLimiter(max_requests=5, window_seconds=10,
+                                             max_keys=3, clock=Reloj())
+        for i in range(10):
+            limitador.hit(f"ip{i}")
+
+        assert len(limitador) == 3
+        assert limitador.get_state("ip0") is None
+        assert limitador.get_state("ip9") is not None
+
+    def test_restaurar_estado(self):
+        reloj = Reloj(1000.0)
+        limitador = SlidingWindowRateLimiter(max_requests=5, window_seconds=10, clock=reloj)
+        limitador.set_state("ip", (1000.0, 5.0, 0.0))
+
+        assert not limitador.is_allowed("ip")
+
+
+class TestLoginRateLimiter:
+
+    def test_bloquea_al_superar_intentos(self, crear_login):
+        limitador = crear_login(max_attempts=3, base_lockout_minutes=5)
+        for _ in range(3):
+            limitador.record_failed_attempt("ana")
+
+        bloqueado, hasta = limitador.is_blocked("ana")
+
+        assert bloqueado
+        assert hasta > datetime.datetime.now() + datetime.timedelta(minutes=4)
+        assert limitador.get_lockout_info("ana")["recent_attempts"] == 3
+
+    def test_bloqueo_progresivo(self, crear_login):
+        limitador = crear_login(max_attempts=3, base_lockout_minutes=5, progressive_multiplier=2)
+        for _ in range(5):
+            limitador.record_failed_attempt("ana")
+
+        _, hasta = limitador.is_blocked("ana")
+        minutos = (hasta - datetime.datetime.now()).total_seconds() / 60
+
+        assert 19 < minutos <= 20
+
+    def test_login_exitoso_limpia_fallos(self, crear_login):
+        limitador = crear_login(max_attempts=3)
+        limitador.record_failed_attempt("ana")
+        limitador.record_successful_attempt("ana")
+
+        info = limitador.get_lockout_info("ana")
+
+        assert info["consecutive_failures"] == 0
+        assert info["recent_attempts"] == 0
+
+    def test_estado_persiste_entre_instancias(self, crear_login):
+        limitador = crear_login(max_attempts=3)
+        for _ in range(3):
+            limitador.record_failed_attempt("ana")
+
+        otro = crear_login(max_attempts=3)
+
+        assert otro.is_blocked("ana")[0]
+        assert otro.get_statistics()["currently_blocked"] == 1
+
+    def test_reset_por_administrador(self, crear_login):
+        limitador = crear_login(max_attempts=2)
+        limitador.record_failed_attempt("ana")
+        limitador.record_failed_attempt("ana")
+
+        limitador.reset_user_attempts("ana", "admin")
+
+        assert not limitador.is_blocked("ana")[0]
+        assert crear_login(max_attempts=2).get_statistics()["total_tracked_users"] == 0
+
+    def test_migra_archivo_json(self, crear_login, tmp_path):
+        datos = tmp_path / "data"
+        datos.mkdir()
+        bloqueo = datetime.datetime.now() + datetime.timedelta(minutes=30)
+        (datos / "rate_limiter.json").write_text(json.dumps({
+            "ana": {
+                "consecutive_failures": 5,
+                "locked_until": bloqueo.isoformat(),
+                "last_attempt": datetime.datetime.now().isoformat(),
+                "attempts": [datetime.datetime.now().isoformat()] * 2,
+            }
+        }), encoding="utf-8")
+
+        limitador = crear_login()
+
+        assert limitador.is_blocked("ana") == (True, bloqueo)
+        assert not (datos / "rate_limiter.json").exists()
+        assert (datos / "rate_limiter.json.migrated").exists()
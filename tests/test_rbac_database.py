@@ -0,0 +1,145 @@
+"""
+Tests del sistema RBAC (rexus.core.rbac_database).
+
+Verifican:
+- Permisos por rol con herencia y vencimiento de asignaciones
+- Políticas DENY/ALLOW con acciones y contexto
+- Invalidación del modelo compilado ante cambios locales y de otro proceso
+- Registro por lotes de los intentos de acceso
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from rexus.core.audit_writer import shutdown_audit_writers
+from rexus.core.rbac_database import AccessResult, RBACDatabase
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    # El respaldo del log de accesos se escribe en logs/ relativo al directorio actual
+    monkeypatch.chdir(tmp_path)
+    yield str(tmp_path / "rbac.db")
+    shutdown_audit_writers()
+
+
+def rol(db_path, nombre):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT id FROM rbac_roles WHERE name = ?", (nombre,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def permiso(db_path, recurso, accion):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT id FROM rbac_permissions WHERE resource = ? AND action = ?", (recurso, accion)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def rbac(db_path):
+    sistema = RBACDatabase(db_path)
+    sistema.assign_permission_to_role(rol(db_path, "user"), permiso(db_path, "inventario", "read"), 1)
+    return sistema
+
+
+class TestPermisos:
+
+    def test_permiso_directo(self, rbac, db_path):
+        rbac.assign_role_to_user(10, rol(db_path, "user"), 1)
+
+        assert rbac.check_access(10, "inventario", "read")[0] == AccessResult.GRANTED
+        assert rbac.check_access(10, "inventario", "delete")[0] == AccessResult.DENIED
+        assert rbac.check_access(99, "inventario", "read")[0] == AccessResult.DENIED
+
+    def test_permiso_heredado_del_rol_padre(self, rbac, db_path):
+        # viewer tiene como padre a user
+        rbac.assign_role_to_user(11, rol(db_path, "viewer"), 1)
+
+        assert rbac.check_access(11, "inventario", "read")[0] == AccessResult.GRANTED
+
+    def test_asignacion_vencida_no_otorga_permisos(self, rbac, db_path):
+        vencida = (datetime.utcnow() - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
+        rbac.assign_role_to_user(12, rol(db_path, "user"), 1, expires_at=vencida)
+
+        assert rbac.check_access(12, "inventario", "read")[0] == AccessResult.DENIED
+
+    def test_asignacion_futura_vigente(self, rbac, db_path):
+        vigente = (datetime.utcnow() + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
+        rbac.assign_role_to_user(13, rol(db_path, "user"), 1, expires_at=vigente)
+
+        assert rbac.check_access(13, "inventario", "read")[0] == AccessResult.GRANTED
+
+
+class TestPoliticas:
+
+    def test_deny_prevalece_sobre_permiso(self, rbac, db_path):
+        rbac.assign_role_to_user(10, rol(db_path, "user"), 1)
+        politica = rbac.create_policy("bloqueo_inventario", "inv*", "DENY",
+                                      conditions={"actions": ["read"]})
+
+        assert rbac.check_access(10, "inventario", "read")[0] == AccessResult.DENIED
+
+        rbac.set_policy_active(politica, False)
+        assert rbac.check_access(10, "inventario", "read")[0] == AccessResult.GRANTED
+
+    def test_politica_con_contexto(self, rbac, db_path):
+        rbac.assign_role_to_user(10, rol(db_path, "user"), 1)
+        rbac.create_policy("fuera_de_horario", "inventario", "DENY",
+                           conditions={"context": {"turno": "noche"}})
+
+        assert rbac.check_access(10, "inventario", "read", {"turno": "noche"})[0] == AccessResult.DENIED
+        assert rbac.check_access(10, "inventario", "read", {"turno": "dia"})[0] == AccessResult.GRANTED
+
+
+class TestModeloCompilado:
+
+    def test_no_consulta_la_base_en_cada_verificacion(self, rbac, db_path, monkeypatch):
+        rbac.assign_role_to_user(10, rol(db_path, "user"), 1)
+        rbac.check_access(10, "inventario", "read")
+
+        compilaciones = []
+        original = rbac._compile
+        monkeypatch.setattr(rbac, "_compile", lambda v: compilaciones.append(v) or original(v))
+        for _ in range(100):
+            rbac.check_access(10, "inventario", "read")
+
+        assert compilaciones == []
+
+    def test_detecta_cambios_de_otro_proceso(self, rbac, db_path):
+        rbac.assign_role_to_user(10, rol(db_path, "user"), 1)
+        assert rbac.check_access(10, "inventario", "delete")[0] == AccessResult.DENIED
+
+        # Otro proceso otorga el permiso directamente en la base
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "INSERT INTO rbac_role_permissions (role_id, permission_id) VALUES (?, ?)",
+            (rol(db_path, "user"), permiso(db_path, "inventario", "delete")),
+        )
+        conn.commit()
+        conn.close()
+        rbac._next_version_check = 0.0
+
+        assert rbac.check_access(10, "inventario", "delete")[0] == AccessResult.GRANTED
+
+
+class TestLogAccesos:
+
+    def test_registra_intentos_por_lotes(self, rbac, db_path):
+        rbac.assign_role_to_user(10, rol(db_path, "user"), 1)
+        for _ in range(5):
+            rbac.check_access(10, "inventario", "read")
+        rbac.check_access(10, "obras", "delete")
+
+        estadisticas = rbac.get_access_statistics(user_id=10)
+
+        assert estadisticas["total_accesses"] == 6
+        assert estadisticas["access_by_result"] == {"GRANTED": 5, "DENIED": 1}
+        assert estadisticas["top_resources"]["inventario"] == 5
@@ -0,0 +1,116 @@
+"""
+Tests de la recepción de compras en el inventario.
+
+Verifican:
+- Los ítems de detalle_compras (sin producto) se resuelven contra el
+  inventario por código o por descripción exacta de un único producto
+- Los ítems que no se pueden resolver se informan y no se ingresa ninguna
+  línea
+"""
+
+import sqlite3
+
+import pytest
+
+from rexus.modules.compras.controller import ComprasController
+from rexus.modules.compras.model import ComprasModel
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+
+@pytest.fixture
+def modelo():
+    conexion = sqlite3.connect(":memory:")
+    conexion.execute(
+        "CREATE TABLE inventario_perfiles (id INTEGER PRIMARY KEY, codigo TEXT, "
+        "descripcion TEXT, activo INTEGER)"
+    )
+    conexion.executemany(
+        "INSERT INTO inventario_perfiles VALUES (?, ?, ?, ?)",
+        [
+            (1, "PERF-001", "Perfil ventana 60mm", 1),
+            (2, "PERF-002", "Perfil puerta", 1),
+            (3, "PERF-003", "Perfil puerta", 1),
+            (4, "PERF-004", "Perfil discontinuado", 0),
+        ],
+    )
+    modelo = ComprasModel.__new__(ComprasModel)
+    modelo.db_connection = conexion
+    modelo.sql_manager = SQLQueryManager()
+    yield modelo
+    conexion.close()
+
+
+def item(id_item, descripcion, cantidad=5, **extra):
+    return {"id": id_item, "descripcion": descripcion, "cantidad": cantidad,
+            "precio_unitario": 10.0, **extra}
+
+
+class TestResolverLineasRecepcion:
+
+    def test_resuelve_por_codigo_y_por_descripcion(self, modelo):
+        lineas, sin_producto = modelo.resolver_lineas_recepcion([
+            item(1, "PERF-002", cantidad=3),
+            item(2, " Perfil ventana 60mm "),
+        ])
+
+        assert sin_producto == []
+        assert [(l["id_producto"], l["cantidad_recibida"]) for l in lineas] == [(2, 3), (1, 5)]
+
+    def test_respeta_producto_informado(self, modelo):
+        lineas, sin_producto = modelo.resolver_lineas_recepcion([
+            item(1, "cualquiera", producto_id=4),
+            item(2, "otra", codigo_producto="PERF-001"),
+        ])
+
+        assert sin_producto == []
+        assert lineas[0]["id_producto"] == 4
+        assert lineas[1]["codigo_producto"] == "PERF-001"
+
+    def test_informa_items_sin_producto_unico(self, modelo):
+        inexistente = item(1, "Tornillo 8mm")
+        ambiguo = item(2, "Perfil puerta")
+        inactivo = item(3, "Perfil discontinuado")
+
+        lineas, sin_producto = modelo.resolver_lineas_recepcion(
+            [inexistente, ambiguo, inactivo, item(4, "PERF-001")]
+        )
+
+        assert sin_producto == [inexistente, ambiguo, inactivo]
+        assert [l["id_producto"] for l in lineas] == [1]
+
+
+class ModeloPrueba:
+    def __init__(self, sin_producto):
+        self.sin_producto = sin_producto
+        self.recepciones = []
+
+    def resolver_lineas_recepcion(self, detalles):
+        return [{"id_producto": 1, "cantidad_recibida": 1}], self.sin_producto
+
+    def recibir_compra(self, orden_id, productos):
+        self.recepciones.append((orden_id, productos))
+
+
+class DetallePrueba:
+    def obtener_items_compra(self, orden_id):
+        return [item(1, "PERF-001"), item(2, "Tornillo 8mm")]
+
+
+class TestActualizarStockDesdeCompra:
+
+    def test_no_ingresa_nada_si_hay_items_sin_producto(self):
+        controlador = ComprasController.__new__(ComprasController)
+        controlador.current_user = {"id": 1}
+        controlador.model = ModeloPrueba([item(2, "Tornillo 8mm")])
+        controlador.detalle_model = DetallePrueba()
+        errores = []
+        controlador.mostrar_error = lambda titulo, mensaje: errores.append((titulo, mensaje))
+
+        controlador.actualizar_stock_desde_compra(7)
+
+        assert controlador.model.recepciones == []
+        assert len(errores) == 1
+        titulo, mensaje = errores[0]
+        assert titulo == "Recepción no aplicada"
+        assert "1 de 2 ítems" in mensaje
+        assert "- Tornillo 8mm" in mensaje
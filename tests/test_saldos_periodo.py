@@ -0,0 +1,294 @@
+"""
+Tests de los saldos por período de contabilidad
+(rexus.modules.administracion.contabilidad.saldos_periodo).
+
+Las consultas de sql/contabilidad son T-SQL; se ejecutan sobre SQLite con
+funciones equivalentes (YEAR, MONTH, DATEFROMPARTS, GETDATE) y ISNULL
+traducido a IFNULL. Las fechas son relativas al mes actual porque el
+consolidado cierra hasta el mes en curso.
+
+Verifican:
+- La consolidación cierra los meses anteriores y es idempotente
+- Un movimiento en un mes cerrado recalcula solo ese mes
+- Editar un asiento que cambia de mes recalcula ambos meses
+- Los bordes parciales del rango se leen del detalle
+- Los totales coinciden con sumar el detalle para rangos al azar
+"""
+
+import random
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from rexus.modules.administracion.contabilidad.model import ContabilidadModel
+from rexus.modules.administracion.contabilidad.saldos_periodo import (
+    ORIGEN_LIBRO,
+    ORIGEN_PAGOS_OBRA,
+    ORIGEN_RECIBOS,
+    ORIGENES,
+    SaldosPeriodo,
+    mes_siguiente,
+    primer_dia_mes,
+)
+from rexus.utils.sql_query_manager import SQLQueryManager
+
+MES_ACTUAL = primer_dia_mes(date.today())
+
+
+def mes(desplazamiento, dia=1):
+    """Día dia del mes desplazado desplazamiento meses respecto del actual."""
+    indice = MES_ACTUAL.year * 12 + MES_ACTUAL.month - 1 + desplazamiento
+    return date(indice // 12, indice % 12 + 1, dia)
+
+
+class SQLSobreSQLite(SQLQueryManager):
+    """Traduce ISNULL de T-SQL a IFNULL."""
+
+    def get_query(self, modulo, nombre, **kwargs):
+        return super().get_query(modulo, nombre, **kwargs).replace("ISNULL(", "IFNULL(")
+
+
+@pytest.fixture
+def conexion():
+    conexion = sqlite3.connect(":memory:")
+    conexion.create_function("GETDATE", 0, lambda: date.today().isoformat())
+    conexion.create_function("YEAR", 1, lambda fecha: int(str(fecha)[:4]))
+    conexion.create_function("MONTH", 1, lambda fecha: int(str(fecha)[5:7]))
+    conexion.create_function("DATEFROMPARTS", 3, lambda a, m, d: date(a, m, d).isoformat())
+    conexion.executescript("""
+        CREATE TABLE libro_contable (
+            id INTEGER PRIMARY KEY, numero_asiento INT, fecha_asiento TEXT, tipo_asiento TEXT,
+            concepto TEXT, referencia TEXT, debe REAL, haber REAL, saldo REAL, estado TEXT,
+            usuario_creacion TEXT, fecha_creacion TEXT, fecha_modificacion TEXT
+        );
+        CREATE TABLE recibos (id INTEGER PRIMARY KEY, fecha_emision TEXT, tipo_recibo TEXT, monto REAL);
+        CREATE TABLE pagos_obra (id INTEGER PRIMARY KEY, fecha_pago TEXT, categoria TEXT, monto REAL);
+        CREATE TABLE saldos_periodo (
+            origen TEXT, cuenta TEXT, periodo TEXT, debe REAL, haber REAL, saldo REAL,
+            movimientos INT, PRIMARY KEY (origen, periodo, cuenta)
+        );
+        CREATE TABLE saldos_periodo_cierre (
+            origen TEXT PRIMARY KEY, cerrado_hasta TEXT, fecha_actualizacion TEXT
+        );
+    """)
+    yield conexion
+    conexion.close()
+
+
+@pytest.fixture
+def saldos(conexion):
+    return SaldosPeriodo(conexion, SQLSobreSQLite())
+
+
+def asiento(conexion, fecha, tipo, debe=0.0, haber=0.0, estado="ACTIVO"):
+    cursor = conexion.execute(
+        "INSERT INTO libro_contable (fecha_asiento, tipo_asiento, debe, haber, saldo, estado) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (fecha.isoformat(), tipo, debe, haber, debe - haber, estado),
+    )
+    return cursor.lastrowid
+
+
+def recibo(conexion, fecha, tipo, monto):
+    conexion.execute("INSERT INTO recibos (fecha_emision, tipo_recibo, monto) VALUES (?, ?, ?)",
+                     (fecha.isoformat(), tipo, monto))
+
+
+def pago(conexion, fecha, categoria, monto):
+    conexion.execute("INSERT INTO pagos_obra (fecha_pago, categoria, monto) VALUES (?, ?, ?)",
+                     (fecha.isoformat(), categoria, monto))
+
+
+def saldos_guardados(conexion, origen):
+    return conexion.execute(
+        "SELECT periodo, cuenta, debe, haber, movimientos FROM saldos_periodo "
+        "WHERE origen = ? ORDER BY periodo, cuenta", (origen,)
+    ).fetchall()
+
+
+class TestConsolidacion:
+
+    def test_cierra_los_meses_anteriores(self, conexion, saldos):
+        asiento(conexion, mes(-2, 5), "VENTA", debe=100)
+        asiento(conexion, mes(-2, 20), "VENTA", debe=50)
+        asiento(conexion, mes(-1, 3), "COMPRA", haber=30)
+        asiento(conexion, mes(-1, 4), "COMPRA", haber=99, estado="ANULADO")
+        asiento(conexion, mes(0, 1), "VENTA", debe=7)
+
+        cierres = saldos.consolidar()
+
+        assert cierres == {origen: MES_ACTUAL for origen in ORIGENES}
+        assert saldos_guardados(conexion, ORIGEN_LIBRO) == [
+            (mes(-2).isoformat(), "VENTA", 150, 0, 2),
+            (mes(-1).isoformat(), "COMPRA", 0, 30, 1),
+        ]
+
+    def test_reconsolidar_no_duplica(self, conexion, saldos):
+        asiento(conexion, mes(-1, 3), "VENTA", debe=100)
+        saldos.consolidar()
+        guardados = saldos_guardados(conexion, ORIGEN_LIBRO)
+
+        saldos.consolidar()
+
+        assert saldos_guardados(conexion, ORIGEN_LIBRO) == guardados
+
+    def test_avanza_solo_los_meses_nuevos(self, conexion, saldos):
+        asiento(conexion, mes(-3, 10), "VENTA", debe=10)
+        asiento(conexion, mes(-2, 10), "VENTA", debe=20)
+        saldos.consolidar(hasta=mes(-2))
+
+        asiento(conexion, mes(-1, 10), "VENTA", debe=40)
+        saldos.consolidar(hasta=mes(0))
+
+        assert [fila[0] for fila in saldos_guardados(conexion, ORIGEN_LIBRO)] == [
+            mes(-3).isoformat(), mes(-2).isoformat(), mes(-1).isoformat()]
+
+
+class TestActualizarMes:
+
+    def test_movimiento_en_mes_cerrado(self, conexion, saldos):
+        asiento(conexion, mes(-2, 5), "VENTA", debe=100)
+        asiento(conexion, mes(-1, 5), "VENTA", debe=10)
+        saldos.consolidar()
+
+        asiento(conexion, mes(-2, 28), "VENTA", debe=25)
+        assert saldos.actualizar_mes(conexion.cursor(), ORIGEN_LIBRO, mes(-2, 28))
+
+        assert saldos_guardados(conexion, ORIGEN_LIBRO) == [
+            (mes(-2).isoformat(), "VENTA", 125, 0, 2),
+            (mes(-1).isoformat(), "VENTA", 10, 0, 1),
+        ]
+
+    def test_mes_abierto_no_se_recalcula(self, conexion, saldos):
+        saldos.consolidar()
+
+        assert not saldos.actualizar_mes(conexion.cursor(), ORIGEN_LIBRO, mes(0, 2))
+        assert not saldos.actualizar_mes(conexion.cursor(), ORIGEN_LIBRO, None)
+
+    def test_sin_consolidar_no_se_recalcula(self, conexion, saldos):
+        assert not saldos.actualizar_mes(conexion.cursor(), ORIGEN_RECIBOS, mes(-6, 2))
+
+
+@pytest.fixture
+def modelo(conexion, saldos):
+    modelo = ContabilidadModel.__new__(ContabilidadModel)
+    modelo.db_connection = conexion
+    modelo.sql_manager = saldos.sql_manager
+    modelo.saldos = saldos
+    modelo.tabla_libro_contable = "libro_contable"
+    return modelo
+
+
+class TestEdicionEntreMeses:
+
+    def test_asiento_que_cambia_de_mes(self, conexion, saldos, modelo):
+        asiento_id = asiento(conexion, mes(-3, 10), "VENTA", debe=100)
+        asiento(conexion, mes(-1, 10), "VENTA", debe=5)
+        saldos.consolidar()
+
+        assert modelo.actualizar_asiento_contable(asiento_id, {
+            "fecha_asiento": mes(-1, 20).isoformat(), "tipo_asiento": "VENTA",
+            "concepto": "Movido", "debe": 100, "haber": 0,
+        })
+
+        assert saldos_guardados(conexion, ORIGEN_LIBRO) == [
+            (mes(-1).isoformat(), "VENTA", 105, 0, 2),
+        ]
+        assert saldos.totales(ORIGEN_LIBRO, mes(-3), mes(-3, 28)) == {}
+
+    def test_asiento_movido_al_periodo_abierto(self, conexion, saldos, modelo):
+        asiento_id = asiento(conexion, mes(-2, 10), "VENTA", debe=100)
+        saldos.consolidar()
+
+        assert modelo.actualizar_asiento_contable(asiento_id, {
+            "fecha_asiento": mes(0, 1).isoformat(), "tipo_asiento": "VENTA", "debe": 100,
+        })
+
+        assert saldos_guardados(conexion, ORIGEN_LIBRO) == []
+        assert saldos.totales(ORIGEN_LIBRO) == {"VENTA": (100, 0, 100)}
+
+
+class TestTotales:
+
+    def test_bordes_parciales_del_rango(self, conexion, saldos):
+        asiento(conexion, mes(-4, 14), "VENTA", debe=1)      # antes del rango
+        asiento(conexion, mes(-4, 15), "VENTA", debe=2)      # borde inicial
+        asiento(conexion, mes(-3, 1), "VENTA", debe=4)       # mes completo
+        asiento(conexion, mes(-2, 28), "VENTA", debe=8)      # mes completo
+        asiento(conexion, mes(-1, 10), "VENTA", debe=16)     # borde final (inclusive)
+        asiento(conexion, mes(-1, 11), "VENTA", debe=32)     # después del rango
+        saldos.consolidar()
+
+        totales = saldos.totales(ORIGEN_LIBRO, mes(-4, 15), mes(-1, 10))
+
+        assert totales == {"VENTA": (30, 0, 30)}
+
+    def test_rango_dentro_de_un_mes(self, conexion, saldos):
+        asiento(conexion, mes(-2, 5), "VENTA", debe=1)
+        asiento(conexion, mes(-2, 10), "VENTA", debe=2)
+        saldos.consolidar()
+
+        assert saldos.totales(ORIGEN_LIBRO, mes(-2, 6), mes(-2, 20)) == {"VENTA": (2, 0, 2)}
+
+    def test_incluye_el_periodo_abierto(self, conexion, saldos):
+        recibo(conexion, mes(-1, 5), "COBRO", 10)
+        recibo(conexion, mes(0, 1), "COBRO", 5)
+        pago(conexion, mes(-1, 5), "MATERIALES", 3)
+
+        assert saldos.totales(ORIGEN_RECIBOS, mes(-1)) == {"COBRO": (15, 0, 15)}
+        assert saldos.totales(ORIGEN_PAGOS_OBRA) == {"MATERIALES": (0, 3, -3)}
+
+
+def sumar_detalle(movimientos, desde, hasta):
+    totales = {}
+    for fecha, cuenta, debe, haber in movimientos:
+        if (desde is None or fecha >= desde) and (hasta is None or fecha <= hasta):
+            anterior = totales.get(cuenta, (0, 0, 0))
+            totales[cuenta] = (anterior[0] + debe, anterior[1] + haber, anterior[2] + debe - haber)
+    return totales
+
+
+class TestContraElDetalle:
+
+    def test_rangos_al_azar(self, conexion, saldos):
+        azar = random.Random(48)
+        inicio = mes(-14)
+        dias = (date.today() - inicio).days
+        movimientos = {origen: [] for origen in ORIGENES}
+        for _ in range(400):
+            fecha = inicio + timedelta(days=azar.randrange(dias + 1))
+            cuenta = azar.choice(["A", "B", "C"])
+            monto = azar.randrange(1, 1000)
+            origen = azar.choice(list(ORIGENES))
+            if origen == ORIGEN_LIBRO:
+                debe, haber = (monto, 0) if azar.random() < 0.5 else (0, monto)
+                asiento(conexion, fecha, cuenta, debe=debe, haber=haber)
+            elif origen == ORIGEN_RECIBOS:
+                debe, haber = monto, 0
+                recibo(conexion, fecha, cuenta, monto)
+            else:
+                debe, haber = 0, monto
+                pago(conexion, fecha, cuenta, monto)
+            movimientos[origen].append((fecha, cuenta, debe, haber))
+
+        saldos.consolidar()
+        assert saldos_guardados(conexion, ORIGEN_LIBRO)
+
+        for _ in range(150):
+            desde = None if azar.random() < 0.15 else inicio + timedelta(days=azar.randrange(dias))
+            hasta = None
+            if azar.random() > 0.15:
+                base = desde or inicio
+                hasta = base + timedelta(days=azar.randrange(dias - (base - inicio).days + 30))
+            for origen in ORIGENES:
+                esperado = sumar_detalle(movimientos[origen], desde, hasta)
+                obtenido = saldos.totales(origen, desde, hasta)
+                assert obtenido.keys() == esperado.keys(), (origen, desde, hasta)
+                for cuenta, valores in esperado.items():
+                    assert obtenido[cuenta] == pytest.approx(valores), (origen, desde, hasta)
+
+
+def test_mes_siguiente():
+    assert mes_siguiente(date(2026, 12, 15)) == date(2027, 1, 1)
+    assert mes_siguiente(date(2026, 1, 31)) == date(2026, 2, 1)
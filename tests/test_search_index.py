@@ -0,0 +1,156 @@
+"""
+Tests del índice de búsqueda local (rexus.utils.search_index).
+
+Verifican:
+- Coincidencia por prefijo, sin mayúsculas ni acentos
+- Orden por relevancia según los pesos de cada campo
+- Refresco y baja de filas tras escrituras locales
+- Sincronización incremental por fecha de modificación
+- Cargador SQL genérico sobre una base SQLite
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from rexus.utils.search_index import (
+    SearchIndex,
+    consulta_prefijos,
+    crear_cargador_sql,
+    ordenar_por_ranking,
+)
+
+
+class Servidor:
+    """Base principal simulada: filas por id y registro de llamadas."""
+
+    def __init__(self, filas):
+        self.filas = {f["id"]: dict(f) for f in filas}
+        self.llamadas = []
+
+    def cargar(self, desde, ids):
+        self.llamadas.append((desde, ids))
+        if ids:
+            return [dict(self.filas[i]) for i in ids if i in self.filas]
+        return [dict(f) for f in self.filas.values()]
+
+
+@pytest.fixture
+def indice(tmp_path):
+    indice = SearchIndex(str(tmp_path / "indice.db"))
+    if not indice.disponible:
+        pytest.skip("SQLite sin FTS5")
+    return indice
+
+
+@pytest.fixture
+def productos():
+    return Servidor([
+        {"id": 1, "codigo": "AL-001", "descripcion": "Perfil de aluminio anodizado"},
+        {"id": 2, "codigo": "VI-010", "descripcion": "Vidrio templado"},
+        {"id": 3, "codigo": "AL-002", "descripcion": "Ángulo de aluminio"},
+        {"id": 4, "codigo": "HE-100", "descripcion": "Bisagra de acero", "activo": 0},
+    ])
+
+
+class TestSearchIndex:
+
+    def test_consulta_prefijos(self):
+        assert consulta_prefijos("  Ángulo alu ") == '"angulo"* "alu"*'
+        assert consulta_prefijos("***") == ""
+
+    def test_busca_por_prefijo_sin_acentos(self, indice, productos):
+        indice.registrar("productos", ["codigo", "descripcion"], cargador=productos.cargar)
+
+        assert sorted(indice.buscar("productos", "alu")) == [1, 3]
+        assert indice.buscar("productos", "ANGULO") == [3]
+        assert indice.buscar("productos", "vidrio alu") == []
+
+    def test_filas_inactivas_no_se_indexan(self, indice, productos):
+        indice.registrar("productos", ["codigo", "descripcion"], cargador=productos.cargar)
+
+        assert indice.buscar("productos", "bisagra") == []
+
+    def test_orden_por_peso_de_campo(self, indice):
+        servidor = Servidor([
+            {"id": 1, "codigo": "X-1", "descripcion": "marco para puerta"},
+            {"id": 2, "codigo": "MARCO", "descripcion": "pieza"},
+        ])
+        indice.registrar("productos", ["codigo", "descripcion"], pesos=[10.0, 1.0],
+                         cargador=servidor.cargar)
+
+        assert indice.buscar("productos", "marco") == [2, 1]
+
+    def test_refrescar_y_eliminar(self, indice, productos):
+        indice.registrar("productos", ["codigo", "descripcion"], cargador=productos.cargar)
+        indice.buscar("productos", "alu")
+
+        productos.filas[2]["descripcion"] = "Vidrio laminado"
+        del productos.filas[3]
+        indice.refrescar("productos", [2, 3])
+
+        assert indice.buscar("productos", "laminado") == [2]
+        assert indice.buscar("productos", "angulo") == []
+
+        indice.eliminar("productos", [1])
+        assert indice.buscar("productos", "alu") == []
+
+    def test_sincronizacion_incremental(self, indice, productos):
+        indice.registrar("productos", ["codigo", "descripcion"], cargador=productos.cargar)
+        indice.buscar("productos", "alu")
+        assert productos.llamadas[0] == (None, None)
+
+        productos.filas[5] = {"id": 5, "codigo": "PU-1", "descripcion": "Puerta corrediza"}
+        indice.invalidar("productos")
+
+        assert indice.buscar("productos", "puerta") == [5]
+        desde, ids = productos.llamadas[-1]
+        assert isinstance(desde, datetime) and ids is None
+
+    def test_entidad_no_registrada_devuelve_none(self, indice):
+        assert indice.buscar("obras", "casa") is None
+
+    def test_indice_no_disponible_devuelve_none(self, tmp_path):
+        # La ruta es un directorio: no se puede abrir la base del índice
+        ruta = tmp_path / "directorio"
+        ruta.mkdir()
+        indice = SearchIndex(str(ruta))
+        indice.registrar("productos", ["codigo"], cargador=lambda desde, ids: [])
+
+        assert not indice.disponible
+        assert indice.buscar("productos", "x") is None
+
+    def test_nombres_invalidos(self, indice):
+        with pytest.raises(ValueError):
+            indice.registrar("productos; DROP", ["codigo"])
+        with pytest.raises(ValueError):
+            indice.registrar("productos", ["codigo", "descripcion"], pesos=[1.0])
+
+    def test_cargador_sql(self, indice, tmp_path):
+        base = sqlite3.connect(str(tmp_path / "principal.db"))
+        base.execute(
+            "CREATE TABLE obras (id INTEGER PRIMARY KEY, nombre TEXT, activo INTEGER, "
+            "fecha_actualizacion TEXT)"
+        )
+        base.executemany(
+            "INSERT INTO obras VALUES (?, ?, 1, ?)",
+            [(1, "Edificio Norte", "2026-01-01 10:00:00"),
+             (2, "Casa Sur", "2026-06-01 10:00:00")],
+        )
+        base.commit()
+        cargador = crear_cargador_sql(
+            lambda: base,
+            "SELECT id, activo, nombre FROM obras WHERE {filtro}",
+            "fecha_actualizacion",
+        )
+
+        assert [f["id"] for f in cargador(datetime(2026, 3, 1), None)] == [2]
+        assert [f["id"] for f in cargador(None, [1])] == [1]
+
+        indice.registrar("obras", ["nombre"], cargador=cargador)
+        assert indice.buscar("obras", "edif") == [1]
+
+    def test_ordenar_por_ranking(self):
+        filas = [{"id": 1}, {"id": 2}, {"id": 3}]
+        assert [f["id"] for f in ordenar_por_ranking(filas, [3, 1, 2])] == [3, 1, 2]
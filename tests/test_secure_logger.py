@@ -0,0 +1,119 @@
+"""
+Tests del enmascarado de datos sensibles (rexus.utils.secure_logger) y del
+pipeline de logging (rexus.utils.log_pipeline).
+
+Verifican que el enmascarado se haga una sola vez, en el hilo del pipeline,
+también para los handlers del logger raíz, y que los contadores del
+pipeline no pierdan incrementos entre hilos.
+"""
+
+import logging
+import threading
+
+import pytest
+
+from rexus.utils import secure_logger
+from rexus.utils.log_pipeline import LogPipeline, LogPipelineStats
+from rexus.utils.secure_logger import SecureLogRecord, SensitiveDataMasker, get_secure_logger
+
+
+class ListaHandler(logging.Handler):
+    """Handler que guarda los mensajes recibidos y el hilo que los escribió."""
+
+    def __init__(self):
+        super().__init__()
+        self.mensajes = []
+        self.hilos = []
+
+    def emit(self, record):
+        self.mensajes.append(record.getMessage())
+        self.hilos.append(threading.current_thread())
+
+
+class MaskerContador(SensitiveDataMasker):
+    def __init__(self):
+        super().__init__()
+        self.llamadas = 0
+
+    def mask_sensitive_data(self, message):
+        self.llamadas += 1
+        return super().mask_sensitive_data(message)
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = LogPipeline()
+    pipeline._masker = MaskerContador()
+    yield pipeline
+    pipeline.stop()
+
+
+@pytest.fixture
+def logger_aislado():
+    logger = logging.getLogger("tests.secure_logger.externo")
+    handler = ListaHandler()
+    logger.addHandler(handler)
+    yield logger, handler
+    logger.handlers.clear()
+
+
+class TestEnmascarado:
+
+    def test_no_instala_factory_global(self):
+        get_secure_logger("tests.secure_logger")
+        assert logging.getLogRecordFactory() is not SecureLogRecord
+
+    def test_handler_adoptado_enmascara_una_vez_en_el_pipeline(self, pipeline, logger_aislado):
+        logger, handler = logger_aislado
+        pipeline.adopt(logger)
+
+        logger.warning("conexión: %s", "password=hunter2")
+        pipeline.stop()
+
+        assert logger.handlers == [pipeline.queue_handler]
+        assert handler.mensajes == ["conexión: password=***MASKED***"]
+        assert handler.hilos[0] is not threading.current_thread()
+        assert pipeline._masker.llamadas == 1
+
+    def test_adoptar_es_idempotente(self, pipeline, logger_aislado):
+        logger, handler = logger_aislado
+
+        pipeline.adopt(logger)
+        pipeline.adopt(logger)
+
+        assert pipeline.handlers_for(logger.name) == [handler]
+
+    def test_secure_logger_adopta_handlers_del_raiz(self, pipeline, monkeypatch):
+        monkeypatch.setattr(secure_logger, "get_log_pipeline", lambda: pipeline)
+        raiz = logging.getLogger()
+        previos = list(raiz.handlers)
+        handler = ListaHandler()
+        raiz.addHandler(handler)
+        try:
+            get_secure_logger("tests.secure_logger.raiz")
+            assert handler not in raiz.handlers
+            assert handler in pipeline.handlers_for("root")
+        finally:
+            raiz.handlers[:] = previos
+
+
+class TestEstadisticas:
+
+    def test_contadores_entre_hilos(self):
+        stats = LogPipelineStats()
+
+        def sumar():
+            for _ in range(5000):
+                stats.add("processed")
+                stats.record_enqueued(1)
+                stats.record_drop("INFO")
+
+        hilos = [threading.Thread(target=sumar) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        datos = stats.as_dict(0)
+        assert datos["processed"] == datos["enqueued"] == datos["dropped"] == 40000
+        assert datos["dropped_by_level"] == {"INFO": 40000}
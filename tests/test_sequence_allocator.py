@@ -0,0 +1,136 @@
+"""
+Tests del numerador de documentos (rexus.core.sequence_allocator).
+
+Verifican:
+- Numeración correlativa por prefijo y año, con semilla desde el último
+  número ya usado
+- Un rollback devuelve el número al contador (sin huecos)
+- Alta concurrente del contador
+- generar_numero_pedido propaga los errores en lugar de inventar un número
+"""
+
+import sqlite3
+
+import pytest
+
+from rexus.core.sequence_allocator import SequenceAllocator, formatear_numero
+from rexus.modules.pedidos.model import PedidosModel
+
+
+@pytest.fixture
+def conexion(tmp_path):
+    conexion = sqlite3.connect(str(tmp_path / "secuencias.db"))
+    conexion.create_function("GETDATE", 0, lambda: "2026-01-01 00:00:00")
+    conexion.execute(
+        "CREATE TABLE secuencias_documentos (prefijo TEXT NOT NULL, anio INT NOT NULL, "
+        "ultimo_numero INT NOT NULL, fecha_modificacion TEXT, PRIMARY KEY (prefijo, anio))"
+    )
+    conexion.commit()
+    yield conexion
+    conexion.close()
+
+
+class TestSequenceAllocator:
+
+    def test_formato(self):
+        assert formatear_numero("PED", 2026, 42) == "PED-2026-00042"
+        assert formatear_numero("RES", 0, 7) == "RES-00007"
+
+    def test_numeros_correlativos_por_prefijo_y_anio(self, conexion):
+        numerador = SequenceAllocator()
+        cursor = conexion.cursor()
+
+        numeros = [numerador.siguiente(cursor, "PED", 2026) for _ in range(3)]
+        otro_anio = numerador.siguiente(cursor, "PED", 2027)
+        otro_prefijo = numerador.siguiente(cursor, "OC", 2026)
+
+        assert numeros == ["PED-2026-00001", "PED-2026-00002", "PED-2026-00003"]
+        assert otro_anio == "PED-2027-00001"
+        assert otro_prefijo == "OC-2026-00001"
+
+    def test_semilla_desde_el_ultimo_numero_usado(self, conexion):
+        numerador = SequenceAllocator()
+        prefijos = []
+
+        def semilla(cursor, prefijo):
+            prefijos.append(prefijo)
+            return 41
+
+        cursor = conexion.cursor()
+        assert numerador.siguiente(cursor, "PED", 2026, semilla=semilla) == "PED-2026-00042"
+        assert numerador.siguiente(cursor, "PED", 2026, semilla=semilla) == "PED-2026-00043"
+        assert prefijos == ["PED-2026-"]
+
+    def test_rollback_devuelve_el_numero(self, conexion):
+        numerador = SequenceAllocator()
+        cursor = conexion.cursor()
+        assert numerador.siguiente(cursor, "PED", 2026) == "PED-2026-00001"
+        conexion.commit()
+
+        assert numerador.siguiente(cursor, "PED", 2026) == "PED-2026-00002"
+        conexion.rollback()
+
+        assert numerador.siguiente(cursor, "PED", 2026) == "PED-2026-00002"
+
+    def test_reserva_de_varios_numeros(self, conexion):
+        numerador = SequenceAllocator()
+        cursor = conexion.cursor()
+
+        assert numerador.reservar(cursor, "LOT", 2026, cantidad=10) == 10
+        assert numerador.reservar(cursor, "LOT", 2026, cantidad=5) == 15
+        with pytest.raises(ValueError):
+            numerador.reservar(cursor, "LOT", 2026, cantidad=0)
+
+    def test_alta_concurrente_reintenta(self, conexion):
+        numerador = SequenceAllocator()
+        cursor = conexion.cursor()
+
+        def semilla(cursor_semilla, prefijo):
+            # Otro cliente crea el contador entre el UPDATE y el INSERT
+            cursor_semilla.execute("INSERT INTO secuencias_documentos VALUES ('PED', 2026, 7, NULL)")
+            return 0
+
+        assert numerador.siguiente(cursor, "PED", 2026, semilla=semilla) == "PED-2026-00008"
+
+
+class ConexionFallida:
+    """Conexión cuyo cursor falla al ejecutar cualquier consulta."""
+
+    def __init__(self):
+        self.rollbacks = 0
+        self.commits = 0
+
+    def cursor(self):
+        class Cursor:
+            rowcount = 0
+
+            def execute(self, *args):
+                raise sqlite3.OperationalError("tabla bloqueada")
+
+        return Cursor()
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class TestGenerarNumeroPedido:
+
+    def test_propaga_errores_sin_inventar_numero(self):
+        modelo = PedidosModel.__new__(PedidosModel)
+        modelo.db_connection = ConexionFallida()
+
+        with pytest.raises(sqlite3.OperationalError):
+            modelo.generar_numero_pedido()
+
+        assert modelo.db_connection.rollbacks == 1
+        assert modelo.db_connection.commits == 0
+
+    def test_propaga_errores_en_la_transaccion_del_llamador(self):
+        modelo = PedidosModel.__new__(PedidosModel)
+        modelo.db_connection = ConexionFallida()
+
+        with pytest.raises(sqlite3.OperationalError):
+            modelo.generar_numero_pedido(modelo.db_connection.cursor())
@@ -0,0 +1,128 @@
+"""
+Tests del servicio de estadísticas (rexus.utils.statistics_service).
+
+El refresco en segundo plano usa conexiones propias a una base SQLite en
+memoria compartida, como haría connection_factory con la base real.
+
+Verifican:
+- Tras invalidar se sigue sirviendo el valor anterior mientras se recalcula
+- Un cálculo que empezó antes de una invalidación no pisa uno más reciente
+- Una ráfaga de escrituras se recalcula una sola vez
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from rexus.utils.statistics_service import StatisticsService
+
+URI = "file:estadisticas_pruebas?mode=memory&cache=shared"
+
+
+def conectar():
+    return sqlite3.connect(URI, uri=True, check_same_thread=False)
+
+
+@pytest.fixture
+def conexion():
+    # Mantiene viva la base en memoria mientras dura el test
+    conexion = conectar()
+    conexion.executescript("""
+        DROP TABLE IF EXISTS inventario;
+        CREATE TABLE inventario (id INTEGER PRIMARY KEY, stock_actual REAL);
+        INSERT INTO inventario (stock_actual) VALUES (5), (0);
+    """)
+    yield conexion
+    conexion.close()
+
+
+@pytest.fixture
+def calculos():
+    return []
+
+
+@pytest.fixture
+def servicio(calculos):
+    def calcular(conexion):
+        calculos.append(time.monotonic())
+        total, sin_stock = conexion.execute(
+            "SELECT COUNT(*), SUM(CASE WHEN stock_actual = 0 THEN 1 ELSE 0 END) FROM inventario"
+        ).fetchone()
+        return {"total": total, "sin_stock": sin_stock}
+
+    servicio = StatisticsService(demora=0.1)
+    servicio.registrar("inventario", calcular, connection_factory=conectar)
+    yield servicio
+    servicio.cerrar()
+
+
+def esperar(condicion, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def insertar(conexion, stock):
+    conexion.execute("INSERT INTO inventario (stock_actual) VALUES (?)", (stock,))
+    conexion.commit()
+
+
+class TestRefresco:
+
+    def test_sirve_el_valor_anterior_mientras_recalcula(self, servicio, conexion, calculos):
+        assert servicio.obtener("inventario", conexion=conexion) == {"total": 2, "sin_stock": 1}
+
+        insertar(conexion, 0)
+        servicio.invalidar("inventario")
+
+        # El recálculo espera la demora: mientras tanto se sirve el valor anterior
+        assert servicio.obtener("inventario") == {"total": 2, "sin_stock": 1}
+        assert esperar(lambda: servicio.obtener("inventario")["total"] == 3)
+        assert servicio.obtener("inventario") == {"total": 3, "sin_stock": 2}
+        assert len(calculos) == 2
+
+    def test_sin_conexion_ni_valor_programa_el_calculo(self, servicio, conexion):
+        assert servicio.obtener("inventario") is None
+        assert esperar(lambda: servicio.obtener("inventario") is not None)
+
+    def test_rafaga_de_escrituras_recalcula_una_vez(self, servicio, conexion, calculos):
+        servicio.obtener("inventario", conexion=conexion)
+
+        for _ in range(20):
+            insertar(conexion, 1)
+            servicio.invalidar("inventario")
+
+        assert esperar(lambda: servicio.obtener("inventario")["total"] == 22)
+        time.sleep(servicio.demora * 3)
+        assert len(calculos) == 2
+
+    def test_modulo_no_registrado(self, servicio):
+        with pytest.raises(KeyError):
+            servicio.obtener("compras")
+
+
+class TestGeneraciones:
+
+    def test_calculo_viejo_no_pisa_uno_reciente(self, servicio):
+        clave = ("inventario", ())
+        generacion_vieja = servicio._modulos["inventario"].generacion
+        servicio.invalidar("inventario")
+        generacion_nueva = servicio._modulos["inventario"].generacion
+
+        servicio._guardar(clave, {"total": 3}, generacion_nueva)
+        # Termina después un cálculo que leyó la base antes de la escritura
+        servicio._guardar(clave, {"total": 2}, generacion_vieja)
+
+        assert servicio.obtener("inventario") == {"total": 3}
+
+    def test_invalidar_vence_el_valor_guardado(self, servicio, conexion):
+        servicio.obtener("inventario", conexion=conexion)
+        entrada = servicio._entradas[("inventario", ())]
+
+        servicio.invalidar("inventario")
+
+        assert not servicio._vigente(servicio._modulos["inventario"], entrada)
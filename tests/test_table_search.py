@@ -0,0 +1,280 @@
+"""
+Tests de la búsqueda indexada en tablas (rexus.utils.table_search).
+
+Las tablas son dobles en memoria con la misma interfaz que usa el índice
+de QTableWidget; el QTimer del debouncer se reemplaza por uno manual para
+disparar el tiempo de espera sin depender del bucle de eventos.
+
+Verifican:
+- Búsqueda sin distinguir mayúsculas ni acentos, limitada a las columnas
+  indicadas y con filtros por columna
+- El índice se arma una vez y no vuelve a recorrer la tabla en cada tecla;
+  las señales del modelo lo invalidan
+- Refinar el término da lo mismo que buscar desde cero
+- Solo se ocultan/muestran las filas cuya visibilidad cambia
+- El debouncer ejecuta la búsqueda una sola vez tras la última tecla
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+
+from rexus.utils import table_search
+from rexus.utils.table_search import SearchDebouncer, TableSearchIndex, normalizar_texto
+
+
+class Senal:
+    def __init__(self):
+        self.receptores = []
+
+    def connect(self, receptor):
+        self.receptores.append(receptor)
+
+    def emit(self, *args):
+        for receptor in list(self.receptores):
+            receptor(*args)
+
+
+class Modelo:
+    def __init__(self):
+        self.dataChanged = Senal()
+        self.rowsInserted = Senal()
+        self.rowsRemoved = Senal()
+        self.modelReset = Senal()
+
+
+class Item:
+    def __init__(self, texto):
+        self._texto = texto
+
+    def text(self):
+        return self._texto
+
+
+class Tabla:
+    """Doble de QTableWidget que cuenta las lecturas de celdas y los cambios de filas."""
+
+    def __init__(self, filas):
+        self.filas = [list(fila) for fila in filas]
+        self.ocultas = set()
+        self._modelo = Modelo()
+        self.lecturas = 0
+        self.cambios_visibilidad = 0
+
+    def model(self):
+        return self._modelo
+
+    def rowCount(self):
+        return len(self.filas)
+
+    def columnCount(self):
+        return max((len(fila) for fila in self.filas), default=0)
+
+    def item(self, row, col):
+        self.lecturas += 1
+        valor = self.filas[row][col] if col < len(self.filas[row]) else None
+        return None if valor is None else Item(valor)
+
+    def isRowHidden(self, row):
+        return row in self.ocultas
+
+    def setRowHidden(self, row, oculta):
+        self.cambios_visibilidad += 1
+        if oculta:
+            self.ocultas.add(row)
+        else:
+            self.ocultas.discard(row)
+
+    def setUpdatesEnabled(self, habilitado):
+        pass
+
+
+FILAS = [
+    ("P-001", "Perfil Aluminio", "Depósito Central"),
+    ("P-002", "Vidrio Templado", "Depósito Norte"),
+    ("P-003", "Herraje Acero", None),
+    ("V-004", "Vidrio laminado", "Obra Pérez"),
+]
+
+
+@pytest.fixture
+def tabla():
+    return Tabla(FILAS)
+
+
+class TestNormalizarTexto:
+
+    def test_minusculas_sin_acentos(self):
+        assert normalizar_texto("Depósito ÑANDÚ") == "deposito nandu"
+
+    def test_valores_no_texto(self):
+        assert normalizar_texto(None) == ""
+        assert normalizar_texto(12.5) == "12.5"
+
+
+class TestTableSearchIndex:
+
+    def test_sin_mayusculas_ni_acentos(self, tabla):
+        indice = TableSearchIndex(tabla)
+
+        assert indice.buscar("VIDRIO") == [1, 3]
+        assert indice.buscar("deposito") == [0, 1]
+        assert indice.buscar("  perez ") == [3]
+        assert indice.buscar("") == [0, 1, 2, 3]
+
+    def test_solo_columnas_indicadas(self, tabla):
+        indice = TableSearchIndex(tabla, columnas_busqueda=(0, 1))
+
+        assert indice.buscar("deposito") == []
+        assert indice.buscar("p-00") == [0, 1, 2]
+
+    def test_no_une_columnas_contiguas(self, tabla):
+        # "aluminiodeposito" no debe coincidir cruzando el límite entre celdas
+        assert TableSearchIndex(tabla).buscar("aluminiodeposito") == []
+
+    def test_filtros_por_columna(self, tabla):
+        indice = TableSearchIndex(tabla)
+
+        filas = indice.buscar("vidrio", {0: lambda codigo: codigo.startswith("v-")})
+
+        assert filas == [3]
+        # El filtro no contamina el resultado que se refina en la siguiente tecla
+        assert indice.buscar("vidrio ") == [1, 3]
+
+    def test_no_recorre_la_tabla_en_cada_tecla(self, tabla):
+        indice = TableSearchIndex(tabla)
+        indice.buscar("")
+        lecturas = tabla.lecturas
+
+        for termino in ("v", "vi", "vid", "vidr", "vid", ""):
+            indice.buscar(termino)
+
+        assert tabla.lecturas == lecturas
+
+    @pytest.mark.parametrize("senal", ["dataChanged", "rowsInserted", "rowsRemoved", "modelReset"])
+    def test_las_senales_del_modelo_invalidan(self, tabla, senal):
+        indice = TableSearchIndex(tabla)
+        assert indice.buscar("acero") == [2]
+
+        tabla.filas[0][1] = "Perfil Acero"
+        assert indice.buscar("acero") == [2]
+        getattr(tabla.model(), senal).emit()
+
+        assert indice.buscar("acero") == [0, 2]
+
+    def test_refinar_da_lo_mismo_que_buscar_de_cero(self):
+        azar = random.Random(30)
+        palabras = ["perfil", "vidrio", "herraje", "acero", "pérez", "depósito", "norte", "templado"]
+        filas = [(f"P-{i:03d}", " ".join(azar.sample(palabras, 2)), azar.choice(palabras))
+                 for i in range(200)]
+        indice = TableSearchIndex(Tabla(filas))
+
+        for _ in range(50):
+            palabra = normalizar_texto(azar.choice(palabras))
+            for largo in list(range(1, len(palabra) + 1)) + [2, 0]:
+                termino = palabra[:largo]
+                esperado = [row for row, fila in enumerate(filas)
+                            if any(termino in normalizar_texto(v) for v in fila)]
+                assert indice.buscar(termino) == esperado, termino
+
+    def test_para_tabla_reutiliza_el_indice(self, tabla):
+        indice = TableSearchIndex.para_tabla(tabla, (0, 1))
+
+        assert TableSearchIndex.para_tabla(tabla, (0, 1)) is indice
+        assert TableSearchIndex.para_tabla(tabla, (0, 2)) is not indice
+
+
+class TestAplicar:
+
+    def test_solo_cambia_las_filas_necesarias(self, tabla):
+        indice = TableSearchIndex(tabla)
+
+        assert indice.filtrar("vidrio") == [1, 3]
+        assert tabla.ocultas == {0, 2}
+        assert tabla.cambios_visibilidad == 2
+
+        indice.filtrar("vidrio lam")
+        assert tabla.ocultas == {0, 1, 2}
+        assert tabla.cambios_visibilidad == 3
+
+        indice.filtrar("")
+        assert tabla.ocultas == set()
+        assert tabla.cambios_visibilidad == 6
+
+    def test_sin_cambios_no_toca_la_tabla(self, tabla):
+        indice = TableSearchIndex(tabla)
+
+        indice.filtrar("")
+
+        assert tabla.cambios_visibilidad == 0
+
+    def test_respeta_filas_ocultas_por_otro_filtro(self, tabla):
+        indice = TableSearchIndex(tabla)
+        tabla.ocultas = {1}
+
+        indice.filtrar("")
+
+        assert tabla.ocultas == set()
+
+
+class TimerManual:
+    """Reemplazo de QTimer: el tiempo de espera se dispara a mano."""
+
+    def __init__(self, parent=None):
+        self.timeout = Senal()
+        self.activo = False
+        self.intervalo = None
+        self.un_solo_disparo = False
+        self.arranques = 0
+
+    def setSingleShot(self, valor):
+        self.un_solo_disparo = valor
+
+    def setInterval(self, ms):
+        self.intervalo = ms
+
+    def start(self):
+        self.activo = True
+        self.arranques += 1
+
+    def stop(self):
+        self.activo = False
+
+    def vencer(self):
+        if self.activo:
+            self.activo = not self.un_solo_disparo
+            self.timeout.emit()
+
+
+@pytest.fixture
+def busquedas(monkeypatch):
+    monkeypatch.setattr(table_search, "QTimer", TimerManual)
+    return []
+
+
+class TestSearchDebouncer:
+
+    def test_una_busqueda_tras_la_ultima_tecla(self, busquedas):
+        debouncer = SearchDebouncer(lambda: busquedas.append("buscar"), delay_ms=300)
+        timer = debouncer._timer
+
+        for texto in ("v", "vi", "vid"):
+            debouncer.programar(texto)
+        assert busquedas == []
+        assert timer.arranques == 3 and timer.intervalo == 300
+
+        timer.vencer()
+        timer.vencer()
+
+        assert busquedas == ["buscar"]
+
+    def test_ejecutar_ahora_cancela_la_espera(self, busquedas):
+        debouncer = SearchDebouncer(lambda: busquedas.append("buscar"))
+        debouncer.programar("vidrio")
+
+        debouncer.ejecutar_ahora()
+        debouncer._timer.vencer()
+
+        assert busquedas == ["buscar"]
@@ -0,0 +1,227 @@
+"""
+Tests de revocación de sesiones.
+
+Verifican que eliminar_usuario invalida las sesiones cacheadas del usuario
+y avisa al resto de los procesos, solo cuando la baja se confirmó, y que una
+revocación ocurrida mientras validar_sesion lee la BD no deja la sesión en
+el cache.
+"""
+
+import datetime
+import sqlite3
+import time
+
+import pytest
+
+from rexus.core.event_bus import EVENTO_SESION_REVOCADA, EventBus
+from rexus.modules.usuarios import model as usuarios_model
+from rexus.modules.usuarios.model import UsuariosModel
+from rexus.modules.usuarios.submodules import sessions_manager
+from rexus.modules.usuarios.submodules.sessions_manager import (
+    CacheSesiones,
+    SessionsManager,
+    _SesionCacheada,
+)
+
+
+class CursorPrueba:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def execute(self, sql, params=None):
+        self.conexion.ejecutadas.append(sql)
+        if self.conexion.falla_en and self.conexion.falla_en in sql:
+            raise RuntimeError("fallo de base de datos")
+
+    def fetchone(self):
+        return ("pepe",)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class ConexionPrueba:
+    def __init__(self):
+        self.falla_en = None
+        self.ejecutadas = []
+        self.commits = 0
+        self.connection = self
+
+    def cursor(self):
+        return CursorPrueba(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class IndicePrueba:
+    def eliminar(self, entidad, ids):
+        pass
+
+
+@pytest.fixture
+def entorno(monkeypatch):
+    cache = CacheSesiones()
+    ahora = datetime.datetime.now()
+    cache.guardar("s1", _SesionCacheada(7, "pepe", ahora, ahora, time.monotonic()))
+    cache.guardar("s2", _SesionCacheada(8, "otro", ahora, ahora, time.monotonic()))
+    bus = EventBus()
+    eventos = []
+    bus.suscribir(EVENTO_SESION_REVOCADA, eventos.append)
+
+    monkeypatch.setattr(usuarios_model, "get_cache_sesiones", lambda: cache)
+    monkeypatch.setattr(usuarios_model, "get_event_bus", lambda: bus)
+    monkeypatch.setattr(usuarios_model, "get_search_index", lambda: IndicePrueba())
+    return cache, eventos
+
+
+class TestEliminarUsuarioRevocaSesiones:
+
+    def test_invalida_cache_y_publica_revocacion(self, entorno):
+        cache, eventos = entorno
+        modelo = UsuariosModel(db_connection=ConexionPrueba())
+
+        exito, _ = modelo.eliminar_usuario(7)
+
+        assert exito
+        assert cache.obtener("s1") is None
+        assert cache.obtener("s2") is not None
+        assert [e.datos for e in eventos] == [{"usuario_id": 7}]
+
+    def test_no_revoca_si_la_baja_falla(self, entorno):
+        cache, eventos = entorno
+        conexion = ConexionPrueba()
+        modelo = UsuariosModel(db_connection=conexion)
+        conexion.falla_en = "UPDATE sesiones_usuario"
+
+        exito, _ = modelo.eliminar_usuario(7)
+
+        assert not exito
+        assert cache.obtener("s1") is not None
+        assert eventos == []
+
+
+def sesion(usuario_id=7):
+    ahora = datetime.datetime.now()
+    return _SesionCacheada(usuario_id, "pepe", ahora, ahora, time.monotonic())
+
+
+class TestGeneracionRevocaciones:
+
+    def test_rechaza_entrada_leida_antes_de_revocar(self):
+        cache = CacheSesiones()
+        generacion = cache.generacion()
+        cache.invalidar("s1")
+
+        assert not cache.guardar("s1", sesion(), generacion)
+        assert cache.guardar("s2", sesion(), generacion)
+        assert cache.obtener("s1") is None
+
+    def test_revocacion_de_usuario_y_total(self):
+        cache = CacheSesiones()
+        generacion = cache.generacion()
+        cache.invalidar_usuario(7)
+
+        assert not cache.guardar("s1", sesion(7), generacion)
+        assert cache.guardar("s2", sesion(8), generacion)
+
+        generacion = cache.generacion()
+        cache.limpiar()
+        assert not cache.guardar("s2", sesion(8), generacion)
+
+    def test_registro_acotado_es_conservador(self):
+        cache = CacheSesiones(max_entradas=2)
+        generacion = cache.generacion()
+        for session_id in ("s1", "s2", "s3"):
+            cache.invalidar(session_id)
+
+        # s1 ya no está en el registro, pero no puede volver a guardarse
+        assert not cache.guardar("s1", sesion(), generacion)
+        assert cache.guardar("s1", sesion(), cache.generacion())
+
+
+class CursorConPausa:
+    """Ejecuta al_leer entre la lectura de la sesión y el resto de validar_sesion."""
+
+    def __init__(self, cursor, al_leer):
+        self.cursor = cursor
+        self.al_leer = al_leer
+
+    def execute(self, sql, params=()):
+        return self.cursor.execute(sql, params)
+
+    def fetchone(self):
+        fila = self.cursor.fetchone()
+        if self.al_leer:
+            al_leer, self.al_leer = self.al_leer, None
+            al_leer()
+        return fila
+
+    def __getattr__(self, nombre):
+        return getattr(self.cursor, nombre)
+
+
+class ConexionConPausa:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.al_leer = None
+
+    def cursor(self):
+        al_leer, self.al_leer = self.al_leer, None
+        return CursorConPausa(self.conexion.cursor(), al_leer)
+
+    def __getattr__(self, nombre):
+        return getattr(self.conexion, nombre)
+
+
+@pytest.fixture
+def gestor(monkeypatch):
+    conexion = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+    conexion.create_function(
+        "GETDATE", 0, lambda: datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    )
+    conexion.execute(
+        "CREATE TABLE sesiones_usuario (session_id TEXT, usuario_id INT, username TEXT, "
+        "created_at TIMESTAMP, last_activity TIMESTAMP, is_active INT, closed_at TIMESTAMP)"
+    )
+    conexion.executemany(
+        "INSERT INTO sesiones_usuario VALUES (?, ?, 'pepe', GETDATE(), GETDATE(), 1, NULL)",
+        [("s1", 7), ("s2", 7)],
+    )
+    monkeypatch.setattr(sessions_manager, "get_event_bus", lambda: EventBus())
+    gestor = SessionsManager.__new__(SessionsManager)
+    gestor.db_connection = ConexionConPausa(conexion)
+    gestor.cache = CacheSesiones()
+    gestor.session_timeout_minutes = 120
+    yield gestor
+    conexion.close()
+
+
+class TestValidarMientrasSeRevoca:
+
+    def test_revocar_durante_la_lectura(self, gestor):
+        gestor.db_connection.al_leer = lambda: gestor.cerrar_sesion("s1")
+
+        resultado = gestor.validar_sesion("s1")
+
+        assert not resultado["valid"]
+        assert gestor.cache.obtener("s1") is None
+        assert not gestor.validar_sesion("s1")["valid"]
+
+    def test_revocar_usuario_durante_la_lectura(self, gestor):
+        gestor.db_connection.al_leer = lambda: gestor.cache.invalidar_usuario(7)
+
+        assert not gestor.validar_sesion("s2")["valid"]
+        assert gestor.cache.obtener("s2") is None
+
+    def test_sin_revocacion_queda_en_cache(self, gestor):
+        gestor.db_connection.al_leer = lambda: gestor.cache.invalidar("otra")
+
+        assert gestor.validar_sesion("s1")["valid"]
+        assert gestor.cache.obtener("s1") is not None
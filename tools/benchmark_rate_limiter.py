@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark del Rate Limiter - Rexus.app
+
+Mide el throughput del motor de ventana deslizante (API) y de
+LoginRateLimiter (intentos fallidos persistidos en SQLite) a medida que
+crecen los clientes y los intentos acumulados. Con el motor O(1) las
+operaciones por segundo deben mantenerse estables entre filas.
+
+Uso:
+    python tools/benchmark_rate_limiter.py [--clientes 100 10000 100000]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar ruta del proyecto
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import rexus.core.rate_limiter as rate_limiter_module  # noqa: E402
+from rexus.core.rate_limiter import (  # noqa: E402
+    LoginRateLimiter, RateLimitConfig, SlidingWindowRateLimiter
+)
+
+
+class RelojSimulado:
+    """Reloj que avanza un paso fijo por llamada (tráfico sostenido)."""
+
+    def __init__(self, paso: float):
+        self.ahora = time.time()
+        self.paso = paso
+
+    def __call__(self) -> float:
+        self.ahora += self.paso
+        return self.ahora
+
+
+def medir_api(clientes: int, operaciones: int, semilla: int) -> float:
+    rnd = random.Random(semilla)
+    claves = [f"10.0.{i // 256}.{i % 256}" for i in range(clientes)]
+    # 100 req/min por cliente, tráfico de una hora distribuido en las operaciones
+    limitador = SlidingWindowRateLimiter(100, 60, clock=RelojSimulado(3600 / operaciones))
+    for clave in claves:
+        limitador.is_allowed(clave)
+    inicio = time.perf_counter()
+    for _ in range(operaciones):
+        limitador.is_allowed(claves[rnd.randrange(clientes)])
+    return operaciones / (time.perf_counter() - inicio)
+
+
+def medir_login(usuarios: int, intentos: int, semilla: int) -> float:
+    rnd = random.Random(semilla)
+    # Sin auditoría en BD: solo se mide el rate limiter
+    LoginRateLimiter._log_security_event = lambda *args, **kwargs: None
+    rate_limiter_module.print = lambda *args, **kwargs: None
+    with tempfile.TemporaryDirectory() as directorio:
+        limitador = LoginRateLimiter(
+            RateLimitConfig(max_attempts=10**9), db_file=Path(directorio) / "rl.db"
+        )
+        nombres = [f"usuario{i}" for i in range(usuarios)]
+        limitador._store.save_many(
+            (nombre, rate_limiter_module._LoginState(consecutive_failures=3), None)
+            for nombre in nombres
+        )
+        inicio = time.perf_counter()
+        for _ in range(intentos):
+            nombre = nombres[rnd.randrange(usuarios)]
+            limitador.is_blocked(nombre)
+            limitador.record_failed_attempt(nombre)
+        return intentos / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del rate limiter")
+    parser.add_argument("--clientes", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--operaciones", type=int, default=200000)
+    parser.add_argument("--intentos", type=int, default=20000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'clientes':>9} {'api ops/s':>12} {'login intentos/s':>17}")
+    for clientes in args.clientes:
+        api = medir_api(clientes, args.operaciones, args.semilla)
+        login = medir_login(clientes, args.intentos, args.semilla)
+        print(f"{clientes:>9} {api:>12,.0f} {login:>17,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark del Optimizador de Rutas - Rexus.app
+
+Compara el solver CVRPTW de logística contra la agrupación anterior (grupos
+consecutivos de 4 servicios) sobre escenarios sintéticos reproducibles
+alrededor de La Plata: km totales, km ahorrados, rutas y tiempo de cálculo.
+
+Uso:
+    python tools/benchmark_rutas.py [--paradas 50 200 400] [--semilla 42]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+# Agregar ruta del proyecto
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rexus.modules.logistica.route_optimizer import (  # noqa: E402
+    ConfiguracionFlota, OptimizadorRutas, Parada
+)
+
+DEPOSITO = (-34.9214, -57.9544)
+
+
+def generar_escenario(cantidad: int, semilla: int):
+    """Paradas aleatorias (radio ~15 km) con demanda y ventanas horarias."""
+    rnd = random.Random(semilla)
+    paradas = []
+    for i in range(cantidad):
+        apertura = rnd.uniform(0, 6 * 60)
+        paradas.append(Parada(
+            id=str(i),
+            lat=DEPOSITO[0] + rnd.uniform(-0.14, 0.14),
+            lng=DEPOSITO[1] + rnd.uniform(-0.14, 0.14),
+            demanda=rnd.randint(20, 200),
+            ventana_inicio=apertura,
+            ventana_fin=apertura + rnd.choice([90, 180, 360]),
+            tiempo_servicio=rnd.choice([10, 15, 20]),
+        ))
+    return paradas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del optimizador de rutas")
+    parser.add_argument("--paradas", type=int, nargs="+", default=[50, 200, 400])
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--presupuesto", type=float, default=5.0,
+                        help="Segundos máximos de cálculo por escenario")
+    args = parser.parse_args()
+
+    flota = ConfiguracionFlota(capacidad=1500, fin_turno=9 * 60, velocidad_kmh=30)
+
+    print(f"{'paradas':>8} {'rutas':>6} {'km solver':>10} {'km grupos4':>11} "
+          f"{'ahorro km':>10} {'ahorro %':>9} {'sin asignar':>12} {'segundos':>9}")
+    for cantidad in args.paradas:
+        paradas = generar_escenario(cantidad, args.semilla)
+        optimizador = OptimizadorRutas(DEPOSITO, paradas, flota)
+        resultado = optimizador.resolver(args.presupuesto)
+        base = optimizador.distancia_agrupacion_fija(4)
+        ahorro = base - resultado.distancia_km
+        print(f"{cantidad:>8} {len(resultado.rutas):>6} {resultado.distancia_km:>10.1f} "
+              f"{base:>11.1f} {ahorro:>10.1f} {100 * ahorro / base:>8.1f}% "
+              f"{len(resultado.no_asignadas):>12} {resultado.tiempo_segundos:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Suite de Benchmarks - Rexus.app
+
+Mide los caminos calientes de la aplicación sobre el dataset sintético de
+tools/generar_dataset.py y compara contra una línea base guardada, para que
+una regresión de rendimiento se vea antes de llegar a producción.
+
+Casos (con las consultas reales de sql/ y los componentes de rexus/):
+- Paginación de productos: primera página, página media y última página
+- Búsqueda: LIKE sobre varias columnas frente al índice FTS5 local
+- Movimiento de stock: lectura, actualización e historial en una transacción
+- Recepción de compra: 500 líneas en una transacción (RecepcionMasiva)
+- Reportes: análisis ABC, valoración y rotación (AnaliticaManager)
+- Exportación CSV en streaming de productos y movimientos recientes
+- Backup: copia consistente de la base y compresión gzip
+- Auditoría: consulta por rango de fechas y agregación por módulo
+
+Las consultas de SQL Server se adaptan a SQLite (OFFSET/FETCH, ISNULL,
+DATEDIFF, GETDATE, tablas temporales #) en la conexión del benchmark; el SQL
+de los módulos no se toca. El movimiento de stock y la recepción de compra
+dejan la base como estaba al terminar.
+
+Cada caso se ejecuta una vez de calentamiento y luego N veces; se informa
+mediana y p95. Con --guardar-baseline se escribe la línea base; sin él se
+compara la mediana contra ella y el proceso termina con código 1 si algún caso
+empeora más que la tolerancia.
+
+Uso:
+    python tools/generar_dataset.py data/benchmark.db --escala grande
+    python tools/benchmark_suite.py data/benchmark.db --guardar-baseline
+    python tools/benchmark_suite.py data/benchmark.db [--tolerancia 0.2] [--casos busqueda_indice]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Agregar ruta del proyecto
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rexus.utils.backup_compressor import BackupCompressor  # noqa: E402
+from rexus.utils.search_index import SearchIndex, crear_cargador_sql  # noqa: E402
+from rexus.utils.sql_query_manager import SQLQueryManager  # noqa: E402
+from rexus.utils.streaming_export import iter_cursor_rows, stream_export  # noqa: E402
+
+RUTA_BASELINE = os.path.join("reports", "benchmarks", "baseline.json")
+TOLERANCIA = 0.20
+# Diferencias menores a esto son ruido de medición, no regresiones
+PISO_RUIDO_SEGUNDOS = 0.002
+TAMANO_PAGINA = 50
+MOVIMIENTOS_POR_REPETICION = 200
+LINEAS_RECEPCION = 500
+TERMINOS_BUSQUEDA = ("alu", "vidrio blanco", "herraje negro 12", "sellador", "per", "bronce serie 3")
+
+_SQLSERVER_A_SQLITE = (
+    (re.compile(r"OFFSET\s+\?\s+ROWS\s+FETCH\s+NEXT\s+\?\s+ROWS\s+ONLY", re.IGNORECASE), "LIMIT ?, ?"),
+    (re.compile(r"\bISNULL\s*\(", re.IGNORECASE), "IFNULL("),
+    (re.compile(r"\bDATEDIFF\s*\(\s*day\s*,", re.IGNORECASE), "DATEDIFF_DIAS("),
+    (re.compile(r"\bCREATE\s+TABLE\s+#", re.IGNORECASE), "CREATE TEMP TABLE "),
+    (re.compile(r"#(\w+)"), r"\1"),
+)
+
+
+def adaptar_sql(sql: str) -> str:
+    """Traduce las construcciones de SQL Server usadas por el repositorio a SQLite."""
+    for patron, reemplazo in _SQLSERVER_A_SQLITE:
+        sql = patron.sub(reemplazo, sql)
+    return sql
+
+
+def _datediff_dias(desde, hasta) -> Optional[int]:
+    """DATEDIFF(day, desde, hasta): cruces de medianoche entre las dos fechas."""
+    if desde is None or hasta is None:
+        return None
+    return (datetime.strptime(str(hasta)[:10], "%Y-%m-%d")
+            - datetime.strptime(str(desde)[:10], "%Y-%m-%d")).days
+
+
+class _CursorAdaptado:
+    """Cursor sqlite3 que acepta el SQL de SQL Server de los módulos."""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def execute(self, sql: str, params=()):
+        self._cursor.execute(adaptar_sql(sql), tuple(params))
+        return self
+
+    def executemany(self, sql: str, filas):
+        self._cursor.executemany(adaptar_sql(sql), filas)
+        return self
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class ConexionBenchmark:
+    """Conexión SQLite con la interfaz que esperan los managers (cursor/commit)."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.create_function(
+            "GETDATE", 0, lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self.conexion.create_function("DATEDIFF_DIAS", 2, _datediff_dias, deterministic=True)
+
+    def cursor(self) -> _CursorAdaptado:
+        return _CursorAdaptado(self.conexion.cursor())
+
+    def commit(self):
+        self.conexion.commit()
+
+    def rollback(self):
+        self.conexion.rollback()
+
+    def close(self):
+        self.conexion.close()
+
+
+@dataclass
+class Caso:
+    nombre: str
+    descripcion: str
+    # preparar(contexto) -> función sin argumentos que se cronometra
+    preparar: Callable[["Contexto"], Callable[[], Any]]
+    repeticiones_max: Optional[int] = None
+
+
+class Contexto:
+    """Estado compartido entre casos: conexión, consultas y directorio temporal."""
+
+    def __init__(self, ruta: str, directorio: str, semilla: int):
+        self.ruta = ruta
+        self.directorio = directorio
+        self.rnd = random.Random(semilla)
+        self.db = ConexionBenchmark(ruta)
+        self.sql = SQLQueryManager()
+        self._indice: Optional[SearchIndex] = None
+
+    def escalar(self, sql: str, params=()):
+        cursor = self.db.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def leer_todo(self, sql: str, params=()) -> int:
+        cursor = self.db.cursor()
+        try:
+            cursor.execute(sql, params)
+            return sum(1 for _ in iter_cursor_rows(cursor))
+        finally:
+            cursor.close()
+
+    def indice(self) -> SearchIndex:
+        if self._indice is None:
+            self._indice = SearchIndex(os.path.join(self.directorio, "indice.db"))
+            self._indice.registrar(
+                "productos",
+                ("codigo", "descripcion", "tipo", "acabado", "proveedor"),
+                (10.0, 4.0, 2.0, 1.0, 1.0),
+                crear_cargador_sql(
+                    lambda: self.db,
+                    self.sql.get_query("inventario", "indice_busqueda_productos"),
+                    "COALESCE(fecha_modificacion, fecha_creacion)",
+                ),
+            )
+        return self._indice
+
+    def dataset(self) -> Dict[str, int]:
+        return {tabla: self.escalar(f"SELECT COUNT(*) FROM {tabla}")
+                for tabla in ("inventario_perfiles", "historial", "auditoria_log")}
+
+
+# --- Casos -------------------------------------------------------------------
+
+def _paginacion(posicion: str):
+    def preparar(ctx: Contexto):
+        sql_pagina = ctx.sql.get_query("inventario", "select_productos_paginados")
+        sql_total = ctx.sql.get_query("inventario", "count_base_paginacion")
+
+        def ejecutar():
+            total = ctx.escalar(sql_total)
+            ultima = max(0, (total - 1) // TAMANO_PAGINA)
+            pagina = {"inicio": 0, "medio": ultima // 2, "fin": ultima}[posicion]
+            return ctx.leer_todo(sql_pagina, (pagina * TAMANO_PAGINA, TAMANO_PAGINA))
+        return ejecutar
+    return preparar
+
+
+def _busqueda_like(ctx: Contexto):
+    sql = ("SELECT id, codigo, descripcion FROM inventario_perfiles WHERE activo = 1 AND ("
+           "codigo LIKE ? OR descripcion LIKE ? OR tipo LIKE ? OR acabado LIKE ? OR proveedor LIKE ?)"
+           " ORDER BY codigo LIMIT 200")
+
+    def ejecutar():
+        for termino in TERMINOS_BUSQUEDA:
+            patron = f"%{termino.split()[0]}%"
+            ctx.leer_todo(sql, (patron,) * 5)
+    return ejecutar
+
+
+def _indice_construccion(ctx: Contexto):
+    def ejecutar():
+        indice = ctx.indice()
+        indice.invalidar("productos")
+        return indice.reconstruir("productos")
+    return ejecutar
+
+
+def _busqueda_indice(ctx: Contexto):
+    indice = ctx.indice()
+    indice.buscar("productos", TERMINOS_BUSQUEDA[0])   # construcción fuera de la medición
+
+    def ejecutar():
+        for termino in TERMINOS_BUSQUEDA:
+            # Tecla por tecla, como la caja de búsqueda
+            for largo in range(2, len(termino) + 1):
+                indice.buscar("productos", termino[:largo])
+    return ejecutar
+
+
+def _movimiento_stock(ctx: Contexto):
+    total = ctx.escalar("SELECT MAX(id) FROM inventario_perfiles")
+    conexion = ctx.db.conexion
+
+    def ejecutar():
+        id_inicial = ctx.escalar("SELECT IFNULL(MAX(id), 0) FROM historial")
+        productos = [ctx.rnd.randint(1, total) for _ in range(MOVIMIENTOS_POR_REPETICION // 2)]
+        try:
+            # Pares salida/entrada: el stock final queda igual al inicial
+            for producto_id in productos:
+                for cantidad in (-1, 1):
+                    cursor = conexion.cursor()
+                    cursor.execute("SELECT stock_actual, stock_minimo FROM inventario_perfiles WHERE id = ?",
+                                   (producto_id,))
+                    cursor.fetchone()
+                    ahora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    cursor.execute("UPDATE inventario_perfiles SET stock_actual = stock_actual + ?, "
+                                   "fecha_modificacion = ? WHERE id = ?", (cantidad, ahora, producto_id))
+                    cursor.execute("INSERT INTO historial (producto_id, tipo_movimiento, cantidad, "
+                                   "fecha_movimiento, accion, usuario) VALUES (?, ?, ?, ?, ?, ?)",
+                                   (producto_id, "ENTRADA" if cantidad > 0 else "SALIDA", cantidad,
+                                    ahora, "BENCHMARK", "benchmark"))
+                    conexion.commit()
+        finally:
+            conexion.execute("DELETE FROM historial WHERE id > ?", (id_inicial,))
+            conexion.commit()
+    return ejecutar
+
+
+def _recepcion_compra(ctx: Contexto):
+    # Importación diferida: el paquete compras requiere PyQt6
+    from rexus.modules.compras.recepcion_masiva import RecepcionMasiva
+
+    total = ctx.escalar("SELECT MAX(id) FROM inventario_perfiles")
+    conexion = ctx.db.conexion
+    recepcion = RecepcionMasiva(ctx.db)
+
+    def ejecutar():
+        id_inicial = ctx.escalar("SELECT IFNULL(MAX(id), 0) FROM historial")
+        lineas = [{"id_producto": ctx.rnd.randint(1, total), "cantidad_recibida": ctx.rnd.randint(1, 20)}
+                  for _ in range(LINEAS_RECEPCION)]
+        try:
+            resultado = recepcion.recibir("BENCHMARK", lineas, "benchmark")
+            if resultado.error:
+                raise RuntimeError(resultado.error)
+            return resultado.aplicadas
+        finally:
+            # Se descuenta lo recibido y se borran los movimientos
+            conexion.execute("UPDATE inventario_perfiles SET stock_actual = stock_actual - m.cantidad "
+                             "FROM (SELECT producto_id, SUM(cantidad) AS cantidad FROM historial "
+                             "WHERE id > ? GROUP BY producto_id) AS m "
+                             "WHERE m.producto_id = inventario_perfiles.id", (id_inicial,))
+            conexion.execute("DELETE FROM historial WHERE id > ?", (id_inicial,))
+            conexion.commit()
+    return ejecutar
+
+
+def _reporte(metodo: str):
+    def preparar(ctx: Contexto):
+        # Importación diferida: el paquete inventario requiere PyQt6
+        from rexus.modules.inventario.submodules.analitica_manager import AnaliticaManager
+        manager = AnaliticaManager(ctx.db)
+        return getattr(manager, metodo)
+    return preparar
+
+
+def _exportacion_csv(ctx: Contexto):
+    desde = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d %H:%M:%S")
+    consultas = (
+        ("productos", ctx.sql.get_query("inventario", "select_base_paginacion"), ()),
+        ("movimientos", "SELECT id, producto_id, tipo_movimiento, cantidad, fecha_movimiento, usuario "
+                        "FROM historial WHERE fecha_movimiento >= ? ORDER BY fecha_movimiento", (desde,)),
+    )
+
+    def ejecutar():
+        for nombre, sql, params in consultas:
+            cursor = ctx.db.cursor()
+            try:
+                cursor.execute(sql, params)
+                encabezados = [desc[0] for desc in cursor.description]
+                stream_export(iter_cursor_rows(cursor), encabezados,
+                              os.path.join(ctx.directorio, f"{nombre}.csv"), "csv")
+            finally:
+                cursor.close()
+    return ejecutar
+
+
+def _backup(ctx: Contexto):
+    destino = os.path.join(ctx.directorio, "backup.db")
+    compresor = BackupCompressor(os.path.join(ctx.directorio, "backups"))
+
+    def ejecutar():
+        copia = sqlite3.connect(destino)
+        try:
+            ctx.db.conexion.backup(copia)
+        finally:
+            copia.close()
+        resultado = compresor.compress_file(destino)
+        os.remove(destino)
+        os.remove(resultado["compressed_path"])
+        return resultado["compressed_size"]
+    return ejecutar
+
+
+def _auditoria_rango(ctx: Contexto):
+    sql_modulos = ctx.sql.get_query("auditoria", "count_acciones_por_modulo")
+    sql_rango = ("SELECT id, fecha_hora, usuario, modulo, accion, descripcion, nivel_criticidad, resultado "
+                 "FROM auditoria_log WHERE modulo = ? AND fecha_hora >= ? AND fecha_hora < ? "
+                 "ORDER BY fecha_hora DESC LIMIT 500")
+    maxima = ctx.escalar("SELECT MAX(fecha_hora) FROM auditoria_log")
+    hasta = datetime.strptime(maxima, "%Y-%m-%d %H:%M:%S") if maxima else datetime.now()
+    desde_mes = (hasta - timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
+    desde_anio = (hasta - timedelta(days=365)).strftime("%Y-%m-%d %H:%M:%S")
+
+    def ejecutar():
+        ctx.leer_todo(sql_modulos, (desde_mes,))
+        ctx.leer_todo(sql_rango, ("inventario", desde_anio, desde_mes))
+    return ejecutar
+
+
+CASOS: List[Caso] = [
+    Caso("paginacion_inicio", "Primera página de productos + total", _paginacion("inicio")),
+    Caso("paginacion_medio", "Página media de productos + total", _paginacion("medio")),
+    Caso("paginacion_fin", "Última página de productos + total", _paginacion("fin")),
+    Caso("busqueda_like", "6 búsquedas LIKE en 5 columnas", _busqueda_like),
+    Caso("indice_construccion", "Construcción completa del índice FTS5", _indice_construccion, 3),
+    Caso("busqueda_indice", "6 búsquedas tecla por tecla en el índice", _busqueda_indice),
+    Caso("movimiento_stock", f"{MOVIMIENTOS_POR_REPETICION} movimientos con commit", _movimiento_stock),
+    Caso("recepcion_compra", f"Recepción de {LINEAS_RECEPCION} líneas en una transacción", _recepcion_compra),
+    Caso("reporte_abc", "Análisis ABC por valor", _reporte("analisis_abc")),
+    Caso("reporte_valoracion", "Valoración con totales", _reporte("valoracion")),
+    Caso("reporte_rotacion", "Rotación y stock inmovilizado", _reporte("rotacion")),
+    Caso("exportacion_csv", "Productos + movimientos de 90 días a CSV", _exportacion_csv, 3),
+    Caso("backup", "Copia de la base y compresión gzip", _backup, 2),
+    Caso("auditoria_rango", "Auditoría por módulo y por rango de fechas", _auditoria_rango),
+]
+
+
+# --- Ejecución y comparación -------------------------------------------------
+
+def _percentil(valores: List[float], percentil: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(percentil / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+def medir(caso: Caso, ctx: Contexto, repeticiones: int) -> Dict[str, Any]:
+    """Ejecuta un caso y devuelve sus tiempos o el motivo por el que se omitió."""
+    try:
+        funcion = caso.preparar(ctx)
+        funcion()   # calentamiento: cachés de SQLite y del sistema operativo
+    except ImportError as e:
+        return {"omitido": f"dependencia no disponible: {e}"}
+    except Exception as e:
+        return {"omitido": f"{type(e).__name__}: {e}"}
+
+    veces = min(repeticiones, caso.repeticiones_max or repeticiones)
+    tiempos = []
+    for _ in range(veces):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        "mediana": statistics.median(tiempos),
+        "p95": _percentil(tiempos, 95),
+        "minimo": min(tiempos),
+        "repeticiones": veces,
+    }
+
+
+def comparar(resultados: Dict[str, Dict[str, Any]], baseline: Dict[str, Any],
+             tolerancia: float) -> List[str]:
+    """Nombres de los casos cuya mediana empeoró más que la tolerancia."""
+    regresiones = []
+    anteriores = baseline.get("resultados", {})
+    for nombre, actual in resultados.items():
+        anterior = anteriores.get(nombre)
+        if "mediana" not in actual or not anterior or "mediana" not in anterior:
+            continue
+        limite = anterior["mediana"] * (1 + tolerancia)
+        if actual["mediana"] > limite and actual["mediana"] - anterior["mediana"] > PISO_RUIDO_SEGUNDOS:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def _ms(segundos: float) -> str:
+    return f"{segundos * 1000:,.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de Rexus.app")
+    parser.add_argument("base", nargs="?", default="data/benchmark.db",
+                        help="Base SQLite generada con tools/generar_dataset.py")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--casos", nargs="+", choices=[c.nombre for c in CASOS],
+                        help="Ejecutar solo estos casos")
+    parser.add_argument("--baseline", default=RUTA_BASELINE)
+    parser.add_argument("--guardar-baseline", action="store_true",
+                        help="Guardar los resultados como nueva línea base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="Empeoramiento relativo admitido de la mediana (0.2 = 20%%)")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.base):
+        parser.error(f"No existe {args.base}; generarla con tools/generar_dataset.py")
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline) and not args.guardar_baseline:
+        with open(args.baseline, encoding="utf-8") as archivo:
+            baseline = json.load(archivo)
+
+    casos = [c for c in CASOS if not args.casos or c.nombre in args.casos]
+    resultados: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="rexus_bench_") as directorio:
+        ctx = Contexto(args.base, directorio, args.semilla)
+        try:
+            dataset = ctx.dataset()
+            print("Dataset: " + ", ".join(f"{tabla}={n:,}" for tabla, n in dataset.items()))
+            if baseline and baseline.get("dataset") != dataset:
+                print("AVISO: el dataset difiere del de la línea base; la comparación no es válida")
+
+            anteriores = baseline.get("resultados", {})
+            print(f"\n{'caso':<22} {'mediana ms':>11} {'p95 ms':>10} {'base ms':>10} {'cambio':>8}")
+            for caso in casos:
+                resultado = medir(caso, ctx, args.repeticiones)
+                resultados[caso.nombre] = resultado
+                if "omitido" in resultado:
+                    print(f"{caso.nombre:<22} omitido ({resultado['omitido']})")
+                    continue
+                anterior = anteriores.get(caso.nombre, {}).get("mediana")
+                base = _ms(anterior) if anterior else "-"
+                cambio = f"{(resultado['mediana'] / anterior - 1) * 100:+.0f}%" if anterior else "-"
+                print(f"{caso.nombre:<22} {_ms(resultado['mediana']):>11} "
+                      f"{_ms(resultado['p95']):>10} {base:>10} {cambio:>8}")
+        finally:
+            ctx.db.close()
+
+    if args.guardar_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "generado": datetime.now().isoformat(timespec="seconds"),
+                "plataforma": f"{platform.system()} {platform.machine()} Python {platform.python_version()} "
+                              f"SQLite {sqlite3.sqlite_version}",
+                "dataset": dataset,
+                "resultados": {n: r for n, r in resultados.items() if "mediana" in r},
+            }, archivo, indent=2)
+        print(f"\nLínea base guardada en {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\nSin línea base en {args.baseline}; usar --guardar-baseline para crearla")
+        return 0
+
+    regresiones = comparar(resultados, baseline, args.tolerancia)
+    if regresiones:
+        print(f"\nREGRESIÓN (> {args.tolerancia:.0%}): {', '.join(regresiones)}")
+        return 1
+    print(f"\nSin regresiones (tolerancia {args.tolerancia:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Generador de Dataset Sintético - Rexus.app
+
+Llena una base con volúmenes realistas para los benchmarks de
+tools/benchmark_suite.py: cientos de miles de productos, millones de
+movimientos de stock y años de auditoría. A diferencia de
+rexus/utils/demo_data_generator.py (pocas decenas de filas para la UI), los
+datos se generan en streaming por lotes y son reproducibles: la misma semilla,
+escala y fecha de fin producen exactamente las mismas filas.
+
+- Popularidad de productos con cola larga (Pareto): pocos productos
+  concentran la mayoría de los movimientos, como en el depósito real
+- Movimientos con fecha distribuida en los años configurados, entradas
+  positivas y salidas negativas (convención de historial)
+- Auditoría con volumen diario constante durante años
+
+Destinos:
+- SQLite (por defecto): crea el esquema de sql/benchmark/ y los índices
+  después de la carga
+- SQL Server (--odbc): inserta en un esquema existente con las mismas
+  columnas, usando fast_executemany de pyodbc
+
+Uso:
+    python tools/generar_dataset.py data/benchmark.db [--escala grande] [--semilla 42]
+    python tools/generar_dataset.py --odbc "DRIVER=...;SERVER=...;DATABASE=..." --escala mediana
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Agregar ruta del proyecto
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rexus.utils.demo_data_generator import DemoDataGenerator  # noqa: E402
+from rexus.utils.sql_query_manager import SQLQueryManager  # noqa: E402
+
+ESCALAS: Dict[str, Dict[str, int]] = {
+    "pequena": {
+        "productos": 5000, "movimientos": 100000, "anios_auditoria": 1,
+        "auditoria_por_dia": 200, "obras": 200, "usuarios": 50, "reservas": 2000,
+    },
+    "mediana": {
+        "productos": 30000, "movimientos": 1000000, "anios_auditoria": 2,
+        "auditoria_por_dia": 1000, "obras": 1500, "usuarios": 200, "reservas": 15000,
+    },
+    "grande": {
+        "productos": 100000, "movimientos": 5000000, "anios_auditoria": 3,
+        "auditoria_por_dia": 3000, "obras": 5000, "usuarios": 500, "reservas": 50000,
+    },
+}
+
+TAMANO_LOTE = 10000
+ANIOS_MOVIMIENTOS = 3
+
+CATEGORIAS = ["Perfil", "Vidrio", "Herraje", "Accesorio", "Sellador", "Tornillería"]
+ACABADOS = ["Natural", "Anodizado", "Blanco", "Negro", "Bronce", "Símil madera"]
+UNIDADES = {"Perfil": "barra", "Vidrio": "m²", "Herraje": "unidad",
+            "Accesorio": "unidad", "Sellador": "cartucho", "Tornillería": "caja"}
+PROVEEDORES = ["Aluar", "Hydro", "Vasa", "Giesse", "Roto", "Sika", "Fischer", "Blindex"]
+MODULOS_AUDITORIA = ["inventario", "obras", "pedidos", "compras", "usuarios",
+                     "vidrios", "herrajes", "logistica", "configuracion"]
+ACCIONES_AUDITORIA = ["CREAR", "ACTUALIZAR", "ELIMINAR", "CONSULTAR", "LOGIN", "EXPORTAR"]
+NIVELES_AUDITORIA = ["BAJA", "MEDIA", "ALTA", "CRITICA"]
+ROLES = ["ADMIN", "SUPERVISOR", "USUARIO", "OPERADOR"]
+
+COLUMNAS: Dict[str, Tuple[str, ...]] = {
+    "usuarios": ("id", "usuario", "nombre_completo", "email", "rol", "activo",
+                 "fecha_creacion", "fecha_modificacion"),
+    "obras": ("id", "codigo", "nombre", "cliente", "direccion", "estado", "presupuesto_total",
+              "fecha_inicio", "activo", "fecha_creacion", "fecha_modificacion"),
+    "inventario_perfiles": ("id", "codigo", "descripcion", "categoria", "acabado", "proveedor",
+                            "stock_actual", "stock_minimo", "precio_unitario", "unidad_medida",
+                            "ubicacion", "activo", "fecha_creacion", "fecha_modificacion"),
+    "historial": ("id", "producto_id", "tipo_movimiento", "cantidad", "fecha_movimiento",
+                  "accion", "descripcion", "usuario", "obra_id"),
+    "reserva_materiales": ("id", "producto_id", "obra_id", "cantidad_reservada", "estado",
+                           "fecha_reserva"),
+    "auditoria_log": ("id", "usuario", "modulo", "accion", "descripcion", "tabla_afectada",
+                      "registro_id", "nivel_criticidad", "resultado", "fecha_hora"),
+}
+
+
+def _fecha(base: datetime, segundos: float) -> str:
+    return (base + timedelta(seconds=segundos)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class GeneradorDataset:
+    """Filas sintéticas reproducibles, una secuencia perezosa por tabla."""
+
+    def __init__(self, escala: Dict[str, int], semilla: int = 42,
+                 fecha_fin: date = None):
+        self.escala = escala
+        self.semilla = semilla
+        fin = fecha_fin or date.today()
+        self.fin = datetime(fin.year, fin.month, fin.day)
+
+    def _random(self, tabla: str) -> random.Random:
+        # Un generador por tabla: cambiar una escala no altera las demás tablas
+        return random.Random(f"{self.semilla}:{tabla}")
+
+    def usuarios(self) -> Iterator[tuple]:
+        rnd = self._random("usuarios")
+        for i in range(1, self.escala["usuarios"] + 1):
+            nombre = rnd.choice(DemoDataGenerator.NOMBRES)
+            apellido = rnd.choice(DemoDataGenerator.APELLIDOS)
+            alta = _fecha(self.fin, -rnd.uniform(30, 1500) * 86400)
+            yield (i, f"usuario{i:05d}", f"{nombre} {apellido}", f"usuario{i:05d}@rexus.local",
+                   rnd.choice(ROLES), 1 if rnd.random() > 0.05 else 0, alta, alta)
+
+    def obras(self) -> Iterator[tuple]:
+        rnd = self._random("obras")
+        for i in range(1, self.escala["obras"] + 1):
+            alta = _fecha(self.fin, -rnd.uniform(0, ANIOS_MOVIMIENTOS * 365) * 86400)
+            cliente = f"{rnd.choice(DemoDataGenerator.NOMBRES)} {rnd.choice(DemoDataGenerator.APELLIDOS)}"
+            yield (i, f"OBR-{i:06d}", f"Obra {cliente} {i}", cliente,
+                   rnd.choice(DemoDataGenerator.DIRECCIONES_LA_PLATA),
+                   rnd.choice(DemoDataGenerator.ESTADOS_OBRA), round(rnd.uniform(5e5, 5e7), 2),
+                   alta[:10], 1, alta, alta)
+
+    def productos(self) -> Iterator[tuple]:
+        rnd = self._random("productos")
+        for i in range(1, self.escala["productos"] + 1):
+            categoria = rnd.choice(CATEGORIAS)
+            acabado = rnd.choice(ACABADOS)
+            alta = _fecha(self.fin, -rnd.uniform(30, ANIOS_MOVIMIENTOS * 365) * 86400)
+            modificacion = _fecha(self.fin, -rnd.uniform(0, 30) * 86400)
+            # ~15% sin stock, el resto con cola larga
+            stock = 0 if rnd.random() < 0.15 else round(rnd.paretovariate(1.5) * 10, 0)
+            yield (i, f"{categoria[:3].upper()}-{i:06d}",
+                   f"{categoria} {acabado} {rnd.randint(10, 999)}mm serie {rnd.randint(1, 40)}",
+                   categoria, acabado, rnd.choice(PROVEEDORES), stock, rnd.randint(5, 50),
+                   round(rnd.uniform(100, 50000), 2), UNIDADES[categoria],
+                   f"Depósito {rnd.randint(1, 4)} - Estante {rnd.randint(1, 60)}",
+                   1 if rnd.random() > 0.02 else 0, alta, modificacion)
+
+    def _pesos_productos(self) -> List[float]:
+        rnd = self._random("popularidad")
+        return list(accumulate(rnd.paretovariate(1.16) for _ in range(self.escala["productos"])))
+
+    def movimientos(self) -> Iterator[tuple]:
+        rnd = self._random("movimientos")
+        pesos = self._pesos_productos()
+        ids = range(1, self.escala["productos"] + 1)
+        total = self.escala["movimientos"]
+        segundos = ANIOS_MOVIMIENTOS * 365 * 86400
+        usuarios = max(1, self.escala["usuarios"])
+        obras = max(1, self.escala["obras"])
+        emitidos = 0
+        while emitidos < total:
+            lote = min(TAMANO_LOTE, total - emitidos)
+            for producto_id in rnd.choices(ids, cum_weights=pesos, k=lote):
+                emitidos += 1
+                if rnd.random() < 0.45:
+                    tipo, cantidad, obra_id = "ENTRADA", rnd.randint(1, 200), None
+                else:
+                    tipo, cantidad, obra_id = "SALIDA", -rnd.randint(1, 50), rnd.randint(1, obras)
+                yield (emitidos, producto_id, tipo, cantidad,
+                       _fecha(self.fin, -rnd.uniform(0, segundos)),
+                       f"MOVIMIENTO_{tipo}", f"{tipo.title()} de stock",
+                       f"usuario{rnd.randint(1, usuarios):05d}", obra_id)
+
+    def reservas(self) -> Iterator[tuple]:
+        rnd = self._random("reservas")
+        for i in range(1, self.escala["reservas"] + 1):
+            yield (i, rnd.randint(1, self.escala["productos"]), rnd.randint(1, max(1, self.escala["obras"])),
+                   rnd.randint(1, 30), "ACTIVA" if rnd.random() < 0.6 else rnd.choice(["CONSUMIDA", "CANCELADA"]),
+                   _fecha(self.fin, -rnd.uniform(0, 180) * 86400))
+
+    def auditoria(self) -> Iterator[tuple]:
+        rnd = self._random("auditoria")
+        por_dia = self.escala["auditoria_por_dia"]
+        dias = self.escala["anios_auditoria"] * 365
+        usuarios = max(1, self.escala["usuarios"])
+        registro = 0
+        for dia in range(dias, 0, -1):
+            inicio_dia = -dia * 86400
+            # Cronológico dentro del día, como lo escribe la aplicación
+            for segundo in sorted(rnd.uniform(0, 86400) for _ in range(por_dia)):
+                registro += 1
+                modulo = rnd.choice(MODULOS_AUDITORIA)
+                accion = rnd.choice(ACCIONES_AUDITORIA)
+                yield (registro, f"usuario{rnd.randint(1, usuarios):05d}", modulo, accion,
+                       f"{accion.title()} en {modulo}", modulo, rnd.randint(1, 100000),
+                       rnd.choices(NIVELES_AUDITORIA, weights=(70, 20, 8, 2))[0],
+                       "EXITOSO" if rnd.random() > 0.03 else "FALLIDO",
+                       _fecha(self.fin, inicio_dia + segundo))
+
+    def tablas(self) -> List[Tuple[str, Iterable[tuple], int]]:
+        """(tabla, filas, total esperado) en orden de carga."""
+        e = self.escala
+        return [
+            ("usuarios", self.usuarios(), e["usuarios"]),
+            ("obras", self.obras(), e["obras"]),
+            ("inventario_perfiles", self.productos(), e["productos"]),
+            ("historial", self.movimientos(), e["movimientos"]),
+            ("reserva_materiales", self.reservas(), e["reservas"]),
+            ("auditoria_log", self.auditoria(), e["anios_auditoria"] * 365 * e["auditoria_por_dia"]),
+        ]
+
+
+def _insertar(conexion, tabla: str, filas: Iterable[tuple], total: int) -> int:
+    columnas = COLUMNAS[tabla]
+    sql = (f"INSERT INTO {tabla} ({', '.join(columnas)}) "
+           f"VALUES ({', '.join('?' for _ in columnas)})")
+    cursor = conexion.cursor()
+    if hasattr(cursor, "fast_executemany"):
+        cursor.fast_executemany = True
+    insertadas = 0
+    inicio = time.perf_counter()
+    filas = iter(filas)
+    while True:
+        lote = list(islice(filas, TAMANO_LOTE))
+        if not lote:
+            break
+        cursor.executemany(sql, lote)
+        conexion.commit()
+        insertadas += len(lote)
+        print(f"\r  {tabla:<22} {insertadas:>10,} / {total:,}", end="", flush=True)
+    cursor.close()
+    print(f"  ({time.perf_counter() - inicio:.1f}s)")
+    return insertadas
+
+
+def poblar_sqlite(ruta: str, generador: GeneradorDataset) -> Dict[str, int]:
+    """Crea el esquema de benchmark en un archivo SQLite nuevo y lo llena."""
+    if os.path.exists(ruta):
+        raise FileExistsError(f"La base de destino ya existe: {ruta}")
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    sql_manager = SQLQueryManager()
+    conexion = sqlite3.connect(ruta)
+    try:
+        # Carga masiva: durabilidad relajada, índices al final
+        conexion.execute("PRAGMA journal_mode=OFF")
+        conexion.execute("PRAGMA synchronous=OFF")
+        conexion.executescript(sql_manager.get_query("benchmark", "crear_esquema_sqlite"))
+        totales = {tabla: _insertar(conexion, tabla, filas, total)
+                   for tabla, filas, total in generador.tablas()}
+        print("  creando índices...")
+        conexion.executescript(sql_manager.get_query("benchmark", "crear_indices_sqlite"))
+        conexion.execute("ANALYZE")
+        conexion.commit()
+        return totales
+    finally:
+        conexion.close()
+
+
+def poblar_odbc(cadena: str, generador: GeneradorDataset,
+                tablas: Sequence[str] = ()) -> Dict[str, int]:
+    """Inserta el dataset en un esquema SQL Server existente."""
+    try:
+        import pyodbc
+    except ImportError:
+        raise RuntimeError("pyodbc no está instalado; no se puede usar --odbc")
+
+    conexion = pyodbc.connect(cadena, autocommit=False)
+    totales: Dict[str, int] = {}
+    try:
+        for tabla, filas, total in generador.tablas():
+            if tablas and tabla not in tablas:
+                continue
+            cursor = conexion.cursor()
+            cursor.execute(f"SET IDENTITY_INSERT {tabla} ON")
+            cursor.close()
+            try:
+                totales[tabla] = _insertar(conexion, tabla, filas, total)
+            finally:
+                cursor = conexion.cursor()
+                cursor.execute(f"SET IDENTITY_INSERT {tabla} OFF")
+                cursor.close()
+        conexion.commit()
+        return totales
+    finally:
+        conexion.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de dataset sintético para benchmarks")
+    parser.add_argument("destino", nargs="?", default="data/benchmark.db",
+                        help="Archivo SQLite a crear (ignorado con --odbc)")
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="pequena")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--fecha-fin", type=date.fromisoformat, default=None,
+                        help="Fecha del último dato (AAAA-MM-DD, por defecto hoy)")
+    parser.add_argument("--odbc", help="Cadena de conexión ODBC a SQL Server")
+    parser.add_argument("--tablas", nargs="+", default=(), choices=sorted(COLUMNAS),
+                        help="Solo estas tablas (con --odbc)")
+    args = parser.parse_args()
+
+    generador = GeneradorDataset(ESCALAS[args.escala], args.semilla, args.fecha_fin)
+    print(f"Dataset '{args.escala}' (semilla {args.semilla}, hasta {generador.fin:%Y-%m-%d})")
+    inicio = time.perf_counter()
+    if args.odbc:
+        totales = poblar_odbc(args.odbc, generador, args.tablas)
+    else:
+        totales = poblar_sqlite(args.destino, generador)
+    print(f"{sum(totales.values()):,} filas en {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()